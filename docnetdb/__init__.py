@@ -1,8 +1,21 @@
 """A pure Python document and graph database engine."""
 
+from docnetdb.compact import CompactVertex
 from docnetdb.docnetdb import DocNetDB
 from docnetdb.edge import Edge
 from docnetdb.exceptions import VertexInsertionException
+from docnetdb.frozen import FrozenDocNetDB
+from docnetdb.sharded import ShardedDocNetDB
+from docnetdb.sqlite import SQLiteDocNetDB
 from docnetdb.vertex import Vertex
 
-__all__ = ["DocNetDB", "Vertex", "Edge", "VertexInsertionException"]
+__all__ = [
+    "DocNetDB",
+    "ShardedDocNetDB",
+    "SQLiteDocNetDB",
+    "FrozenDocNetDB",
+    "Vertex",
+    "CompactVertex",
+    "Edge",
+    "VertexInsertionException",
+]
@@ -0,0 +1,5 @@
+"""This package defines benchmarks of the DocNetDB operations.
+
+Run them with ``python -m docnetdb.benchmarks``, and compare two runs with
+``python -m docnetdb.benchmarks.compare``.
+"""
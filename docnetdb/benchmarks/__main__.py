@@ -0,0 +1,77 @@
+"""Run the DocNetDB benchmarks and write the results as JSON.
+
+Example
+-------
+$ python -m docnetdb.benchmarks --sizes 1000 10000 --output before.json
+"""
+
+import argparse
+import json
+import sys
+from typing import List, Optional
+
+from docnetdb.benchmarks.scenarios import SCENARIOS, run_benchmarks
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Parse the arguments, run the benchmarks and write the results."""
+    parser = argparse.ArgumentParser(
+        prog="python -m docnetdb.benchmarks",
+        description=__doc__.split("\n")[0],
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1000, 10000],
+        help="numbers of vertices of the synthetic graphs",
+    )
+    parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        choices=sorted(SCENARIOS),
+        help="scenarios to run (all by default)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--ops",
+        type=int,
+        default=100,
+        help="number of operations of the repeated scenarios",
+    )
+    parser.add_argument(
+        "--edge-factor",
+        type=float,
+        default=2.0,
+        help="number of edges per vertex",
+    )
+    parser.add_argument(
+        "--no-memory",
+        action="store_true",
+        help="don't measure the peak memory (faster)",
+    )
+    parser.add_argument(
+        "--output", help="file to write the results to (stdout by default)"
+    )
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(
+        args.sizes,
+        args.scenarios,
+        seed=args.seed,
+        ops=args.ops,
+        edge_factor=args.edge_factor,
+        memory=not args.no_memory,
+    )
+
+    if args.output is None:
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        with open(args.output, "w") as file_:
+            json.dump(results, file_, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""Compare the results of two benchmark runs.
+
+Example
+-------
+$ python -m docnetdb.benchmarks.compare before.json after.json
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, List, Optional
+
+
+def compare_results(
+    old: Dict, new: Dict, threshold: float = 0.1
+) -> List[Dict]:
+    """Compare the results of two runs, scenario by scenario.
+
+    Only the (scenario, size) pairs present in both runs are compared.
+
+    Parameters
+    ----------
+    old : Dict
+        The results of the reference run.
+    new : Dict
+        The results of the compared run.
+    threshold : float, optional
+        The relative time increase above which a scenario is marked as a
+        regression (0.1 by default, for 10 %).
+
+    Returns
+    -------
+    List[Dict]
+        One row per compared scenario, with the old and new time and peak
+        memory, their relative changes, and a "regression" flag.
+    """
+
+    def index(run: Dict) -> Dict:
+        return {(r["scenario"], r["size"]): r for r in run["results"]}
+
+    def change(old_value, new_value) -> Optional[float]:
+        if old_value is None or new_value is None or old_value == 0:
+            return None
+        return (new_value - old_value) / old_value
+
+    old_index, new_index = index(old), index(new)
+    rows = []
+    for key, new_result in new_index.items():
+        if key not in old_index:
+            continue
+        old_result = old_index[key]
+        time_change = change(old_result["time"], new_result["time"])
+        rows.append(
+            {
+                "scenario": key[0],
+                "size": key[1],
+                "old_time": old_result["time"],
+                "new_time": new_result["time"],
+                "time_change": time_change,
+                "old_peak_memory": old_result["peak_memory"],
+                "new_peak_memory": new_result["peak_memory"],
+                "memory_change": change(
+                    old_result["peak_memory"], new_result["peak_memory"]
+                ),
+                "regression": time_change is not None
+                and time_change > threshold,
+            }
+        )
+    return rows
+
+
+def _format_change(value: Optional[float]) -> str:
+    """Format a relative change as a percentage."""
+    return "n/a" if value is None else f"{value:+.1%}"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Compare two result files and print a table.
+
+    The exit code is 1 if a regression is found and ``--fail`` is given.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m docnetdb.benchmarks.compare",
+        description=__doc__.split("\n")[0],
+    )
+    parser.add_argument("old", help="results of the reference run")
+    parser.add_argument("new", help="results of the compared run")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="relative time increase considered a regression",
+    )
+    parser.add_argument(
+        "--fail",
+        action="store_true",
+        help="exit with code 1 if a regression is found",
+    )
+    args = parser.parse_args(argv)
+
+    with open(args.old) as file_:
+        old = json.load(file_)
+    with open(args.new) as file_:
+        new = json.load(file_)
+    rows = compare_results(old, new, args.threshold)
+
+    print(
+        f"{'scenario':<12} {'size':>9} {'old (s)':>10} {'new (s)':>10} "
+        f"{'time':>8} {'memory':>8}"
+    )
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(
+            f"{row['scenario']:<12} {row['size']:>9} "
+            f"{row['old_time']:>10.4f} {row['new_time']:>10.4f} "
+            f"{_format_change(row['time_change']):>8} "
+            f"{_format_change(row['memory_change']):>8}{flag}"
+        )
+
+    if args.fail and any(row["regression"] for row in rows):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""Compare the load time, save time and file size of each compression.
+
+Example
+-------
+$ python -m docnetdb.benchmarks.compression --sizes 10000 100000
+"""
+
+import argparse
+import json
+import pathlib
+import sys
+import tempfile
+import time
+from typing import Dict, Iterable, List, Optional
+
+from docnetdb.benchmarks.generator import generate_graph
+from docnetdb.compression import CODECS, SUFFIXES
+from docnetdb.docnetdb import DocNetDB
+
+# The compressions to compare, None being the plain text.
+COMPRESSIONS = [None, *CODECS]
+
+
+def run_compression_benchmark(
+    sizes: Iterable[int], seed: int = 0, edge_factor: float = 2.0
+) -> Dict:
+    """Save and load the same graph with each compression.
+
+    Returns
+    -------
+    Dict
+        The JSON-serializable results, with one result per size and
+        compression : the file size in bytes and the save and load times in
+        seconds.
+    """
+    results: List[Dict] = []
+    with tempfile.TemporaryDirectory() as tempdir:
+        directory = pathlib.Path(tempdir)
+        for size in sizes:
+            db = generate_graph(
+                DocNetDB(directory / "graph.db"), size, edge_factor, seed=seed
+            )
+            for compression in COMPRESSIONS:
+                suffix = SUFFIXES.get(compression, "")
+                db.path = directory / f"graph-{size}.db{suffix}"
+
+                start = time.perf_counter()
+                db.save()
+                save_time = time.perf_counter() - start
+
+                start = time.perf_counter()
+                DocNetDB(db.path)
+                load_time = time.perf_counter() - start
+
+                results.append(
+                    {
+                        "compression": compression or "none",
+                        "size": size,
+                        "file_size": db.path.stat().st_size,
+                        "save_time": save_time,
+                        "load_time": load_time,
+                    }
+                )
+    return {
+        "meta": {"seed": seed, "edge_factor": edge_factor},
+        "results": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Parse the arguments, run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(
+        prog="python -m docnetdb.benchmarks.compression",
+        description=__doc__.split("\n")[0],
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--edge-factor", type=float, default=2.0)
+    args = parser.parse_args(argv)
+    results = run_compression_benchmark(
+        args.sizes, args.seed, args.edge_factor
+    )
+    json.dump(results, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""Measure the memory that forked readers share with their parent.
+
+A database is loaded, then processes are forked and read all of it, like
+the workers of a prefork server. The shared and private memory of each
+worker is read in /proc, so this benchmark only runs on Linux.
+
+Example
+-------
+$ python -m docnetdb.benchmarks.fork --size 100000 --workers 4
+"""
+
+import argparse
+import json
+import os
+import pathlib
+import random
+import sys
+import tempfile
+from typing import Callable, Dict, List, Optional
+
+from docnetdb.benchmarks.generator import generate_graph
+from docnetdb.docnetdb import DocNetDB
+from docnetdb.frozen import freeze_gc
+
+# The file that sums the memory mappings of a process.
+SMAPS_ROLLUP = "/proc/self/smaps_rollup"
+
+# The ways to prepare the database before forking.
+MODES: Dict[str, Callable[[pathlib.Path], DocNetDB]] = {
+    "DocNetDB": DocNetDB,
+    "FrozenDocNetDB": lambda path: DocNetDB(path).freeze(),
+}
+
+
+def is_supported() -> bool:
+    """Return whether this platform can fork and measure the workers."""
+    return hasattr(os, "fork") and os.path.exists(SMAPS_ROLLUP)
+
+
+def read_memory() -> Dict[str, int]:
+    """Return the shared and private memory of this process, in bytes."""
+    memory = {"shared": 0, "private": 0}
+    with open(SMAPS_ROLLUP) as file_:
+        for line in file_:
+            name, __, value = line.partition(":")
+            kind = name.split("_")[0].lower()
+            if kind in memory:
+                memory[kind] += int(value.split()[0]) * 1024
+    return memory
+
+
+def read_database(db: DocNetDB, searches: int, seed: int) -> None:
+    """Read all the vertices, and the edges of some of them."""
+    places = [vertex.place for vertex in db.search(lambda v: True)]
+    rng = random.Random(seed)
+    for place in rng.sample(places, min(searches, len(places))):
+        for __ in db.search_edge(db[place]):
+            pass
+
+
+def fork(function: Callable[[], Dict]) -> Dict:
+    """Run a function in a forked process and return its result.
+
+    The result is sent back as JSON through a pipe.
+    """
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:  # pragma: no cover
+        # The forked process never returns, even if the function fails.
+        status = 1
+        try:
+            os.close(read_fd)
+            with os.fdopen(write_fd, "w") as file_:
+                json.dump(function(), file_)
+            status = 0
+        finally:
+            os._exit(status)
+    os.close(write_fd)
+    with os.fdopen(read_fd) as file_:
+        data = file_.read()
+    __, status = os.waitpid(pid, 0)
+    if status != 0:
+        raise RuntimeError("A forked process of the benchmark failed")
+    return json.loads(data)
+
+
+def measure_mode(
+    path: pathlib.Path, mode: str, workers: int, searches: int, seed: int
+) -> Dict:
+    """Load the database in a mode and measure the forked readers.
+
+    This runs in a forked process, so that the modes don't share memory.
+    """
+    db = MODES[mode](path)
+    freeze_gc()
+    parent = read_memory()
+    results = [
+        fork(lambda: (read_database(db, searches, seed), read_memory())[1])
+        for __ in range(workers)
+    ]
+    return {
+        "mode": mode,
+        "parent": parent["shared"] + parent["private"],
+        "worker_shared": sum(r["shared"] for r in results) // workers,
+        "worker_private": sum(r["private"] for r in results) // workers,
+    }
+
+
+def run_fork_benchmark(
+    size: int,
+    workers: int = 2,
+    searches: int = 1000,
+    seed: int = 0,
+    edge_factor: float = 2.0,
+) -> Dict:
+    """Measure the forked readers of each mode on the same graph.
+
+    Returns
+    -------
+    Dict
+        The JSON-serializable results, with one result per mode : the
+        memory of the parent process, and the mean shared and private
+        memory of a worker, in bytes.
+
+    Raises
+    ------
+    RuntimeError
+        If the platform can't fork or measure the workers.
+    """
+    if not is_supported():
+        raise RuntimeError("This benchmark needs fork and /proc (Linux)")
+
+    results: List[Dict] = []
+    with tempfile.TemporaryDirectory() as tempdir:
+        path = pathlib.Path(tempdir) / "graph.db"
+        generate_graph(DocNetDB(path), size, edge_factor, seed=seed).save()
+        for mode in MODES:
+            results.append(
+                fork(lambda: measure_mode(path, mode, workers, searches, seed))
+            )
+    return {
+        "meta": {
+            "size": size,
+            "workers": workers,
+            "searches": searches,
+            "seed": seed,
+            "edge_factor": edge_factor,
+        },
+        "results": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Parse the arguments, run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(
+        prog="python -m docnetdb.benchmarks.fork",
+        description=__doc__.split("\n")[0],
+    )
+    parser.add_argument("--size", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--searches", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--edge-factor", type=float, default=2.0)
+    args = parser.parse_args(argv)
+    results = run_fork_benchmark(
+        args.size, args.workers, args.searches, args.seed, args.edge_factor
+    )
+    json.dump(results, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
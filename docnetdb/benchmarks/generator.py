@@ -0,0 +1,175 @@
+"""This module defines a seeded generator of synthetic graphs."""
+
+import itertools
+import random
+import string
+from typing import Iterator, List, Sequence
+
+from docnetdb.docnetdb import DocNetDB
+from docnetdb.edge import Edge
+from docnetdb.vertex import Vertex
+
+# The labels given to the generated edges.
+LABELS = ("", "friend", "follows", "likes", "parent")
+
+# The kinds of vertices, with their shared field names.
+KINDS = ("user", "post", "tag")
+
+
+def _random_word(rng: random.Random, length: int) -> str:
+    """Return a random lowercase word."""
+    return "".join(rng.choices(string.ascii_lowercase, k=length))
+
+
+def generate_vertices(count: int, rng: random.Random) -> Iterator[Vertex]:
+    """Generate vertices with mixed field types.
+
+    All the vertices share a few field names, and the optional fields are
+    only present in some of them, like in a real database.
+
+    Parameters
+    ----------
+    count : int
+        The number of vertices to generate.
+    rng : random.Random
+        The random generator to use.
+
+    Returns
+    -------
+    Iterator[Vertex]
+        A generator of non-inserted vertices.
+    """
+    for index in range(count):
+        vertex = Vertex(
+            {
+                "kind": KINDS[index % len(KINDS)],
+                "name": _random_word(rng, rng.randint(4, 12)),
+                "rank": rng.randint(0, 1000),
+                "score": rng.random(),
+                "active": rng.random() < 0.5,
+            }
+        )
+        if rng.random() < 0.3:
+            vertex["tags"] = [_random_word(rng, 5) for __ in range(3)]
+        if rng.random() < 0.2:
+            vertex["meta"] = {"source": _random_word(rng, 6), "version": 1}
+        if rng.random() < 0.1:
+            vertex["note"] = None
+        yield vertex
+
+
+def power_law_weights(
+    count: int, rng: random.Random, exponent: float = 2.5
+) -> List[float]:
+    """Return shuffled weights that follow a power-law distribution.
+
+    Picking vertices in proportion to these weights gives a degree
+    distribution with a tail of exponent ``exponent`` (like in the
+    Chung-Lu model).
+
+    Parameters
+    ----------
+    count : int
+        The number of weights.
+    rng : random.Random
+        The random generator to use.
+    exponent : float, optional
+        The exponent of the degree distribution, greater than 2 (2.5 by
+        default).
+    """
+    if exponent <= 1:
+        raise ValueError("exponent must be greater than 1")
+    power = -1 / (exponent - 1)
+    weights = [(rank + 1) ** power for rank in range(count)]
+    # The hubs must not always be the first vertices.
+    rng.shuffle(weights)
+    return weights
+
+
+def generate_edges(
+    vertices: Sequence[Vertex],
+    count: int,
+    rng: random.Random,
+    exponent: float = 2.5,
+    directed_ratio: float = 0.8,
+) -> Iterator[Edge]:
+    """Generate edges between inserted vertices.
+
+    The ends of the edges are picked with power-law weights, so a few
+    vertices have a lot of edges and most of them have a few.
+
+    Parameters
+    ----------
+    vertices : Sequence[Vertex]
+        The inserted vertices to link.
+    count : int
+        The number of edges to generate.
+    rng : random.Random
+        The random generator to use.
+    exponent : float, optional
+        The exponent of the degree distribution (2.5 by default).
+    directed_ratio : float, optional
+        The proportion of edges that have a direction (0.8 by default).
+
+    Returns
+    -------
+    Iterator[Edge]
+        A generator of non-inserted edges.
+    """
+    if len(vertices) < 2:
+        return
+    weights = power_law_weights(len(vertices), rng, exponent)
+    cum_weights = list(itertools.accumulate(weights))
+    starts = rng.choices(vertices, cum_weights=cum_weights, k=count)
+    ends = rng.choices(vertices, cum_weights=cum_weights, k=count)
+    for start, end in zip(starts, ends):
+        if start is end:
+            # No loops : the end is replaced by a uniformly picked vertex.
+            while end is start:
+                end = rng.choice(vertices)
+        yield Edge(
+            start,
+            end,
+            label=rng.choice(LABELS),
+            has_direction=rng.random() < directed_ratio,
+        )
+
+
+def generate_graph(
+    db: DocNetDB,
+    vertex_count: int,
+    edge_factor: float = 2.0,
+    seed: int = 0,
+    exponent: float = 2.5,
+) -> DocNetDB:
+    """Fill a DocNetDB with a synthetic graph.
+
+    The same parameters always give the same graph.
+
+    Parameters
+    ----------
+    db : DocNetDB
+        The database to fill.
+    vertex_count : int
+        The number of vertices to insert.
+    edge_factor : float, optional
+        The number of edges to insert per vertex (2.0 by default).
+    seed : int, optional
+        The seed of the random generator (0 by default).
+    exponent : float, optional
+        The exponent of the degree distribution (2.5 by default).
+
+    Returns
+    -------
+    DocNetDB
+        The filled database.
+    """
+    rng = random.Random(seed)
+    vertices = []
+    for vertex in generate_vertices(vertex_count, rng):
+        db.insert(vertex)
+        vertices.append(vertex)
+    edge_count = int(vertex_count * edge_factor)
+    for edge in generate_edges(vertices, edge_count, rng, exponent):
+        db.insert_edge(edge)
+    return db
@@ -0,0 +1,89 @@
+"""Compare the memory used by the vertex classes on a synthetic graph.
+
+Example
+-------
+$ python -m docnetdb.benchmarks.memory --sizes 10000 100000
+"""
+
+import argparse
+import gc
+import json
+import pathlib
+import sys
+import tempfile
+import tracemalloc
+from typing import Callable, Dict, Iterable, List, Optional
+
+from docnetdb.benchmarks.generator import generate_graph
+from docnetdb.compact import CompactVertex
+from docnetdb.docnetdb import DocNetDB
+from docnetdb.vertex import Vertex
+
+# The vertex factories to compare.
+VERTEX_FACTORIES: Dict[str, Callable[[Dict], Vertex]] = {
+    "Vertex": Vertex.from_pack,
+    "CompactVertex": CompactVertex.from_pack,
+}
+
+
+def measure_vertex_memory(path: pathlib.Path, factory: Callable) -> int:
+    """Return the memory held by a database loaded with a vertex factory."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        db = DocNetDB(path, vertex_creation_callable=factory)
+        gc.collect()
+        memory = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del db
+    return memory
+
+
+def run_memory_benchmark(sizes: Iterable[int], seed: int = 0) -> Dict:
+    """Load the same vertices with each vertex class and measure them.
+
+    The graphs have no edges, so only the vertices are measured.
+
+    Returns
+    -------
+    Dict
+        The JSON-serializable results, with one result per size and
+        vertex class, in bytes and bytes per vertex.
+    """
+    results: List[Dict] = []
+    with tempfile.TemporaryDirectory() as tempdir:
+        for size in sizes:
+            path = pathlib.Path(tempdir) / f"vertices-{size}.db"
+            generate_graph(DocNetDB(path), size, 0, seed=seed).save()
+            for name, factory in VERTEX_FACTORIES.items():
+                memory = measure_vertex_memory(path, factory)
+                results.append(
+                    {
+                        "vertex_class": name,
+                        "size": size,
+                        "memory": memory,
+                        "bytes_per_vertex": memory / size if size else 0,
+                    }
+                )
+    return {"meta": {"seed": seed}, "results": results}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Parse the arguments, run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(
+        prog="python -m docnetdb.benchmarks.memory",
+        description=__doc__.split("\n")[0],
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    json.dump(
+        run_memory_benchmark(args.sizes, args.seed), sys.stdout, indent=2
+    )
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,311 @@
+"""This module defines the benchmark scenarios and the function to run them.
+
+A scenario is a function that prepares a database from a saved synthetic
+graph, and returns the function to time. The timed function returns the
+number of operations it has done.
+"""
+
+import gc
+import pathlib
+import platform
+import random
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterable, List, Optional
+
+from docnetdb.benchmarks.generator import generate_graph, generate_vertices
+from docnetdb.docnetdb import DocNetDB
+from docnetdb.edge import Edge
+
+
+class Context:
+    """The parameters given to a scenario."""
+
+    def __init__(
+        self,
+        graph_path: pathlib.Path,
+        work_path: pathlib.Path,
+        ops: int,
+        seed: int,
+    ) -> None:
+        """Init a Context.
+
+        Parameters
+        ----------
+        graph_path : pathlib.Path
+            The path of the saved synthetic graph. It must not be modified.
+        work_path : pathlib.Path
+            A path the scenario may write to.
+        ops : int
+            The number of operations to do, for the scenarios that repeat
+            an operation.
+        seed : int
+            The seed of the random generator of the scenario.
+        """
+        self.graph_path = graph_path
+        self.work_path = work_path
+        self.ops = ops
+        self.rng = random.Random(seed)
+
+    def load_graph(self) -> DocNetDB:
+        """Load the synthetic graph in a DocNetDB that saves to work_path."""
+        db = DocNetDB(self.graph_path)
+        db.path = self.work_path
+        return db
+
+
+Scenario = Callable[[Context], Callable[[], int]]
+
+SCENARIOS: Dict[str, Scenario] = {}
+
+
+def scenario(name: str) -> Callable[[Scenario], Scenario]:
+    """Register a scenario under a name."""
+
+    def decorator(func: Scenario) -> Scenario:
+        SCENARIOS[name] = func
+        return func
+
+    return decorator
+
+
+# SCENARIOS
+
+
+@scenario("load")
+def load_scenario(ctx: Context) -> Callable[[], int]:
+    """Load the whole database file."""
+
+    def run() -> int:
+        DocNetDB(ctx.graph_path)
+        return 1
+
+    return run
+
+
+@scenario("save")
+def save_scenario(ctx: Context) -> Callable[[], int]:
+    """Save the whole database file."""
+    db = ctx.load_graph()
+
+    def run() -> int:
+        db.save()
+        return 1
+
+    return run
+
+
+@scenario("insert")
+def insert_scenario(ctx: Context) -> Callable[[], int]:
+    """Insert new vertices."""
+    db = ctx.load_graph()
+    vertices = list(generate_vertices(ctx.ops, ctx.rng))
+
+    def run() -> int:
+        for vertex in vertices:
+            db.insert(vertex)
+        return len(vertices)
+
+    return run
+
+
+@scenario("remove")
+def remove_scenario(ctx: Context) -> Callable[[], int]:
+    """Remove vertices that have no edges."""
+    db = ctx.load_graph()
+    vertices = list(generate_vertices(ctx.ops, ctx.rng))
+    for vertex in vertices:
+        db.insert(vertex)
+
+    def run() -> int:
+        for vertex in vertices:
+            db.remove(vertex)
+        return len(vertices)
+
+    return run
+
+
+@scenario("search")
+def search_scenario(ctx: Context) -> Callable[[], int]:
+    """Search the vertices with a few different gate functions."""
+    db = ctx.load_graph()
+    gates = [
+        lambda v: v["kind"] == "user",
+        lambda v: v["score"] > 0.9,
+        lambda v: "tags" in v and v["rank"] < 100,
+    ]
+
+    def run() -> int:
+        for gate in gates:
+            for __ in db.search(gate):
+                pass
+        return len(gates)
+
+    return run
+
+
+@scenario("search_edge")
+def search_edge_scenario(ctx: Context) -> Callable[[], int]:
+    """Search the edges of random vertices."""
+    db = ctx.load_graph()
+    anchors = ctx.rng.choices(list(db.vertices()), k=ctx.ops)
+
+    def run() -> int:
+        for anchor in anchors:
+            for __ in db.search_edge(anchor):
+                pass
+        return len(anchors)
+
+    return run
+
+
+@scenario("insert_edge")
+def insert_edge_scenario(ctx: Context) -> Callable[[], int]:
+    """Insert edges between random vertices."""
+    db = ctx.load_graph()
+    vertices = list(db.vertices())
+    edges = [
+        Edge(*ctx.rng.sample(vertices, 2), label="bench")
+        for __ in range(ctx.ops)
+    ]
+
+    def run() -> int:
+        for edge in edges:
+            db.insert_edge(edge)
+        return len(edges)
+
+    return run
+
+
+@scenario("remove_edge")
+def remove_edge_scenario(ctx: Context) -> Callable[[], int]:
+    """Remove random edges."""
+    db = ctx.load_graph()
+    edges = list(db.edges())
+    edges = ctx.rng.sample(edges, min(ctx.ops, len(edges)))
+
+    def run() -> int:
+        for edge in edges:
+            db.remove_edge(edge)
+        return len(edges)
+
+    return run
+
+
+# RUNNER
+
+
+def _measure(
+    name: str, ctx: Context, memory: bool
+) -> Dict[str, Optional[float]]:
+    """Run a scenario and return its time, ops/sec and peak memory.
+
+    The scenario is prepared and run twice when the memory is measured, as
+    tracemalloc slows down the execution.
+    """
+    run = SCENARIOS[name](ctx)
+    gc.collect()
+    start = time.perf_counter()
+    ops = run()
+    elapsed = time.perf_counter() - start
+
+    peak_memory = None
+    if memory:
+        run = SCENARIOS[name](ctx)
+        gc.collect()
+        tracemalloc.start()
+        try:
+            run()
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return {
+        "ops": ops,
+        "time": elapsed,
+        "ops_per_sec": ops / elapsed if elapsed > 0 else None,
+        "peak_memory": peak_memory,
+    }
+
+
+def run_benchmarks(
+    sizes: Iterable[int],
+    scenarios: Optional[Iterable[str]] = None,
+    seed: int = 0,
+    ops: int = 100,
+    edge_factor: float = 2.0,
+    memory: bool = True,
+    workdir: Optional[pathlib.Path] = None,
+) -> Dict:
+    """Run the benchmark scenarios on synthetic graphs of different sizes.
+
+    Parameters
+    ----------
+    sizes : Iterable[int]
+        The numbers of vertices of the synthetic graphs.
+    scenarios : Iterable[str], optional
+        The names of the scenarios to run (all of them by default).
+    seed : int, optional
+        The seed of the generated graphs and of the scenarios (0 by
+        default).
+    ops : int, optional
+        The number of operations of the repeated scenarios (100 by
+        default).
+    edge_factor : float, optional
+        The number of edges per vertex in the graphs (2.0 by default).
+    memory : bool, optional
+        Whether to measure the peak memory with tracemalloc (True by
+        default).
+    workdir : pathlib.Path, optional
+        The directory for the database files (a temporary directory by
+        default).
+
+    Returns
+    -------
+    Dict
+        The JSON-serializable results, with a "meta" and a "results" key.
+    """
+    names = list(SCENARIOS) if scenarios is None else list(scenarios)
+    for name in names:
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario '{name}'")
+
+    results: List[Dict] = []
+    with tempfile.TemporaryDirectory() as tempdir:
+        directory = pathlib.Path(tempdir) if workdir is None else workdir
+        for size in sizes:
+            # The graph is generated once per size, then every scenario
+            # loads it.
+            graph_path = directory / f"graph-{size}.db"
+            db = generate_graph(
+                DocNetDB(graph_path), size, edge_factor, seed=seed
+            )
+            edge_count = len(list(db.edges()))
+            db.save()
+            del db
+
+            for name in names:
+                ctx = Context(
+                    graph_path, directory / f"work-{size}.db", ops, seed
+                )
+                result = {
+                    "scenario": name,
+                    "size": size,
+                    "edges": edge_count,
+                }
+                result.update(_measure(name, ctx, memory))
+                results.append(result)
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "seed": seed,
+            "ops": ops,
+            "edge_factor": edge_factor,
+            "timestamp": time.time(),
+        },
+        "results": results,
+    }
@@ -0,0 +1,769 @@
+"""This module defines the bulk import and export of vertices and edges.
+
+The vertices and edges are read from NDJSON files, with a JSON object by
+line, or from CSV files with a header line. Each vertex has an external id
+in one of its fields, and the edge files designate their ends with these
+ids. A BulkLoader keeps the mapping from the external ids to the places.
+
+The files are streamed by batches of records, so the memory used by the
+import is bounded by the batch size rather than by the size of the file :
+
+- The lines of a batch are parsed, optionally in a pool of processes. A
+  CSV record spans several lines if a quoted value has a line break, so the
+  lines are grouped into records by the parity of their quotes.
+- The records of a batch are all validated before any of them is inserted.
+- The edges are inserted from their packs, without creating Edge objects.
+
+The exporters write the vertices and edges of a DocNetDB one at a time,
+with the layout that the importers read.
+"""
+
+import collections
+import csv
+import io
+import json
+import os
+import pathlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    TextIO,
+    Tuple,
+    Union,
+)
+
+from docnetdb.compression import EXTENSIONS, open_text, resolve_compression
+from docnetdb.docnetdb import DocNetDB, encode_vertex, write_atomically
+from docnetdb.logger import logger
+
+# The formats of the files, and the ones inferred from the extensions.
+FORMATS = ("ndjson", "csv")
+FORMAT_EXTENSIONS = {".ndjson": "ndjson", ".jsonl": "ndjson", ".csv": "csv"}
+
+# The default number of records of a batch.
+DEFAULT_BATCH_SIZE = 10000
+
+# What to do with an invalid record.
+ERROR_MODES = ("raise", "skip")
+
+# The values of the CSV cells read as a boolean direction.
+BOOLEAN_CELLS = {
+    "true": True,
+    "1": True,
+    "yes": True,
+    "false": False,
+    "0": False,
+    "no": False,
+}
+
+# The converters of the values of some fields.
+Converters = Optional[Dict[str, Callable[[Any], Any]]]
+
+# A parsed record : its line number, and the record or the error.
+ParsedRecord = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+# A value that no field has.
+_MISSING = object()
+
+_decode = json.JSONDecoder().decode
+
+
+def resolve_format(format: str, path: pathlib.Path) -> str:
+    """Return the format of a file.
+
+    If ``format`` is "infer", it is inferred from the extension of the path,
+    before the extension of the compression if there is one.
+
+    Raises
+    ------
+    ValueError
+        If the format is unknown, or can't be inferred.
+    """
+    if format == "infer":
+        suffixes = [suffix.lower() for suffix in path.suffixes]
+        if suffixes and suffixes[-1] in EXTENSIONS:
+            suffixes.pop()
+        format = FORMAT_EXTENSIONS.get(suffixes[-1] if suffixes else "", "")
+        if not format:
+            raise ValueError(
+                f"Can't infer the format of {path}, use one of "
+                f"{', '.join(FORMATS)}"
+            )
+    if format not in FORMATS:
+        raise ValueError(
+            f"Unknown format '{format}', use one of {', '.join(FORMATS)} "
+            "or 'infer'"
+        )
+    return format
+
+
+# PARSING FUNCTIONS
+
+
+def record_texts(
+    lines: Iterable[str], format: str
+) -> Iterator[Tuple[int, str]]:
+    """Iterate over the texts of the records of a file, and their line.
+
+    The blank lines are skipped. The lines of a CSV record are joined while
+    the number of its quotes is odd, as a quoted value goes on.
+    """
+    is_csv = format == "csv"
+    pending: List[str] = []
+    first = quotes = 0
+    for number, line in enumerate(lines, 1):
+        if not pending:
+            if not line.strip():
+                continue
+            first = number
+        pending.append(line)
+        if is_csv:
+            quotes += line.count('"')
+            if quotes % 2:
+                continue
+        yield first, "".join(pending)
+        pending, quotes = [], 0
+    if pending:
+        yield first, "".join(pending)
+
+
+def parse_batch(
+    format: str,
+    header: Optional[List[str]],
+    converters: Converters,
+    texts: Sequence[Tuple[int, str]],
+) -> List[ParsedRecord]:
+    """Parse the texts of some records.
+
+    The empty cells of a CSV record are left out. The converters are called
+    on the values of their fields, and a ValueError or TypeError they raise
+    makes the record invalid.
+
+    Returns
+    -------
+    List[ParsedRecord]
+        The line of each record, with the record or the error message.
+    """
+    parsed: List[ParsedRecord] = []
+    if format == "csv":
+        assert header is not None
+        size = len(header)
+        rows: Iterable = csv.reader(text for __, text in texts)
+    else:
+        rows = (text for __, text in texts)
+    for (line, __), row in zip(texts, rows):
+        if format == "csv":
+            if len(row) != size:
+                parsed.append(
+                    (line, None, f"{len(row)} cells instead of {size}")
+                )
+                continue
+            record = {key: cell for key, cell in zip(header, row) if cell}
+        else:
+            try:
+                record = _decode(row)
+            except ValueError as error:
+                parsed.append((line, None, f"Invalid JSON ({error})"))
+                continue
+            if not isinstance(record, dict):
+                parsed.append((line, None, "The record is not an object"))
+                continue
+        if converters:
+            try:
+                for key, convert in converters.items():
+                    if key in record:
+                        record[key] = convert(record[key])
+            except (ValueError, TypeError) as error:
+                parsed.append((line, None, f"Can't convert '{key}' ({error})"))
+                continue
+        parsed.append((line, record, None))
+    return parsed
+
+
+def parsed_batches(
+    batches: Iterable[List[Tuple[int, str]]],
+    format: str,
+    header: Optional[List[str]],
+    converters: Converters,
+    processes: Optional[int] = 1,
+) -> Iterator[List[ParsedRecord]]:
+    """Parse some batches of texts, in order.
+
+    With several processes, at most two batches by process are parsed ahead
+    of the one being returned, so the memory stays bounded.
+    """
+    processes = os.cpu_count() if processes is None else processes
+    if (processes or 1) < 2:
+        for batch in batches:
+            yield parse_batch(format, header, converters, batch)
+        return
+    with ProcessPoolExecutor(processes) as pool:
+        pending: Deque = collections.deque()
+        for batch in batches:
+            pending.append(
+                pool.submit(parse_batch, format, header, converters, batch)
+            )
+            if len(pending) > 2 * processes:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+# IMPORT
+
+
+class BulkLoader:
+    """The importer of the vertex and edge files of a DocNetDB.
+
+    It keeps the mapping from the external ids of the vertices to their
+    places, so an edge file imported after a vertex file designates its
+    ends with the same ids.
+    """
+
+    def __init__(
+        self,
+        db: DocNetDB,
+        id_field: str = "id",
+        mapping: Optional[Dict[Any, int]] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        processes: Optional[int] = 1,
+        errors: str = "raise",
+    ) -> None:
+        """Init a BulkLoader on a DocNetDB.
+
+        Parameters
+        ----------
+        db : DocNetDB
+            The database to insert the vertices and edges in.
+        id_field : str, optional
+            The field of the vertices that has their external id. It is
+            kept in the inserted vertices ("id" by default).
+        mapping : Dict[Any, int], optional
+            The places of the vertices by external id, which the imports
+            extend. If None, it starts empty (None by default).
+        batch_size : int, optional
+            The number of records parsed and validated at a time (10000 by
+            default).
+        processes : int, optional
+            The number of processes that parse the batches, or None for one
+            by CPU. The converters must then be picklable, like ``int`` or
+            a function of a module (1 by default, for no process pool).
+        errors : str {'raise', 'skip'}, optional
+            If "raise", an invalid record raises a ValueError before any
+            record of its batch is inserted. If "skip", it is logged and
+            left out ("raise" by default).
+
+        Raises
+        ------
+        ValueError
+            If ``batch_size`` is not positive, or ``errors`` is unknown.
+        """
+        if batch_size < 1:
+            raise ValueError("The batch size must be positive")
+        if errors not in ERROR_MODES:
+            raise ValueError(
+                f"Unknown error mode '{errors}', use one of "
+                f"{', '.join(ERROR_MODES)}"
+            )
+        self.db = db
+        self.id_field = id_field
+        self.mapping: Dict[Any, int] = {} if mapping is None else mapping
+        self.batch_size = batch_size
+        self.processes = processes
+        self.errors = errors
+
+    def map_vertices(self) -> int:
+        """Add the inserted vertices that have an external id to the mapping.
+
+        Returns
+        -------
+        int
+            The number of mapped vertices.
+        """
+        count = 0
+        for vertex in self.db.vertices():
+            if self.id_field in vertex:
+                self.mapping[vertex[self.id_field]] = vertex.place
+                count += 1
+        return count
+
+    def _batches(
+        self,
+        path: Union[str, pathlib.Path],
+        format: str,
+        compression: Optional[str],
+        converters: Converters,
+    ) -> Iterator[List[ParsedRecord]]:
+        """Iterate over the parsed batches of records of a file."""
+        path = pathlib.Path(path)
+        format = resolve_format(format, path)
+        with open(path, "rb") as file_:
+            with open_text(
+                file_, "r", resolve_compression(compression, path)
+            ) as text:
+                texts = record_texts(text, format)
+                header = None
+                if format == "csv":
+                    first = next(texts, None)
+                    if first is None:
+                        return
+                    header = next(csv.reader([first[1]]))
+                yield from parsed_batches(
+                    _chunks(texts, self.batch_size),
+                    format,
+                    header,
+                    converters,
+                    self.processes,
+                )
+
+    def _reject(
+        self, path: Any, line: int, error: str, counts: Dict[str, int]
+    ) -> None:
+        """Raise a ValueError for an invalid record, or count it as skipped."""
+        message = f"{path}, line {line}: {error}"
+        if self.errors == "raise":
+            raise ValueError(message)
+        counts["skipped"] += 1
+        logger.warning("Skipped the record of %s", message)
+
+    def import_vertices(
+        self,
+        path: Union[str, pathlib.Path],
+        format: str = "infer",
+        compression: Optional[str] = "infer",
+        converters: Converters = None,
+    ) -> Dict[str, int]:
+        """Insert the vertices of a file, and map their external ids.
+
+        Each record has the fields of a Vertex, created with the
+        ``make_vertex`` function of the database. Its external id must be
+        new.
+
+        Parameters
+        ----------
+        path : str or pathlib.Path
+            The path of the file.
+        format : str {'ndjson', 'csv', 'infer'}, optional
+            The format of the file. If "infer", it is inferred from the
+            extension : .ndjson, .jsonl or .csv ("infer" by default).
+        compression : str, optional
+            The codec of the file, like the ``compression`` option of the
+            DocNetDB ("infer" by default).
+        converters : Dict[str, Callable[[Any], Any]], optional
+            The functions that convert the values of some fields, like the
+            cells of a CSV file, which are strings (None by default).
+
+        Returns
+        -------
+        Dict[str, int]
+            The number of "inserted" and "skipped" records.
+
+        Raises
+        ------
+        ValueError
+            If a record is invalid and ``errors`` is "raise".
+        """
+        db, mapping, id_field = self.db, self.mapping, self.id_field
+        counts = {"inserted": 0, "skipped": 0}
+        for batch in self._batches(path, format, compression, converters):
+            valid: List[Tuple[Any, Dict[str, Any]]] = []
+            batch_ids = set()
+            for line, record, error in batch:
+                if error is None:
+                    assert record is not None
+                    key = record.get(id_field, _MISSING)
+                    if key is _MISSING:
+                        error = f"The record has no '{id_field}' field"
+                    else:
+                        try:
+                            if key in mapping or key in batch_ids:
+                                error = f"The id {key!r} is already mapped"
+                        except TypeError:
+                            error = f"The id {key!r} is not hashable"
+                if error is not None:
+                    self._reject(path, line, error, counts)
+                    continue
+                batch_ids.add(key)
+                valid.append((key, record))
+
+            for key, record in valid:
+                mapping[key] = db.insert(db.make_vertex(record))
+            counts["inserted"] += len(valid)
+        return counts
+
+    def import_edges(
+        self,
+        path: Union[str, pathlib.Path],
+        format: str = "infer",
+        compression: Optional[str] = "infer",
+        converters: Converters = None,
+        start_field: str = "start",
+        end_field: str = "end",
+        label_field: str = "label",
+        direction_field: str = "has_direction",
+        label: str = "",
+        has_direction: bool = True,
+    ) -> Dict[str, int]:
+        """Insert the edges of a file between the mapped vertices.
+
+        Each record has the external ids of the ends of an Edge, and
+        optionally its label and direction. Its other fields are the
+        properties of the Edge.
+
+        Parameters
+        ----------
+        path : str or pathlib.Path
+            The path of the file.
+        format : str {'ndjson', 'csv', 'infer'}, optional
+            The format of the file, like in ``import_vertices`` ("infer" by
+            default).
+        compression : str, optional
+            The codec of the file ("infer" by default).
+        converters : Dict[str, Callable[[Any], Any]], optional
+            The functions that convert the values of some fields, including
+            the ids of the ends (None by default).
+        start_field : str, optional
+            The field of the id of the start ("start" by default).
+        end_field : str, optional
+            The field of the id of the end ("end" by default).
+        label_field : str, optional
+            The field of the label ("label" by default).
+        direction_field : str, optional
+            The field of the direction. In a CSV file, it is one of true,
+            false, 1, 0, yes or no ("has_direction" by default).
+        label : str, optional
+            The label of the records without one ("" by default).
+        has_direction : bool, optional
+            The direction of the records without one (True by default).
+
+        Returns
+        -------
+        Dict[str, int]
+            The number of "inserted" and "skipped" records.
+
+        Raises
+        ------
+        ValueError
+            If a record is invalid and ``errors`` is "raise".
+        """
+        db, get_place = self.db, self.mapping.get
+        vertices = db._vertices
+        fields = (start_field, end_field, label_field, direction_field)
+        counts = {"inserted": 0, "skipped": 0}
+        for batch in self._batches(path, format, compression, converters):
+            packs: List[Tuple] = []
+            for line, record, error in batch:
+                if error is not None:
+                    self._reject(path, line, error, counts)
+                    continue
+                assert record is not None
+
+                # The valid records are checked without building messages.
+                get = record.get
+                try:
+                    start = get_place(get(start_field, _MISSING))
+                    end = get_place(get(end_field, _MISSING))
+                except TypeError:
+                    start = end = None
+                edge_label = get(label_field, label)
+                direction = get(direction_field, has_direction)
+                if (
+                    start is None
+                    or end is None
+                    or type(edge_label) is not str
+                    or type(direction) is not bool
+                    or start not in vertices
+                    or end not in vertices
+                ):
+                    pack, error = _edge_pack(
+                        record,
+                        fields,
+                        self.mapping,
+                        vertices,
+                        label,
+                        has_direction,
+                    )
+                    if error is not None:
+                        self._reject(path, line, error, counts)
+                        continue
+                else:
+                    for field in fields:
+                        record.pop(field, None)
+                    pack = (start, end, edge_label, direction)
+                    if record:
+                        pack += (record,)
+                packs.append(pack)
+
+            db._insert_edge_packs(packs)
+            counts["inserted"] += len(packs)
+        return counts
+
+
+def _chunks(
+    items: Iterator[Tuple[int, str]], size: int
+) -> Iterator[List[Tuple[int, str]]]:
+    """Iterate over the lists of ``size`` items of an iterator."""
+    while True:
+        chunk = [item for __, item in zip(range(size), items)]
+        if not chunk:
+            return
+        yield chunk
+
+
+def _edge_pack(
+    record: Dict[str, Any],
+    fields: Tuple[str, str, str, str],
+    mapping: Dict[Any, int],
+    vertices: Any,
+    label: str,
+    has_direction: bool,
+) -> Tuple[Tuple, Optional[str]]:
+    """Return the pack of the edge of a record, or the error message."""
+    start_field, end_field, label_field, direction_field = fields
+    places = []
+    for field in (start_field, end_field):
+        key = record.pop(field, _MISSING)
+        if key is _MISSING:
+            return (), f"The record has no '{field}' field"
+        try:
+            place = mapping.get(key)
+        except TypeError:
+            return (), f"The id {key!r} is not hashable"
+        if place is None or place not in vertices:
+            return (), f"No vertex has the id {key!r}"
+        places.append(place)
+
+    edge_label = record.pop(label_field, label)
+    if not isinstance(edge_label, str):
+        return (), f"The label {edge_label!r} is not a string"
+    direction = record.pop(direction_field, has_direction)
+    if isinstance(direction, str):
+        direction = BOOLEAN_CELLS.get(direction.lower(), direction)
+    if not isinstance(direction, bool):
+        return (), f"The direction {direction!r} is not a boolean"
+
+    pack: Tuple = (*places, edge_label, direction)
+    if record:
+        pack += (record,)
+    return pack, None
+
+
+# EXPORT
+
+
+def export_vertices(
+    db: DocNetDB,
+    path: Union[str, pathlib.Path],
+    format: str = "infer",
+    compression: Optional[str] = "infer",
+    id_field: str = "id",
+    fields: Optional[Sequence[str]] = None,
+) -> int:
+    """Write the vertices of a DocNetDB to a file, one at a time.
+
+    The vertices without an external id get their place as id, so the file
+    can be imported again with a BulkLoader.
+
+    Parameters
+    ----------
+    db : DocNetDB
+        The database to export.
+    path : str or pathlib.Path
+        The path of the file. It is written through a temporary file.
+    format : str {'ndjson', 'csv', 'infer'}, optional
+        The format of the file, like in ``BulkLoader.import_vertices``
+        ("infer" by default).
+    compression : str, optional
+        The codec of the file ("infer" by default).
+    id_field : str, optional
+        The field of the external ids ("id" by default).
+    fields : Sequence[str], optional
+        The columns of a CSV file. If None, they are the fields of all the
+        vertices, found in a first pass (None by default).
+
+    Returns
+    -------
+    int
+        The number of written vertices.
+    """
+    path = pathlib.Path(path)
+    format = resolve_format(format, path)
+    encode = json.JSONEncoder().encode
+
+    def records() -> Iterator[Dict[str, Any]]:
+        for vertex in db.vertices():
+            record = vertex.pack()
+            if id_field not in record:
+                record = {id_field: vertex.place, **record}
+            yield record
+
+    if format == "ndjson":
+
+        def write_lines() -> Iterator[str]:
+            for vertex in db.vertices():
+                if id_field in vertex:
+                    yield encode_vertex(encode, vertex)
+                else:
+                    yield encode({id_field: vertex.place, **vertex.pack()})
+
+        return _write_ndjson(path, compression, write_lines())
+
+    if fields is None:
+        fields = _first_seen_keys([id_field], records())
+    return _write_csv(path, compression, fields, records())
+
+
+def export_edges(
+    db: DocNetDB,
+    path: Union[str, pathlib.Path],
+    format: str = "infer",
+    compression: Optional[str] = "infer",
+    id_field: str = "id",
+    start_field: str = "start",
+    end_field: str = "end",
+    label_field: str = "label",
+    direction_field: str = "has_direction",
+    fields: Optional[Sequence[str]] = None,
+) -> int:
+    """Write the edges of a DocNetDB to a file, one at a time.
+
+    The ends are designated by their external id, or by their place if they
+    have none, and the properties are the other fields. The edges are read
+    from their packs, without creating Edge objects, and are written as
+    plain edges.
+
+    Parameters
+    ----------
+    db : DocNetDB
+        The database to export.
+    path : str or pathlib.Path
+        The path of the file. It is written through a temporary file.
+    format : str {'ndjson', 'csv', 'infer'}, optional
+        The format of the file ("infer" by default).
+    compression : str, optional
+        The codec of the file ("infer" by default).
+    id_field : str, optional
+        The field of the external ids of the vertices ("id" by default).
+    start_field, end_field, label_field, direction_field : str, optional
+        The fields of the ends, label and direction, like in
+        ``BulkLoader.import_edges``.
+    fields : Sequence[str], optional
+        The columns of a CSV file. If None, they are the four fields above
+        and the properties of all the edges, found in a first pass (None by
+        default).
+
+    Returns
+    -------
+    int
+        The number of written edges.
+    """
+    path = pathlib.Path(path)
+    format = resolve_format(format, path)
+    vertices = db._vertices
+
+    def external_id(place: int) -> Any:
+        return vertices[place].get(id_field, place)
+
+    def records() -> Iterator[Dict[str, Any]]:
+        for pack in db._edges.packs():
+            record = {
+                start_field: external_id(pack[0]),
+                end_field: external_id(pack[1]),
+                label_field: pack[2],
+                direction_field: pack[3],
+            }
+            if len(pack) > 4 and isinstance(pack[4], dict):
+                record.update(pack[4])
+            yield record
+
+    if format == "ndjson":
+        encode = json.JSONEncoder().encode
+        return _write_ndjson(
+            path, compression, (encode(record) for record in records())
+        )
+
+    if fields is None:
+        fields = _first_seen_keys(
+            [start_field, end_field, label_field, direction_field], records()
+        )
+    return _write_csv(path, compression, fields, records())
+
+
+def _first_seen_keys(
+    first: List[str], records: Iterable[Dict[str, Any]]
+) -> List[str]:
+    """Return some keys then the other keys of records, as first seen."""
+    keys = dict.fromkeys(first)
+    for record in records:
+        keys.update(dict.fromkeys(record))
+    return list(keys)
+
+
+def _write_ndjson(
+    path: pathlib.Path, compression: Optional[str], lines: Iterable[str]
+) -> int:
+    """Write some JSON lines to a file, and return their number."""
+    count = 0
+
+    def write_data(file_: TextIO) -> None:
+        nonlocal count
+        write = file_.write
+        for line in lines:
+            write(line)
+            write("\n")
+            count += 1
+
+    write_atomically(path, write_data, resolve_compression(compression, path))
+    return count
+
+
+def _write_csv(
+    path: pathlib.Path,
+    compression: Optional[str],
+    fields: Sequence[str],
+    records: Iterable[Dict[str, Any]],
+) -> int:
+    """Write some records to a CSV file, and return their number.
+
+    The strings are written as they are, the missing and None values as
+    empty cells, and the other values in JSON.
+    """
+    count = 0
+    encode = json.JSONEncoder().encode
+
+    def write_data(file_: TextIO) -> None:
+        nonlocal count
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(fields)
+        for record in records:
+            writer.writerow(
+                [_csv_cell(encode, record.get(field)) for field in fields]
+            )
+            count += 1
+            # The rows are written by blocks, and the buffer is emptied.
+            if buffer.tell() > 1 << 16:
+                file_.write(buffer.getvalue())
+                buffer.seek(0)
+                buffer.truncate()
+        file_.write(buffer.getvalue())
+
+    write_atomically(path, write_data, resolve_compression(compression, path))
+    return count
+
+
+def _csv_cell(encode: Callable[[Any], str], value: Any) -> str:
+    """Return the cell of a value in a CSV file."""
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    return encode(value)
@@ -0,0 +1,161 @@
+"""This module defines the change feed of a DocNetDB.
+
+A ChangeFeed receives a Change for each modification of the database :
+the insertions and removals of vertices and edges, the changes of the
+fields of the inserted vertices, and the reloads of the file. Each Change
+has a sequence number, and the last ones are kept in a bounded buffer, so a
+consumer can read the changes since the last sequence it processed and
+resume from there. The subscribers are called with each Change as it is
+published.
+
+The changes made in a transaction are published when it is committed, and
+dropped if it is rolled back.
+"""
+
+import collections
+import itertools
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from docnetdb.exceptions import ChangesLostException
+from docnetdb.vertex import _MISSING
+
+# The value of ``old`` for a new field, and of ``new`` for a deleted field.
+MISSING = _MISSING
+
+# The kinds of changes.
+CHANGE_KINDS = (
+    "vertex_inserted",
+    "vertex_removed",
+    "field_changed",
+    "edge_inserted",
+    "edge_removed",
+    "load",
+)
+
+
+class Change(NamedTuple):
+    """A modification of a DocNetDB.
+
+    ``place`` is the place of the Vertex, or of the start of the edge.
+    ``key``, ``old`` and ``new`` describe a field change, and ``edge`` is
+    the pack of an inserted or removed edge. The other attributes are None.
+    A "load" change means the database was read from its file again, so
+    the consumers must read it again too.
+    """
+
+    sequence: int
+    kind: str
+    place: int
+    key: Any = None
+    old: Any = None
+    new: Any = None
+    edge: Optional[Tuple] = None
+
+
+# A subscriber of a ChangeFeed.
+Subscriber = Callable[[Change], None]
+
+
+class ChangeFeed:
+    """The published changes of a DocNetDB, and their subscribers."""
+
+    def __init__(
+        self, subscribers: Iterable[Subscriber] = (), capacity: int = 1000
+    ) -> None:
+        """Init a ChangeFeed.
+
+        Parameters
+        ----------
+        subscribers : Iterable[Callable[[Change], None]], optional
+            The callables that receive each published Change.
+        capacity : int, optional
+            The number of changes kept in the buffer. The oldest ones are
+            dropped first (1000 by default).
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be a positive integer")
+        self.subscribers: List[Subscriber] = list(subscribers)
+        self.entries: Deque[Change] = collections.deque(maxlen=capacity)
+        self._last_sequence = 0
+
+    def __len__(self) -> int:
+        """Return the number of changes in the buffer."""
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[Change]:
+        """Iterate over the changes of the buffer, from the oldest one."""
+        return iter(self.entries)
+
+    @property
+    def last_sequence(self) -> int:
+        """Return the sequence of the last published change, or 0."""
+        return self._last_sequence
+
+    def subscribe(self, subscriber: Subscriber) -> Subscriber:
+        """Add a subscriber, and return it (so it works as a decorator)."""
+        self.subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        """Remove a subscriber, or raise a ValueError."""
+        self.subscribers.remove(subscriber)
+
+    def publish(self, kind: str, place: int = 0, *args: Any) -> Change:
+        """Number a change, keep it and pass it to the subscribers.
+
+        The subscribers are called synchronously, so their exceptions are
+        propagated to the modification, which is already done.
+        """
+        self._last_sequence += 1
+        change = Change(self._last_sequence, kind, place, *args)
+        self.entries.append(change)
+        for subscriber in self.subscribers:
+            subscriber(change)
+        return change
+
+    def changes(self, since: Optional[int] = None) -> Iterator[Change]:
+        """Iterate over the kept changes published after a sequence.
+
+        Parameters
+        ----------
+        since : int, optional
+            The sequence of the last change that the consumer processed, or
+            None for all the kept changes (None by default).
+
+        Returns
+        -------
+        Iterator[Change]
+            The changes whose sequence is greater than ``since``, in order.
+
+        Raises
+        ------
+        ChangesLostException
+            If some changes after ``since`` were dropped from the buffer,
+            so the consumer must read the database again.
+        """
+        entries = self.entries
+        if since is None:
+            return iter(list(entries))
+        first = entries[0].sequence if entries else self._last_sequence + 1
+        if since < first - 1 and since < self._last_sequence:
+            raise ChangesLostException(
+                f"The changes after {since} are no longer kept"
+            )
+        # The sequences of the buffer are consecutive. The changes are
+        # copied, so that the buffer can change during the iteration.
+        skipped = max(since - first + 1, 0)
+        return iter(list(itertools.islice(entries, skipped, None)))
+
+    def clear(self) -> None:
+        """Empty the buffer. The sequences keep increasing."""
+        self.entries.clear()
@@ -0,0 +1,266 @@
+"""This module defines the CompactVertex class.
+
+A CompactVertex stores its fields as a row of values, and shares the tuple
+of its field names with all the vertices of the same shape. This is much
+smaller than a dict when a lot of vertices have the same fields.
+
+The row is turned into a regular dict storage on the first modification,
+and can be compacted again with the ``compact`` method.
+"""
+
+import sys
+import weakref
+from collections.abc import ItemsView, KeysView, ValuesView
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from docnetdb.vertex import Vertex
+
+# The shapes are interned, so the vertices with the same field names share
+# the same one. A shape is forgotten once no vertex uses it.
+_SHAPES: "weakref.WeakValueDictionary[Tuple[str, ...], VertexShape]"
+_SHAPES = weakref.WeakValueDictionary()
+
+
+class VertexShape:
+    """The ordered field names shared by vertices, and their positions."""
+
+    __slots__ = ("keys", "positions", "__weakref__")
+
+    def __init__(self, keys: Tuple[str, ...]) -> None:
+        """Init a VertexShape. Use ``get_shape`` instead."""
+        self.keys = keys
+        self.positions = {key: position for position, key in enumerate(keys)}
+
+    def __repr__(self) -> str:
+        """Override the __repr__ method."""
+        return f"<VertexShape {self.keys}>"
+
+    def __reduce__(self):
+        """Intern the shape again when it is unpickled."""
+        return (get_shape, (self.keys,))
+
+
+def get_shape(keys: Tuple[Any, ...]) -> VertexShape:
+    """Return the interned shape of these field names.
+
+    The string field names are interned as well.
+    """
+    try:
+        return _SHAPES[keys]
+    except KeyError:
+        keys = tuple(
+            sys.intern(key) if type(key) is str else key for key in keys
+        )
+        return _SHAPES.setdefault(keys, VertexShape(keys))
+
+
+class CompactVertex(Vertex):
+    """A Vertex that stores its fields as a row of a shared shape.
+
+    It keeps the dict-like API of the Vertex. To use it in a DocNetDB,
+    give ``CompactVertex.from_pack`` as the ``vertex_creation_callable``.
+
+    Note that the dict storage of the vertex is empty while it is compact,
+    so the C functions that read it directly (like ``json.dumps``) must be
+    given ``pack()`` or ``dict(vertex)`` instead.
+    """
+
+    # The attributes of the CompactVertex are stored in slots, so that the
+    # __dict__ is only allocated if another attribute is set.
+    __slots__ = ("place", "_db", "_shape", "_row")
+
+    def __init__(self, init_dict: Optional[Dict] = None) -> None:
+        """Init a CompactVertex.
+
+        Parameters
+        ----------
+        init_dict : Dict, optional
+            When not None, the CompactVertex is filled on initialization
+            with the content of ``init_dict`` (None by default).
+        """
+        super().__init__()
+        self._shape: Optional[VertexShape] = None
+        self._row: Optional[Tuple] = None
+        if init_dict:
+            self._shape = get_shape(tuple(init_dict))
+            self._row = tuple(init_dict.values())
+
+    # FACTORIES
+
+    @classmethod
+    def from_pack(cls, pack: Dict) -> "CompactVertex":
+        """Create a compact Vertex from a pack.
+
+        The field names of the pack are interned.
+        """
+        return cls(pack)
+
+    # COMPACTION METHODS
+
+    @property
+    def is_compact(self) -> bool:
+        """Return whether the fields are stored as a row."""
+        return self._shape is not None
+
+    def compact(self) -> None:
+        """Store the fields as a row again after a modification."""
+        if self._shape is None and dict.__len__(self):
+            self._shape = get_shape(tuple(dict.keys(self)))
+            self._row = tuple(dict.values(self))
+            dict.clear(self)
+
+    def _expand(self) -> None:
+        """Move the fields of the row to the dict storage."""
+        if self._shape is not None:
+            dict.update(self, zip(self._shape.keys, self._row))
+            self._shape = None
+            self._row = None
+
+    # READ METHODS
+
+    def __getitem__(self, key: Any) -> Any:
+        """Override the __getitem__ method to read the row."""
+        if self._shape is None:
+            return super().__getitem__(key)
+        try:
+            return self._row[self._shape.positions[key]]
+        except KeyError:
+            raise KeyError(key) from None
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """Override the get method to read the row."""
+        if self._shape is None:
+            return super().get(key, default)
+        position = self._shape.positions.get(key)
+        return default if position is None else self._row[position]
+
+    def __contains__(self, key: Any) -> bool:
+        """Override the __contains__ method to read the row."""
+        if self._shape is None:
+            return super().__contains__(key)
+        return key in self._shape.positions
+
+    def __iter__(self) -> Iterator:
+        """Override the __iter__ method to read the row."""
+        if self._shape is None:
+            return super().__iter__()
+        return iter(self._shape.keys)
+
+    def __len__(self) -> int:
+        """Override the __len__ method to read the row."""
+        if self._shape is None:
+            return super().__len__()
+        return len(self._row)
+
+    # The dict views read the dict storage directly, so views of the
+    # mapping are returned instead while the vertex is compact. They follow
+    # the later modifications as well.
+
+    def keys(self):
+        """Override the keys method to read the row."""
+        if self._shape is None:
+            return super().keys()
+        return KeysView(self)
+
+    def values(self):
+        """Override the values method to read the row."""
+        if self._shape is None:
+            return super().values()
+        return ValuesView(self)
+
+    def items(self):
+        """Override the items method to read the row."""
+        if self._shape is None:
+            return super().items()
+        return ItemsView(self)
+
+    def copy(self) -> Dict:
+        """Override the copy method to read the row."""
+        if self._shape is None:
+            return super().copy()
+        return dict(zip(self._shape.keys, self._row))
+
+    def __eq__(self, other: Any) -> bool:
+        """Override the __eq__ method to read the row."""
+        if isinstance(other, CompactVertex):
+            other = other.copy()
+        return dict.__eq__(self.copy(), other)
+
+    def __ne__(self, other: Any) -> bool:
+        """Override the __ne__ method to read the row."""
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __repr__(self) -> str:
+        """Override the __repr__ method."""
+        place_str = f"{self.place}" if self.is_inserted else ""
+        return f"<Vertex ({place_str}) {self.copy()!r}>"
+
+    def __reduce__(self):
+        """Pickle the CompactVertex with its row."""
+        fields = None if self._shape is not None else self.copy()
+        state = (self.place, self._shape, self._row, fields)
+        return (_rebuild, (type(self), state), self.__dict__ or None)
+
+    # EXPORT METHODS
+
+    def pack(self) -> Dict:
+        """Make a pack from the CompactVertex (a new dict)."""
+        return self.copy()
+
+    # FIELD MODIFICATION METHODS
+
+    # The row is expanded before any modification.
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        """Override the __setitem__ method to expand the row."""
+        self._expand()
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key: Any) -> None:
+        """Override the __delitem__ method to expand the row."""
+        self._expand()
+        super().__delitem__(key)
+
+    def update(self, *args, **kwargs) -> None:
+        """Override the update method to expand the row."""
+        self._expand()
+        super().update(*args, **kwargs)
+
+    def setdefault(self, key: Any, default: Any = None) -> Any:
+        """Override the setdefault method to expand the row."""
+        self._expand()
+        return super().setdefault(key, default)
+
+    def pop(self, key: Any, *default) -> Any:
+        """Override the pop method to expand the row."""
+        self._expand()
+        return super().pop(key, *default)
+
+    def popitem(self) -> Any:
+        """Override the popitem method to expand the row."""
+        self._expand()
+        return super().popitem()
+
+    def clear(self) -> None:
+        """Override the clear method to expand the row."""
+        self._expand()
+        super().clear()
+
+    def _restore_field(self, key: Any, value: Any) -> None:
+        """Override the _restore_field method to expand the row."""
+        self._expand()
+        super()._restore_field(key, value)
+
+
+def _rebuild(cls, state: Tuple) -> CompactVertex:
+    """Rebuild an unpickled CompactVertex."""
+    place, shape, row, fields = state
+    vertex = cls.__new__(cls)
+    vertex.place = place
+    vertex._db = None
+    vertex._shape = shape
+    vertex._row = row
+    if shape is None:
+        dict.update(vertex, fields)
+    return vertex
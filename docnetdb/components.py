@@ -0,0 +1,173 @@
+"""This module defines the ComponentTracker class.
+
+A ComponentTracker keeps the connected components of the graph of a
+DocNetDB in a union-find structure, so the component of a vertex and its
+size are found in near-constant time. The direction of the edges is
+ignored.
+
+The insertions of vertices and edges merge the components as they happen.
+A removal can split a component, which union-find can't do, so the
+structure is rebuilt from the vertices and edges on the next query.
+"""
+
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional
+
+from docnetdb.exceptions import VertexInsertionException
+from docnetdb.vertex import Vertex
+
+if TYPE_CHECKING:  # pragma: no cover
+    from docnetdb.docnetdb import DocNetDB
+
+
+class ComponentTracker:
+    """The connected components of a DocNetDB, kept up to date.
+
+    The component of a vertex is identified by the place of one of its
+    vertices, which can change when the database is modified.
+    """
+
+    def __init__(
+        self, db: "DocNetDB", labels: Optional[Iterable[str]] = None
+    ) -> None:
+        """Init a ComponentTracker on a database.
+
+        Parameters
+        ----------
+        db : DocNetDB
+            The database whose components are tracked.
+        labels : Iterable[str], optional
+            If not None, only the edges with these labels connect the
+            vertices (None by default).
+        """
+        self.db = db
+        self.labels = None if labels is None else frozenset(labels)
+        # The parent of each place, and the size of the component of each
+        # root place.
+        self._parents: Dict[int, int] = {}
+        self._sizes: Dict[int, int] = {}
+        # Whether the structure must be rebuilt before the next query.
+        self._stale = True
+
+    # UPDATE METHODS
+
+    def tracks(self, label: str) -> bool:
+        """Return whether the edges of a label connect the vertices."""
+        return self.labels is None or label in self.labels
+
+    def add_vertex(self, place: int) -> None:
+        """Add a new vertex, alone in its component."""
+        if not self._stale:
+            self._parents[place] = place
+            self._sizes[place] = 1
+
+    def remove_vertex(self, place: int) -> None:
+        """Remove a vertex that has no edge, so is alone in its component."""
+        if not self._stale:
+            del self._parents[place]
+            del self._sizes[place]
+
+    def add_edge(self, start: int, end: int, label: str) -> None:
+        """Merge the components of the ends of a new edge."""
+        if not self._stale and self.tracks(label):
+            self._union(start, end)
+
+    def invalidate(self) -> None:
+        """Rebuild the structure on the next query, after a removal."""
+        self._stale = True
+        self._parents = {}
+        self._sizes = {}
+
+    # UNION-FIND METHODS
+
+    def _find(self, place: int) -> int:
+        """Return the root place of the component of a place.
+
+        The path is halved on the way, so that the next finds are shorter.
+        """
+        parents = self._parents
+        parent = parents[place]
+        while parent != place:
+            grandparent = parents[parent]
+            parents[place] = grandparent
+            place, parent = grandparent, parents[grandparent]
+        return place
+
+    def _union(self, first: int, second: int) -> None:
+        """Merge the components of two places, the smaller one in the other."""
+        first, second = self._find(first), self._find(second)
+        if first == second:
+            return
+        sizes = self._sizes
+        if sizes[first] < sizes[second]:
+            first, second = second, first
+        self._parents[second] = first
+        sizes[first] += sizes.pop(second)
+
+    def _rebuild(self) -> None:
+        """Build the structure from the vertices and edges of the database."""
+        self._parents = {place: place for place in self.db._vertices.keys()}
+        self._sizes = dict.fromkeys(self._parents, 1)
+        edges = self.db._edges
+        labels = [None] if self.labels is None else sorted(self.labels)
+        for label in labels:
+            for start, end in edges.place_pairs(label):
+                self._union(start, end)
+        self._stale = False
+
+    def _root(self, vertex: Vertex) -> int:
+        """Return the root place of the component of an inserted Vertex."""
+        if vertex not in self.db:
+            raise VertexInsertionException(
+                "This vertex isn't inserted in this DocNetDB"
+            )
+        if self._stale:
+            self._rebuild()
+        return self._find(vertex.place)
+
+    # QUERY METHODS
+
+    def component_of(self, vertex: Vertex) -> int:
+        """Return the id of the component of a Vertex.
+
+        Two vertices are connected if their components have the same id.
+        The ids are valid until the next modification of the database.
+
+        Raises
+        ------
+        VertexInsertionException
+            If the Vertex isn't inserted in the database.
+        """
+        return self._root(vertex)
+
+    def component_size(self, vertex: Vertex) -> int:
+        """Return the number of vertices of the component of a Vertex.
+
+        Raises
+        ------
+        VertexInsertionException
+            If the Vertex isn't inserted in the database.
+        """
+        root = self._root(vertex)
+        return self._sizes[root]
+
+    def component_count(self) -> int:
+        """Return the number of components."""
+        if self._stale:
+            self._rebuild()
+        return len(self._sizes)
+
+    def components(self) -> Iterator[List[Vertex]]:
+        """Iterate over the components, as lists of vertices.
+
+        The vertices of a component are in the order of their places, and
+        the components in the order of their first place.
+        """
+        if self._stale:
+            self._rebuild()
+        places: Dict[int, List[int]] = {}
+        for place in sorted(self._parents):
+            places.setdefault(self._find(place), []).append(place)
+        db = self.db
+        return (
+            [db[place] for place in component] for component in places.values()
+        )
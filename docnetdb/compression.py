@@ -0,0 +1,279 @@
+"""This module defines the compression of the database files.
+
+The files can be compressed with gzip, bz2 or lzma. The codecs stream the
+data, so a compressed file is written and read one chunk at a time. The
+compressed files are decoded by ``load_stream``, which reads the JSON
+object of a database file one value at a time instead of reading the
+whole text first.
+"""
+
+import bz2
+import contextlib
+import gzip
+import io
+import json
+import lzma
+import pathlib
+import re
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Match,
+    Optional,
+    Pattern,
+    TextIO,
+    Tuple,
+)
+
+# The codecs, by compression name. They are given an open binary file,
+# which they don't close.
+CODECS: Dict[str, Callable[[BinaryIO, str], BinaryIO]] = {
+    "gzip": lambda fileobj, mode: gzip.GzipFile(fileobj=fileobj, mode=mode),
+    "bz2": lambda fileobj, mode: bz2.BZ2File(fileobj, mode),
+    "lzma": lambda fileobj, mode: lzma.LZMAFile(fileobj, mode),
+}
+
+# The compressions inferred from the file extensions.
+EXTENSIONS = {".gz": "gzip", ".bz2": "bz2", ".xz": "lzma", ".lzma": "lzma"}
+
+# The extension of the files written with each compression.
+SUFFIXES = {"gzip": ".gz", "bz2": ".bz2", "lzma": ".xz"}
+
+# The number of characters read at a time by load_stream.
+CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+def check_compression(compression: Optional[str]) -> None:
+    """Raise a ValueError if a compression is unknown.
+
+    The compression can be a name of ``CODECS``, None or "infer".
+    """
+    if compression not in CODECS and compression not in (None, "infer"):
+        raise ValueError(
+            f"Unknown compression '{compression}', use one of "
+            f"{', '.join(CODECS)}, None or 'infer'"
+        )
+
+
+def resolve_compression(
+    compression: Optional[str], path: pathlib.Path
+) -> Optional[str]:
+    """Return the compression of a file.
+
+    If ``compression`` is "infer", it is inferred from the extension of the
+    path (None if the extension is unknown).
+    """
+    if compression == "infer":
+        return EXTENSIONS.get(path.suffix.lower())
+    return compression
+
+
+@contextlib.contextmanager
+def open_text(
+    fileobj: BinaryIO, mode: str, compression: Optional[str]
+) -> Iterator[TextIO]:
+    """Open a text stream on a binary file, through a codec.
+
+    The binary file is left open, so that it can be synced after a write.
+
+    Parameters
+    ----------
+    fileobj : BinaryIO
+        The open binary file.
+    mode : str {'r', 'w'}
+        Whether to read or write.
+    compression : str, optional
+        The name of the codec, or None for plain text.
+    """
+    if compression is None:
+        text = io.TextIOWrapper(fileobj)
+        try:
+            yield text
+        finally:
+            if mode == "w":
+                text.flush()
+            text.detach()
+    else:
+        text = io.TextIOWrapper(CODECS[compression](fileobj, mode + "b"))
+        try:
+            yield text
+        finally:
+            # Closing the codec writes its last block, but not the file.
+            text.close()
+
+
+# STREAMING DECODER
+
+# The separators that must follow a key, a member and an item.
+_COLON = re.compile(r"[ \t\n\r]*:[ \t\n\r]*")
+_MEMBER_END = re.compile(r"[ \t\n\r]*([,}])[ \t\n\r]*")
+_ITEM_END = re.compile(r"[ \t\n\r]*([,\]])[ \t\n\r]*")
+
+
+class _StreamReader:
+    """A buffer over a text file for the streaming decoder."""
+
+    def __init__(self, file_: TextIO, chunk_size: int) -> None:
+        """Init a _StreamReader at the beginning of a file."""
+        self.file = file_
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.position = 0
+        self.eof = False
+        # json.load shares the equal keys of all the objects of a file,
+        # but each call of raw_decode has its own keys, so they are shared
+        # here instead.
+        self.keys: Dict[str, str] = {}
+        self.scan = json.JSONDecoder(
+            object_pairs_hook=self._make_object
+        ).scan_once
+
+    def _make_object(self, pairs: List[Tuple[str, Any]]) -> Dict:
+        """Make a decoded object with the shared keys."""
+        keys = self.keys
+        return {keys.setdefault(key, key): value for key, value in pairs}
+
+    def _fill(self) -> None:
+        """Read the next chunk, or set eof at the end of the file.
+
+        The consumed part of the buffer is dropped.
+        """
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return
+        self.buffer = self.buffer[self.position :] + chunk
+        self.position = 0
+
+    def peek(self) -> str:
+        """Skip the whitespace and return the next character ('' at EOF)."""
+        while True:
+            self.position = _WHITESPACE.match(self.buffer, self.position).end()
+            if self.position < len(self.buffer) or self.eof:
+                return self.buffer[self.position : self.position + 1]
+            self._fill()
+
+    def take(self, expected: str) -> str:
+        """Consume the next character, which must be one of ``expected``."""
+        char = self.peek()
+        if char == "" or char not in expected:
+            raise json.JSONDecodeError(
+                f"Expecting one of {expected!r}", self.buffer, self.position
+            )
+        self.position += 1
+        return char
+
+    def next(self, separator: Pattern) -> Tuple[Any, Match]:
+        """Decode the next JSON value and the separator that follows it.
+
+        More chunks are read until both are in the buffer, so a value cut
+        by the end of the buffer (like a number) is never returned.
+        """
+        # The separators skip the whitespace, but not past the buffer.
+        self.peek()
+        while True:
+            try:
+                value, end = self.scan(self.buffer, self.position)
+                match = separator.match(self.buffer, end)
+            except (StopIteration, json.JSONDecodeError):
+                match = None
+            if match is not None and (
+                match.end() < len(self.buffer) or self.eof
+            ):
+                self.position = match.end()
+                return value, match
+            if self.eof:
+                raise json.JSONDecodeError(
+                    "Invalid or truncated value", self.buffer, self.position
+                )
+            # The chunks grow with the value, so a big value isn't decoded
+            # again for each chunk.
+            self.chunk_size = max(self.chunk_size, len(self.buffer))
+            self._fill()
+
+    def array(self) -> Tuple[List, Match]:
+        """Decode the next JSON array one item at a time.
+
+        Returns
+        -------
+        Tuple[List, Match]
+            The array and the member separator that follows it.
+        """
+        self.take("[")
+        items: List = []
+        if self.peek() == "]":
+            self.position += 1
+        else:
+            # The items that are complete in the buffer are decoded without
+            # the checks of the next method.
+            append, scan, match_end = items.append, self.scan, _ITEM_END.match
+            buffer, position = self.buffer, self.position
+            while True:
+                try:
+                    item, end = scan(buffer, position)
+                    match = match_end(buffer, end)
+                except (StopIteration, json.JSONDecodeError):
+                    match = None
+                if match is None or match.end() == len(buffer):
+                    self.position = position
+                    item, match = self.next(_ITEM_END)
+                    buffer, position = self.buffer, self.position
+                else:
+                    position = match.end()
+                append(item)
+                if match.group(1) == "]":
+                    break
+            self.position = position
+        self.peek()
+        match = _MEMBER_END.match(self.buffer, self.position)
+        if match is None:
+            raise json.JSONDecodeError(
+                "Expecting ',' or '}'", self.buffer, self.position
+            )
+        self.position = match.end()
+        return items, match
+
+
+def load_stream(file_: TextIO, chunk_size: int = CHUNK_SIZE) -> Dict:
+    """Decode the JSON object of a database file, one value at a time.
+
+    The arrays of the object (like the packed edges) are decoded one item
+    at a time too, so only a chunk of the text is in memory at a time.
+
+    Parameters
+    ----------
+    file_ : TextIO
+        The file to read.
+    chunk_size : int, optional
+        The number of characters read at a time (CHUNK_SIZE by default).
+
+    Returns
+    -------
+    Dict
+        The decoded object, like ``json.load`` returns it.
+    """
+    reader = _StreamReader(file_, chunk_size)
+    data: Dict = {}
+    reader.take("{")
+    if reader.peek() == "}":
+        reader.position += 1
+    else:
+        while True:
+            key, __ = reader.next(_COLON)
+            if reader.peek() == "[":
+                data[key], match = reader.array()
+            else:
+                data[key], match = reader.next(_MEMBER_END)
+            if match.group(1) == "}":
+                break
+    if reader.peek() != "":
+        raise json.JSONDecodeError(
+            "Extra data", reader.buffer, reader.position
+        )
+    return data
@@ -1,17 +1,151 @@
 """This module define the DocNetDB class."""
 
 
+import contextlib
+import heapq
 import json
+import os
 import pathlib
-from typing import Any, Callable, Dict, Iterator, List, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    TextIO,
+    Tuple,
+    Union,
+)
 
+from docnetdb.changes import ChangeFeed, Subscriber
+from docnetdb.components import ComponentTracker
+from docnetdb.compression import (
+    check_compression,
+    load_stream,
+    open_text,
+    resolve_compression,
+)
 from docnetdb.edge import Edge
+from docnetdb.edgeindex import ValueRange
+from docnetdb.edgestore import EdgeStore
 from docnetdb.exceptions import (
+    ReadOnlyDatabaseException,
     VertexInsertionException,
     VertexNotReadyException,
 )
+from docnetdb.hubs import DEFAULT_HUB_THRESHOLD, check_hub_threshold
+from docnetdb.metrics import Metrics, MetricsHook
+from docnetdb.neighbours import (
+    OPPOSITE_DIRECTIONS,
+    NeighbourIndex,
+    SimilarityQuery,
+    check_direction,
+)
+from docnetdb.reachability import ReachabilityIndex
+from docnetdb.sampling import GraphSampler
+from docnetdb.slowlog import SlowOperationLog
 from docnetdb.vertex import Vertex
 
+if TYPE_CHECKING:  # pragma: no cover
+    from docnetdb.frozen import FrozenDocNetDB
+
+
+def write_atomically(
+    path: pathlib.Path,
+    write_data: Callable[[TextIO], None],
+    compression: Optional[str] = None,
+) -> None:
+    """Write a file through a temporary file that then replaces it.
+
+    The directory is created if needed. A failed write doesn't corrupt the
+    file.
+
+    Parameters
+    ----------
+    path : pathlib.Path
+        The path of the file.
+    write_data : Callable[[TextIO], None]
+        The function that writes the data to the open temporary file.
+    compression : str, optional
+        The codec that compresses the file, or None for plain text (None by
+        default).
+    """
+    # Before writing the data, we ensure the directory exists.
+
+    if not path.parent.exists():
+        path.parent.mkdir(parents=True)
+
+    # Then, we can write the data
+
+    temp_path = path.with_name(path.name + ".tmp")
+    with open(temp_path, "wb") as file_:
+        with open_text(file_, "w", compression) as text:
+            write_data(text)
+        file_.flush()
+        os.fsync(file_.fileno())
+    os.replace(temp_path, path)
+
+
+def read_packed_data(
+    path: pathlib.Path, compression: Optional[str] = None
+) -> Dict:
+    """Decode the packed data of a database file.
+
+    Parameters
+    ----------
+    path : pathlib.Path
+        The path of the file.
+    compression : str, optional
+        The codec that compressed the file, or None for plain text (None by
+        default).
+
+    Returns
+    -------
+    Dict
+        The decoded JSON object.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the file doesn't exist.
+    """
+    if compression is None:
+        with open(path) as file_:
+            return json.load(file_)
+    # The compressed files are decompressed and decoded one chunk at a
+    # time.
+    with open(path, "rb") as file_:
+        with open_text(file_, "r", compression) as text:
+            return load_stream(text)
+
+
+def properties_pass(
+    where: Callable[[Mapping[str, Any]], bool], properties: Mapping[str, Any]
+) -> bool:
+    """Return whether the properties of an edge pass a function.
+
+    Like in ``search``, a KeyError means the edge doesn't pass.
+    """
+    try:
+        return where(properties) is True
+    except KeyError:
+        return False
+
+
+def encode_vertex(encode: Callable[[Any], str], vertex: Vertex) -> str:
+    """Return the JSON of the pack of a Vertex.
+
+    The vertices that don't override the ``pack`` method are encoded
+    directly, without making a copy.
+    """
+    if type(vertex).pack is Vertex.pack:
+        return encode(vertex)
+    return encode(vertex.pack())
+
 
 class DocNetDB:
     """A database class which can store Vertex objects."""
@@ -21,6 +155,11 @@ class DocNetDB:
         path: Union[str, pathlib.Path],
         vertex_creation_callable: Callable[..., Vertex] = None,
         edge_creation_callable: Callable[..., Edge] = None,
+        metrics: bool = False,
+        fields: Optional[Iterable[str]] = None,
+        where: Optional[Callable[[Dict], bool]] = None,
+        edges: bool = True,
+        compression: Optional[str] = "infer",
     ) -> None:
         """Init a DocNetDB.
 
@@ -35,6 +174,28 @@ class DocNetDB:
         edge_creation_callable : Callable[..., Edge]
             The callable which is used to create the edges from a pack.
             Provide it if you are using subclasses of Edge.
+        metrics : bool, optional
+            Whether to enable the instrumentation straight away, so that the
+            initial load is measured too (False by default). See
+            ``enable_metrics``.
+        fields : Iterable[str], optional
+            If not None, the vertices are loaded with these fields only
+            (None by default).
+        where : Callable[[Dict], bool], optional
+            If not None, only the vertices whose pack passes this function
+            are loaded, and the edges of the other ones are dropped. Like
+            in ``search``, a KeyError means the vertex doesn't pass (None by
+            default).
+        edges : bool, optional
+            Whether to load the edges (True by default).
+        compression : str {'gzip', 'bz2', 'lzma'}, optional
+            The compression of the file. If "infer", it is inferred from
+            the extension of the path (.gz, .bz2, .xz or .lzma), and if
+            None, the file is plain text ("infer" by default).
+
+        When ``fields``, ``where`` or ``edges`` leaves out a part of the
+        file, the DocNetDB is read-only : it can't be modified or saved,
+        and a ReadOnlyDatabaseException is raised instead.
         """
         # The path we will use is a pathlib.Path.
         # It will be converted from a string if needed.
@@ -45,6 +206,9 @@ class DocNetDB:
         else:
             raise TypeError("path must be a str or a pathlib.Path")
 
+        check_compression(compression)
+        self.compression = compression
+
         # To allow Vertex inheritance, we must allow to specify how to create
         # the Vertex subclasses when the database loads in memory.
         # The make_vertex() function is made for that : the user can specify a
@@ -60,6 +224,47 @@ class DocNetDB:
         else:
             self.make_edge = edge_creation_callable
 
+        # During a transaction, the inverse of each operation is appended to
+        # the undo log. It is None outside of a transaction.
+        self._undo_log: Optional[List[Callable[[], None]]] = None
+        # Whether a save was requested during the current transaction.
+        self._save_deferred = False
+        # Whether the inserted vertices must notify their field changes.
+        self._watching_fields = False
+
+        # The change feed is None when it is disabled. During a
+        # transaction, the changes wait in a list until it is committed.
+        self._change_feed: Optional[ChangeFeed] = None
+        self._pending_changes: List[Tuple] = []
+
+        # The component tracker is None when it is disabled.
+        self._components: Optional[ComponentTracker] = None
+
+        # The neighbour indexes of the similarity queries, by label and
+        # direction. They are rebuilt when the edges change.
+        self._neighbour_indexes: Dict[Tuple, NeighbourIndex] = {}
+        # The reachability indexes, by label and direction. They are kept
+        # after the changes of the edges that don't change them.
+        self._reachability_indexes: Dict[Tuple, ReachabilityIndex] = {}
+
+        # The instrumentation is None when it is disabled.
+        self._metrics: Optional[Metrics] = None
+        self._slow_log: Optional[SlowOperationLog] = None
+        if metrics is True:
+            self.enable_metrics()
+
+        # The load options, which can leave out a part of the file.
+        self._fields = None if fields is None else tuple(fields)
+        self._where = where
+        self._load_edges = edges
+
+        # The kinds of the indexes of the edge properties, by key. They are
+        # rebuilt when the database is loaded again.
+        self._edge_index_kinds: Dict[str, str] = {}
+        # The degree from which the edges of a vertex are partitioned, or
+        # None.
+        self._hub_threshold: Optional[int] = DEFAULT_HUB_THRESHOLD
+
         # Use the default values
         self._use_defaults()
 
@@ -74,10 +279,13 @@ class DocNetDB:
         self._vertices: Dict[int, Vertex]
         self._vertices = dict()
 
-        # All the edges will go in a list.
-        # It could have been a Set but it's not JSON serializable.
-        self._edges: List[Edge]
-        self._edges = list()
+        # All the edges will go in an EdgeStore, as rows of typed arrays.
+        # The Edge objects are created when the edges are read.
+        self._edges: EdgeStore
+        self._edges = EdgeStore()
+        for key, kind in self._edge_index_kinds.items():
+            self._edges.create_index(key, kind)
+        self._edges.set_hub_threshold(self._hub_threshold)
 
         # This variable stores the place of the next vertex, to speed up the
         # next insertion.
@@ -124,6 +332,33 @@ class DocNetDB:
 
     # LOAD AND SAVE METHODS
 
+    @property
+    def is_read_only(self) -> bool:
+        """Return whether only a part of the file was loaded."""
+        return (
+            self._fields is not None
+            or self._where is not None
+            or self._load_edges is False
+        )
+
+    def _check_writable(self) -> None:
+        """Raise a ReadOnlyDatabaseException if the DocNetDB is read-only."""
+        if self.is_read_only:
+            raise ReadOnlyDatabaseException(
+                "This DocNetDB was partially loaded and is read-only"
+            )
+
+    def _io_size(self) -> int:
+        """Return the number of bytes the last load or save read or wrote.
+
+        This is used by the metrics. The whole file is read by a load, and
+        written by a save.
+        """
+        try:
+            return os.stat(self.path).st_size
+        except OSError:
+            return 0
+
     def load(self) -> None:
         """Read the file and load it in memory.
 
@@ -135,14 +370,26 @@ class DocNetDB:
 
         # Try to open the file
         try:
-            with open(self.path) as file_:
-                decoded_json = json.load(file_)
-                self._load_packed_data(decoded_json)
+            decoded_json = read_packed_data(
+                self.path, resolve_compression(self.compression, self.path)
+            )
+            self._load_packed_data(decoded_json)
 
         # If the file can't be found
         except FileNotFoundError:
             pass
 
+        self._loaded()
+
+    def _loaded(self) -> None:
+        """Notify the change feed and the component tracker of a load."""
+        if self._change_feed is not None:
+            self._publish_change("load")
+        if self._components is not None:
+            self._components.invalidate()
+        self._neighbour_indexes = {}
+        self._reachability_indexes = {}
+
     def _load_packed_data(self, packed_data: Dict) -> None:
         """Read the packed data and load it in memory.
 
@@ -163,60 +410,197 @@ class DocNetDB:
         # Little joke there, it seems that the keys in JSON are always
         # strings. So we have to convert them.
 
+        # When the vertices are plain vertices, they directly take the
+        # decoded fields instead of going through their __init__.
+        adoptable_class = self._adoptable_vertex_class()
+        if adoptable_class is not None:
+            make_vertex = adoptable_class._adopt
+        else:
+            # We use the custom function to make the Vertices
+            make_vertex = self.make_vertex
+
+        # The vertices that don't pass the where function are skipped, and
+        # the others are projected on the requested fields before being
+        # created.
+        fields, where = self._fields, self._where
+
         for place_str, packed_vertex in packed_vertices.items():
 
-            # We use the custom function to make the Vertices
-            vertex = self.make_vertex(packed_vertex)
+            if where is not None:
+                try:
+                    if where(packed_vertex) is not True:
+                        continue
+                except KeyError:
+                    continue
+            if fields is not None:
+                packed_vertex = {
+                    key: packed_vertex[key]
+                    for key in fields
+                    if key in packed_vertex
+                }
+
+            vertex = make_vertex(packed_vertex)
 
             vertex.place = int(place_str)
+            vertex._db = self
             self._vertices[vertex.place] = vertex
 
-        # Finally, the edges are created as well.
+        # Finally, the edges are loaded as well. The plain edges stay in
+        # their packed form, and the Edge objects are created when they are
+        # read.
+
+        if self._load_edges is False:
+            return
 
-        for pack in packed_edges:
+        # The edges of the skipped vertices are dropped.
+        if where is not None:
+            packed_edges = self._edges_of_loaded_vertices(packed_edges)
 
-            edge = self.make_edge(pack, self)
-            edge.is_inserted = True
-            self._edges.append(edge)
+        if self._edges_are_plain():
+            self._edges.extend_packs(packed_edges)
+        else:
+            for pack in packed_edges:
+
+                edge = self.make_edge(pack, self)
+                self._edges.add(edge)
+
+    def _edges_of_loaded_vertices(self, packed_edges: List) -> Iterator:
+        """Return the packed edges whose two vertices were loaded.
+
+        The packs of the Edge subclasses are expected to start with the
+        places of the start and end vertices too.
+        """
+        vertices = self._vertices
+        return (
+            pack
+            for pack in packed_edges
+            if pack[0] in vertices and pack[1] in vertices
+        )
+
+    def _adoptable_vertex_class(self) -> Optional[type]:
+        """Return the Vertex class that can adopt the decoded packs.
+
+        Returns
+        -------
+        Optional[type]
+            The class if ``make_vertex`` is the ``from_pack`` method of a
+            Vertex class that overrides neither ``from_pack`` nor
+            ``__init__``, else None.
+        """
+        cls = getattr(self.make_vertex, "__self__", None)
+        if (
+            isinstance(cls, type)
+            and issubclass(cls, Vertex)
+            and getattr(self.make_vertex, "__func__", None)
+            is Vertex.from_pack.__func__
+            and cls.__init__ is Vertex.__init__
+        ):
+            return cls
+        return None
+
+    def _edges_are_plain(self) -> bool:
+        """Return whether ``make_edge`` creates plain edges from packs.
+
+        Returns
+        -------
+        bool
+            True if ``make_edge`` is the ``from_pack`` method of the Edge
+            class itself, so the packs don't need to go through it.
+        """
+        return (
+            getattr(self.make_edge, "__self__", None) is Edge
+            and getattr(self.make_edge, "__func__", None)
+            is Edge.from_pack.__func__
+        )
 
     def save(self) -> None:
         """Save the database in memory to a file.
 
         The path is read in the self.path attribute.
-        The file is completely overriden.
+        The file is completely overriden. The data is first written in a
+        temporary file, which then replaces the old one, so a failed save
+        doesn't corrupt the database file.
+
+        During a transaction, the save is deferred until the transaction is
+        committed.
+
+        Raises
+        ------
+        ReadOnlyDatabaseException
+            If the DocNetDB was partially loaded.
         """
-        # A new dictionary is created.
+        self._check_writable()
 
-        packed_data: Dict[Any, Any]
-        packed_data = dict()
+        if self._undo_log is not None:
+            self._save_deferred = True
+            return
 
-        # We fill it with all the vertices converted in a dict, labeled with
-        # a place.
+        # The rows of the removed edges are dropped as they are not saved.
+        self._edges.compact()
 
-        for place, vertex in self._vertices.items():
-            packed_data[place] = vertex.pack()
+        write_atomically(
+            self.path,
+            self._write_packed_data,
+            resolve_compression(self.compression, self.path),
+        )
 
-        # Append the _next_place value
+    def _write_packed_data(self, file_: TextIO) -> None:
+        """Write the packed data to a file, one Vertex or Edge at a time.
 
-        packed_data["_next_place"] = self._next_place
+        The output is the same as dumping the whole packed data at once : a
+        JSON object with the packed vertices labeled with their place, the
+        _next_place value and the list of packed edges. But only one pack
+        is in memory at a time.
 
-        # Append the edges
+        The vertices that don't override the ``pack`` method are encoded
+        directly, without making a copy.
 
-        packed_edges = []
-        for edge in self._edges:
-            packed_edges.append(edge.pack())
-        packed_data["edges"] = packed_edges
+        Parameters
+        ----------
+        file_ : TextIO
+            The file to write to.
+        """
+        encode = json.JSONEncoder().encode
+        write = file_.write
+
+        write("{")
+        separator = ""
+        for place, vertex in self._vertices.items():
+            write(f'{separator}"{place}": {encode_vertex(encode, vertex)}')
+            separator = ", "
 
-        # Then it is time to write the data in a file.
-        # Before, we ensure the directory exists.
+        write(f'{separator}"_next_place": {encode(self._next_place)}')
 
-        if not self.path.parent.exists():
-            self.path.parent.mkdir(parents=True)
+        write(', "edges": [')
+        separator = ""
+        edges = self._edges
+        for row in edges.rows():
+            write(separator + encode(edges.pack(row)))
+            separator = ", "
+        write("]}")
 
-        # Then, we can write the data
+    def freeze(self) -> "FrozenDocNetDB":
+        """Return a read-only copy of the DocNetDB for forked processes.
 
-        with open(self.path, "w") as file_:
-            json.dump(packed_data, file_)
+        The copy holds its data in a few buffers instead of an object per
+        vertex and edge, so the processes forked afterwards share its
+        memory with the parent process while they read it. Drop the
+        DocNetDB and call ``docnetdb.frozen.freeze_gc`` before forking.
+
+        Returns
+        -------
+        FrozenDocNetDB
+            The read-only copy.
+
+        Example
+        -------
+        >>> frozen = DocNetDB("file.db").freeze()
+        >>> docnetdb.frozen.freeze_gc()
+        """
+        # The frozen module depends on this one.
+        from docnetdb.frozen import FrozenDocNetDB
+
+        return FrozenDocNetDB(self)
 
     # VERTEX INSERTION AND REMOVAL METHODS
 
@@ -256,7 +640,11 @@ class DocNetDB:
         VertexNotReadyException
             If the ``is_ready_for_insertion`` method of the Vertex returns
             False.
+        ReadOnlyDatabaseException
+            If the DocNetDB was partially loaded.
         """
+        self._check_writable()
+
         if not isinstance(vertex, Vertex):
             raise TypeError("The parameter should be a Vertex")
 
@@ -266,13 +654,30 @@ class DocNetDB:
         if vertex.is_ready_for_insertion() is False:
             raise VertexNotReadyException()
 
+        old_next_place = self._next_place
         new_place = self._get_next_place()
 
         # The place is updated in the Vertex object (it was at 0 by default).
         vertex.place = new_place
+        vertex._db = self
         # Add the vertex in the _vertices dictionary
         self._vertices[new_place] = vertex
 
+        if self._undo_log is not None:
+
+            def undo_insert():
+                self._vertices.pop(new_place)
+                vertex.place = 0
+                vertex._db = None
+                self._next_place = old_next_place
+
+            self._undo_log.append(undo_insert)
+
+        if self._change_feed is not None:
+            self._publish_change("vertex_inserted", new_place)
+        if self._components is not None:
+            self._components.add_vertex(new_place)
+
         return new_place
 
     def remove(self, vertex: Vertex) -> int:
@@ -299,14 +704,18 @@ class DocNetDB:
             If the vertex is not already inserted in this database.
         ValueError:
             If the vertex couldn't be found in this database.
+        ReadOnlyDatabaseException
+            If the DocNetDB was partially loaded.
         """
+        self._check_writable()
+
         if not isinstance(vertex, Vertex):
             raise TypeError("The parameter should be a Vertex")
 
         if not vertex.is_inserted:
             raise VertexInsertionException("This vertex wasn't inserted")
 
-        if len(list(self.search_edge(vertex))) != 0:
+        if self._edges.has_incident(vertex.place):
             raise ValueError("Can't remove: Vertex still connected to others")
 
         try:
@@ -316,11 +725,126 @@ class DocNetDB:
             old_place = vertex.place
             # Reset the place of the vertex
             vertex.place = 0
+            vertex._db = None
+
+            if self._undo_log is not None:
+
+                def undo_remove():
+                    self._vertices[old_place] = vertex
+                    vertex.place = old_place
+                    vertex._db = self
+
+                self._undo_log.append(undo_remove)
+
+            if self._change_feed is not None:
+                self._publish_change("vertex_removed", old_place)
+            if self._components is not None:
+                self._components.remove_vertex(old_place)
+
             return old_place
 
         except KeyError:
             raise ValueError("The vertex couldn't be found")
 
+    def remove_many(
+        self, vertices: Iterable[Vertex], cascade: bool = True
+    ) -> Dict[str, int]:
+        """Remove some inserted vertices, and their edges if ``cascade``.
+
+        The edges of all the vertices are found in a single pass over the
+        edge store, so the removal is linear in the number of vertices and
+        edges. Nothing is removed if an exception is raised.
+
+        Parameters
+        ----------
+        vertices : Iterable[Vertex]
+            The vertices to remove from the database.
+        cascade : bool, optional
+            Whether to remove the edges of the vertices too. If False, the
+            vertices must not have edges, like in ``remove`` (True by
+            default).
+
+        Returns
+        -------
+        Dict[str, int]
+            The number of removed "vertices" and "edges".
+
+        Raises
+        ------
+        TypeError
+            If an item of ``vertices`` is not a Vertex.
+        VertexInsertionException
+            If a Vertex is not inserted in this database.
+        ValueError
+            If ``cascade`` is False and a Vertex still has edges.
+        ReadOnlyDatabaseException
+            If the DocNetDB was partially loaded.
+        """
+        self._check_writable()
+
+        victims: Dict[int, Vertex] = {}
+        for vertex in vertices:
+            if not isinstance(vertex, Vertex):
+                raise TypeError("The vertices should be Vertex objects")
+            if vertex not in self:
+                raise VertexInsertionException(
+                    "This vertex isn't inserted in this DocNetDB"
+                )
+            victims[vertex.place] = vertex
+
+        rows = self._edges.rows_touching(set(victims))
+        if rows and not cascade:
+            raise ValueError("Can't remove: Vertex still connected to others")
+
+        removed_rows = self._remove_edge_rows(rows)
+        for place, vertex in victims.items():
+            self._vertices.pop(place)
+            vertex.place = 0
+            vertex._db = None
+            if self._change_feed is not None:
+                self._publish_change("vertex_removed", place)
+            if self._components is not None:
+                self._components.remove_vertex(place)
+
+        if self._undo_log is not None:
+
+            def undo_remove_many():
+                for place, vertex in victims.items():
+                    self._vertices[place] = vertex
+                    vertex.place = place
+                    vertex._db = self
+                for row, token in reversed(removed_rows):
+                    self._edges.restore_row(row, token)
+                    if token[2] is not None:
+                        token[2].is_inserted = True
+
+            self._undo_log.append(undo_remove_many)
+
+        return {"vertices": len(victims), "edges": len(removed_rows)}
+
+    def _remove_edge_rows(self, rows: List[int]) -> List[Tuple[int, Any]]:
+        """Remove some rows of the edge store.
+
+        Returns
+        -------
+        List[Tuple[int, Any]]
+            The rows and the tokens that restore them.
+        """
+        if rows and self._components is not None:
+            self._components.invalidate()
+        removed_rows = []
+        for row in rows:
+            pack = None if self._change_feed is None else self._edges.pack(row)
+            token = self._edges.remove_row(row)
+            if token[2] is not None:
+                token[2].is_inserted = False
+            removed_rows.append((row, token))
+            if pack is not None:
+                self._publish_change(
+                    "edge_removed", pack[0], None, None, None, pack
+                )
+        return removed_rows
+
     # VERTICES ITERATION METHODS
 
     def vertices(self) -> Iterator[Vertex]:
@@ -379,7 +903,11 @@ class DocNetDB:
         VertexInsertionException
             If the two vertices that make the edge are not inserted is this
             database.
+        ReadOnlyDatabaseException
+            If the DocNetDB was partially loaded.
         """
+        self._check_writable()
+
         if edge.is_inserted is True:
             raise ValueError("This Edge is already inserted")
 
@@ -389,7 +917,59 @@ class DocNetDB:
             )
 
         edge.is_inserted = True
-        self._edges.append(edge)
+        version = self._edges.version
+        row = self._edges.add(edge)
+        if self._reachability_indexes:
+            self._keep_reachability_indexes(version, edge, inserted=True)
+
+        if self._undo_log is not None:
+
+            def undo_insert_edge():
+                self._edges.remove_row(row)
+                edge.is_inserted = False
+
+            self._undo_log.append(undo_insert_edge)
+
+        if self._change_feed is not None:
+            pack = edge.pack()
+            self._publish_change(
+                "edge_inserted", pack[0], None, None, None, pack
+            )
+        if self._components is not None:
+            self._components.add_edge(
+                edge.start.place, edge.end.place, edge.label
+            )
+
+    def _insert_edge_packs(self, packs: List[Tuple]) -> None:
+        """Insert some edges from their packs, for the bulk imports.
+
+        The ends of the packs must be inserted vertices. The packs are
+        stored without creating Edge objects, unless a transaction or the
+        change feed follows the insertions one at a time, or ``make_edge``
+        creates an Edge subclass.
+
+        Raises
+        ------
+        ReadOnlyDatabaseException
+            If the DocNetDB was partially loaded.
+        """
+        self._check_writable()
+        if not (
+            self._undo_log is None
+            and self._change_feed is None
+            and self._edges_are_plain()
+            and isinstance(self._edges, EdgeStore)
+        ):
+            for pack in packs:
+                self.insert_edge(self.make_edge(pack, self))
+            return
+
+        # The reachability indexes are rebuilt on their next query, as the
+        # version of the edges changes.
+        self._edges.extend_packs(packs)
+        if self._components is not None:
+            for start, end, label, *__ in packs:
+                self._components.add_edge(start, end, label)
 
     def remove_edge(self, edge: Edge) -> None:
         """Remove an edge from the database.
@@ -406,24 +986,791 @@ class DocNetDB:
         ------
         ValueError
             If no corresponding edge was found in the database.
+        ReadOnlyDatabaseException
+            If the DocNetDB was partially loaded.
         """
-        if edge in self._edges:
-            self._edges.remove(edge)
-            edge.is_inserted = False
-        else:
+        self._check_writable()
+
+        row = None
+        start, end = edge.start, edge.end
+        if (
+            self._vertices.get(start.place) is start
+            and self._vertices.get(end.place) is end
+        ):
+            row = self._edges.find(
+                start.place, end.place, edge.label, edge.has_direction
+            )
+        if row is None:
             raise ValueError(f"No Edge such as {edge} was found")
 
+        pack = None if self._change_feed is None else self._edges.pack(row)
+        version = self._edges.version
+        token = self._edges.remove_row(row)
+        if self._reachability_indexes:
+            self._keep_reachability_indexes(version, edge, inserted=False)
+        stored_edge = token[2]
+        if stored_edge is not None:
+            stored_edge.is_inserted = False
+        edge.is_inserted = False
+        if self._components is not None and self._components.tracks(
+            edge.label
+        ):
+            self._components.invalidate()
+
+        if self._undo_log is not None:
+
+            def undo_remove_edge():
+                # The row is restored at its position, so the order of the
+                # edges doesn't change.
+                self._edges.restore_row(row, token)
+                if stored_edge is not None:
+                    stored_edge.is_inserted = True
+
+            self._undo_log.append(undo_remove_edge)
+
+        if pack is not None:
+            self._publish_change(
+                "edge_removed", pack[0], None, None, None, pack
+            )
+
+    # TRANSACTION METHODS
+
+    @contextlib.contextmanager
+    def transaction(self, save: bool = True) -> Iterator["DocNetDB"]:
+        """Group operations so that they are all applied or none of them.
+
+        The insertions and removals of vertices and edges, and the changes
+        of the fields of the inserted vertices, are recorded in an undo log.
+        If an exception is raised in the ``with`` block, they are undone in
+        reverse order and the exception is propagated.
+
+        The saves requested during the transaction are deferred, and the
+        database is written once when the transaction is committed.
+
+        A transaction can be nested in another one. In that case, a failure
+        only undoes the operations of the nested transaction, and the save
+        happens when the outermost transaction is committed.
+
+        Parameters
+        ----------
+        save : bool, optional
+            Whether to save the database when the transaction is committed,
+            even if ``save`` wasn't called in it (True by default).
+
+        Example
+        -------
+        >>> with database.transaction():
+        ...     database.insert(vertex)
+        ...     database.insert_edge(Edge(vertex, other))
+        """
+        self._check_writable()
+
+        outermost = self._undo_log is None
+        if outermost:
+            self._undo_log = []
+            self._watching_fields = True
+        save_deferred = self._save_deferred
+        self._save_deferred = save_deferred or save
+
+        savepoint = len(self._undo_log)
+        try:
+            yield self
+        except BaseException:
+            self._rollback(savepoint)
+            self._save_deferred = save_deferred
+            if outermost:
+                self._end_transaction()
+            raise
+
+        if outermost:
+            save_needed = self._save_deferred
+            self._end_transaction()
+            if save_needed:
+                self.save()
+
+    def _rollback(self, savepoint: int) -> None:
+        """Undo the operations of the undo log made after the savepoint."""
+        # The undo functions must not be recorded themselves.
+        watching_fields = self._watching_fields
+        self._watching_fields = False
+        # The undone removals can join components, but the undone
+        # insertions can split them.
+        if self._components is not None and len(self._undo_log) > savepoint:
+            self._components.invalidate()
+        while len(self._undo_log) > savepoint:
+            self._undo_log.pop()()
+        self._watching_fields = watching_fields
+
+    def _end_transaction(self) -> None:
+        """Reset the transaction state, and publish the kept changes."""
+        self._undo_log = None
+        self._save_deferred = False
+        self._watching_fields = self._change_feed is not None
+
+        pending, self._pending_changes = self._pending_changes, []
+        if self._change_feed is not None:
+            for change in pending:
+                self._change_feed.publish(*change)
+
+    def _field_changed(
+        self, vertex: Vertex, key: Any, old: Any, new: Any
+    ) -> None:
+        """Record the change of a field of an inserted Vertex.
+
+        This method is called by the Vertex when the fields are watched.
+        ``old`` is _MISSING for a new field, ``new`` is _MISSING for a
+        deleted field.
+        """
+        if self._change_feed is not None:
+            self._publish_change("field_changed", vertex.place, key, old, new)
+
+        if self._undo_log is None:
+            return
+
+        self._undo_log.append(lambda: vertex._restore_field(key, old))
+
+    # CHANGE FEED METHODS
+
+    def enable_change_feed(
+        self, *subscribers: Subscriber, capacity: int = 1000
+    ) -> ChangeFeed:
+        """Publish the modifications of the database to a change feed.
+
+        The insertions and removals of vertices and edges, the changes of
+        the fields of the inserted vertices and the reloads are published
+        as numbered ``Change`` objects. The feed keeps the last ones, so
+        that a consumer can read the changes since the last one it
+        processed, and passes each one to its subscribers. The changes
+        made in a transaction are published when it is committed. When the
+        feed is disabled, the modifications are not slowed down.
+
+        Parameters
+        ----------
+        *subscribers : Callable[[Change], None]
+            Callables that receive each published Change. They are added
+            to the subscribers of the feed if it is already enabled.
+        capacity : int, optional
+            The number of changes kept by a new feed (1000 by default).
+
+        Returns
+        -------
+        ChangeFeed
+            The change feed of the database.
+
+        Example
+        -------
+        >>> feed = database.enable_change_feed(print)
+        >>> for change in feed.changes(since=last_sequence):
+        ...     last_sequence = change.sequence
+        """
+        if self._change_feed is None:
+            self._change_feed = ChangeFeed(subscribers, capacity)
+            self._watching_fields = True
+        else:
+            self._change_feed.subscribers.extend(subscribers)
+        return self._change_feed
+
+    def disable_change_feed(self) -> None:
+        """Stop publishing the modifications, and forget the changes."""
+        self._change_feed = None
+        self._pending_changes = []
+
+    def _publish_change(self, kind: str, place: int = 0, *args: Any) -> None:
+        """Publish a change, or keep it until the transaction is committed.
+
+        The change feed must be enabled.
+        """
+        if self._undo_log is None:
+            self._change_feed.publish(kind, place, *args)
+        else:
+            pending = self._pending_changes
+            pending.append((kind, place, *args))
+            self._undo_log.append(pending.pop)
+
+    # COMPONENT METHODS
+
+    def enable_components(
+        self, labels: Optional[Iterable[str]] = None
+    ) -> ComponentTracker:
+        """Track the connected components of the graph.
+
+        The components are kept in a union-find structure, which the
+        insertions of vertices and edges update in near-constant time. The
+        removals of edges can split a component, so the structure is rebuilt
+        on the next query after them. The direction of the edges is ignored.
+
+        Parameters
+        ----------
+        labels : Iterable[str], optional
+            If not None, only the edges with these labels connect the
+            vertices (None by default). A removal of an edge with another
+            label doesn't cause a rebuild.
+
+        Returns
+        -------
+        ComponentTracker
+            The tracker, which gives the component of a Vertex. It replaces
+            the previous one.
+
+        Example
+        -------
+        >>> tracker = database.enable_components(labels=["duplicate"])
+        >>> tracker.component_size(vertex)
+        3
+        """
+        self._components = ComponentTracker(self, labels)
+        return self._components
+
+    def disable_components(self) -> None:
+        """Stop tracking the connected components."""
+        self._components = None
+
+    # SIMILARITY METHODS
+
+    def _neighbour_index(
+        self, label: str, direction: str, transposed: bool = False
+    ) -> NeighbourIndex:
+        """Return the neighbour index of a label and a direction.
+
+        It is built on the first query, and again after the edges change.
+        """
+        check_direction(direction)
+        version = self._edges.version
+        key = (label, direction, transposed)
+        index = self._neighbour_indexes.get(key)
+        if index is None or index.version != version:
+            index = NeighbourIndex(
+                self._edges.edge_ends(label),
+                direction,
+                self._next_place,
+                version,
+                transposed,
+            )
+            self._neighbour_indexes[key] = index
+        return index
+
+    def _similarity_query(
+        self, measure: str, label: str, direction: str
+    ) -> SimilarityQuery:
+        """Return a SimilarityQuery on the edges of a label and direction."""
+        return SimilarityQuery(
+            self._neighbour_index(label, direction),
+            self._neighbour_index(label, direction, transposed=True),
+            measure,
+        )
+
+    def _check_inserted(self, *vertices: Vertex) -> None:
+        """Raise a VertexInsertionException if a Vertex isn't inserted."""
+        for vertex in vertices:
+            if vertex not in self:
+                raise VertexInsertionException(
+                    "This vertex isn't inserted in this DocNetDB"
+                )
+
+    def common_neighbours(
+        self,
+        v1: Vertex,
+        v2: Vertex,
+        label: str = None,
+        direction: str = "all",
+    ) -> List[Vertex]:
+        """Return the neighbours that two vertices have in common.
+
+        Parameters
+        ----------
+        v1 : Vertex
+            The first Vertex.
+        v2 : Vertex
+            The second Vertex.
+        label : str, optional
+            If not None, only the edges with this label lead to the
+            neighbours (None by default).
+        direction : str {'out', 'in', 'none', 'all'}, optional
+            The direction of the edges to the neighbours, seen from the
+            vertices, like in ``search_edge`` ("all" by default).
+
+        Returns
+        -------
+        List[Vertex]
+            The common neighbours, in the order of their places.
+
+        Raises
+        ------
+        VertexInsertionException
+            If a Vertex isn't inserted in this database.
+        ValueError
+            If ``direction`` is not a direction.
+        """
+        self._check_inserted(v1, v2)
+        index = self._neighbour_index(label, direction)
+        return [
+            self._vertices[place] for place in index.common(v1.place, v2.place)
+        ]
+
+    def similarity(
+        self,
+        v1: Vertex,
+        v2: Vertex,
+        measure: str = "jaccard",
+        label: str = None,
+        direction: str = "all",
+    ) -> float:
+        """Return the similarity of the neighbourhoods of two vertices.
+
+        Parameters
+        ----------
+        v1 : Vertex
+            The first Vertex.
+        v2 : Vertex
+            The second Vertex.
+        measure : str {'common', 'jaccard', 'adamic_adar'}, optional
+            The number of common neighbours, this number divided by the
+            number of neighbours of either vertex, or the sum of
+            1 / log(d) over the common neighbours, where d is the number of
+            vertices a neighbour is the neighbour of ("jaccard" by default).
+        label : str, optional
+            If not None, only the edges with this label lead to the
+            neighbours (None by default).
+        direction : str {'out', 'in', 'none', 'all'}, optional
+            The direction of the edges to the neighbours, seen from the
+            vertices, like in ``search_edge`` ("all" by default).
+
+        Raises
+        ------
+        VertexInsertionException
+            If a Vertex isn't inserted in this database.
+        ValueError
+            If ``measure`` or ``direction`` is not valid.
+        """
+        self._check_inserted(v1, v2)
+        query = self._similarity_query(measure, label, direction)
+        return query.score(v1.place, v2.place)
+
+    def similar_vertices(
+        self,
+        vertex: Vertex,
+        k: int = 10,
+        measure: str = "jaccard",
+        label: str = None,
+        direction: str = "all",
+        candidates: Optional[Iterable[Vertex]] = None,
+    ) -> List[Tuple[Vertex, float]]:
+        """Return the vertices whose neighbourhood is the most similar.
+
+        The neighbours are read from sorted arrays built once for all the
+        queries, until the edges change. Without ``candidates``, the scores
+        of all the vertices that share a neighbour with ``vertex`` are
+        computed in a single pass over the neighbours of its neighbours.
+        With ``candidates``, they are compared from the one whose score can
+        be the highest, and the search stops when the others can't be in
+        the top ``k``.
+
+        Parameters
+        ----------
+        vertex : Vertex
+            The Vertex to compare the others with.
+        k : int, optional
+            The highest number of returned vertices (10 by default).
+        measure : str {'common', 'jaccard', 'adamic_adar'}, optional
+            The similarity measure, like in ``similarity`` ("jaccard" by
+            default).
+        label : str, optional
+            If not None, only the edges with this label lead to the
+            neighbours (None by default).
+        direction : str {'out', 'in', 'none', 'all'}, optional
+            The direction of the edges to the neighbours, seen from the
+            vertices, like in ``search_edge`` ("all" by default).
+        candidates : Iterable[Vertex], optional
+            If not None, only these vertices are compared with ``vertex``
+            (None by default).
+
+        Returns
+        -------
+        List[Tuple[Vertex, float]]
+            The vertices and their score, by decreasing score then
+            increasing place. ``vertex`` itself and the vertices with a
+            score of 0 are left out.
+
+        Raises
+        ------
+        VertexInsertionException
+            If a Vertex isn't inserted in this database.
+        ValueError
+            If ``measure`` or ``direction`` is not valid.
+
+        Example
+        -------
+        >>> database.similar_vertices(song, k=3, label="liked", direction="in")
+        [(<Vertex 12 ...>, 0.5), (<Vertex 7 ...>, 0.25)]
+        """
+        self._check_inserted(vertex)
+        places = None
+        if candidates is not None:
+            candidates = list(candidates)
+            self._check_inserted(*candidates)
+            places = [candidate.place for candidate in candidates]
+        query = self._similarity_query(measure, label, direction)
+        return [
+            (self._vertices[place], score)
+            for place, score in query.top(vertex.place, k, places)
+        ]
+
+    # REACHABILITY METHODS
+
+    def _reachability_index(
+        self, label: str, direction: str
+    ) -> ReachabilityIndex:
+        """Return the reachability index of a label and a direction.
+
+        It is built on the first query, and again after the edges change.
+        """
+        version = self._edges.version
+        index = self._reachability_indexes.get((label, direction))
+        if index is None or index.version != version:
+            index = ReachabilityIndex(self._neighbour_index(label, direction))
+            self._reachability_indexes[(label, direction)] = index
+        return index
+
+    def _keep_reachability_indexes(
+        self, version: int, edge: Edge, inserted: bool
+    ) -> None:
+        """Keep the reachability indexes that an edge change doesn't change.
+
+        Parameters
+        ----------
+        version : int
+            The version of the edges before the change.
+        edge : Edge
+            The inserted or removed edge.
+        inserted : bool
+            Whether the edge was inserted or removed.
+        """
+        start, end = edge.start.place, edge.end.place
+        for (label, __), index in self._reachability_indexes.items():
+            if index.version != version:
+                continue
+            # The edges of another label don't change an index, and the new
+            # edges between reachable vertices don't either.
+            if (label is None or label == edge.label) and not (
+                inserted and index.covers(start, end, edge.has_direction)
+            ):
+                continue
+            index.version = self._edges.version
+
+    def is_reachable(
+        self,
+        v1: Vertex,
+        v2: Vertex,
+        label: str = None,
+        direction: str = "out",
+    ) -> bool:
+        """Return whether a Vertex can be reached from another one.
+
+        The vertices that each vertex reaches are kept in an index, built on
+        the first query, so that the answer is found without following the
+        edges, in a time that grows with the log of the number of vertices
+        at most. The index is kept after the changes of the edges that
+        don't change it, like the insertion of a shortcut.
+
+        Parameters
+        ----------
+        v1 : Vertex
+            The Vertex the paths start from.
+        v2 : Vertex
+            The Vertex to reach.
+        label : str, optional
+            If not None, the paths only follow the edges with this label
+            (None by default).
+        direction : str {'out', 'in', 'none', 'all'}, optional
+            The direction of the followed edges, seen from the vertex they
+            leave, like in ``search_edge``. With "out", the paths go from
+            the start to the end of the edges ("out" by default).
+
+        Returns
+        -------
+        bool
+            Whether there is a path of one or more edges from ``v1`` to
+            ``v2``. A Vertex only reaches itself if it is on a cycle.
+
+        Raises
+        ------
+        VertexInsertionException
+            If a Vertex isn't inserted in this database.
+        ValueError
+            If ``direction`` is not a direction.
+
+        Example
+        -------
+        >>> database.is_reachable(child, grandparent, label="parent")
+        True
+        """
+        self._check_inserted(v1, v2)
+        index = self._reachability_index(label, direction)
+        return index.is_reachable(v1.place, v2.place)
+
+    def descendants(
+        self, vertex: Vertex, label: str = None, direction: str = "out"
+    ) -> Iterator[Vertex]:
+        """Iterate over the vertices that can be reached from a Vertex.
+
+        They are listed from the reachability index of ``is_reachable``,
+        without following the edges.
+
+        Parameters
+        ----------
+        vertex : Vertex
+            The Vertex the paths start from.
+        label : str, optional
+            If not None, the paths only follow the edges with this label
+            (None by default).
+        direction : str {'out', 'in', 'none', 'all'}, optional
+            The direction of the followed edges, like in ``is_reachable``
+            ("out" by default).
+
+        Raises
+        ------
+        VertexInsertionException
+            If the Vertex isn't inserted in this database.
+        ValueError
+            If ``direction`` is not a direction.
+        """
+        self._check_inserted(vertex)
+        index = self._reachability_index(label, direction)
+        return (
+            self._vertices[place] for place in index.reachable(vertex.place)
+        )
+
+    def ancestors(
+        self, vertex: Vertex, label: str = None, direction: str = "out"
+    ) -> Iterator[Vertex]:
+        """Iterate over the vertices that can reach a Vertex.
+
+        It is ``descendants`` in the opposite direction.
+
+        Parameters
+        ----------
+        vertex : Vertex
+            The Vertex the paths end at.
+        label : str, optional
+            If not None, the paths only follow the edges with this label
+            (None by default).
+        direction : str {'out', 'in', 'none', 'all'}, optional
+            The direction of the followed edges, like in ``is_reachable``
+            ("out" by default).
+
+        Raises
+        ------
+        VertexInsertionException
+            If the Vertex isn't inserted in this database.
+        ValueError
+            If ``direction`` is not a direction.
+        """
+        check_direction(direction)
+        return self.descendants(vertex, label, OPPOSITE_DIRECTIONS[direction])
+
+    # SAMPLING METHODS
+
+    def sampler(
+        self,
+        label: str = None,
+        direction: str = "out",
+        weight: Optional[str] = None,
+        default_weight: float = 1.0,
+    ) -> GraphSampler:
+        """Return a sampler of random walks and neighbourhoods.
+
+        The sampler keeps the neighbours of the vertices, and the alias
+        tables of their weights, in arrays built once from the edges, so
+        the walks don't search the edges. It designates the vertices by
+        their place, and doesn't follow the later changes of the database.
+
+        Parameters
+        ----------
+        label : str, optional
+            If not None, the walks only follow the edges with this label
+            (None by default).
+        direction : str {'out', 'in', 'none', 'all'}, optional
+            The direction of the followed edges, seen from the vertex they
+            leave, like in ``search_edge`` ("out" by default).
+        weight : str, optional
+            If not None, the property of the edges that weighs them, so the
+            neighbours are drawn in proportion to the weights. If None, they
+            are drawn uniformly (None by default).
+        default_weight : float, optional
+            The weight of the edges that don't have the ``weight`` property
+            (1.0 by default).
+
+        Raises
+        ------
+        ValueError
+            If ``direction`` is not a direction, or a weight is not a
+            non-negative number.
+
+        Example
+        -------
+        >>> sampler = database.sampler(label="follows", weight="strength")
+        >>> starts = [vertex.place for vertex in database] * 10
+        >>> walks = sampler.walks(starts, length=20, p=0.5, q=2, seed=1)
+        """
+        check_direction(direction)
+        ends = self._edges.edge_ends(label)
+        if weight is not None:
+            values = self._edges.property_values(weight, label)
+            ends = (
+                (*edge_ends, default_weight if value is None else value)
+                for edge_ends, value in zip(ends, values)
+            )
+        return GraphSampler(
+            ends, direction, self._next_place, weighted=weight is not None
+        )
+
+    # DEGREE METHODS
+
+    def set_hub_threshold(self, threshold: Optional[int]) -> None:
+        """Set the degree from which the edges of a vertex are partitioned.
+
+        The edges of a hub, a vertex with at least this number of edges,
+        are partitioned by label and by other vertex, so ``search_edge`` on
+        a hub with a second vertex or a label doesn't check all its edges.
+        The partitions are kept in memory, and rebuilt on load.
+
+        Parameters
+        ----------
+        threshold : int, optional
+            The degree from which a vertex is a hub, or None to have no hubs.
+
+        Raises
+        ------
+        ValueError
+            If ``threshold`` is not None or a positive integer.
+        """
+        check_hub_threshold(threshold)
+        self._edges.set_hub_threshold(threshold)
+        self._hub_threshold = threshold
+
+    def degree(self, vertex: Vertex, label: str = None) -> int:
+        """Return the number of edges of a Vertex.
+
+        The degree is counted in constant time. A loop is counted once.
+
+        Parameters
+        ----------
+        vertex : Vertex
+            The inserted Vertex.
+        label : str, optional
+            If not None, only the edges with this label are counted. They
+            are counted in constant time for a hub only (None by default).
+
+        Raises
+        ------
+        VertexInsertionException
+            If the Vertex isn't inserted in the database.
+        """
+        self._check_inserted(vertex)
+        return self._edges.degree(vertex.place, label)
+
+    def degree_stats(self, top: int = 10) -> Dict[str, Any]:
+        """Return statistics on the degrees of the vertices.
+
+        Parameters
+        ----------
+        top : int, optional
+            The number of vertices with the most edges to return (10 by
+            default).
+
+        Returns
+        -------
+        Dict[str, Any]
+            - "vertices" : the number of vertices.
+            - "edges" : the number of edges.
+            - "max" : the highest degree.
+            - "mean" : the mean degree.
+            - "histogram" : the number of vertices by degree range, with
+              the lower bound of the range as key. The ranges are 0, 1,
+              2-3, 4-7 and so on.
+            - "top" : the ``top`` vertices with the most edges and their
+              degree, from the highest degree.
+            - "hub_threshold" : the threshold of the hubs.
+            - "hubs" : the number of hubs.
+
+        Example
+        -------
+        >>> database.degree_stats(top=1)["top"]
+        [(<Vertex(1)>, 5000)]
+        """
+        degrees = list(self._edges.degrees())
+        vertices = len(self._vertices)
+        histogram: Dict[int, int] = {}
+        if vertices > len(degrees):
+            histogram[0] = vertices - len(degrees)
+        for __, degree in degrees:
+            bound = 1 << (degree.bit_length() - 1)
+            histogram[bound] = histogram.get(bound, 0) + 1
+        return {
+            "vertices": vertices,
+            "edges": len(self._edges),
+            "max": max((degree for __, degree in degrees), default=0),
+            "mean": (
+                sum(degree for __, degree in degrees) / vertices
+                if vertices
+                else 0.0
+            ),
+            "histogram": dict(sorted(histogram.items())),
+            "top": [
+                (self._vertices[place], degree)
+                for place, degree in heapq.nlargest(
+                    top, degrees, key=lambda item: item[1]
+                )
+            ],
+            "hub_threshold": self._hub_threshold,
+            "hubs": len(self._edges.hubs()),
+        }
+
     # EDGES ITERATION METHODS
 
-    def edges(self) -> Iterator[Edge]:
+    def edges(self, label: str = None) -> Iterator[Edge]:
         """Return an iterator over all the inserted edges.
 
+        The edges are created from the edge store as they are read, so two
+        iterations return different Edge objects, except for the instances
+        of the Edge subclasses, which are kept.
+
+        Parameters
+        ----------
+        label : str, optional
+            If not None, only the edges with this label are returned. They
+            are read from the label index, without a scan (None by
+            default).
+
         Returns
         -------
         Iterator[Edge]
             An iterator over all the edges in the database.
         """
-        return iter(self._edges)
+        edges, vertices = self._edges, self._vertices
+        rows = edges.rows() if label is None else edges.label_rows(label)
+        return (edges.materialize(row, vertices) for row in rows)
+
+    def count_edges(self, label: str = None) -> int:
+        """Return the number of inserted edges, in constant time.
+
+        Parameters
+        ----------
+        label : str, optional
+            If not None, only the edges with this label are counted (None
+            by default).
+        """
+        if label is None:
+            return len(self._edges)
+        return self._edges.label_count(label)
+
+    def edge_labels(self) -> Dict[str, int]:
+        """Return the number of inserted edges of each label.
+
+        The labels of the removed edges that no other edge has are left
+        out.
+        """
+        return self._edges.label_counts()
 
     def search_edge(
         self,
@@ -431,6 +1778,7 @@ class DocNetDB:
         v2: Vertex = None,
         label: str = None,
         direction: str = "all",
+        where: Optional[Callable[[Mapping[str, Any]], bool]] = None,
     ) -> Iterator[Edge]:
         """Return a generator of corresponding edges.
 
@@ -438,6 +1786,7 @@ class DocNetDB:
         - One or two vertices
         - A label
         - The oriented state of the edge
+        - The properties of the edge
 
         Parameters
         ----------
@@ -460,30 +1809,287 @@ class DocNetDB:
             If "none", all returned edges will be non-oriented edges between
             ``v1`` and ``v2``.
             If "all", no further filtering is done ("all" by default).
+        where : Callable[[Mapping[str, Any]], bool], optional
+            If not None, all returned edges will have properties that pass
+            this function. Like in ``search``, a KeyError means the edge
+            doesn't pass (None by default).
 
         Returns
         -------
         Iterator[Edge]
-            A generator on all the corresponding edges.
+            A generator on all the corresponding edges, anchored on ``v1``.
         """
+        # The rows are filtered before any Edge is created.
+        edges = self._edges
+        place = v1.place
+        if v1 not in self or (v2 is not None and v2 not in self):
+            return iter(())
 
-        def filter_by_v1(edge):
-            if edge.has_vertex(v1):
-                edge.change_anchor(v1)
-                return True
-            return False
+        selection = self._edge_candidates(v1, v2, label)
 
-        selection = filter(filter_by_v1, self._edges)
+        # The label is checked first, as it is the cheapest check.
+        if label is not None:
+            if edges.label_count(label) == 0:
+                return iter(())
+            selection = (row for row in selection if edges.label(row) == label)
 
         if v2 is not None:
-            selection = filter(lambda edge: edge.other is v2, selection)
+            other = v2.place
+            selection = (
+                row for row in selection if edges.other(row, place) == other
+            )
 
         if direction != "all":
-            selection = filter(
-                lambda edge: edge.direction == direction, selection
+            selection = (
+                row
+                for row in selection
+                if edges.direction(row, place) == direction
             )
 
-        if label is not None:
-            selection = filter(lambda edge: edge.label == label, selection)
+        if where is not None:
+            selection = (
+                row
+                for row in selection
+                if properties_pass(where, edges.properties(row))
+            )
+
+        return (self._anchored_edge(row, v1) for row in selection)
+
+    def _edge_candidates(
+        self, v1: Vertex, v2: Vertex = None, label: str = None
+    ) -> Iterator[int]:
+        """Return the rows of the edge store that ``search_edge`` checks.
+
+        The returned rows are a superset of the rows of the edges of ``v1``
+        with ``v2`` and ``label``. If one of them is a hub, they are only
+        these rows.
+        """
+        return self._edges.search_rows(
+            v1.place, None if v2 is None else v2.place, label
+        )
+
+    def _anchored_edge(self, row: int, anchor: Vertex) -> Edge:
+        """Create the Edge of a row of the edge store, with an anchor."""
+        edge = self._materialize(row)
+        edge.change_anchor(anchor)
+        return edge
+
+    def _materialize(self, row: int) -> Edge:
+        """Create the Edge of a row of the edge store."""
+        return self._edges.materialize(row, self._vertices)
+
+    # EDGE PROPERTY METHODS
+
+    def create_edge_index(self, key: str, kind: str = "hash") -> None:
+        """Index a property of the edges, to find them without a scan.
+
+        The index is kept up to date by the modifications, and rebuilt when
+        the database is loaded again. It is not stored in the file.
+
+        Parameters
+        ----------
+        key : str
+            The key of the property.
+        kind : str {'hash', 'sorted'}, optional
+            The kind of index. A hash index finds the edges whose property
+            equals a value, and a sorted index finds the ones whose
+            property is in a range too ("hash" by default).
+
+        Raises
+        ------
+        ValueError
+            If ``kind`` is neither 'hash' nor 'sorted'.
+        """
+        self._edges.create_index(key, kind)
+        self._edge_index_kinds[key] = kind
+
+    def drop_edge_index(self, key: str) -> None:
+        """Drop the index of a property of the edges.
+
+        Raises
+        ------
+        KeyError
+            If the property has no index.
+        """
+        self._edges.drop_index(key)
+        del self._edge_index_kinds[key]
+
+    def edge_indexes(self) -> Dict[str, str]:
+        """Return the kind of the index of each indexed edge property."""
+        return dict(self._edge_index_kinds)
+
+    def find_edges(self, key: str, value: Any) -> Iterator[Edge]:
+        """Return an iterator over the edges whose property has a value.
+
+        The edges are found in the index of the property if it has one,
+        else by a scan of the edges that have properties.
+
+        Parameters
+        ----------
+        key : str
+            The key of the property.
+        value : Any
+            The value of the property.
+
+        Returns
+        -------
+        Iterator[Edge]
+            An iterator over the edges, in the order of ``edges``.
+        """
+        return (
+            self._materialize(row) for row in self._edges.find_rows(key, value)
+        )
+
+    def find_edges_in_range(
+        self,
+        key: str,
+        low: Any = None,
+        high: Any = None,
+        include_low: bool = True,
+        include_high: bool = True,
+    ) -> Iterator[Edge]:
+        """Return an iterator over the edges whose property is in a range.
+
+        The edges are found in the index of the property if it is sorted,
+        else by a scan of the edges that have properties. The bounds are two
+        numbers or two strings, and the values of another type are never in
+        the range.
+
+        Parameters
+        ----------
+        key : str
+            The key of the property.
+        low : Any, optional
+            The lowest value, or None for no lowest value (None by default).
+        high : Any, optional
+            The highest value, or None for no highest value (None by
+            default).
+        include_low : bool, optional
+            Whether ``low`` is in the range (True by default).
+        include_high : bool, optional
+            Whether ``high`` is in the range (True by default).
+
+        Returns
+        -------
+        Iterator[Edge]
+            An iterator over the edges, in the order of ``edges``.
+
+        Raises
+        ------
+        ValueError
+            If both bounds are None.
+        TypeError
+            If the bounds are not two numbers or two strings.
+
+        Example
+        -------
+        >>> database.create_edge_index("weight", "sorted")
+        >>> heavy = database.find_edges_in_range(
+        ...     "weight", low=0.8, include_low=False
+        ... )
+        """
+        value_range = ValueRange(low, high, include_low, include_high)
+        return (
+            self._materialize(row)
+            for row in self._edges.find_rows_in_range(key, value_range)
+        )
+
+    # INSTRUMENTATION METHODS
 
-        return selection
+    def enable_metrics(self, *hooks: MetricsHook) -> Metrics:
+        """Enable the instrumentation of the operations.
+
+        The calls of ``load``, ``save``, ``insert``, ``remove``, ``search``,
+        ``search_edge``, ``insert_edge`` and ``remove_edge`` are counted and
+        timed. The searches also count the scanned and returned rows, and
+        the loads and saves the size of the file. When the instrumentation
+        is disabled, those methods are not slowed down at all.
+
+        Parameters
+        ----------
+        *hooks : MetricsHook
+            Hooks that receive the measures of every operation, to export
+            them to another system. They are added to the hooks of the
+            instrumentation if it is already enabled.
+
+        Returns
+        -------
+        Metrics
+            The instrumentation of the database.
+        """
+        if self._metrics is None:
+            self._metrics = Metrics(hooks)
+            self._metrics.instrument(self)
+        else:
+            self._metrics.hooks.extend(hooks)
+        return self._metrics
+
+    def disable_metrics(self) -> None:
+        """Disable the instrumentation and forget the measures."""
+        if self._metrics is not None:
+            self._metrics.uninstrument(self)
+            self._metrics = None
+        self._slow_log = None
+
+    def enable_slow_log(
+        self, threshold: float = 0.1, capacity: int = 100
+    ) -> SlowOperationLog:
+        """Log the operations that take longer than a threshold.
+
+        The slow operations are logged with the ``docnetdb.logger`` logger,
+        with their duration, their arguments (the qualified name of the
+        gate function, the place of the vertices, the label and the
+        direction) and, for the searches, the rows examined and returned.
+        The last ones are also kept in the returned log.
+
+        This enables the instrumentation (see ``enable_metrics``). A slow
+        log that was already enabled is replaced.
+
+        Parameters
+        ----------
+        threshold : float, optional
+            The duration in seconds above which an operation is slow (0.1 by
+            default).
+        capacity : int, optional
+            The number of slow operations kept in memory (100 by default).
+
+        Returns
+        -------
+        SlowOperationLog
+            The log, which can be iterated over.
+        """
+        self.disable_slow_log()
+        self._slow_log = SlowOperationLog(threshold, capacity)
+        self.enable_metrics(self._slow_log)
+        return self._slow_log
+
+    def disable_slow_log(self) -> None:
+        """Stop logging the slow operations.
+
+        The instrumentation stays enabled.
+        """
+        if self._slow_log is not None and self._metrics is not None:
+            self._metrics.hooks.remove(self._slow_log)
+        self._slow_log = None
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return the measures of the operations, by operation name.
+
+        Returns
+        -------
+        Dict[str, Dict[str, Any]]
+            For each called operation, the call count, the total, mean and
+            max time in seconds, a latency histogram, the rows scanned and
+            returned (for the searches) and the bytes read or written (for
+            the loads and saves). It is empty if the instrumentation is
+            disabled.
+
+        Example
+        -------
+        >>> database.enable_metrics()
+        >>> list(database.search(lambda v: v["age"] > 14))
+        >>> database.stats()["search"]["rows_scanned"]
+        """
+        if self._metrics is None:
+            return {}
+        return self._metrics.stats()
@@ -1,6 +1,7 @@
 """This module defines a class for edge return."""
 
-from typing import Optional, Tuple
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
 
 from docnetdb.exceptions import VertexInsertionException
 from docnetdb.vertex import Vertex
@@ -15,6 +16,7 @@ class Edge:
         end: Vertex,
         label: str = "",
         has_direction: bool = True,
+        properties: Optional[Mapping[str, Any]] = None,
     ):
         """Init an Edge between two vertices.
 
@@ -31,6 +33,10 @@ class Edge:
             ``start`` and ``end`` has little importance, and ``start`` is set
             to have the lowest place regardless of the order of the
             parameters (True by default).
+        properties : Mapping[str, Any], optional
+            The properties of the edge, like a weight or a timestamp. They
+            are copied, and can be read in the ``properties`` attribute
+            (None by default).
 
         Raises
         ------
@@ -56,6 +62,9 @@ class Edge:
             )
         self._label = label
         self._has_direction = has_direction
+        self._properties: Dict[str, Any] = (
+            {} if properties is None else dict(properties)
+        )
 
         self._anchor: Optional[Vertex] = None
         self._other: Optional[Vertex] = None
@@ -72,6 +81,7 @@ class Edge:
         other: Vertex,
         label: str = "",
         direction: str = "out",
+        properties: Optional[Mapping[str, Any]] = None,
     ) -> "Edge":
         """Create an Edge between two vertices using an anchor.
 
@@ -90,6 +100,8 @@ class Edge:
         direction : {"out", "in", "none"}, optional
             The direction of the edge according to the anchor point. "none" if
             the edge has no direction ("out" by default).
+        properties : Mapping[str, Any], optional
+            The properties of the edge (None by default).
 
         Returns
         -------
@@ -119,7 +131,13 @@ class Edge:
             start = anchor
             end = other
 
-        edge = cls(start, end, label=label, has_direction=has_direction)
+        edge = cls(
+            start,
+            end,
+            label=label,
+            has_direction=has_direction,
+            properties=properties,
+        )
 
         edge._anchor = anchor
         edge._other = other
@@ -128,14 +146,15 @@ class Edge:
         return edge
 
     @classmethod
-    def from_pack(cls, pack: Tuple[int, int, str, bool], db) -> "Edge":
-        """Create an Edge between two vertices using a pack (4-tuple).
+    def from_pack(cls, pack: Tuple, db) -> "Edge":
+        """Create an Edge between two vertices using a pack (4 or 5-tuple).
 
         Parameters
         ----------
-        pack : Tuple[int, int, str, bool]
+        pack : Tuple
             The pack of 4 values (start_place, end_place, label,
-            has_direction) used for storage.
+            has_direction) used for storage, followed by the dict of the
+            properties if the edge has some.
         db : DocNetDB
             The database used to associate places to vertices.
 
@@ -144,10 +163,37 @@ class Edge:
         Edge:
             The freshly-created edge.
         """
-        start_place, end_place, label, has_direction = pack
+        start_place, end_place, label, has_direction, *properties = pack
         start = db[start_place]
         end = db[end_place]
-        return cls(start, end, label, has_direction)
+        return cls(start, end, label, has_direction, *properties)
+
+    @classmethod
+    def _from_row(
+        cls,
+        start: Vertex,
+        end: Vertex,
+        label: str,
+        has_direction: bool,
+        properties: Optional[Dict[str, Any]] = None,
+    ) -> "Edge":
+        """Create an inserted Edge from a row of the edge store.
+
+        The vertices are already in the right order, so the checks of the
+        __init__ method are skipped. The properties are the dict of the
+        store, which the Edge only exposes as read-only.
+        """
+        edge = cls.__new__(cls)
+        edge._start = start
+        edge._end = end
+        edge._label = label
+        edge._has_direction = has_direction
+        edge._properties = {} if properties is None else properties
+        edge._anchor = None
+        edge._other = None
+        edge._direction = None
+        edge.is_inserted = True
+        return edge
 
     # CHECK METHODS
 
@@ -216,7 +262,11 @@ class Edge:
         )
 
     def __eq__(self, other) -> bool:
-        """Override the __eq__ method."""
+        """Override the __eq__ method.
+
+        The properties are not compared, so an Edge can be removed without
+        knowing them.
+        """
         return (
             self._start is other._start
             and self._end is other._end
@@ -226,14 +276,22 @@ class Edge:
 
     # EXPORT METHODS
 
-    def pack(self) -> Tuple[int, int, str, bool]:
-        """Return a pack used for storage (4-tuple in that situation)."""
-        return (
+    def pack(self) -> Tuple:
+        """Return a pack used for storage.
+
+        The pack is a 4-tuple, or a 5-tuple ending with a copy of the
+        properties if the edge has some, so the files of the edges without
+        properties don't change.
+        """
+        pack: Tuple = (
             self.start.place,
             self.end.place,
             self.label,
             self.has_direction,
         )
+        if self._properties:
+            pack += (dict(self._properties),)
+        return pack
 
     # CALLBACK METHODS
 
@@ -267,6 +325,15 @@ class Edge:
         """Read-only property for the has_direction attribute."""
         return self._has_direction
 
+    @property
+    def properties(self) -> Mapping[str, Any]:
+        """Read-only property for the properties of the edge.
+
+        The properties are set when the Edge is created, and can't be
+        modified afterwards, as they may be indexed by the database.
+        """
+        return MappingProxyType(self._properties)
+
     @property
     def anchor(self) -> Optional[Vertex]:
         """Read-only property for the anchor attribute."""
@@ -0,0 +1,253 @@
+"""This module defines the indexes of the edge properties.
+
+An index maps the values of a property to the rows of the EdgeStore that
+have them, so the edges with some values are found without a scan :
+
+- A HashIndex finds the edges whose property equals a value.
+- A SortedIndex keeps the values in order, so it also finds the edges whose
+  property is in a ValueRange. The numbers are sorted before the strings,
+  and the other values (like None and the booleans) are not indexed.
+
+The rows found by an index are returned in order, like the other rows of
+the EdgeStore. When an index can't answer a lookup, it returns None and
+the rows are found by a scan instead.
+"""
+
+import bisect
+from typing import Any, Dict, Hashable, List, Optional, Tuple, Union
+
+# The ranks of the values that a SortedIndex sorts.
+NUMBER_RANK = 0
+STRING_RANK = 1
+
+# A row that is after all the rows, to find the end of the entries of a
+# value.
+_LAST_ROW = float("inf")
+
+
+def sort_key(value: Any) -> Optional[Tuple[int, Any]]:
+    """Return the key of a value in a SortedIndex, or None.
+
+    The numbers are sorted before the strings. The other values can't be
+    compared with them, so they have no key, like the booleans and NaN.
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        if value != value:
+            return None
+        return (NUMBER_RANK, value)
+    if isinstance(value, str):
+        return (STRING_RANK, value)
+    return None
+
+
+class ValueRange:
+    """A range of numbers or of strings, with optional bounds."""
+
+    def __init__(
+        self,
+        low: Any = None,
+        high: Any = None,
+        include_low: bool = True,
+        include_high: bool = True,
+    ) -> None:
+        """Init a ValueRange.
+
+        Parameters
+        ----------
+        low : Any, optional
+            The lowest value of the range, or None if it has no lowest value
+            (None by default).
+        high : Any, optional
+            The highest value of the range, or None if it has no highest
+            value (None by default).
+        include_low : bool, optional
+            Whether ``low`` is in the range (True by default).
+        include_high : bool, optional
+            Whether ``high`` is in the range (True by default).
+
+        Raises
+        ------
+        ValueError
+            If the range has no bound.
+        TypeError
+            If the bounds are not two numbers or two strings.
+        """
+        bounds = [bound for bound in (low, high) if bound is not None]
+        if not bounds:
+            raise ValueError("A range needs a low or a high bound")
+        keys = [sort_key(bound) for bound in bounds]
+        if None in keys or len({key[0] for key in keys}) > 1:
+            raise TypeError("The bounds must be two numbers or two strings")
+
+        self.rank = keys[0][0]
+        self.low = low
+        self.high = high
+        self.include_low = include_low
+        self.include_high = include_high
+
+    def __contains__(self, value: Any) -> bool:
+        """Return whether a value is in the range."""
+        key = sort_key(value)
+        if key is None or key[0] != self.rank:
+            return False
+        low, high = self.low, self.high
+        if low is not None and (
+            value < low or (value == low and not self.include_low)
+        ):
+            return False
+        if high is not None and (
+            value > high or (value == high and not self.include_high)
+        ):
+            return False
+        return True
+
+    def __repr__(self) -> str:
+        """Override the __repr__ method."""
+        return (
+            f"<ValueRange {'[' if self.include_low else ']'}{self.low}, "
+            f"{self.high}{']' if self.include_high else '['}>"
+        )
+
+
+class HashIndex:
+    """An index of the rows of each value of a property.
+
+    The unhashable values are not indexed.
+    """
+
+    kind = "hash"
+
+    def __init__(self, key: str) -> None:
+        """Init an empty HashIndex on a property."""
+        self.key = key
+        self._rows: Dict[Hashable, List[int]] = {}
+
+    def add(self, row: int, value: Any) -> None:
+        """Index the value of a row."""
+        try:
+            rows = self._rows.setdefault(value, [])
+        except TypeError:
+            return
+        # The restored rows may come before the others.
+        if rows and rows[-1] > row:
+            bisect.insort(rows, row)
+        else:
+            rows.append(row)
+
+    def remove(self, row: int, value: Any) -> None:
+        """Remove the value of a row from the index."""
+        try:
+            rows = self._rows.get(value)
+        except TypeError:
+            return
+        if rows is not None and row in rows:
+            rows.remove(row)
+            if not rows:
+                del self._rows[value]
+
+    def find(self, value: Any) -> Optional[List[int]]:
+        """Return the rows whose value equals a value, or None."""
+        try:
+            return list(self._rows.get(value, ()))
+        except TypeError:
+            return None
+
+    def find_range(self, value_range: ValueRange) -> Optional[List[int]]:
+        """Return None, as the values are not in order."""
+        return None
+
+
+class SortedIndex:
+    """An index of the rows of a property, in the order of the values.
+
+    The entries are (rank, value, row) tuples. The new entries are sorted in
+    on the next lookup, so the entries of a load are sorted once.
+    """
+
+    kind = "sorted"
+
+    def __init__(self, key: str) -> None:
+        """Init an empty SortedIndex on a property."""
+        self.key = key
+        self._entries: List[Tuple] = []
+        self._pending: List[Tuple] = []
+
+    def _sorted_entries(self) -> List[Tuple]:
+        """Sort the new entries in, and return all the entries."""
+        if self._pending:
+            self._entries.extend(self._pending)
+            self._entries.sort()
+            self._pending = []
+        return self._entries
+
+    def add(self, row: int, value: Any) -> None:
+        """Index the value of a row."""
+        key = sort_key(value)
+        if key is not None:
+            self._pending.append((*key, row))
+
+    def remove(self, row: int, value: Any) -> None:
+        """Remove the value of a row from the index."""
+        key = sort_key(value)
+        if key is None:
+            return
+        entry = (*key, row)
+        entries = self._sorted_entries()
+        position = bisect.bisect_left(entries, entry)
+        if position < len(entries) and entries[position] == entry:
+            del entries[position]
+
+    def find(self, value: Any) -> Optional[List[int]]:
+        """Return the rows whose value equals a value, or None."""
+        key = sort_key(value)
+        if key is None:
+            return None
+        entries = self._sorted_entries()
+        first = bisect.bisect_left(entries, key)
+        stop = bisect.bisect_left(entries, (*key, _LAST_ROW))
+        return sorted(entry[2] for entry in entries[first:stop])
+
+    def find_range(self, value_range: ValueRange) -> Optional[List[int]]:
+        """Return the rows whose value is in a range."""
+        entries = self._sorted_entries()
+        rank, low, high = value_range.rank, value_range.low, value_range.high
+
+        if low is None:
+            first = bisect.bisect_left(entries, (rank,))
+        elif value_range.include_low:
+            first = bisect.bisect_left(entries, (rank, low))
+        else:
+            first = bisect.bisect_left(entries, (rank, low, _LAST_ROW))
+
+        if high is None:
+            stop = bisect.bisect_left(entries, (rank + 1,))
+        elif value_range.include_high:
+            stop = bisect.bisect_left(entries, (rank, high, _LAST_ROW))
+        else:
+            stop = bisect.bisect_left(entries, (rank, high))
+
+        return sorted(entry[2] for entry in entries[first:stop])
+
+
+# An index of any kind.
+PropertyIndex = Union[HashIndex, SortedIndex]
+
+# The index classes, by kind.
+INDEX_CLASSES = {"hash": HashIndex, "sorted": SortedIndex}
+
+
+def make_index(key: str, kind: str) -> PropertyIndex:
+    """Return an empty index of a kind on a property.
+
+    Raises
+    ------
+    ValueError
+        If ``kind`` is neither 'hash' nor 'sorted'.
+    """
+    try:
+        index_class = INDEX_CLASSES[kind]
+    except KeyError:
+        raise ValueError("kind is either 'hash' or 'sorted'") from None
+    return index_class(key)
@@ -0,0 +1,779 @@
+"""This module defines the EdgeStore class, which stores the edges.
+
+The edges are stored as rows of typed arrays instead of Edge objects : the
+places of the start and end vertices, the id of the label in an interned
+label table, and the direction flag in a bit array. The Edge objects are
+created on demand when the edges are read.
+
+The removed rows are marked with start and end places of 0 (the place of a
+non-inserted vertex), and are dropped when the store is compacted.
+
+Each label has an index of its rows and a count of its edges, so the edges
+of a label are listed without a scan, and counted in constant time.
+
+The properties of the edges are kept in a dict by row, for the rows that
+have some. The properties can be indexed with a HashIndex or a SortedIndex,
+which are updated with the rows.
+
+The degree of each place is counted, and the rows of the hubs, the places
+whose degree reached the hub threshold, are partitioned by label and other
+end in a HubPartition, so the edges of a hub are found without a scan.
+"""
+
+import heapq
+import sys
+from array import array
+from types import MappingProxyType
+from typing import (
+    Any,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from docnetdb.edge import Edge
+from docnetdb.edgeindex import PropertyIndex, ValueRange, make_index
+from docnetdb.hubs import HubPartition, check_hub_threshold
+
+# The typecode of the arrays of places.
+PLACE_TYPECODE = "q"
+
+# The typecode of the array of label ids.
+LABEL_TYPECODE = "L"
+
+# The properties of the rows that have none.
+NO_PROPERTIES: Mapping[str, Any] = MappingProxyType({})
+
+# A value that no property has.
+_MISSING = object()
+
+
+def find_all(values: array, value: int) -> Iterator[int]:
+    """Yield the positions of a value in an array, in order.
+
+    The search is done by the array itself, in C.
+    """
+    if sys.version_info >= (3, 10):
+        index = values.index
+        position = -1
+        while True:
+            try:
+                position = index(value, position + 1)
+            except ValueError:
+                return
+            yield position
+    else:  # pragma: no cover
+        for position, item in enumerate(values):
+            if item == value:
+                yield position
+
+
+class EdgeStore:
+    """The inserted edges of a DocNetDB, stored as rows of typed arrays."""
+
+    def __init__(self) -> None:
+        """Init an empty EdgeStore."""
+        self._starts = array(PLACE_TYPECODE)
+        self._ends = array(PLACE_TYPECODE)
+        self._label_ids = array(LABEL_TYPECODE)
+        # One bit per row, set if the edge has a direction.
+        self._directed = bytearray()
+
+        # The interned labels, and the id of each one.
+        self._labels: List[Hashable] = []
+        self._label_index: Dict[Hashable, int] = {}
+
+        # The rows of each label, in order, and the number of its edges
+        # that are not removed. Both are indexed by label id, and the rows
+        # of the removed edges are only dropped on compaction.
+        self._label_rows: List[array] = []
+        self._label_counts = array(PLACE_TYPECODE)
+
+        # The Edge subclasses may hold more than their pack, so their
+        # objects are kept alongside their row.
+        self._objects: Dict[int, Edge] = {}
+
+        # The properties of the rows that have some, and the indexes of the
+        # properties by key. The properties of the removed rows are only
+        # dropped on compaction, but they are removed from the indexes.
+        self._properties: Dict[int, Dict[str, Any]] = {}
+        self._indexes: Dict[str, PropertyIndex] = {}
+
+        # The number of rows that are not removed.
+        self._count = 0
+        # The number of modifications of the edges, so that the structures
+        # built from them know when they are stale.
+        self.version = 0
+
+        # The number of edges of each place, and the partitions of the rows
+        # of the hubs. A hub stays a hub until the store is compacted.
+        self._degrees = array(PLACE_TYPECODE)
+        self.hub_threshold: Optional[int] = None
+        self._hubs: Dict[int, HubPartition] = {}
+
+    # SPECIAL METHODS
+
+    def __len__(self) -> int:
+        """Return the number of stored edges."""
+        return self._count
+
+    def __repr__(self) -> str:
+        """Override the __repr__ method."""
+        return f"<EdgeStore {self._count} edges>"
+
+    # LABEL METHODS
+
+    def intern_label(self, label: Hashable) -> int:
+        """Return the id of a label, adding it to the table if needed."""
+        try:
+            return self._label_index[label]
+        except KeyError:
+            self._labels.append(label)
+            self._label_rows.append(array(PLACE_TYPECODE))
+            self._label_counts.append(0)
+            label_id = self._label_index[label] = len(self._labels) - 1
+            return label_id
+
+    def label_id(self, label: Hashable) -> Optional[int]:
+        """Return the id of a label, or None if no edge ever used it."""
+        return self._label_index.get(label)
+
+    def label_rows(self, label: Hashable) -> Iterator[int]:
+        """Iterate over the rows of a label that are not removed, in order."""
+        label_id = self._label_index.get(label)
+        if label_id is None:
+            return iter(())
+        starts = self._starts
+        return (row for row in self._label_rows[label_id] if starts[row] != 0)
+
+    def label_count(self, label: Hashable) -> int:
+        """Return the number of stored edges with a label."""
+        label_id = self._label_index.get(label)
+        return 0 if label_id is None else self._label_counts[label_id]
+
+    def label_counts(self) -> Dict[Hashable, int]:
+        """Return the number of stored edges of each used label."""
+        return {
+            label: count
+            for label, count in zip(self._labels, self._label_counts)
+            if count != 0
+        }
+
+    # PROPERTY METHODS
+
+    def properties(self, row: int) -> Mapping[str, Any]:
+        """Return the properties of a row.
+
+        The returned dict is the one of the store, so it must not be
+        modified.
+        """
+        return self._properties.get(row, NO_PROPERTIES)
+
+    def create_index(self, key: str, kind: str = "hash") -> None:
+        """Index a property of the rows, replacing its current index.
+
+        Raises
+        ------
+        ValueError
+            If ``kind`` is neither 'hash' nor 'sorted'.
+        """
+        index = make_index(key, kind)
+        starts = self._starts
+        for row, properties in self._properties.items():
+            if starts[row] != 0 and key in properties:
+                index.add(row, properties[key])
+        self._indexes[key] = index
+
+    def drop_index(self, key: str) -> None:
+        """Drop the index of a property, or raise a KeyError."""
+        del self._indexes[key]
+
+    def find_rows(self, key: str, value: Any) -> List[int]:
+        """Return the rows whose property equals a value, in order.
+
+        The rows are found in the index of the property if it has one,
+        else by a scan of the properties.
+        """
+        index = self._indexes.get(key)
+        if index is not None:
+            rows = index.find(value)
+            if rows is not None:
+                return rows
+        starts = self._starts
+        return [
+            row
+            for row, properties in self._properties.items()
+            if starts[row] != 0 and properties.get(key, _MISSING) == value
+        ]
+
+    def find_rows_in_range(
+        self, key: str, value_range: ValueRange
+    ) -> List[int]:
+        """Return the rows whose property is in a range, in order.
+
+        The rows are found in the index of the property if it is sorted,
+        else by a scan of the properties.
+        """
+        index = self._indexes.get(key)
+        if index is not None:
+            rows = index.find_range(value_range)
+            if rows is not None:
+                return rows
+        starts = self._starts
+        return [
+            row
+            for row, properties in self._properties.items()
+            if starts[row] != 0
+            and properties.get(key, _MISSING) in value_range
+        ]
+
+    def _index_row(self, row: int, properties: Dict[str, Any]) -> None:
+        """Add the indexed properties of a row to their indexes."""
+        for key, index in self._indexes.items():
+            if key in properties:
+                index.add(row, properties[key])
+
+    def _unindex_row(self, row: int, properties: Dict[str, Any]) -> None:
+        """Remove the indexed properties of a row from their indexes."""
+        for key, index in self._indexes.items():
+            if key in properties:
+                index.remove(row, properties[key])
+
+    # DEGREE AND HUB METHODS
+
+    def degree(self, place: int, label: Hashable = None) -> int:
+        """Return the number of edges of a place, or of a label.
+
+        The number of all the edges, and of the edges of a label of a hub,
+        is counted in constant time. A loop is counted once.
+        """
+        degrees = self._degrees
+        if not 0 < place < len(degrees):
+            return 0
+        if label is None:
+            return degrees[place]
+        label_id = self._label_index.get(label)
+        if label_id is None:
+            return 0
+        hub = self._hubs.get(place)
+        if hub is not None:
+            return hub.count(label_id)
+        label_ids = self._label_ids
+        return sum(
+            1
+            for row in self.incident_rows(place)
+            if label_ids[row] == label_id
+        )
+
+    def degrees(self) -> Iterator[Tuple[int, int]]:
+        """Iterate over the places that have edges, and their degree."""
+        return (
+            (place, degree)
+            for place, degree in enumerate(self._degrees)
+            if degree != 0
+        )
+
+    def set_hub_threshold(self, threshold: Optional[int]) -> None:
+        """Set the degree from which a place is a hub, or None for no hubs.
+
+        Raises
+        ------
+        ValueError
+            If ``threshold`` is not None or a positive integer.
+        """
+        check_hub_threshold(threshold)
+        self.hub_threshold = threshold
+        self._build_hubs()
+
+    def hubs(self) -> List[int]:
+        """Return the places of the hubs, in order."""
+        return sorted(self._hubs)
+
+    def _grow_degrees(self, place: int) -> None:
+        """Make room for the degree of a place."""
+        missing = place + 1 - len(self._degrees)
+        if missing > 0:
+            self._degrees.extend(array(PLACE_TYPECODE, bytes(8 * missing)))
+
+    def _count_row(
+        self, row: int, start: int, end: int, label_id: int, added: bool
+    ) -> None:
+        """Count an added or removed row in the degrees and the hubs.
+
+        A place becomes a hub when its degree reaches the threshold.
+        """
+        self._grow_degrees(max(start, end))
+        degrees, threshold = self._degrees, self.hub_threshold
+        for place, other in ((start, end), (end, start))[: 1 + (start != end)]:
+            degrees[place] += 1 if added else -1
+            hub = self._hubs.get(place)
+            if hub is None:
+                if added and threshold is not None:
+                    if degrees[place] >= threshold:
+                        self._hubs[place] = self._partition(place)
+            elif added:
+                hub.add(row, label_id, other)
+            else:
+                hub.remove(row, label_id, other)
+
+    def _partition(self, place: int) -> HubPartition:
+        """Return the partition of the rows of a place."""
+        hub = HubPartition(place)
+        starts, ends, label_ids = self._starts, self._ends, self._label_ids
+        for row in self.incident_rows(place):
+            start = starts[row]
+            hub.add(
+                row, label_ids[row], ends[row] if start == place else start
+            )
+        return hub
+
+    def _build_hubs(self) -> None:
+        """Partition the rows of the places whose degree reached the threshold.
+
+        The rows of all the hubs are partitioned in a single pass.
+        """
+        self._hubs = {}
+        threshold = self.hub_threshold
+        if threshold is not None:
+            self._add_hubs(
+                {
+                    place
+                    for place, degree in self.degrees()
+                    if degree >= threshold
+                }
+            )
+
+    def _add_hubs(self, places: Set[int]) -> None:
+        """Partition the rows of some new hubs, in a single pass."""
+        if not places:
+            return
+        hubs = {place: HubPartition(place) for place in places}
+        self._hubs.update(hubs)
+        label_ids = self._label_ids
+        for row, (start, end) in enumerate(zip(self._starts, self._ends)):
+            hub = hubs.get(start)
+            if hub is not None:
+                hub.add(row, label_ids[row], end)
+            if end != start:
+                hub = hubs.get(end)
+                if hub is not None:
+                    hub.add(row, label_ids[row], start)
+
+    # ROW ACCESS METHODS
+
+    def is_alive(self, row: int) -> bool:
+        """Return whether a row holds an edge that is not removed."""
+        return self._starts[row] != 0
+
+    def start(self, row: int) -> int:
+        """Return the place of the start vertex of a row."""
+        return self._starts[row]
+
+    def end(self, row: int) -> int:
+        """Return the place of the end vertex of a row."""
+        return self._ends[row]
+
+    def label(self, row: int) -> Hashable:
+        """Return the label of a row."""
+        return self._labels[self._label_ids[row]]
+
+    def has_direction(self, row: int) -> bool:
+        """Return whether the edge of a row has a direction."""
+        return bool(self._directed[row >> 3] & (1 << (row & 7)))
+
+    def direction(self, row: int, place: int) -> str:
+        """Return the direction of a row seen from the vertex at a place.
+
+        The result is the ``direction`` attribute of the Edge anchored on
+        this vertex : "none", "out" or "in".
+        """
+        if not self.has_direction(row):
+            return "none"
+        return "out" if self._starts[row] == place else "in"
+
+    def other(self, row: int, place: int) -> int:
+        """Return the place of the other end of a row."""
+        start = self._starts[row]
+        return self._ends[row] if start == place else start
+
+    def rows(self) -> Iterator[int]:
+        """Iterate over the rows that are not removed, in order."""
+        starts = self._starts
+        return (row for row in range(len(starts)) if starts[row] != 0)
+
+    def place_pairs(self, label: Hashable = None) -> Iterator[Tuple[int, int]]:
+        """Iterate over the start and end places of the rows, or of a label."""
+        starts, ends = self._starts, self._ends
+        if label is None:
+            return (
+                (start, end) for start, end in zip(starts, ends) if start != 0
+            )
+        return ((starts[row], ends[row]) for row in self.label_rows(label))
+
+    def edge_ends(
+        self, label: Hashable = None
+    ) -> Iterator[Tuple[int, int, bool]]:
+        """Iterate over the places and direction of the rows, or of a label.
+
+        The items are the start place, the end place and whether the edge
+        has a direction.
+        """
+        rows = self.rows() if label is None else self.label_rows(label)
+        starts, ends, has_direction = (
+            self._starts,
+            self._ends,
+            self.has_direction,
+        )
+        return ((starts[row], ends[row], has_direction(row)) for row in rows)
+
+    def property_values(
+        self, key: str, label: Hashable = None
+    ) -> Iterator[Any]:
+        """Iterate over the values of a property, in the order of edge_ends.
+
+        The value of the rows without the property is None.
+        """
+        rows = self.rows() if label is None else self.label_rows(label)
+        properties = self._properties
+        return (properties.get(row, NO_PROPERTIES).get(key) for row in rows)
+
+    def incident_rows(self, place: int) -> Iterator[int]:
+        """Iterate over the rows that have the vertex at a place, in order.
+
+        Each row is yielded once, even if both ends are that vertex.
+        """
+        if place == 0:
+            return iter(())
+        merged = heapq.merge(
+            find_all(self._starts, place), find_all(self._ends, place)
+        )
+        return _unique(merged)
+
+    def rows_starting_in(self, first: int, stop: int) -> List[int]:
+        """Return the rows whose start place is in ``range(first, stop)``."""
+        return [
+            row
+            for row, start in enumerate(self._starts)
+            if first <= start < stop
+        ]
+
+    def rows_touching(self, places: Set[int]) -> List[int]:
+        """Return the rows that have a vertex at one of some places.
+
+        The rows are found in a single pass, in order.
+        """
+        return [
+            row
+            for row, (start, end) in enumerate(zip(self._starts, self._ends))
+            if start in places or end in places
+        ]
+
+    def has_incident(self, place: int) -> bool:
+        """Return whether a vertex is an end of an edge."""
+        return self.degree(place) != 0
+
+    def search_rows(
+        self, place: int, other: int = None, label: Hashable = None
+    ) -> Iterator[int]:
+        """Iterate over the rows of a place, in order.
+
+        If a hub is one of the ends, only the rows with the other end and
+        the label are returned. Otherwise, all the rows of the place are
+        returned, and they must be filtered.
+        """
+        hub = self._hubs.get(place)
+        if hub is None and other is not None:
+            hub, other = self._hubs.get(other), place
+        if hub is None:
+            return self.incident_rows(place)
+        label_id = None
+        if label is not None:
+            label_id = self._label_index.get(label)
+            if label_id is None:
+                return iter(())
+        starts = self._starts
+        return (row for row in hub.rows(label_id, other) if starts[row] != 0)
+
+    def find(
+        self, start: int, end: int, label: Hashable, has_direction: bool
+    ) -> Optional[int]:
+        """Return the first row of an edge with these values, or None."""
+        label_id = self.label_id(label)
+        if label_id is None:
+            return None
+        ends, label_ids = self._ends, self._label_ids
+        rows = find_all(self._starts, start)
+        if start in self._hubs or end in self._hubs:
+            rows = self.search_rows(start, end, label)
+        for row in rows:
+            if (
+                self._starts[row] == start
+                and ends[row] == end
+                and label_ids[row] == label_id
+                and self.has_direction(row) == has_direction
+            ):
+                return row
+        return None
+
+    # MODIFICATION METHODS
+
+    def add(self, edge: Edge) -> int:
+        """Store an Edge in a new row and return the row.
+
+        The object is kept too if it is an instance of an Edge subclass.
+        """
+        row = self._append(
+            edge.start.place,
+            edge.end.place,
+            edge.label,
+            edge.has_direction,
+            edge._properties,
+        )
+        if type(edge) is not Edge:
+            self._objects[row] = edge
+        return row
+
+    def extend_packs(self, packs: Iterable[Sequence]) -> None:
+        """Store edges from their packs, without creating Edge objects.
+
+        The packs are the ``(start, end, label, has_direction)`` packs of
+        plain edges, followed by their properties if they have some. Like
+        the Edge, the ends of the undirected edges are sorted by place.
+        """
+        starts, ends, label_ids = self._starts, self._ends, self._label_ids
+        directed = self._directed
+        label_index = self._label_index
+        label_rows, label_counts = self._label_rows, self._label_counts
+        intern_label = self.intern_label
+        all_properties, index_row = self._properties, self._index_row
+        first_row = row = len(starts)
+        for pack in packs:
+            if len(pack) == 4:
+                start, end, label, has_direction = pack
+            else:
+                start, end, label, has_direction, properties = pack
+                if properties:
+                    all_properties[row] = properties
+                    index_row(row, properties)
+            if not has_direction and end < start:
+                start, end = end, start
+            starts.append(start)
+            ends.append(end)
+            label_id = label_index.get(label)
+            if label_id is None:
+                label_id = intern_label(label)
+            label_ids.append(label_id)
+            label_rows[label_id].append(row)
+            label_counts[label_id] += 1
+            if row & 7 == 0:
+                directed.append(0)
+            if has_direction:
+                directed[row >> 3] |= 1 << (row & 7)
+            row += 1
+        self._count += row - first_row
+        self.version += 1
+
+        # The degrees and the hubs are updated from the new rows only, so
+        # that the store can be extended by batches.
+        if row == first_row:
+            return
+        self._grow_degrees(max(max(starts[first_row:]), max(ends[first_row:])))
+        degrees, hubs = self._degrees, self._hubs
+        for new_row in range(first_row, row):
+            start, end = starts[new_row], ends[new_row]
+            degrees[start] += 1
+            if end != start:
+                degrees[end] += 1
+            if hubs:
+                hub = hubs.get(start)
+                if hub is not None:
+                    hub.add(new_row, label_ids[new_row], end)
+                hub = hubs.get(end)
+                if hub is not None and end != start:
+                    hub.add(new_row, label_ids[new_row], start)
+        threshold = self.hub_threshold
+        if threshold is not None:
+            self._add_hubs(
+                {
+                    place
+                    for place in (*starts[first_row:], *ends[first_row:])
+                    if place not in hubs and degrees[place] >= threshold
+                }
+            )
+
+    def _append(
+        self,
+        start: int,
+        end: int,
+        label: Hashable,
+        has_direction: bool,
+        properties: Optional[Dict[str, Any]] = None,
+    ) -> int:
+        """Append a row and return it."""
+        row = len(self._starts)
+        label_id = self.intern_label(label)
+        self._starts.append(start)
+        self._ends.append(end)
+        self._label_ids.append(label_id)
+        self._label_rows[label_id].append(row)
+        self._label_counts[label_id] += 1
+        if row & 7 == 0:
+            self._directed.append(0)
+        if has_direction:
+            self._directed[row >> 3] |= 1 << (row & 7)
+        if properties:
+            self._properties[row] = properties
+            self._index_row(row, properties)
+        self._count += 1
+        self.version += 1
+        self._count_row(row, start, end, label_id, added=True)
+        return row
+
+    def remove_row(self, row: int) -> Tuple[int, int, Optional[Edge]]:
+        """Mark a row as removed.
+
+        Returns
+        -------
+        Tuple[int, int, Optional[Edge]]
+            What is needed to restore the row with ``restore_row`` : the
+            start and end places and the kept Edge object.
+        """
+        token = (
+            self._starts[row],
+            self._ends[row],
+            self._objects.pop(row, None),
+        )
+        self._starts[row] = 0
+        self._ends[row] = 0
+        self._count -= 1
+        self.version += 1
+        self._label_counts[self._label_ids[row]] -= 1
+        self._count_row(row, token[0], token[1], self._label_ids[row], False)
+        properties = self._properties.get(row)
+        if properties is not None:
+            self._unindex_row(row, properties)
+        return token
+
+    def restore_row(
+        self, row: int, token: Tuple[int, int, Optional[Edge]]
+    ) -> None:
+        """Restore a removed row, if the store wasn't compacted since."""
+        start, end, edge = token
+        self._starts[row] = start
+        self._ends[row] = end
+        if edge is not None:
+            self._objects[row] = edge
+        self._count += 1
+        self.version += 1
+        self._label_counts[self._label_ids[row]] += 1
+        self._count_row(row, start, end, self._label_ids[row], added=True)
+        properties = self._properties.get(row)
+        if properties is not None:
+            self._index_row(row, properties)
+
+    @property
+    def garbage(self) -> int:
+        """Return the number of removed rows that are still allocated."""
+        return len(self._starts) - self._count
+
+    def compact(self) -> None:
+        """Drop the removed rows.
+
+        The rows are renumbered, so the rows returned before are invalid.
+        """
+        if self.garbage == 0:
+            return
+        alive = list(self.rows())
+        objects, all_properties = self._objects, self._properties
+        directions = [self.has_direction(row) for row in alive]
+
+        self._starts = array(PLACE_TYPECODE, (self._starts[r] for r in alive))
+        self._ends = array(PLACE_TYPECODE, (self._ends[r] for r in alive))
+        self._label_ids = array(
+            LABEL_TYPECODE, (self._label_ids[r] for r in alive)
+        )
+        self._directed = bytearray((len(alive) + 7) >> 3)
+        for new_row, has_direction in enumerate(directions):
+            if has_direction:
+                self._directed[new_row >> 3] |= 1 << (new_row & 7)
+        self._objects = {
+            new_row: objects[row]
+            for new_row, row in enumerate(alive)
+            if row in objects
+        }
+        self._properties = {
+            new_row: all_properties[row]
+            for new_row, row in enumerate(alive)
+            if row in all_properties
+        }
+        for key, index in list(self._indexes.items()):
+            self.create_index(key, index.kind)
+        self._label_rows = [array(PLACE_TYPECODE) for __ in self._labels]
+        for new_row, label_id in enumerate(self._label_ids):
+            self._label_rows[label_id].append(new_row)
+        self._build_hubs()
+
+    # EDGE CREATION METHODS
+
+    def pack(self, row: int) -> Tuple:
+        """Return the pack of the edge of a row."""
+        edge = self._objects.get(row)
+        if edge is not None:
+            return edge.pack()
+        pack: Tuple = (
+            self._starts[row],
+            self._ends[row],
+            self.label(row),
+            self.has_direction(row),
+        )
+        properties = self._properties.get(row)
+        if properties is not None:
+            pack += (properties,)
+        return pack
+
+    def packs(self) -> Iterator[Tuple]:
+        """Iterate over the packs of the edges, in order."""
+        return (self.pack(row) for row in self.rows())
+
+    def materialize(self, row: int, vertices: Dict[int, Any]) -> Edge:
+        """Return an inserted Edge for a row.
+
+        Parameters
+        ----------
+        row : int
+            The row of the edge.
+        vertices : Dict[int, Vertex]
+            The vertices of the database, by place.
+
+        Returns
+        -------
+        Edge
+            The kept object for the Edge subclasses, else a new Edge.
+        """
+        edge = self._objects.get(row)
+        if edge is None:
+            edge = Edge._from_row(
+                vertices[self._starts[row]],
+                vertices[self._ends[row]],
+                self.label(row),
+                self.has_direction(row),
+                self._properties.get(row),
+            )
+        edge.is_inserted = True
+        return edge
+
+
+def _unique(rows: Iterator[int]) -> Iterator[int]:
+    """Skip the consecutive duplicates of sorted rows."""
+    previous = -1
+    for row in rows:
+        if row != previous:
+            yield row
+            previous = row
@@ -13,3 +13,19 @@ class VertexInsertionException(Exception):
 
 class VertexNotReadyException(Exception):
     """Raised when the Vertex is_ready_for_insertion method returns False."""
+
+
+class ReadOnlyDatabaseException(Exception):
+    """Raised when a read-only DocNetDB is modified or saved.
+
+    A DocNetDB is read-only when only a part of its file was loaded, so that
+    a save can't lose the rest of the data.
+    """
+
+
+class ChangesLostException(Exception):
+    """Raised when the changes to read were dropped from a change feed.
+
+    The change feed only keeps its last changes, so a consumer that is too
+    far behind must read the database again.
+    """
@@ -0,0 +1,268 @@
+"""This module defines the FrozenDocNetDB class.
+
+A FrozenDocNetDB is a read-only copy of a DocNetDB, made to be shared by
+forked processes (like the workers of a prefork server). The vertices are
+encoded in a single bytes buffer, and the edges are stored in the typed
+arrays of an EdgeStore, so the data is held by a few big objects instead
+of an object per vertex and edge.
+
+The Vertex objects are decoded from the buffer when they are read. Reading
+a database then only writes to the memory of the decoded objects, and the
+pages of the shared data stay shared with the parent process instead of
+being copied in each process by the reference counting and the garbage
+collector.
+"""
+
+import bisect
+import gc
+import json
+import weakref
+from array import array
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from docnetdb.docnetdb import DocNetDB, encode_vertex
+from docnetdb.edge import Edge
+from docnetdb.edgestore import PLACE_TYPECODE
+from docnetdb.exceptions import ReadOnlyDatabaseException
+from docnetdb.vertex import Vertex
+
+# The typecode of the array of the offsets in the vertex buffer.
+OFFSET_TYPECODE = "Q"
+
+
+class FrozenVertexTable:
+    """The vertices of a FrozenDocNetDB, encoded in a bytes buffer.
+
+    It has the dict methods that the DocNetDB uses to read its vertices.
+    The Vertex objects are decoded when they are read, and kept while they
+    are referenced, so the same place always gives the same object.
+    """
+
+    def __init__(
+        self, vertices: Iterable[Tuple[int, Vertex]], db: DocNetDB
+    ) -> None:
+        """Init a FrozenVertexTable with the packs of some vertices.
+
+        Parameters
+        ----------
+        vertices : Iterable[Tuple[int, Vertex]]
+            The places and vertices to encode.
+        db : DocNetDB
+            The frozen database the decoded vertices belong to.
+        """
+        encode = json.JSONEncoder().encode
+        packs = sorted(
+            (place, encode_vertex(encode, vertex))
+            for place, vertex in vertices
+        )
+        places = [place for place, __ in packs]
+        chunks = [chunk for __, chunk in packs]
+        del packs
+
+        # The pack of the vertex at places[i] is between offsets[i] and
+        # offsets[i + 1].
+        self._places = array(PLACE_TYPECODE, places)
+        self._offsets = array(OFFSET_TYPECODE, [0])
+        position = 0
+        for index, chunk in enumerate(chunks):
+            chunk = chunks[index] = chunk.encode()
+            position += len(chunk)
+            self._offsets.append(position)
+        self._buffer = b"".join(chunks)
+
+        adoptable_class = db._adoptable_vertex_class()
+        self._make_vertex = (
+            db.make_vertex
+            if adoptable_class is None
+            else adoptable_class._adopt
+        )
+        self._db = db
+        self._loaded: "weakref.WeakValueDictionary[int, Vertex]"
+        self._loaded = weakref.WeakValueDictionary()
+
+    def _index(self, place: int) -> Optional[int]:
+        """Return the index of a place in the buffer, or None."""
+        index = bisect.bisect_left(self._places, place)
+        if index < len(self._places) and self._places[index] == place:
+            return index
+        return None
+
+    def _decode(self, index: int) -> Vertex:
+        """Return the Vertex at an index of the buffer."""
+        place = self._places[index]
+        vertex = self._loaded.get(place)
+        if vertex is None:
+            start, stop = self._offsets[index], self._offsets[index + 1]
+            vertex = self._make_vertex(json.loads(self._buffer[start:stop]))
+            vertex.place = place
+            vertex._db = self._db
+            self._loaded[place] = vertex
+        return vertex
+
+    # MAPPING METHODS
+
+    def __getitem__(self, place: int) -> Vertex:
+        """Return the Vertex at a place, or raise a KeyError."""
+        index = self._index(place)
+        if index is None:
+            raise KeyError(place)
+        return self._decode(index)
+
+    def get(self, place: int, default: Any = None) -> Any:
+        """Return the Vertex at a place, or ``default``."""
+        index = self._index(place)
+        return default if index is None else self._decode(index)
+
+    def __contains__(self, place: int) -> bool:
+        """Return whether there is a Vertex at a place."""
+        return self._index(place) is not None
+
+    def __len__(self) -> int:
+        """Return the number of vertices."""
+        return len(self._places)
+
+    def items(self) -> Iterator[Tuple[int, Vertex]]:
+        """Iterate over the places and vertices, in the order of places."""
+        return (
+            (self._places[index], self._decode(index))
+            for index in range(len(self._places))
+        )
+
+    def values(self) -> Iterator[Vertex]:
+        """Iterate over the vertices, in the order of places."""
+        return (self._decode(index) for index in range(len(self._places)))
+
+    def keys(self) -> Iterator[int]:
+        """Iterate over the places, without decoding the vertices."""
+        return iter(self._places)
+
+
+class FrozenDocNetDB(DocNetDB):
+    """A read-only copy of a DocNetDB, which forked processes can share.
+
+    It has the read API of the DocNetDB. The vertices are decoded when they
+    are read, in the order of their places, and changing them raises a
+    ReadOnlyDatabaseException, like the modification methods and ``save``.
+
+    The instances of the Edge subclasses are rebuilt from their pack with
+    ``make_edge`` when they are read.
+    """
+
+    def __init__(self, db: DocNetDB) -> None:
+        """Init a FrozenDocNetDB with a copy of a DocNetDB.
+
+        Parameters
+        ----------
+        db : DocNetDB
+            The database to copy. It can be dropped afterwards, so that its
+            objects are freed before the processes are forked.
+        """
+        self._source: Optional[DocNetDB] = db
+        super().__init__(
+            db.path,
+            db.make_vertex,
+            db.make_edge,
+            compression=db.compression,
+        )
+
+    def _use_defaults(self) -> None:
+        """Reset the database attributes."""
+        super()._use_defaults()
+        # The encoded packs of the Edge subclasses, by row.
+        self._edge_packs: Dict[int, bytes] = {}
+        # The changes of the fields are watched to reject them.
+        self._watching_fields = True
+
+    # LOAD AND SAVE METHODS
+
+    def load(self) -> None:
+        """Copy the source database, or the file if it was already copied.
+
+        This method is called on instantiation.
+        """
+        source = self._source
+        self._source = None
+        if source is None:
+            source = DocNetDB(
+                self.path,
+                self.make_vertex,
+                self.make_edge,
+                compression=self.compression,
+            )
+
+        # The edge indexes are rebuilt on the copy.
+        self._edge_index_kinds = dict(source._edge_index_kinds)
+        self._hub_threshold = source._hub_threshold
+        self._use_defaults()
+        self._next_place = source._next_place
+        self._vertices = FrozenVertexTable(source._vertices.items(), self)
+
+        # The edges are copied in a new store with their properties, and the
+        # Edge subclasses are kept as their pack.
+        encode = json.JSONEncoder().encode
+        packs = []
+        for row, edge in enumerate(source.edges()):
+            packs.append(
+                (
+                    edge.start.place,
+                    edge.end.place,
+                    edge.label,
+                    edge.has_direction,
+                    edge._properties,
+                )
+            )
+            if type(edge) is not Edge:
+                self._edge_packs[row] = encode(edge.pack()).encode()
+        self._edges.extend_packs(packs)
+
+    @property
+    def is_read_only(self) -> bool:
+        """Return True, as a FrozenDocNetDB can't be modified."""
+        return True
+
+    def _check_writable(self) -> None:
+        """Raise a ReadOnlyDatabaseException, as the DocNetDB is frozen."""
+        raise ReadOnlyDatabaseException("This DocNetDB is frozen")
+
+    def _field_changed(
+        self, vertex: Vertex, key: Any, old: Any, new: Any
+    ) -> None:
+        """Undo the change of a field and raise an exception.
+
+        Raises
+        ------
+        ReadOnlyDatabaseException
+            Always, as the DocNetDB is frozen.
+        """
+        vertex._restore_field(key, old)
+        self._check_writable()
+
+    # EDGES ITERATION METHODS
+
+    def edges(self, label: str = None) -> Iterator[Edge]:
+        """Override the edges method to rebuild the Edge subclasses."""
+        edges = self._edges
+        rows = edges.rows() if label is None else edges.label_rows(label)
+        return (self._materialize(row) for row in rows)
+
+    def _materialize(self, row: int) -> Edge:
+        """Override the _materialize method to rebuild the subclasses."""
+        pack = self._edge_packs.get(row)
+        if pack is None:
+            return self._edges.materialize(row, self._vertices)
+        edge = self.make_edge(json.loads(pack), self)
+        edge.is_inserted = True
+        return edge
+
+
+def freeze_gc() -> None:
+    """Move all the objects of the process to the permanent generation.
+
+    Call it once the FrozenDocNetDB is made and before forking, so that the
+    garbage collections of the forked processes don't write to the pages of
+    the objects of the parent process. The objects allocated afterwards are
+    collected as usual. It does nothing before Python 3.7.
+    """
+    gc.collect()
+    if hasattr(gc, "freeze"):
+        gc.freeze()
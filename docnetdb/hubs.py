@@ -0,0 +1,97 @@
+"""This module defines the HubPartition class.
+
+A hub is a vertex whose degree reached the hub threshold of an EdgeStore.
+The rows of its edges are partitioned by label and by the place of their
+other end, so the edges between a hub and another vertex, or with a label,
+are found with a dict lookup instead of a scan of all its edges.
+"""
+
+import bisect
+import heapq
+from typing import Dict, Iterator, List, Optional
+
+# The default degree from which a vertex is a hub.
+DEFAULT_HUB_THRESHOLD = 1000
+
+
+def check_hub_threshold(threshold: Optional[int]) -> None:
+    """Raise a ValueError if ``threshold`` is not None or a positive int."""
+    if threshold is not None and (
+        isinstance(threshold, bool)
+        or not isinstance(threshold, int)
+        or threshold < 1
+    ):
+        raise ValueError("The hub threshold must be a positive integer")
+
+
+def _insert_row(rows: List[int], row: int) -> None:
+    """Insert a row in a sorted list of rows."""
+    if not rows or rows[-1] < row:
+        rows.append(row)
+    else:
+        bisect.insort(rows, row)
+
+
+def _delete_row(groups: Dict[int, List[int]], key: int, row: int) -> None:
+    """Delete a row from a group of sorted rows, and the group if empty."""
+    rows = groups.get(key)
+    if rows is None:
+        return
+    position = bisect.bisect_left(rows, row)
+    if position < len(rows) and rows[position] == row:
+        del rows[position]
+        if not rows:
+            del groups[key]
+
+
+class HubPartition:
+    """The rows of the edges of a hub, by label id and by other end.
+
+    The rows of each group are sorted, like the other rows of the
+    EdgeStore. The loops of the hub have the hub as other end.
+    """
+
+    def __init__(self, place: int) -> None:
+        """Init an empty HubPartition for the vertex at a place."""
+        self.place = place
+        self._by_label: Dict[int, List[int]] = {}
+        self._by_other: Dict[int, Dict[int, List[int]]] = {}
+
+    def __len__(self) -> int:
+        """Return the number of rows of the hub."""
+        return sum(len(rows) for rows in self._by_label.values())
+
+    def add(self, row: int, label_id: int, other: int) -> None:
+        """Add the row of an edge of the hub."""
+        _insert_row(self._by_label.setdefault(label_id, []), row)
+        labels = self._by_other.setdefault(other, {})
+        _insert_row(labels.setdefault(label_id, []), row)
+
+    def remove(self, row: int, label_id: int, other: int) -> None:
+        """Remove the row of an edge of the hub."""
+        _delete_row(self._by_label, label_id, row)
+        labels = self._by_other.get(other)
+        if labels is not None:
+            _delete_row(labels, label_id, row)
+            if not labels:
+                del self._by_other[other]
+
+    def count(self, label_id: int) -> int:
+        """Return the number of rows of the hub with a label id."""
+        return len(self._by_label.get(label_id, ()))
+
+    def rows(
+        self, label_id: Optional[int] = None, other: Optional[int] = None
+    ) -> Iterator[int]:
+        """Iterate over the rows with a label id and other end, in order.
+
+        The rows are copied, so the partition can change during the
+        iteration.
+        """
+        if other is None:
+            groups = self._by_label
+        else:
+            groups = self._by_other.get(other, {})
+        if label_id is not None:
+            return iter(list(groups.get(label_id, ())))
+        return heapq.merge(*[list(rows) for rows in groups.values()])
@@ -1,11 +1,37 @@
-"""Define a logger for the package."""
+"""Define a logger for the package.
+
+Importing this module doesn't configure anything : the records of the
+``docnetdb`` logger are handled by the application's logging configuration.
+Call ``configure`` to write them to a file and to the console instead.
+"""
 
 import logging
+from typing import List, Optional
+
+logger = logging.getLogger("docnetdb")
+logger.addHandler(logging.NullHandler())
+
 
-logging.getLogger(__name__)
+def configure(
+    filename: Optional[str] = "log.log", level: int = logging.INFO
+) -> None:
+    """Send the records of the package logger to a file and the console.
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s :: %(levelname)s :: %(message)s",
-    handlers=[logging.FileHandler("log.log"), logging.StreamHandler()],
-)
+    Parameters
+    ----------
+    filename : str, optional
+        The file to write the records to, or None to only write them to the
+        console ("log.log" by default).
+    level : int, optional
+        The minimum level of the records (logging.INFO by default).
+    """
+    formatter = logging.Formatter(
+        "%(asctime)s :: %(levelname)s :: %(message)s"
+    )
+    handlers: List[logging.Handler] = [logging.StreamHandler()]
+    if filename is not None:
+        handlers.append(logging.FileHandler(filename))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+    logger.setLevel(level)
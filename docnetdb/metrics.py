@@ -0,0 +1,320 @@
+"""This module defines the optional instrumentation of a DocNetDB.
+
+When it is enabled, the instrumented methods of the database are shadowed
+by timing wrappers on the instance. When it is disabled, the wrappers are
+removed, so the methods are called without any overhead.
+"""
+
+import bisect
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple
+
+# The upper bounds of the latency histogram buckets, in seconds.
+HISTOGRAM_BOUNDS = (1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0, 10.0)
+
+# The methods that are timed with a simple call wrapper.
+_CALL_OPERATIONS = ("insert", "remove", "insert_edge", "remove_edge")
+
+# The methods that return the vertices or the edges lazily.
+_SEARCH_OPERATIONS = ("search", "search_edge")
+
+# The methods that read or write the database file.
+_FILE_OPERATIONS = ("load", "save")
+
+
+class OperationRecord(NamedTuple):
+    """The measures of one call of an instrumented method.
+
+    ``scanned`` and ``returned`` are only set for the searches, and
+    ``nbytes`` for the loads and saves.
+    """
+
+    name: str
+    duration: float
+    details: Dict[str, Any]
+    scanned: Any = None
+    returned: Any = None
+    nbytes: Any = None
+
+
+class MetricsHook:
+    """A receiver of the measures of a DocNetDB.
+
+    Subclass it and override ``on_operation`` to export the measures to
+    another system. The hooks are called synchronously after each
+    operation, so they should be fast.
+    """
+
+    def on_operation(self, record: OperationRecord) -> None:
+        """Receive the measures of one operation.
+
+        Parameters
+        ----------
+        record : OperationRecord
+            The measures of the operation.
+        """
+
+
+class OperationStats:
+    """The aggregated measures of one operation."""
+
+    def __init__(self) -> None:
+        """Init empty stats."""
+        self.count = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        # The last bucket is for the durations above the last bound.
+        self.histogram = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+        self.rows_scanned = 0
+        self.rows_returned = 0
+        self.bytes = 0
+
+    def add(self, record: OperationRecord) -> None:
+        """Add the measures of one call."""
+        self.count += 1
+        self.total_time += record.duration
+        self.max_time = max(self.max_time, record.duration)
+        self.histogram[
+            bisect.bisect_left(HISTOGRAM_BOUNDS, record.duration)
+        ] += 1
+        if record.scanned is not None:
+            self.rows_scanned += record.scanned
+        if record.returned is not None:
+            self.rows_returned += record.returned
+        if record.nbytes is not None:
+            self.bytes += record.nbytes
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the stats as a JSON-serializable dict."""
+        labels = [f"<={bound:g}s" for bound in HISTOGRAM_BOUNDS]
+        labels.append(f">{HISTOGRAM_BOUNDS[-1]:g}s")
+        return {
+            "count": self.count,
+            "total_time": self.total_time,
+            "mean_time": self.total_time / self.count if self.count else 0.0,
+            "max_time": self.max_time,
+            "histogram": dict(zip(labels, self.histogram)),
+            "rows_scanned": self.rows_scanned,
+            "rows_returned": self.rows_returned,
+            "bytes": self.bytes,
+        }
+
+
+class Metrics:
+    """The instrumentation of one DocNetDB."""
+
+    def __init__(self, hooks: Iterable[MetricsHook] = ()) -> None:
+        """Init the instrumentation.
+
+        Parameters
+        ----------
+        hooks : Iterable[MetricsHook], optional
+            The hooks that receive the measures of every operation.
+        """
+        self.hooks: List[MetricsHook] = list(hooks)
+        self.operations: Dict[str, OperationStats] = {}
+
+    def record(self, record: OperationRecord) -> None:
+        """Aggregate the measures of an operation and pass them to hooks."""
+        try:
+            stats = self.operations[record.name]
+        except KeyError:
+            stats = self.operations[record.name] = OperationStats()
+        stats.add(record)
+        for hook in self.hooks:
+            hook.on_operation(record)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return the aggregated measures, by operation name."""
+        return {
+            name: stats.to_dict() for name, stats in self.operations.items()
+        }
+
+    def reset(self) -> None:
+        """Forget the aggregated measures."""
+        self.operations.clear()
+
+    # INSTRUMENTATION METHODS
+
+    def instrument(self, db) -> None:
+        """Shadow the instrumented methods of a database with wrappers.
+
+        The methods are read on the instance, so the overriden methods of
+        a DocNetDB subclass are instrumented too.
+        """
+        for name in _CALL_OPERATIONS:
+            setattr(db, name, self._wrap_call(name, getattr(db, name)))
+        for name in _FILE_OPERATIONS:
+            setattr(db, name, self._wrap_file(db, name, getattr(db, name)))
+        db.search = self._wrap_search(db.search)
+        db.search_edge = self._wrap_search_edge(db, db.search_edge)
+
+    @staticmethod
+    def uninstrument(db) -> None:
+        """Remove the wrappers from a database."""
+        names = _CALL_OPERATIONS + _FILE_OPERATIONS + _SEARCH_OPERATIONS
+        for name in names:
+            db.__dict__.pop(name, None)
+
+    def _wrap_call(self, name: str, method: Callable) -> Callable:
+        """Return a wrapper that times the calls of a method.
+
+        The details of the record are the place of the Vertex, or the ends,
+        label and direction of the Edge.
+        """
+
+        def wrapper(item, *args, **kwargs):
+            details = _describe(item)
+            start = time.perf_counter()
+            try:
+                result = method(item, *args, **kwargs)
+            finally:
+                duration = time.perf_counter() - start
+                # The place of an inserted Vertex is only known afterwards.
+                if details.get("vertex") == 0:
+                    details["vertex"] = getattr(item, "place", None)
+                self.record(OperationRecord(name, duration, details))
+            return result
+
+        return wrapper
+
+    def _wrap_file(self, db, name: str, method: Callable) -> Callable:
+        """Return a wrapper that times a method and measures the file."""
+
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                duration = time.perf_counter() - start
+                nbytes = db._io_size()
+                self.record(
+                    OperationRecord(
+                        name, duration, {"path": str(db.path)}, nbytes=nbytes
+                    )
+                )
+
+        return wrapper
+
+    def _track(
+        self,
+        name: str,
+        iterator: Iterator,
+        details: Dict[str, Any],
+        scanned: Callable[[], int],
+        elapsed: float,
+    ) -> Iterator:
+        """Yield the items of a search while timing it.
+
+        Only the time spent in the search is measured, not the time spent
+        by the caller between two items. The measures are recorded when the
+        iteration ends or when the generator is closed.
+        """
+        returned = 0
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    elapsed += time.perf_counter() - start
+                    return
+                elapsed += time.perf_counter() - start
+                returned += 1
+                yield item
+        finally:
+            self.record(
+                OperationRecord(
+                    name,
+                    elapsed,
+                    details,
+                    scanned=scanned(),
+                    returned=returned,
+                )
+            )
+
+    def _wrap_search(self, method: Callable) -> Callable:
+        """Return a wrapper of the search method.
+
+        The scanned rows are the calls of the gate function.
+        """
+
+        def wrapper(gate_func):
+            calls = 0
+
+            def counting_gate(vertex):
+                nonlocal calls
+                calls += 1
+                return gate_func(vertex)
+
+            start = time.perf_counter()
+            iterator = iter(method(counting_gate))
+            elapsed = time.perf_counter() - start
+            details = {"predicate": _qualname(gate_func)}
+            return self._track(
+                "search", iterator, details, lambda: calls, elapsed
+            )
+
+        return wrapper
+
+    def _wrap_search_edge(self, db, method: Callable) -> Callable:
+        """Return a wrapper of the search_edge method.
+
+        The scanned rows are the rows that the search reads from the
+        ``_edge_candidates`` method of the database.
+        """
+        get_candidates = db._edge_candidates
+
+        def wrapper(v1, v2=None, label=None, direction="all", where=None):
+            scanned = 0
+
+            def counting_candidates(*args, **kwargs):
+                def count(rows):
+                    nonlocal scanned
+                    for row in rows:
+                        scanned += 1
+                        yield row
+
+                return count(get_candidates(*args, **kwargs))
+
+            # The candidates are read when the search is created, so the
+            # shadowing only lasts for the call.
+            start = time.perf_counter()
+            db._edge_candidates = counting_candidates
+            try:
+                iterator = iter(method(v1, v2, label, direction, where))
+            finally:
+                del db._edge_candidates
+            elapsed = time.perf_counter() - start
+            details = {
+                "vertex": getattr(v1, "place", None),
+                "other": getattr(v2, "place", None),
+                "label": label,
+                "direction": direction,
+            }
+            if where is not None:
+                details["where"] = _qualname(where)
+            return self._track(
+                "search_edge", iterator, details, lambda: scanned, elapsed
+            )
+
+        return wrapper
+
+
+def _describe(item: Any) -> Dict[str, Any]:
+    """Return the details of a Vertex or an Edge given to an operation."""
+    if hasattr(item, "has_direction"):
+        return {
+            "start": getattr(item.start, "place", None),
+            "end": getattr(item.end, "place", None),
+            "label": item.label,
+            "direction": "out" if item.has_direction else "none",
+        }
+    return {"vertex": getattr(item, "place", None)}
+
+
+def _qualname(func: Callable) -> str:
+    """Return a readable name for a callable."""
+    name = getattr(func, "__qualname__", None) or repr(func)
+    module = getattr(func, "__module__", None)
+    return f"{module}.{name}" if module else name
@@ -0,0 +1,354 @@
+"""This module defines the NeighbourIndex class and the similarity measures.
+
+A NeighbourIndex is a compressed sparse row (CSR) adjacency of a graph : the
+sorted places of the neighbours of all the vertices are in a single array,
+and the neighbours of a vertex are between two offsets of another array.
+The common neighbours of two vertices are found by searching the items of
+the smaller list in the larger one, without building sets.
+
+The similarity of two vertices is computed from their common neighbours :
+
+- "common" is their number.
+- "jaccard" is their number divided by the number of neighbours of either
+  vertex.
+- "adamic_adar" is the sum of 1 / log(d) over them, where d is the number
+  of vertices a common neighbour is a neighbour of. The rare neighbours
+  weigh more than the hubs.
+"""
+
+import bisect
+import collections
+import heapq
+import math
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from docnetdb.edgestore import PLACE_TYPECODE
+
+# The measures of the similarity of two vertices.
+SIMILARITY_MEASURES = ("common", "jaccard", "adamic_adar")
+
+# The directions of the edges to a neighbour, seen from the vertex, and the
+# direction of the same edges seen from the neighbour.
+OPPOSITE_DIRECTIONS = {"out": "in", "in": "out", "none": "none", "all": "all"}
+
+# The highest weight of a common neighbour in the Adamic-Adar measure, as
+# a common neighbour is a neighbour of at least two vertices.
+_MAX_ADAMIC_ADAR_WEIGHT = 1 / math.log(2)
+
+
+def adamic_adar_weight(degree: int) -> float:
+    """Return the Adamic-Adar weight of a neighbour of ``degree`` vertices.
+
+    The weight of a neighbour of a single vertex, which is only shared by a
+    vertex with itself, is undefined, so it is 0.
+    """
+    if degree < 2:
+        return 0.0
+    return 1 / math.log(degree)
+
+
+def check_measure(measure: str) -> None:
+    """Raise a ValueError if ``measure`` is not a similarity measure."""
+    if measure not in SIMILARITY_MEASURES:
+        raise ValueError("measure is 'common', 'jaccard' or 'adamic_adar'")
+
+
+def check_direction(direction: str) -> None:
+    """Raise a ValueError if ``direction`` is not a direction of the edges."""
+    if direction not in OPPOSITE_DIRECTIONS:
+        raise ValueError("direction is 'out', 'in', 'none' or 'all'")
+
+
+def neighbour_pairs(
+    ends: Iterable[Tuple], direction: str
+) -> Iterator[Tuple[Any, ...]]:
+    """Yield the places and neighbours that some edges make.
+
+    Parameters
+    ----------
+    ends : Iterable[Tuple]
+        The start place, end place and direction flag of the edges, which
+        can be followed by other values.
+    direction : str {'out', 'in', 'none', 'all'}
+        The direction of the edges to the neighbours, seen from the places.
+
+    Yields
+    ------
+    Tuple
+        The place, the neighbour and the other values of an edge, for each
+        end of the edge whose direction matches. Like in ``search_edge``, a
+        loop is yielded once, and a directed loop only goes "out".
+    """
+    check_direction(direction)
+    directed_out = direction in ("out", "all")
+    directed_in = direction in ("in", "all")
+    undirected = direction in ("none", "all")
+    for start, end, has_direction, *values in ends:
+        if has_direction:
+            if directed_out:
+                yield (start, end, *values)
+            if directed_in and start != end:
+                yield (end, start, *values)
+        elif undirected:
+            yield (start, end, *values)
+            if start != end:
+                yield (end, start, *values)
+
+
+class NeighbourIndex:
+    """The neighbours of each vertex, in sorted arrays.
+
+    The neighbours of a vertex are the other ends of its edges whose
+    direction, seen from the vertex, is ``direction`` (any direction if
+    "all"). Each neighbour is listed once.
+
+    A transposed index lists the vertices each vertex is a neighbour of
+    instead.
+    """
+
+    def __init__(
+        self,
+        ends: Iterable[Tuple[int, int, bool]],
+        direction: str,
+        size: int,
+        version: int = 0,
+        transposed: bool = False,
+    ) -> None:
+        """Init a NeighbourIndex from the ends of some edges.
+
+        Parameters
+        ----------
+        ends : Iterable[Tuple[int, int, bool]]
+            The start place, end place and direction flag of the edges.
+        direction : str {'out', 'in', 'none', 'all'}
+            The direction of the edges to the neighbours.
+        size : int
+            A number greater than all the places.
+        version : int, optional
+            The version of the edges the index is built from (0 by default).
+        transposed : bool, optional
+            Whether the index lists the vertices each vertex is a neighbour
+            of (False by default).
+        """
+        self.direction = direction
+        self.version = version
+        self.size = size
+        self.transposed = transposed
+
+        # Each (place, neighbour) pair is encoded in an integer, so that the
+        # pairs are sorted and deduplicated as integers.
+        pairs = neighbour_pairs(ends, direction)
+        if transposed:
+            keys = {neighbour * size + place for place, neighbour in pairs}
+        else:
+            keys = {place * size + neighbour for place, neighbour in pairs}
+        sorted_keys = sorted(keys)
+
+        # The neighbours of the vertex at a place are between
+        # offsets[place] and offsets[place + 1].
+        self._neighbours = array(
+            PLACE_TYPECODE, (key % size for key in sorted_keys)
+        )
+        self._offsets = array(
+            PLACE_TYPECODE,
+            (
+                bisect.bisect_left(sorted_keys, place * size)
+                for place in range(size + 1)
+            ),
+        )
+
+    def bounds(self, place: int) -> Tuple[int, int]:
+        """Return the offsets of the neighbours of a place."""
+        if 0 < place < self.size:
+            return self._offsets[place], self._offsets[place + 1]
+        return 0, 0
+
+    def degree(self, place: int) -> int:
+        """Return the number of neighbours of a place."""
+        first, stop = self.bounds(place)
+        return stop - first
+
+    def neighbours(self, place: int) -> array:
+        """Return the sorted places of the neighbours of a place."""
+        first, stop = self.bounds(place)
+        return self._neighbours[first:stop]
+
+    def common(self, first_place: int, second_place: int) -> List[int]:
+        """Return the sorted common neighbours of two places.
+
+        Each neighbour of the smaller list is searched in the larger one,
+        from the position of the previous one.
+        """
+        first, stop = self.bounds(first_place)
+        other_first, other_stop = self.bounds(second_place)
+        if stop - first > other_stop - other_first:
+            first, stop, other_first, other_stop = (
+                other_first,
+                other_stop,
+                first,
+                stop,
+            )
+        neighbours = self._neighbours
+        common = []
+        position = other_first
+        for index in range(first, stop):
+            neighbour = neighbours[index]
+            position = bisect.bisect_left(
+                neighbours, neighbour, position, other_stop
+            )
+            if position == other_stop:
+                break
+            if neighbours[position] == neighbour:
+                common.append(neighbour)
+        return common
+
+
+class SimilarityQuery:
+    """The similarity measures of the vertices of a NeighbourIndex.
+
+    The reverse index lists the vertices each vertex is a neighbour of, so
+    it gives the candidates that share a neighbour with a vertex, and the
+    weights of the Adamic-Adar measure.
+    """
+
+    def __init__(
+        self, forward: NeighbourIndex, reverse: NeighbourIndex, measure: str
+    ) -> None:
+        """Init a SimilarityQuery.
+
+        Parameters
+        ----------
+        forward : NeighbourIndex
+            The neighbours of the vertices.
+        reverse : NeighbourIndex
+            The transposed index, built from the same edges.
+        measure : str {'common', 'jaccard', 'adamic_adar'}
+            The similarity measure.
+        """
+        check_measure(measure)
+        self.forward = forward
+        self.reverse = reverse
+        self.measure = measure
+
+    def _weight(self, neighbour: int) -> float:
+        """Return the weight of a common neighbour."""
+        if self.measure != "adamic_adar":
+            return 1.0
+        return adamic_adar_weight(self.reverse.degree(neighbour))
+
+    def _from_common(self, first: int, second: int, common: float) -> float:
+        """Return the score of two places from their weighted common count."""
+        if self.measure != "jaccard" or common == 0:
+            return common
+        forward = self.forward
+        return common / (
+            forward.degree(first) + forward.degree(second) - common
+        )
+
+    def _bound(self, first: int, second: int) -> float:
+        """Return the highest score that two places can have."""
+        forward = self.forward
+        first_degree, second_degree = (
+            forward.degree(first),
+            forward.degree(second),
+        )
+        smallest = min(first_degree, second_degree)
+        if self.measure == "common" or smallest == 0:
+            return smallest
+        if self.measure == "jaccard":
+            return smallest / max(first_degree, second_degree)
+        return smallest * _MAX_ADAMIC_ADAR_WEIGHT
+
+    def score(self, first: int, second: int) -> float:
+        """Return the similarity of two places."""
+        common = self.forward.common(first, second)
+        if self.measure == "adamic_adar":
+            weighted = sum(self._weight(neighbour) for neighbour in common)
+        else:
+            weighted = len(common)
+        return self._from_common(first, second, weighted)
+
+    def top(
+        self, place: int, k: int, candidates: Optional[Iterable[int]] = None
+    ) -> List[Tuple[int, float]]:
+        """Return the places most similar to a place, and their score.
+
+        Parameters
+        ----------
+        place : int
+            The place to compare the others with.
+        k : int
+            The highest number of returned places.
+        candidates : Iterable[int], optional
+            The places to compare with ``place``. If None, they are the
+            places that share a neighbour with it (None by default).
+
+        Returns
+        -------
+        List[Tuple[int, float]]
+            The places whose score is not 0, by decreasing score then
+            increasing place. ``place`` itself is left out.
+        """
+        if k <= 0:
+            return []
+        if candidates is None:
+            scores = self._scores_of_neighbourhood(place)
+            return heapq.nlargest(
+                k, scores.items(), key=lambda item: (item[1], -item[0])
+            )
+
+        # The candidates are compared from the highest bound of their
+        # score, and the search stops when no bound can beat the k-th best
+        # score.
+        bounded = sorted(
+            (
+                (self._bound(place, candidate), -candidate)
+                for candidate in set(candidates)
+                if candidate != place
+            ),
+            reverse=True,
+        )
+        best: List[Tuple[float, int]] = []
+        for bound, negative_candidate in bounded:
+            if bound == 0 or (len(best) == k and bound < best[0][0]):
+                break
+            score = self.score(place, -negative_candidate)
+            if score == 0:
+                continue
+            if len(best) < k:
+                heapq.heappush(best, (score, negative_candidate))
+            elif (score, negative_candidate) > best[0]:
+                heapq.heapreplace(best, (score, negative_candidate))
+        return [
+            (-negative_candidate, score)
+            for score, negative_candidate in sorted(best, reverse=True)
+        ]
+
+    def _scores_of_neighbourhood(self, place: int) -> Dict[int, float]:
+        """Return the scores of the places that share a neighbour with one.
+
+        The common neighbours of all the candidates are counted in a single
+        pass over the neighbours of the neighbours.
+        """
+        reverse = self.reverse
+        counts: Dict[int, float]
+        if self.measure == "adamic_adar":
+            counts = collections.defaultdict(float)
+            for neighbour in self.forward.neighbours(place):
+                others = reverse.neighbours(neighbour)
+                weight = adamic_adar_weight(len(others))
+                if weight == 0:
+                    continue
+                for other in others:
+                    counts[other] += weight
+        else:
+            counter: collections.Counter = collections.Counter()
+            for neighbour in self.forward.neighbours(place):
+                counter.update(reverse.neighbours(neighbour))
+            counts = counter
+        counts.pop(place, None)
+        return {
+            other: self._from_common(place, other, common)
+            for other, common in counts.items()
+        }
@@ -0,0 +1,235 @@
+"""This module defines the ReachabilityIndex class.
+
+A ReachabilityIndex answers whether a vertex can be reached from another by
+following the edges of a NeighbourIndex, without walking the edges :
+
+- The strongly connected components are found with Tarjan's algorithm.
+  They are numbered in the order they are completed, which is a post-order
+  of the DFS of the graph of the components, so the components reachable
+  from a component have lower numbers.
+- Each component gets the sorted list of the intervals of the numbers of
+  the components it reaches. The DFS subtree of a component is a single
+  interval, so the components of a tree, or of a DAG with few shortcuts,
+  have only a few intervals.
+
+The reachability of a vertex is then found by a binary search in the
+intervals of its component, and the vertices reached from a vertex are
+listed from the intervals.
+"""
+
+import bisect
+from array import array
+from typing import Iterator, List, Tuple
+
+from docnetdb.edgestore import PLACE_TYPECODE
+from docnetdb.neighbours import NeighbourIndex
+
+
+class ReachabilityIndex:
+    """The vertices reachable from each vertex, as intervals of components.
+
+    A vertex reaches another one if there is a path of one or more edges of
+    the NeighbourIndex from the first one to the second one. A vertex only
+    reaches itself if it is on a cycle.
+    """
+
+    def __init__(self, neighbours: NeighbourIndex) -> None:
+        """Init a ReachabilityIndex from a NeighbourIndex.
+
+        Parameters
+        ----------
+        neighbours : NeighbourIndex
+            The neighbours of the vertices, which the paths go to.
+        """
+        self.direction = neighbours.direction
+        self.version = neighbours.version
+        self.size = size = neighbours.size
+        self._find_components(neighbours)
+
+        # The members of each component, between member_offsets[component]
+        # and member_offsets[component + 1].
+        components = self._components
+        counts = [0] * (self._count + 1)
+        for component in components[1:]:
+            counts[component + 1] += 1
+        for component in range(self._count):
+            counts[component + 1] += counts[component]
+        self._member_offsets = array(PLACE_TYPECODE, counts)
+        members = array(PLACE_TYPECODE, bytes(8 * (size - 1)))
+        positions = counts[:-1]
+        for place in range(1, size):
+            component = components[place]
+            members[positions[component]] = place
+            positions[component] += 1
+        self._members = members
+
+        self._find_intervals(neighbours)
+
+    def _find_components(self, neighbours: NeighbourIndex) -> None:
+        """Number the strongly connected components, with Tarjan's algorithm.
+
+        The DFS is iterative, so that long paths don't reach the recursion
+        limit.
+        """
+        size = neighbours.size
+        offsets, targets = neighbours._offsets, neighbours._neighbours
+        visits = [0] * size
+        lowlinks = [0] * size
+        on_stack = bytearray(size)
+        stack: List[int] = []
+        components = array(PLACE_TYPECODE, [-1]) * size
+        # Whether each component is on a cycle.
+        cyclic = bytearray()
+        count = 0
+        visit = 0
+
+        for root in range(1, size):
+            if visits[root]:
+                continue
+            visit += 1
+            visits[root] = lowlinks[root] = visit
+            stack.append(root)
+            on_stack[root] = 1
+            work = [(root, offsets[root])]
+            while work:
+                node, position = work[-1]
+                if position < offsets[node + 1]:
+                    work[-1] = (node, position + 1)
+                    target = targets[position]
+                    if not visits[target]:
+                        visit += 1
+                        visits[target] = lowlinks[target] = visit
+                        stack.append(target)
+                        on_stack[target] = 1
+                        work.append((target, offsets[target]))
+                    elif on_stack[target] and visits[target] < lowlinks[node]:
+                        lowlinks[node] = visits[target]
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if lowlinks[node] < lowlinks[parent]:
+                        lowlinks[parent] = lowlinks[node]
+                if lowlinks[node] != visits[node]:
+                    continue
+                # The node is the root of a component, whose members are
+                # on the stack above it.
+                member = stack.pop()
+                on_stack[member] = 0
+                components[member] = count
+                is_cyclic = member != node
+                while member != node:
+                    member = stack.pop()
+                    on_stack[member] = 0
+                    components[member] = count
+                if not is_cyclic:
+                    first, stop = offsets[node], offsets[node + 1]
+                    position = bisect.bisect_left(targets, node, first, stop)
+                    is_cyclic = position < stop and targets[position] == node
+                cyclic.append(is_cyclic)
+                count += 1
+
+        self._components = components
+        self._cyclic = cyclic
+        self._count = count
+
+    def _find_intervals(self, neighbours: NeighbourIndex) -> None:
+        """Merge the intervals of the components each component reaches.
+
+        The components are visited in the order of their numbers, so the
+        intervals of the components they reach are already known.
+        """
+        offsets, targets = neighbours._offsets, neighbours._neighbours
+        components, members = self._components, self._members
+        member_offsets = self._member_offsets
+        interval_offsets = array(PLACE_TYPECODE, [0])
+        lows = array(PLACE_TYPECODE)
+        highs = array(PLACE_TYPECODE)
+
+        for component in range(self._count):
+            intervals: List[Tuple[int, int]] = [(component, component)]
+            reached = {component}
+            for index in range(
+                member_offsets[component], member_offsets[component + 1]
+            ):
+                member = members[index]
+                for position in range(offsets[member], offsets[member + 1]):
+                    other = components[targets[position]]
+                    if other in reached:
+                        continue
+                    reached.add(other)
+                    first = interval_offsets[other]
+                    stop = interval_offsets[other + 1]
+                    intervals.extend(zip(lows[first:stop], highs[first:stop]))
+            intervals.sort()
+
+            # The overlapping and adjacent intervals are merged.
+            low, high = intervals[0]
+            for next_low, next_high in intervals[1:]:
+                if next_low <= high + 1:
+                    if next_high > high:
+                        high = next_high
+                    continue
+                lows.append(low)
+                highs.append(high)
+                low, high = next_low, next_high
+            lows.append(low)
+            highs.append(high)
+            interval_offsets.append(len(lows))
+
+        self._interval_offsets = interval_offsets
+        self._lows = lows
+        self._highs = highs
+
+    def _reaches(self, component: int, other: int) -> bool:
+        """Return whether a component is in the intervals of another one."""
+        first = self._interval_offsets[component]
+        stop = self._interval_offsets[component + 1]
+        position = bisect.bisect_left(self._highs, other, first, stop)
+        return position < stop and self._lows[position] <= other
+
+    def is_reachable(self, start: int, end: int) -> bool:
+        """Return whether a place reaches another one by a path of edges."""
+        size = self.size
+        if not (0 < start < size and 0 < end < size):
+            return False
+        component = self._components[start]
+        if start == end:
+            return bool(self._cyclic[component])
+        return self._reaches(component, self._components[end])
+
+    def reachable(self, start: int) -> Iterator[int]:
+        """Iterate over the places reached from a place.
+
+        The places are grouped by component, from the last components in
+        the order of the paths.
+        """
+        if not 0 < start < self.size:
+            return
+        component = self._components[start]
+        cyclic = self._cyclic[component]
+        members, member_offsets = self._members, self._member_offsets
+        first = self._interval_offsets[component]
+        stop = self._interval_offsets[component + 1]
+        for index in range(first, stop):
+            for other in range(self._lows[index], self._highs[index] + 1):
+                for position in range(
+                    member_offsets[other], member_offsets[other + 1]
+                ):
+                    place = members[position]
+                    if place != start or cyclic:
+                        yield place
+
+    def covers(self, start: int, end: int, has_direction: bool) -> bool:
+        """Return whether the index stays true with one more edge.
+
+        It is the case when the new edge doesn't lead to a new place.
+        """
+        forward = has_direction and self.direction in ("out", "all")
+        backward = has_direction and self.direction in ("in", "all")
+        if not has_direction and self.direction in ("none", "all"):
+            forward = backward = True
+        return (not forward or self.is_reachable(start, end)) and (
+            not backward or self.is_reachable(end, start)
+        )
@@ -0,0 +1,432 @@
+"""This module defines the GraphSampler class.
+
+A GraphSampler samples random walks and neighbourhoods from a snapshot of
+the edges of a DocNetDB, for the training of graph embeddings :
+
+- The neighbours of all the vertices are in a compressed sparse row (CSR)
+  adjacency, sorted by place, so a step of a walk reads two offsets and a
+  neighbour instead of searching the edges.
+- The weighted samplers have an alias table for the neighbours of each
+  vertex (Vose's method), so a weighted step takes constant time too.
+- The node2vec walks are biased by the ``p`` and ``q`` parameters. The
+  next vertex is drawn like in a first-order walk, and accepted with a
+  probability proportional to its bias (rejection sampling), so no table
+  is needed for each pair of vertices.
+
+The walks are generated by batches of starts. Each batch has its own random
+generator, seeded from the seed and the number of the batch, so the walks
+are the same whatever the number of processes that generate them.
+"""
+
+import bisect
+import os
+import random
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from docnetdb.edgestore import PLACE_TYPECODE
+from docnetdb.neighbours import neighbour_pairs
+
+# The typecode of the arrays of weights and probabilities.
+WEIGHT_TYPECODE = "d"
+
+# The sampler of the worker processes.
+_worker_sampler: Optional["GraphSampler"] = None
+
+
+def check_weight(weight: Any) -> float:
+    """Return a weight as a float, or raise a ValueError."""
+    if (
+        isinstance(weight, bool)
+        or not isinstance(weight, (int, float))
+        or not weight >= 0
+    ):
+        raise ValueError(f"The weights must be non-negative: {weight}")
+    return float(weight)
+
+
+def alias_table(weights: Sequence[float]) -> Tuple[List[float], List[int]]:
+    """Return the alias table of some positive weights, with Vose's method.
+
+    Returns
+    -------
+    Tuple[List[float], List[int]]
+        The probability of keeping each index, and the index to take
+        instead of it otherwise.
+    """
+    count = len(weights)
+    total = sum(weights)
+    scaled = [weight * count / total for weight in weights]
+    probabilities = [1.0] * count
+    aliases = list(range(count))
+    small = [index for index, value in enumerate(scaled) if value < 1]
+    large = [index for index, value in enumerate(scaled) if value >= 1]
+    while small and large:
+        less, more = small.pop(), large.pop()
+        probabilities[less] = scaled[less]
+        aliases[less] = more
+        scaled[more] -= 1 - scaled[less]
+        if scaled[more] < 1:
+            small.append(more)
+        else:
+            large.append(more)
+    return probabilities, aliases
+
+
+class GraphSampler:
+    """The random walks and neighbourhoods of a snapshot of some edges.
+
+    The vertices are designated by their place. The sampler doesn't follow
+    the later changes of the database.
+    """
+
+    def __init__(
+        self,
+        ends: Iterable[Tuple],
+        direction: str,
+        size: int,
+        weighted: bool = False,
+    ) -> None:
+        """Init a GraphSampler from the ends of some edges.
+
+        Parameters
+        ----------
+        ends : Iterable[Tuple]
+            The start place, end place and direction flag of the edges,
+            followed by their weight if ``weighted``.
+        direction : str {'out', 'in', 'none', 'all'}
+            The direction of the edges to the neighbours, seen from the
+            vertices, like in ``search_edge``.
+        size : int
+            A number greater than all the places.
+        weighted : bool, optional
+            Whether the neighbours are drawn in proportion to the weights of
+            the edges (False by default). The edges whose weight is 0 are
+            left out.
+
+        Raises
+        ------
+        ValueError
+            If ``direction`` is not a direction, or a weight is not a
+            non-negative number.
+        """
+        self.direction = direction
+        self.size = size
+        self.weighted = weighted
+
+        if weighted:
+            entries = sorted(
+                (place, neighbour, check_weight(weight))
+                for place, neighbour, weight in neighbour_pairs(
+                    ends, direction
+                )
+            )
+            entries = [entry for entry in entries if entry[2] > 0]
+        else:
+            entries = sorted(
+                (place, neighbour, 1.0)
+                for place, neighbour, *__ in neighbour_pairs(ends, direction)
+            )
+
+        # The neighbours of the vertex at a place are between
+        # offsets[place] and offsets[place + 1]. A neighbour is repeated
+        # for each of the edges to it.
+        self._neighbours = array(
+            PLACE_TYPECODE, (entry[1] for entry in entries)
+        )
+        counts = [0] * (size + 1)
+        for place, __, __ in entries:
+            counts[place + 1] += 1
+        for place in range(size):
+            counts[place + 1] += counts[place]
+        self._offsets = array(PLACE_TYPECODE, counts)
+
+        self._weights = array(WEIGHT_TYPECODE)
+        self._probabilities = array(WEIGHT_TYPECODE)
+        self._aliases = array(PLACE_TYPECODE)
+        if weighted:
+            self._weights.extend(entry[2] for entry in entries)
+            for place in range(size):
+                first, stop = counts[place], counts[place + 1]
+                if first == stop:
+                    continue
+                probabilities, aliases = alias_table(self._weights[first:stop])
+                self._probabilities.extend(probabilities)
+                self._aliases.extend(aliases)
+
+    def __len__(self) -> int:
+        """Return the number of (place, neighbour) entries."""
+        return len(self._neighbours)
+
+    def degree(self, place: int) -> int:
+        """Return the number of edges to the neighbours of a place."""
+        if not 0 < place < self.size:
+            return 0
+        return self._offsets[place + 1] - self._offsets[place]
+
+    def neighbours(self, place: int) -> array:
+        """Return the sorted places of the neighbours of a place."""
+        if not 0 < place < self.size:
+            return array(PLACE_TYPECODE)
+        return self._neighbours[
+            self._offsets[place] : self._offsets[place + 1]
+        ]
+
+    def _is_neighbour(self, place: int, other: int) -> bool:
+        """Return whether a place is a neighbour of another one."""
+        first, stop = self._offsets[place], self._offsets[place + 1]
+        position = bisect.bisect_left(self._neighbours, other, first, stop)
+        return position < stop and self._neighbours[position] == other
+
+    def _step(self, generator: random.Random, place: int) -> Optional[int]:
+        """Return a random neighbour of a place, or None if it has none."""
+        if not 0 < place < self.size:
+            return None
+        first = self._offsets[place]
+        count = self._offsets[place + 1] - first
+        if count == 0:
+            return None
+        index = int(generator.random() * count)
+        if (
+            self.weighted
+            and generator.random() >= self._probabilities[first + index]
+        ):
+            index = self._aliases[first + index]
+        return self._neighbours[first + index]
+
+    def walk(
+        self,
+        generator: random.Random,
+        start: int,
+        length: int,
+        p: float = 1.0,
+        q: float = 1.0,
+    ) -> List[int]:
+        """Return a random walk from a place.
+
+        Parameters
+        ----------
+        generator : random.Random
+            The random generator of the walk.
+        start : int
+            The place the walk starts from.
+        length : int
+            The highest number of places of the walk, with ``start``. The
+            walk stops earlier at a vertex without neighbours.
+        p : float, optional
+            The return parameter of node2vec. The lower it is, the more the
+            walk goes back to the previous vertex (1.0 by default).
+        q : float, optional
+            The in-out parameter of node2vec. The lower it is, the more the
+            walk goes away from the previous vertex (1.0 by default).
+
+        Returns
+        -------
+        List[int]
+            The places of the walk.
+        """
+        walk = [start]
+        if length < 2:
+            return walk[:length]
+        step = self._step
+        place = step(generator, start)
+        if place is None:
+            return walk
+        walk.append(place)
+        if p == 1 and q == 1:
+            while len(walk) < length:
+                place = step(generator, place)
+                if place is None:
+                    break
+                walk.append(place)
+            return walk
+
+        # The next vertex is accepted with the probability of its bias,
+        # relative to the highest bias.
+        return_bias, away_bias = 1 / p, 1 / q
+        highest_bias = max(return_bias, 1.0, away_bias)
+        is_neighbour = self._is_neighbour
+        previous = start
+        while len(walk) < length:
+            while True:
+                candidate = step(generator, place)
+                if candidate is None:
+                    return walk
+                if candidate == previous:
+                    bias = return_bias
+                elif is_neighbour(previous, candidate):
+                    bias = 1.0
+                else:
+                    bias = away_bias
+                if generator.random() * highest_bias < bias:
+                    break
+            previous, place = place, candidate
+            walk.append(place)
+        return walk
+
+    def _walk_batch(
+        self,
+        seed: int,
+        batch: int,
+        starts: Sequence[int],
+        length: int,
+        p: float,
+        q: float,
+    ) -> List[List[int]]:
+        """Return the walks of a batch of starts, with the batch generator."""
+        generator = random.Random(f"{seed}:{batch}")
+        return [self.walk(generator, start, length, p, q) for start in starts]
+
+    def walks(
+        self,
+        starts: Iterable[int],
+        length: int,
+        p: float = 1.0,
+        q: float = 1.0,
+        seed: Optional[int] = None,
+        batch_size: int = 1000,
+        processes: Optional[int] = 1,
+    ) -> List[List[int]]:
+        """Return a random walk from each start.
+
+        Parameters
+        ----------
+        starts : Iterable[int]
+            The places the walks start from. A place can be repeated to have
+            several walks from it.
+        length : int
+            The highest number of places of each walk.
+        p : float, optional
+            The return parameter of node2vec, like in ``walk`` (1.0 by
+            default).
+        q : float, optional
+            The in-out parameter of node2vec, like in ``walk`` (1.0 by
+            default).
+        seed : int, optional
+            The seed of the random generators. With the same seed, the walks
+            are the same (None by default, for a random seed).
+        batch_size : int, optional
+            The number of walks of each batch (1000 by default).
+        processes : int, optional
+            The number of processes that generate the batches, or None for
+            one by CPU (1 by default, for no process pool).
+
+        Returns
+        -------
+        List[List[int]]
+            The places of each walk, in the order of the starts.
+
+        Raises
+        ------
+        ValueError
+            If ``p`` or ``q`` is not positive.
+        """
+        if p <= 0 or q <= 0:
+            raise ValueError("p and q must be positive")
+        if seed is None:
+            seed = random.randrange(2**32)
+        starts = list(starts)
+        batches = [
+            starts[first : first + batch_size]
+            for first in range(0, len(starts), batch_size)
+        ]
+
+        processes = os.cpu_count() if processes is None else processes
+        if (processes or 1) < 2 or len(batches) < 2:
+            results = [
+                self._walk_batch(seed, batch, batch_starts, length, p, q)
+                for batch, batch_starts in enumerate(batches)
+            ]
+        else:
+            with ProcessPoolExecutor(
+                processes, initializer=_init_worker, initargs=(self,)
+            ) as pool:
+                results = list(
+                    pool.map(
+                        _walk_batch_in_worker,
+                        [seed] * len(batches),
+                        range(len(batches)),
+                        batches,
+                        [length] * len(batches),
+                        [p] * len(batches),
+                        [q] * len(batches),
+                    )
+                )
+        return [walk for result in results for walk in result]
+
+    def sample_neighbourhood(
+        self,
+        seeds: Iterable[int],
+        fanouts: Sequence[int],
+        seed: Optional[int] = None,
+    ) -> List[Dict[int, List[int]]]:
+        """Sample the neighbours of some places, hop by hop.
+
+        At each hop, at most ``fanout`` neighbours of each place of the
+        frontier are drawn without replacement, uniformly or in proportion
+        to the weights (with the method of Efraimidis and Spirakis). The
+        drawn neighbours are the frontier of the next hop.
+
+        Parameters
+        ----------
+        seeds : Iterable[int]
+            The places of the first frontier.
+        fanouts : Sequence[int]
+            The highest number of neighbours drawn for a place, by hop.
+        seed : int, optional
+            The seed of the random generator (None by default).
+
+        Returns
+        -------
+        List[Dict[int, List[int]]]
+            For each hop, the drawn neighbours of each place of the
+            frontier.
+        """
+        generator = random.Random(seed)
+        neighbours, offsets, weights = (
+            self._neighbours,
+            self._offsets,
+            self._weights,
+        )
+        frontier = list(dict.fromkeys(seeds))
+        hops = []
+        for fanout in fanouts:
+            hop: Dict[int, List[int]] = {}
+            for place in frontier:
+                count = self.degree(place)
+                first = offsets[place] if count else 0
+                if count <= fanout:
+                    indexes: Iterable[int] = range(first, first + count)
+                elif self.weighted:
+                    keyed = sorted(
+                        (
+                            generator.random() ** (1 / weights[index]),
+                            index,
+                        )
+                        for index in range(first, first + count)
+                    )
+                    indexes = sorted(index for __, index in keyed[-fanout:])
+                else:
+                    indexes = sorted(
+                        generator.sample(range(first, first + count), fanout)
+                    )
+                hop[place] = [neighbours[index] for index in indexes]
+            hops.append(hop)
+            frontier = list(
+                dict.fromkeys(
+                    neighbour for drawn in hop.values() for neighbour in drawn
+                )
+            )
+        return hops
+
+
+def _init_worker(sampler: GraphSampler) -> None:
+    """Keep the sampler in a worker process."""
+    global _worker_sampler
+    _worker_sampler = sampler
+
+
+def _walk_batch_in_worker(*arguments: Any) -> List[List[int]]:
+    """Return the walks of a batch, in a worker process."""
+    return _worker_sampler._walk_batch(*arguments)
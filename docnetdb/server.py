@@ -0,0 +1,655 @@
+"""This module defines a local server and client to share one DocNetDB.
+
+The server owns a single DocNetDB and serves it over a Unix domain socket, so
+that several processes can work on the same in-memory graph instead of each
+loading their own copy.
+
+The protocol is a simple framed one : every message is a 4-byte big-endian
+length followed by a compact JSON payload. A request is a ``[op, args]``
+list, and a response is either ``[true, result]`` or
+``[false, exception_name, message]``. The server answers the requests of a
+connection in order, which allows the client to pipeline them.
+"""
+
+import json
+import pathlib
+import queue
+import socket
+import socketserver
+import struct
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from docnetdb.docnetdb import DocNetDB
+from docnetdb.edge import Edge
+from docnetdb.exceptions import (
+    ReadOnlyDatabaseException,
+    VertexInsertionException,
+    VertexNotReadyException,
+)
+from docnetdb.vertex import Vertex
+
+# The header of a frame is the length of the payload.
+_HEADER = struct.Struct(">I")
+
+# The exceptions that are sent back to the client with their type.
+# Any other exception is raised as a RuntimeError on the client side.
+_EXCEPTIONS = {
+    exception.__name__: exception
+    for exception in (
+        KeyError,
+        TypeError,
+        ValueError,
+        ReadOnlyDatabaseException,
+        VertexInsertionException,
+        VertexNotReadyException,
+    )
+}
+
+
+# FRAMING FUNCTIONS
+
+
+def _encode_frame(payload: Any) -> bytes:
+    """Encode a JSON-serializable payload into a frame."""
+    data = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return _HEADER.pack(len(data)) + data
+
+
+def _read_exactly(sock: socket.socket, size: int) -> Optional[bytes]:
+    """Read exactly ``size`` bytes, or return None if the peer has gone."""
+    chunks = []
+    while size > 0:
+        chunk = sock.recv(size)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _read_frame(sock: socket.socket) -> Any:
+    """Read a frame and return its decoded payload.
+
+    Raises
+    ------
+    ConnectionError
+        If the connection was closed before a whole frame was read.
+    """
+    header = _read_exactly(sock, _HEADER.size)
+    if header is None:
+        raise ConnectionError("The connection was closed")
+    (size,) = _HEADER.unpack(header)
+    data = _read_exactly(sock, size)
+    if data is None:
+        raise ConnectionError("The connection was closed")
+    return json.loads(data.decode("utf-8"))
+
+
+def _response_exception(response: List) -> Optional[Exception]:
+    """Return the exception of a failed response, or None."""
+    if response[0] is True:
+        return None
+    __, name, message = response
+    return _EXCEPTIONS.get(name, RuntimeError)(message)
+
+
+# SERVER
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    """Answer the requests of one connection until it is closed."""
+
+    server: "_UnixServer"
+
+    def handle(self) -> None:
+        """Override the handle method."""
+        while True:
+            try:
+                op, args = _read_frame(self.request)
+            except ConnectionError:
+                return
+            response = self.server.owner.execute(op, args)
+            self.request.sendall(_encode_frame(response))
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    """A threading Unix stream server that knows its DocNetDBServer."""
+
+    daemon_threads = True
+
+    def __init__(self, address: str, owner: "DocNetDBServer") -> None:
+        """Init the server and keep a reference on its owner."""
+        self.owner = owner
+        super().__init__(address, _RequestHandler)
+
+
+class DocNetDBServer:
+    """A server that shares one DocNetDB over a Unix domain socket."""
+
+    def __init__(
+        self, db: DocNetDB, address: Union[str, pathlib.Path]
+    ) -> None:
+        """Init a DocNetDBServer.
+
+        The socket is bound immediately, but the requests are only served
+        once ``serve_forever`` or ``start`` is called.
+
+        Parameters
+        ----------
+        db : DocNetDB
+            The database to serve.
+        address : Union[str, pathlib.Path]
+            The path of the Unix domain socket. An existing file at this
+            path is replaced.
+        """
+        self.db = db
+        self.address = pathlib.Path(address)
+
+        # A stale socket file would make the bind fail.
+        if self.address.exists():
+            self.address.unlink()
+
+        # The DocNetDB is not thread-safe, so the requests of the different
+        # connections are executed one at a time.
+        self._lock = threading.Lock()
+        self._server = _UnixServer(str(self.address), self)
+        self._thread: Optional[threading.Thread] = None
+
+        self._operations: Dict[str, Callable[..., Any]] = {
+            "insert": self._insert,
+            "remove": self._remove,
+            "getitem": self._getitem,
+            "update": self._update,
+            "contains": self._contains,
+            "len": self._len,
+            "insert_edge": self._insert_edge,
+            "remove_edge": self._remove_edge,
+            "search_edge": self._search_edge,
+            "save": self._save,
+        }
+
+    def __repr__(self) -> str:
+        """Override the __repr__ method."""
+        return f"<DocNetDBServer {self.address} serving {self.db}>"
+
+    def __enter__(self) -> "DocNetDBServer":
+        """Start serving in a background thread."""
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Stop serving."""
+        self.shutdown()
+
+    # SERVING METHODS
+
+    def serve_forever(self) -> None:
+        """Serve the requests until ``shutdown`` is called."""
+        self._server.serve_forever()
+
+    def start(self) -> None:
+        """Serve the requests in a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+
+    def shutdown(self) -> None:
+        """Stop serving and remove the socket file."""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+        if self.address.exists():
+            self.address.unlink()
+
+    def execute(self, op: str, args: List) -> List:
+        """Execute one request and return the response payload.
+
+        Parameters
+        ----------
+        op : str
+            The name of the operation.
+        args : List
+            The arguments of the operation.
+
+        Returns
+        -------
+        List
+            ``[True, result]`` on success, ``[False, exception_name,
+            message]`` on failure.
+        """
+        try:
+            operation = self._operations[op]
+        except KeyError:
+            return [False, "ValueError", f"Unknown operation '{op}'"]
+
+        try:
+            with self._lock:
+                return [True, operation(*args)]
+        except Exception as exc:  # pylint: disable=broad-except
+            message = exc.args[0] if len(exc.args) == 1 else str(exc)
+            return [False, type(exc).__name__, str(message)]
+
+    # OPERATIONS
+
+    def _insert(self, pack: Dict) -> int:
+        return self.db.insert(self.db.make_vertex(pack))
+
+    def _remove(self, place: int) -> int:
+        return self.db.remove(self.db[place])
+
+    def _getitem(self, place: int) -> Dict:
+        return self.db[place].pack()
+
+    def _update(self, place: int, fields: Dict) -> None:
+        vertex = self.db[place]
+        vertex.clear()
+        vertex.update(fields)
+
+    def _contains(self, place: int) -> bool:
+        try:
+            self.db[place]
+        except KeyError:
+            return False
+        return True
+
+    def _len(self) -> int:
+        return len(self.db)
+
+    def _insert_edge(self, pack: List) -> None:
+        self.db.insert_edge(self.db.make_edge(pack, self.db))
+
+    def _remove_edge(self, pack: List) -> None:
+        self.db.remove_edge(self.db.make_edge(pack, self.db))
+
+    def _search_edge(
+        self,
+        v1_place: int,
+        v2_place: Optional[int],
+        label: Optional[str],
+        direction: str,
+    ) -> List:
+        v2 = None if v2_place is None else self.db[v2_place]
+        edges = self.db.search_edge(self.db[v1_place], v2, label, direction)
+        return [edge.pack() for edge in edges]
+
+    def _save(self) -> None:
+        self.db.save()
+
+
+# CLIENT
+
+
+class DocNetDBClient:
+    """A client that mirrors the DocNetDB API over a DocNetDBServer.
+
+    The vertices returned by the client are copies of the served ones. Their
+    place is set, but modifying them doesn't modify the served vertices until
+    ``update`` is called.
+    """
+
+    def __init__(
+        self,
+        address: Union[str, pathlib.Path],
+        pool_size: int = 4,
+        vertex_creation_callable: Callable[..., Vertex] = None,
+        edge_creation_callable: Callable[..., Edge] = None,
+        timeout: Optional[float] = None,
+    ) -> None:
+        """Init a DocNetDBClient.
+
+        No connection is opened until the first request.
+
+        Parameters
+        ----------
+        address : Union[str, pathlib.Path]
+            The path of the Unix domain socket of the server.
+        pool_size : int, optional
+            The maximum number of connections kept open to the server (4 by
+            default). A thread that needs a connection when all of them are
+            used waits for one to be released.
+        vertex_creation_callable : Callable[..., Vertex]
+            The callable which is used to create the vertices from a pack,
+            like in the DocNetDB.
+        edge_creation_callable : Callable[..., Edge]
+            The callable which is used to create the edges from a pack, like
+            in the DocNetDB.
+        timeout : float, optional
+            The timeout of the socket operations, in seconds (None by
+            default, for no timeout).
+        """
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1")
+
+        self.address = pathlib.Path(address)
+        self.timeout = timeout
+
+        if vertex_creation_callable is None:
+            self.make_vertex = Vertex.from_pack
+        else:
+            self.make_vertex = vertex_creation_callable
+
+        if edge_creation_callable is None:
+            self.make_edge = Edge.from_pack
+        else:
+            self.make_edge = edge_creation_callable
+
+        # The idle connections wait in the pool, and a semaphore limits the
+        # number of connections in use.
+        self._pool: "queue.LifoQueue[socket.socket]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(pool_size)
+
+    def __repr__(self) -> str:
+        """Override the __repr__ method."""
+        return f"<DocNetDBClient {self.address}>"
+
+    def __enter__(self) -> "DocNetDBClient":
+        """Return the client itself."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Close all the connections."""
+        self.close()
+
+    # CONNECTION METHODS
+
+    def _connect(self) -> socket.socket:
+        """Open a new connection to the server."""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(str(self.address))
+        return sock
+
+    def _send_many(self, requests: List[Tuple[str, List]]) -> List[List]:
+        """Send several requests at once, then read all the responses.
+
+        Returns
+        -------
+        List[List]
+            The responses, in the order of the requests.
+        """
+        self._slots.acquire()
+        try:
+            try:
+                sock = self._pool.get_nowait()
+            except queue.Empty:
+                sock = self._connect()
+
+            try:
+                sock.sendall(
+                    b"".join(_encode_frame(request) for request in requests)
+                )
+                responses = [_read_frame(sock) for __ in requests]
+            except BaseException:
+                # The connection is in an unknown state, don't reuse it.
+                sock.close()
+                raise
+
+            self._pool.put(sock)
+        finally:
+            self._slots.release()
+        return responses
+
+    def _call(self, op: str, *args) -> Any:
+        """Send one request and return its result."""
+        (response,) = self._send_many([(op, list(args))])
+        exception = _response_exception(response)
+        if exception is not None:
+            raise exception
+        return response[1]
+
+    def close(self) -> None:
+        """Close all the idle connections."""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def pipeline(self) -> "Pipeline":
+        """Return a Pipeline to send several requests in one round-trip.
+
+        Example
+        -------
+        >>> with client.pipeline() as pipe:
+        ...     pipe.insert(vertex)
+        ...     pipe.getitem(1)
+        >>> place, first = pipe.results
+        """
+        return Pipeline(self)
+
+    # SPECIAL METHODS
+
+    def __getitem__(self, index) -> Vertex:
+        """Return a copy of the served Vertex at this place."""
+        if not isinstance(index, int):
+            raise TypeError("index must be an integer")
+        return self._make_vertex(index, self._call("getitem", index))
+
+    def __len__(self) -> int:
+        """Return the number of served vertices."""
+        return self._call("len")
+
+    def __contains__(self, vertex: Vertex) -> bool:
+        """Return whether a Vertex with this place is served."""
+        return vertex.is_inserted and self._call("contains", vertex.place)
+
+    # DATABASE METHODS
+
+    def insert(self, vertex: Vertex) -> int:
+        """Insert a Vertex in the served database.
+
+        See ``DocNetDB.insert``. The place of the Vertex is set afterwards.
+        """
+        with self.pipeline() as pipe:
+            pipe.insert(vertex)
+        return pipe.results[0]
+
+    def remove(self, vertex: Vertex) -> int:
+        """Remove a Vertex from the served database.
+
+        See ``DocNetDB.remove``. The place of the Vertex is reset
+        afterwards.
+        """
+        with self.pipeline() as pipe:
+            pipe.remove(vertex)
+        return pipe.results[0]
+
+    def update(self, vertex: Vertex) -> None:
+        """Replace the fields of the served Vertex by the ones of ``vertex``.
+
+        Raises
+        ------
+        VertexInsertionException
+            If the Vertex is not inserted.
+        """
+        with self.pipeline() as pipe:
+            pipe.update(vertex)
+
+    def insert_edge(self, edge: Edge) -> None:
+        """Insert an Edge in the served database.
+
+        See ``DocNetDB.insert_edge``.
+        """
+        with self.pipeline() as pipe:
+            pipe.insert_edge(edge)
+
+    def remove_edge(self, edge: Edge) -> None:
+        """Remove an Edge from the served database.
+
+        See ``DocNetDB.remove_edge``.
+        """
+        with self.pipeline() as pipe:
+            pipe.remove_edge(edge)
+
+    def search_edge(
+        self,
+        v1: Vertex,
+        v2: Vertex = None,
+        label: str = None,
+        direction: str = "all",
+    ) -> Iterator[Edge]:
+        """Return an iterator over the corresponding served edges.
+
+        See ``DocNetDB.search_edge``. The edges are anchored on ``v1``, and
+        their other vertices are fetched in one pipelined round-trip.
+        """
+        v2_place = None if v2 is None else v2.place
+        packs = self._call("search_edge", v1.place, v2_place, label, direction)
+
+        # The vertices of the edges are indexed by place, so the edge
+        # factory can use the dict like a DocNetDB.
+        vertices = {v1.place: v1}
+        if v2 is not None:
+            vertices[v2.place] = v2
+        missing = sorted(
+            {place for pack in packs for place in pack[:2]} - set(vertices)
+        )
+        with self.pipeline() as pipe:
+            for place in missing:
+                pipe.getitem(place)
+        vertices.update(zip(missing, pipe.results))
+
+        edges = []
+        for pack in packs:
+            edge = self.make_edge(pack, vertices)
+            edge.is_inserted = True
+            edge.change_anchor(v1)
+            edges.append(edge)
+        return iter(edges)
+
+    def save(self) -> None:
+        """Make the server save its database."""
+        self._call("save")
+
+    # UTILITY METHODS
+
+    def _make_vertex(self, place: int, pack: Dict) -> Vertex:
+        """Create a Vertex from a served pack."""
+        vertex = self.make_vertex(pack)
+        vertex.place = place
+        return vertex
+
+
+class Pipeline:
+    """Queue requests to a DocNetDBServer and send them in one round-trip.
+
+    The requests are sent when ``execute`` is called, or when the ``with``
+    block is left without exception. The results are then available in the
+    ``results`` attribute, in the order of the requests.
+
+    If some requests fail, the others still have their effect : their
+    results are processed, then the exception of the first failed request
+    is raised. The exceptions are in ``results`` in place of the results of
+    the failed requests.
+    """
+
+    def __init__(self, client: DocNetDBClient) -> None:
+        """Init an empty Pipeline for a client."""
+        self.client = client
+        self.results: List[Any] = []
+        self._requests: List[Tuple[str, List]] = []
+        self._callbacks: List[Callable[[Any], Any]] = []
+
+    def __enter__(self) -> "Pipeline":
+        """Return the pipeline itself."""
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        """Execute the queued requests if no exception was raised."""
+        if exc_type is None:
+            self.execute()
+
+    def _queue(
+        self, op: str, args: List, callback: Callable[[Any], Any] = None
+    ) -> None:
+        """Queue a request and the callback that processes its result."""
+        self._requests.append((op, args))
+        self._callbacks.append(callback or (lambda result: result))
+
+    def execute(self) -> List[Any]:
+        """Send the queued requests and return their results.
+
+        Raises
+        ------
+        Exception
+            The exception raised by the first failed request, once the
+            results of the others are processed.
+        """
+        requests, callbacks = self._requests, self._callbacks
+        self._requests, self._callbacks = [], []
+        self.results = []
+        if not requests:
+            return self.results
+
+        first_exception = None
+        for callback, response in zip(
+            callbacks, self.client._send_many(requests)
+        ):
+            exception = _response_exception(response)
+            if exception is None:
+                self.results.append(callback(response[1]))
+            else:
+                self.results.append(exception)
+                if first_exception is None:
+                    first_exception = exception
+        if first_exception is not None:
+            raise first_exception
+        return self.results
+
+    # QUEUEING METHODS
+
+    def insert(self, vertex: Vertex) -> None:
+        """Queue the insertion of a Vertex. The result is its place."""
+        if not isinstance(vertex, Vertex):
+            raise TypeError("The parameter should be a Vertex")
+        if vertex.is_inserted:
+            raise VertexInsertionException("This vertex is already inserted")
+        if vertex.is_ready_for_insertion() is False:
+            raise VertexNotReadyException()
+
+        def set_place(place: int) -> int:
+            vertex.place = place
+            return place
+
+        self._queue("insert", [vertex.pack()], set_place)
+
+    def remove(self, vertex: Vertex) -> None:
+        """Queue the removal of a Vertex. The result is its old place."""
+        if not isinstance(vertex, Vertex):
+            raise TypeError("The parameter should be a Vertex")
+        if not vertex.is_inserted:
+            raise VertexInsertionException("This vertex wasn't inserted")
+
+        def reset_place(place: int) -> int:
+            vertex.place = 0
+            return place
+
+        self._queue("remove", [vertex.place], reset_place)
+
+    def update(self, vertex: Vertex) -> None:
+        """Queue the update of the fields of a served Vertex."""
+        if not vertex.is_inserted:
+            raise VertexInsertionException("This vertex wasn't inserted")
+        self._queue("update", [vertex.place, dict(vertex)])
+
+    def getitem(self, place: int) -> None:
+        """Queue the access to a Vertex. The result is a copy of it."""
+        self._queue(
+            "getitem",
+            [place],
+            lambda pack: self.client._make_vertex(place, pack),
+        )
+
+    def insert_edge(self, edge: Edge) -> None:
+        """Queue the insertion of an Edge."""
+        self._queue("insert_edge", [list(edge.pack())])
+
+    def remove_edge(self, edge: Edge) -> None:
+        """Queue the removal of an Edge."""
+        self._queue("remove_edge", [list(edge.pack())])
+
+    def save(self) -> None:
+        """Queue the save of the served database."""
+        self._queue("save", [])
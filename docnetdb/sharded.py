@@ -0,0 +1,445 @@
+"""This module defines the ShardedDocNetDB class.
+
+A ShardedDocNetDB stores its vertices in several files, partitioned by
+ranges of places, and its edges in files partitioned the same way by the
+place of their start vertex. The files are in a directory :
+
+- ``meta.json`` holds the _next_place value, the size of the shards, the
+  ids of the shards and their compression.
+- ``vertices-<id>.json`` holds the packed vertices of a shard, labeled
+  with their place.
+- ``edges-<id>.json`` holds the list of the packed edges that start in a
+  shard.
+
+The shards are decoded concurrently in a process pool, and a save only
+rewrites the shards whose vertices or edges were modified. The shard
+files are compressed with the ``compression`` of the ShardedDocNetDB, and
+get the extension of the codec.
+"""
+
+import contextlib
+import json
+import os
+import pathlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    TextIO,
+    Tuple,
+    Union,
+)
+
+from docnetdb.compression import SUFFIXES, open_text, resolve_compression
+from docnetdb.docnetdb import DocNetDB, encode_vertex, write_atomically
+from docnetdb.edge import Edge
+from docnetdb.vertex import Vertex
+
+# The name of the file that describes the shards.
+META_FILENAME = "meta.json"
+
+
+def shard_paths(
+    directory: pathlib.Path, shard: int, compression: Optional[str]
+) -> Tuple[pathlib.Path, pathlib.Path]:
+    """Return the paths of the vertex and edge files of a shard."""
+    suffix = ".json" + SUFFIXES.get(compression, "")
+    return (
+        directory / f"vertices-{shard}{suffix}",
+        directory / f"edges-{shard}{suffix}",
+    )
+
+
+def read_shard(
+    directory: pathlib.Path, shard: int, compression: Optional[str] = None
+) -> Tuple[Dict, List]:
+    """Decode the files of a shard.
+
+    This function is run in the processes of the pool. The files of a shard
+    are small enough to be decoded at once.
+
+    Returns
+    -------
+    Tuple[Dict, List]
+        The packed vertices labeled with their place, and the packed edges.
+    """
+    decoded = []
+    for path in shard_paths(directory, shard, compression):
+        with open(path, "rb") as file_:
+            with open_text(file_, "r", compression) as text:
+                decoded.append(json.load(text))
+    packed_vertices, packed_edges = decoded
+    return packed_vertices, packed_edges
+
+
+class ShardedDocNetDB(DocNetDB):
+    """A DocNetDB that is stored in several files.
+
+    It has the same API as the DocNetDB. The edges are loaded shard by
+    shard, so their order is the order of the places of their start
+    vertices.
+
+    The shards to save are found with the modifications of the vertices and
+    of the edges that go through the DocNetDB and the Vertex methods. The
+    lists and dicts in the fields of a Vertex can be modified in place, so
+    the JSON of the vertices that have some is kept, and compared on save.
+    The changes of the attributes of a kept instance of an Edge subclass are
+    not tracked, so the shard of the edge must be marked with
+    ``mark_dirty``.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, pathlib.Path],
+        *args,
+        shard_size: int = 100_000,
+        workers: Optional[int] = None,
+        **kwargs,
+    ) -> None:
+        """Init a ShardedDocNetDB.
+
+        Parameters
+        ----------
+        path : Union[str, pathlib.Path]
+            The path to the directory of the files. If it doesn't exist, it
+            will be created on the next save.
+        shard_size : int, optional
+            The number of places of each shard (100 000 by default). The
+            size of an existing database is read in its files instead.
+        workers : int, optional
+            The number of processes that decode the shards (the number of
+            processors by default). If lower than 2, the shards are decoded
+            in this process.
+
+        The other parameters are the parameters of the DocNetDB.
+        """
+        if shard_size < 1:
+            raise ValueError("shard_size must be a positive integer")
+        self.shard_size = shard_size
+        self.workers = workers
+        super().__init__(path, *args, **kwargs)
+
+    def _use_defaults(self) -> None:
+        """Reset the database attributes."""
+        super()._use_defaults()
+        # The ids of the shards that are in the files, and of the shards
+        # that must be written on the next save.
+        self._shards: Set[int] = set()
+        self._dirty_shards: Set[int] = set()
+        # The JSON of the saved vertices that have a nested field.
+        self._nested_bodies: Dict[int, str] = {}
+        # The files that the last load or save read or wrote.
+        self._io_paths: List[pathlib.Path] = []
+        # The compression of the shard files.
+        self._shard_compression: Optional[str] = None
+        # The changes of the fields are always watched, to find the shards
+        # to save.
+        self._watching_fields = True
+
+    # SHARD METHODS
+
+    def shard_of(self, place: int) -> int:
+        """Return the id of the shard of a place."""
+        return (place - 1) // self.shard_size
+
+    def mark_dirty(self, place: int) -> None:
+        """Mark the shard of a place as modified, so that it gets saved."""
+        shard = self.shard_of(place)
+        self._dirty_shards.add(shard)
+        self._shards.add(shard)
+
+    @property
+    def dirty_shards(self) -> Set[int]:
+        """Return the ids of the shards that the next save will write."""
+        return self._dirty_shards | self._nested_changed_shards()
+
+    def _nested_changed_shards(self) -> Set[int]:
+        """Return the other shards of the vertices changed in place.
+
+        The vertices that have a nested field, in the shards that are not
+        marked, are encoded again and compared with their saved JSON.
+        """
+        encode = json.JSONEncoder().encode
+        dirty, changed = self._dirty_shards, set()
+        for place, body in self._nested_bodies.items():
+            shard = self.shard_of(place)
+            if shard in dirty or shard in changed:
+                continue
+            vertex = self._vertices.get(place)
+            if vertex is None or encode_vertex(encode, vertex) != body:
+                changed.add(shard)
+        return changed
+
+    # LOAD AND SAVE METHODS
+
+    def load(self) -> None:
+        """Read the files and load them in memory.
+
+        The shards are decoded in a process pool, then merged.
+        """
+        self._use_defaults()
+
+        try:
+            with open(self.path / META_FILENAME) as file_:
+                meta = json.load(file_)
+        except FileNotFoundError:
+            self._loaded()
+            return
+
+        self.shard_size = meta["shard_size"]
+        shards = meta["shards"]
+        compression = meta.get("compression")
+
+        workers = os.cpu_count() if self.workers is None else self.workers
+        if (workers or 1) < 2 or len(shards) < 2:
+            decoded = [
+                read_shard(self.path, shard, compression) for shard in shards
+            ]
+        else:
+            with ProcessPoolExecutor(workers) as pool:
+                decoded = list(
+                    pool.map(
+                        read_shard,
+                        [self.path] * len(shards),
+                        shards,
+                        [compression] * len(shards),
+                    )
+                )
+
+        # The shards are merged in the layout of a single file.
+        packed_data: Dict[str, Any] = {}
+        packed_edges: List = []
+        for packed_vertices, shard_edges in decoded:
+            packed_data.update(packed_vertices)
+            packed_edges.extend(shard_edges)
+        packed_data["_next_place"] = meta["_next_place"]
+        packed_data["edges"] = packed_edges
+        del decoded
+
+        self._load_packed_data(packed_data)
+        self._shards = set(shards)
+        self._shard_compression = compression
+        self._io_paths = [self.path / META_FILENAME] + [
+            path
+            for shard in shards
+            for path in shard_paths(self.path, shard, compression)
+        ]
+        if not self.is_read_only:
+            encode = json.JSONEncoder().encode
+            self._nested_bodies = {
+                place: encode_vertex(encode, vertex)
+                for place, vertex in self._vertices.items()
+                if any(
+                    isinstance(value, (list, dict))
+                    for value in vertex.values()
+                )
+            }
+        # The loaded vertices are watched like the inserted ones.
+        self._watching_fields = True
+
+        self._loaded()
+
+    def save(self) -> None:
+        """Save the modified shards and the description of the shards.
+
+        Each file is written through a temporary file. During a
+        transaction, the save is deferred until the transaction is
+        committed.
+
+        Raises
+        ------
+        ReadOnlyDatabaseException
+            If the ShardedDocNetDB was partially loaded.
+        """
+        self._check_writable()
+        self._io_paths = []
+
+        if self._undo_log is not None:
+            self._save_deferred = True
+            return
+
+        self._edges.compact()
+
+        # When the compression changes, all the shards are rewritten.
+        old_compression = self._shard_compression
+        compression = resolve_compression(self.compression, self.path)
+        if compression != old_compression:
+            self._dirty_shards |= self._shards
+        else:
+            self._dirty_shards |= self._nested_changed_shards()
+
+        dirty = self._dirty_shards
+        edge_rows = self._edge_rows_of_shards(dirty)
+
+        for shard in sorted(dirty):
+            vertex_path, edge_path = shard_paths(self.path, shard, compression)
+            write_atomically(
+                vertex_path,
+                lambda file_: self._write_shard_vertices(file_, shard),
+                compression,
+            )
+            write_atomically(
+                edge_path,
+                lambda file_: self._write_shard_edges(file_, edge_rows[shard]),
+                compression,
+            )
+            self._io_paths += [vertex_path, edge_path]
+
+        self._shard_compression = compression
+        write_atomically(self.path / META_FILENAME, self._write_meta)
+        self._io_paths.append(self.path / META_FILENAME)
+        self._dirty_shards = set()
+
+        # The files of the old compression are removed once the new ones
+        # are described.
+        if compression != old_compression:
+            for shard in self._shards:
+                for path in shard_paths(self.path, shard, old_compression):
+                    with contextlib.suppress(FileNotFoundError):
+                        path.unlink()
+
+    def _io_size(self) -> int:
+        """Return the size of the files the last load or save read or wrote."""
+        size = 0
+        for path in self._io_paths:
+            with contextlib.suppress(OSError):
+                size += os.stat(path).st_size
+        return size
+
+    def _edge_rows_of_shards(self, shards: Set[int]) -> Dict[int, List[int]]:
+        """Return the rows of the edges that start in some shards."""
+        edges, shard_size = self._edges, self.shard_size
+
+        # A few shards are found by a fast scan each, more of them by a
+        # single slower scan.
+        if len(shards) < 3:
+            return {
+                shard: edges.rows_starting_in(
+                    shard * shard_size + 1, (shard + 1) * shard_size + 1
+                )
+                for shard in shards
+            }
+
+        edge_rows: Dict[int, List[int]] = {shard: [] for shard in shards}
+        for row in edges.rows():
+            rows = edge_rows.get((edges.start(row) - 1) // shard_size)
+            if rows is not None:
+                rows.append(row)
+        return edge_rows
+
+    def _write_meta(self, file_: TextIO) -> None:
+        """Write the description of the shards to a file."""
+        json.dump(
+            {
+                "_next_place": self._next_place,
+                "shard_size": self.shard_size,
+                "shards": sorted(self._shards),
+                "compression": self._shard_compression,
+            },
+            file_,
+        )
+
+    def _write_shard_vertices(self, file_: TextIO, shard: int) -> None:
+        """Write the packed vertices of a shard to a file.
+
+        The JSON of the vertices that have a nested field is kept.
+        """
+        encode = json.JSONEncoder().encode
+        write = file_.write
+        vertices = self._vertices
+        nested_bodies = self._nested_bodies
+        first_place = shard * self.shard_size + 1
+
+        write("{")
+        separator = ""
+        for place in range(first_place, first_place + self.shard_size):
+            vertex = vertices.get(place)
+            if vertex is None:
+                nested_bodies.pop(place, None)
+                continue
+            body = encode_vertex(encode, vertex)
+            write(f'{separator}"{place}": {body}')
+            separator = ", "
+            if any(
+                isinstance(value, (list, dict)) for value in vertex.values()
+            ):
+                nested_bodies[place] = body
+            else:
+                nested_bodies.pop(place, None)
+        write("}")
+
+    def _write_shard_edges(self, file_: TextIO, rows: List[int]) -> None:
+        """Write the packed edges of some rows to a file.
+
+        The packs of a shard are encoded at once, which is faster than one
+        by one.
+        """
+        pack = self._edges.pack
+        file_.write(json.JSONEncoder().encode([pack(row) for row in rows]))
+
+    # MODIFICATION METHODS
+
+    # The modifications mark the shards of the vertices or of the start of
+    # the edges, after they succeed.
+
+    def insert(self, vertex: Vertex) -> int:
+        """Override the insert method to mark the shard."""
+        place = super().insert(vertex)
+        self.mark_dirty(place)
+        return place
+
+    def remove(self, vertex: Vertex) -> int:
+        """Override the remove method to mark the shard."""
+        place = super().remove(vertex)
+        self.mark_dirty(place)
+        return place
+
+    def insert_edge(self, edge: Edge) -> None:
+        """Override the insert_edge method to mark the shard."""
+        super().insert_edge(edge)
+        self.mark_dirty(edge.start.place)
+
+    def _insert_edge_packs(self, packs: List[Tuple]) -> None:
+        """Override the _insert_edge_packs method to mark the shards."""
+        super()._insert_edge_packs(packs)
+        for start, end, __, has_direction, *__ in packs:
+            self.mark_dirty(start if has_direction else min(start, end))
+
+    def remove_edge(self, edge: Edge) -> None:
+        """Override the remove_edge method to mark the shard."""
+        super().remove_edge(edge)
+        self.mark_dirty(edge.start.place)
+
+    def remove_many(
+        self, vertices: Iterable[Vertex], cascade: bool = True
+    ) -> Dict[str, int]:
+        """Override the remove_many method to mark the shards."""
+        vertices = list(vertices)
+        places = [getattr(vertex, "place", 0) for vertex in vertices]
+        counts = super().remove_many(vertices, cascade)
+        for place in places:
+            self.mark_dirty(place)
+        return counts
+
+    def _remove_edge_rows(self, rows: List[int]) -> List[Tuple[int, Any]]:
+        """Override the _remove_edge_rows method to mark the shards."""
+        removed_rows = super()._remove_edge_rows(rows)
+        for __, token in removed_rows:
+            self.mark_dirty(token[0])
+        return removed_rows
+
+    def _field_changed(
+        self, vertex: Vertex, key: Any, old: Any, new: Any
+    ) -> None:
+        """Override the _field_changed method to mark the shard."""
+        self.mark_dirty(vertex.place)
+        super()._field_changed(vertex, key, old, new)
+
+    def _end_transaction(self) -> None:
+        """Override the _end_transaction method to keep watching fields."""
+        super()._end_transaction()
+        self._watching_fields = True
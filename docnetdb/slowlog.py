@@ -0,0 +1,89 @@
+"""This module defines a log of the slow operations of a DocNetDB."""
+
+import collections
+import logging
+import time
+from typing import Any, Deque, Dict, Iterator, NamedTuple, Optional
+
+from docnetdb.logger import logger
+from docnetdb.metrics import MetricsHook, OperationRecord
+
+
+class SlowOperation(NamedTuple):
+    """An operation that took longer than the threshold."""
+
+    timestamp: float
+    name: str
+    duration: float
+    details: Dict[str, Any]
+    scanned: Optional[int]
+    returned: Optional[int]
+
+
+class SlowOperationLog(MetricsHook):
+    """A metrics hook that keeps and logs the slow operations.
+
+    The slow operations are logged with the ``docnetdb`` logger, and the
+    last ones are kept in a bounded buffer for inspection.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.1,
+        capacity: int = 100,
+        level: int = logging.WARNING,
+    ) -> None:
+        """Init a SlowOperationLog.
+
+        Parameters
+        ----------
+        threshold : float, optional
+            The duration in seconds above which an operation is slow (0.1 by
+            default).
+        capacity : int, optional
+            The number of slow operations kept in the buffer. The oldest
+            ones are dropped first (100 by default).
+        level : int, optional
+            The level of the log records (logging.WARNING by default).
+        """
+        if threshold < 0:
+            raise ValueError("threshold must be non-negative")
+        self.threshold = threshold
+        self.level = level
+        self.entries: Deque[SlowOperation] = collections.deque(maxlen=capacity)
+
+    def __len__(self) -> int:
+        """Return the number of slow operations in the buffer."""
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[SlowOperation]:
+        """Iterate over the slow operations, from the oldest one."""
+        return iter(self.entries)
+
+    def clear(self) -> None:
+        """Empty the buffer."""
+        self.entries.clear()
+
+    def on_operation(self, record: OperationRecord) -> None:
+        """Keep and log the operation if it is slow."""
+        if record.duration < self.threshold:
+            return
+        entry = SlowOperation(
+            time.time(),
+            record.name,
+            record.duration,
+            record.details,
+            record.scanned,
+            record.returned,
+        )
+        self.entries.append(entry)
+
+        arguments = ", ".join(
+            f"{key}={value!r}" for key, value in entry.details.items()
+        )
+        message = "Slow %s(%s) took %.3f s"
+        values = [entry.name, arguments, entry.duration]
+        if entry.scanned is not None:
+            message += " (%d rows examined, %d returned)"
+            values += [entry.scanned, entry.returned]
+        logger.log(self.level, message, *values)
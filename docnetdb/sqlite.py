@@ -0,0 +1,1337 @@
+"""This module defines the SQLiteDocNetDB class.
+
+A SQLiteDocNetDB stores its vertices and edges in the tables of a SQLite
+file instead of a JSON file :
+
+- ``vertices`` holds the packed vertices as JSON, keyed by their place.
+- ``edges`` holds the places of the start and end vertices, the label and
+  the direction of the edges, indexed on the start and end places with the
+  label, and on the label alone. The properties of the edges and the pack
+  of the Edge subclasses are kept as JSON too.
+- ``meta`` holds the _next_place value.
+
+The indexes of the edge properties are indexes on the expression that
+extracts the property from the JSON, so they are stored in the file.
+
+Only the vertices and edges that are read are loaded in memory, so the
+accesses by place, the edge searches and the removals are index lookups.
+The modifications are written in a SQLite transaction, which is committed
+by ``save``.
+
+The ``convert_to_sqlite`` and ``convert_to_json`` functions convert a
+database file from one format to the other.
+"""
+
+import json
+import os
+import pathlib
+import sqlite3
+import weakref
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    TextIO,
+    Tuple,
+    Union,
+)
+
+from docnetdb.compression import resolve_compression
+from docnetdb.docnetdb import (
+    DocNetDB,
+    encode_vertex,
+    properties_pass,
+    read_packed_data,
+    write_atomically,
+)
+from docnetdb.edge import Edge
+from docnetdb.edgeindex import (
+    INDEX_CLASSES,
+    NUMBER_RANK,
+    ValueRange,
+    sort_key,
+)
+from docnetdb.vertex import Vertex
+
+# The tables of the file. The "{schema}" prefix allows to create them in an
+# attached database.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS {schema}meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS {schema}vertices (
+    place INTEGER PRIMARY KEY,
+    body TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS {schema}edges (
+    id INTEGER PRIMARY KEY,
+    start_place INTEGER NOT NULL,
+    end_place INTEGER NOT NULL,
+    label TEXT NOT NULL,
+    has_direction INTEGER NOT NULL,
+    pack TEXT,
+    properties TEXT
+);
+CREATE INDEX IF NOT EXISTS {schema}edges_start
+    ON edges (start_place, label);
+CREATE INDEX IF NOT EXISTS {schema}edges_end
+    ON edges (end_place, label);
+CREATE INDEX IF NOT EXISTS {schema}edges_label
+    ON edges (label);
+"""
+
+# The columns of the edge records, in the order of the queries.
+EDGE_COLUMNS = (
+    "id, start_place, end_place, label, has_direction, pack, properties"
+)
+
+# The prefix of the names of the indexes of the edge properties. The names
+# end with the kind of the index and the hexadecimal UTF-8 of the key.
+PROPERTY_INDEX_PREFIX = "edges_property_"
+
+# The number of rows read at a time when iterating over a table.
+BATCH_SIZE = 1000
+
+# A record of the edges table.
+EdgeRecord = Tuple[int, int, int, str, int, Optional[str], Optional[str]]
+
+# A value that no property has.
+_MISSING = object()
+
+
+def connect(database: str) -> sqlite3.Connection:
+    """Open a connection for a SQLiteDocNetDB.
+
+    The transactions are managed by hand. The connection can be used from
+    any thread, as the DocNetDB is used by one thread at a time (like the
+    DocNetDBServer does).
+    """
+    return sqlite3.connect(
+        database, isolation_level=None, check_same_thread=False
+    )
+
+
+def begin(connection: sqlite3.Connection) -> None:
+    """Begin a transaction on a connection, if none is open.
+
+    The transaction stays open until it is committed, so the modifications
+    are written to the file at once.
+    """
+    if not connection.in_transaction:
+        connection.execute("BEGIN")
+
+
+def execute_write(
+    connection: sqlite3.Connection, sql: str, parameters: Sequence = ()
+) -> sqlite3.Cursor:
+    """Execute a modification in the open transaction of a connection."""
+    begin(connection)
+    return connection.execute(sql, parameters)
+
+
+def property_path(key: str) -> Optional[str]:
+    """Return the SQL literal of the JSON path of a property, or None.
+
+    SQLite can't find the keys with a double quote, a backslash or a
+    control character in a path, so they have no path.
+    """
+    if not isinstance(key, str) or any(
+        char in '"\\' or char < " " for char in key
+    ):
+        return None
+    return "'$.\"" + key.replace("'", "''") + "\"'"
+
+
+def property_index_sql(key: str, kind: str, schema: str = "") -> str:
+    """Return the statement that creates the index of a property."""
+    name = PROPERTY_INDEX_PREFIX + kind + "_" + key.encode().hex()
+    return (
+        f"CREATE INDEX IF NOT EXISTS {schema}{name} "
+        f"ON edges (json_extract(properties, {property_path(key)}))"
+    )
+
+
+def encode_properties(encode: Callable[[Any], str], properties: Dict) -> Any:
+    """Return the value of the properties column for some properties.
+
+    The properties are encoded without escaping the non-ASCII characters,
+    as SQLite finds the keys in the JSON as they are written.
+    """
+    return encode(properties) if properties else None
+
+
+class VertexTable:
+    """The vertices of a SQLiteDocNetDB, stored in the vertices table.
+
+    It has the dict methods that the DocNetDB uses on its vertices, so the
+    DocNetDB methods work on it. The Vertex objects are created when they
+    are read, and kept while they are referenced, so the same place always
+    gives the same object. The modified vertices are kept until they are
+    written by ``flush``.
+
+    The lists and dicts in the fields of a Vertex can be modified in place,
+    without the Vertex knowing. So the vertices that have some are kept
+    until the next ``flush``, which writes the ones whose JSON changed.
+    """
+
+    def __init__(
+        self,
+        connection: sqlite3.Connection,
+        make_vertex: Callable[[Dict], Vertex],
+        db: DocNetDB,
+    ) -> None:
+        """Init a VertexTable on an open connection.
+
+        Parameters
+        ----------
+        connection : sqlite3.Connection
+            The connection to the file.
+        make_vertex : Callable[[Dict], Vertex]
+            The callable that creates a Vertex from a pack.
+        db : DocNetDB
+            The database the vertices are inserted in.
+        """
+        self.connection = connection
+        self._make_vertex = make_vertex
+        self._db = db
+        self._encode = json.JSONEncoder().encode
+        self._loaded: "weakref.WeakValueDictionary[int, Vertex]"
+        self._loaded = weakref.WeakValueDictionary()
+        self._dirty: Dict[int, Vertex] = {}
+        # The last written JSON of the loaded vertices that have a nested
+        # field, and the ones of them that were read since the last flush.
+        self._bodies: Dict[int, str] = {}
+        self._held: Dict[int, Vertex] = {}
+
+    def _load(self, place: int, body: str) -> Vertex:
+        """Return the Vertex of a row, creating it if needed."""
+        vertex = self._loaded.get(place)
+        if vertex is None:
+            vertex = self._make_vertex(json.loads(body))
+            vertex.place = place
+            vertex._db = self._db
+            self._loaded[place] = vertex
+            self._watch(place, vertex, body)
+        elif place in self._bodies:
+            self._held[place] = vertex
+        return vertex
+
+    def _watch(self, place: int, vertex: Vertex, body: str) -> None:
+        """Keep the JSON of a Vertex whose fields can change in place."""
+        if any(isinstance(value, (list, dict)) for value in vertex.values()):
+            self._bodies[place] = body
+            self._held[place] = vertex
+        else:
+            self._bodies.pop(place, None)
+            self._held.pop(place, None)
+
+    # MAPPING METHODS
+
+    def __getitem__(self, place: int) -> Vertex:
+        """Return the Vertex at a place, or raise a KeyError."""
+        vertex = self._loaded.get(place)
+        if vertex is not None:
+            if place in self._bodies:
+                self._held[place] = vertex
+            return vertex
+        row = self.connection.execute(
+            "SELECT body FROM vertices WHERE place = ?", (place,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(place)
+        return self._load(place, row[0])
+
+    def get(self, place: int, default: Any = None) -> Any:
+        """Return the Vertex at a place, or ``default``."""
+        try:
+            return self[place]
+        except KeyError:
+            return default
+
+    def __setitem__(self, place: int, vertex: Vertex) -> None:
+        """Write a Vertex at a place."""
+        body = encode_vertex(self._encode, vertex)
+        execute_write(
+            self.connection,
+            "INSERT OR REPLACE INTO vertices VALUES (?, ?)",
+            (place, body),
+        )
+        self._loaded[place] = vertex
+        self._dirty.pop(place, None)
+        self._watch(place, vertex, body)
+
+    def pop(self, place: int) -> Vertex:
+        """Delete the Vertex at a place and return it."""
+        vertex = self[place]
+        execute_write(
+            self.connection, "DELETE FROM vertices WHERE place = ?", (place,)
+        )
+        del self._loaded[place]
+        self._dirty.pop(place, None)
+        self._bodies.pop(place, None)
+        self._held.pop(place, None)
+        return vertex
+
+    def __contains__(self, place: int) -> bool:
+        """Return whether there is a Vertex at a place."""
+        return self.get(place) is not None
+
+    def __len__(self) -> int:
+        """Return the number of vertices."""
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM vertices"
+        ).fetchone()[0]
+
+    def items(self) -> Iterator[Tuple[int, Vertex]]:
+        """Iterate over the places and vertices, in the order of places.
+
+        The rows are read by batches, so the table can be modified during
+        the iteration.
+        """
+        last_place = 0
+        while True:
+            rows = self.connection.execute(
+                "SELECT place, body FROM vertices WHERE place > ? "
+                "ORDER BY place LIMIT ?",
+                (last_place, BATCH_SIZE),
+            ).fetchall()
+            for place, body in rows:
+                yield place, self._load(place, body)
+            if len(rows) < BATCH_SIZE:
+                return
+            last_place = rows[-1][0]
+
+    def values(self) -> Iterator[Vertex]:
+        """Iterate over the vertices, in the order of places."""
+        return (vertex for __, vertex in self.items())
+
+    def keys(self) -> List[int]:
+        """Return the places, in order, without creating the vertices."""
+        return [
+            row[0]
+            for row in self.connection.execute(
+                "SELECT place FROM vertices ORDER BY place"
+            )
+        ]
+
+    # MODIFICATION TRACKING METHODS
+
+    def mark_dirty(self, vertex: Vertex) -> None:
+        """Keep a modified Vertex until it is written."""
+        self._dirty[vertex.place] = vertex
+
+    def flush(self) -> None:
+        """Write the modified vertices.
+
+        The loaded vertices that have a nested field are encoded again, and
+        written if their JSON changed.
+        """
+        encode = self._encode
+        bodies = {}
+        for place, vertex in self._dirty.items():
+            bodies[place] = encode_vertex(encode, vertex)
+        for place, body in list(self._bodies.items()):
+            if place in bodies:
+                continue
+            vertex = self._loaded.get(place)
+            if vertex is None:
+                del self._bodies[place]
+                continue
+            new_body = encode_vertex(encode, vertex)
+            if new_body != body:
+                bodies[place] = new_body
+
+        if bodies:
+            begin(self.connection)
+            self.connection.executemany(
+                "UPDATE vertices SET body = ? WHERE place = ?",
+                ((body, place) for place, body in bodies.items()),
+            )
+            for place, body in bodies.items():
+                self._watch(place, self._loaded[place], body)
+        self._dirty = {}
+        # The vertices that are not referenced anymore can now be freed.
+        self._held = {}
+
+    def detach(self) -> None:
+        """Detach the loaded vertices from the database."""
+        for vertex in list(self._loaded.values()):
+            vertex._db = None
+        self._loaded = weakref.WeakValueDictionary()
+        self._dirty = {}
+        self._bodies = {}
+        self._held = {}
+
+
+class EdgeTable:
+    """The edges of a SQLiteDocNetDB, stored in the edges table.
+
+    It has the methods of the EdgeStore that the DocNetDB uses, and the rows
+    are the ids of the records. Like in the EdgeStore, the plain Edge
+    objects are created when the edges are read, and the objects of the
+    Edge subclasses are kept.
+    """
+
+    def __init__(
+        self,
+        connection: sqlite3.Connection,
+        make_edge: Optional[Callable[[Sequence], Edge]],
+    ) -> None:
+        """Init an EdgeTable on an open connection.
+
+        Parameters
+        ----------
+        connection : sqlite3.Connection
+            The connection to the file.
+        make_edge : Callable[[Sequence], Edge], optional
+            The callable that creates an Edge from a pack, or None if the
+            edges are plain edges.
+        """
+        self.connection = connection
+        self._make_edge = make_edge
+        self._encode = json.JSONEncoder().encode
+        self._encode_properties = json.JSONEncoder(ensure_ascii=False).encode
+        self._objects: Dict[int, Edge] = {}
+        # The number of modifications of the edges, like in the EdgeStore.
+        self.version = 0
+        self.hub_threshold: Optional[int] = None
+
+    def __len__(self) -> int:
+        """Return the number of stored edges."""
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM edges"
+        ).fetchone()[0]
+
+    # RECORD METHODS
+
+    def records(
+        self, where: str = "1", parameters: Dict[str, Any] = None
+    ) -> Iterator[EdgeRecord]:
+        """Iterate over the records that match a condition, in order.
+
+        The records are read by batches, so the table can be modified
+        during the iteration.
+
+        Parameters
+        ----------
+        where : str, optional
+            The SQL condition on the columns, with named parameters (all
+            the records by default).
+        parameters : Dict[str, Any], optional
+            The values of the named parameters.
+        """
+        parameters = dict(parameters or {}, batch_size=BATCH_SIZE)
+        parameters["last_id"] = 0
+        query = (
+            f"SELECT {EDGE_COLUMNS} FROM edges "
+            f"WHERE id > :last_id AND ({where}) ORDER BY id LIMIT :batch_size"
+        )
+        while True:
+            records = self.connection.execute(query, parameters).fetchall()
+            yield from records
+            if len(records) < BATCH_SIZE:
+                return
+            parameters["last_id"] = records[-1][0]
+
+    def materialize_record(
+        self, record: EdgeRecord, vertices: VertexTable
+    ) -> Edge:
+        """Return an inserted Edge for a record.
+
+        Returns
+        -------
+        Edge
+            The kept object for the Edge subclasses, else a new Edge.
+        """
+        row, start, end, label, has_direction, pack, properties = record
+        edge = self._objects.get(row)
+        if edge is not None:
+            return edge
+        if properties is not None:
+            properties = json.loads(properties)
+        if self._make_edge is None and pack is None:
+            return Edge._from_row(
+                vertices[start],
+                vertices[end],
+                label,
+                bool(has_direction),
+                properties,
+            )
+        if pack is None:
+            plain_pack: Tuple = (start, end, label, bool(has_direction))
+            if properties is not None:
+                plain_pack += (properties,)
+            edge = self._make_edge(plain_pack)
+        else:
+            edge = self._make_edge(json.loads(pack))
+        edge.is_inserted = True
+        self._objects[row] = edge
+        return edge
+
+    # EDGESTORE METHODS
+
+    def rows(self) -> Iterator[int]:
+        """Iterate over the rows, in order."""
+        return (record[0] for record in self.records())
+
+    def label_rows(self, label: str) -> Iterator[int]:
+        """Iterate over the rows of a label, in order."""
+        return (
+            record[0]
+            for record in self.records("label = :label", {"label": label})
+        )
+
+    def place_pairs(self, label: str = None) -> List[Tuple[int, int]]:
+        """Return the start and end places of the edges, or of a label."""
+        if label is None:
+            cursor = self.connection.execute(
+                "SELECT start_place, end_place FROM edges ORDER BY id"
+            )
+        else:
+            cursor = self.connection.execute(
+                "SELECT start_place, end_place FROM edges "
+                "WHERE label = ? ORDER BY id",
+                (label,),
+            )
+        return cursor.fetchall()
+
+    def edge_ends(self, label: str = None) -> List[Tuple[int, int, bool]]:
+        """Return the places and direction of the edges, or of a label."""
+        query = "SELECT start_place, end_place, has_direction FROM edges"
+        if label is None:
+            cursor = self.connection.execute(f"{query} ORDER BY id")
+        else:
+            cursor = self.connection.execute(
+                f"{query} WHERE label = ? ORDER BY id", (label,)
+            )
+        return [
+            (start, end, bool(has_direction))
+            for start, end, has_direction in cursor
+        ]
+
+    def property_values(self, key: str, label: str = None) -> List[Any]:
+        """Return the values of a property, in the order of edge_ends.
+
+        The value of the edges without the property is None.
+        """
+        query = "SELECT properties FROM edges"
+        if label is None:
+            cursor = self.connection.execute(f"{query} ORDER BY id")
+        else:
+            cursor = self.connection.execute(
+                f"{query} WHERE label = ? ORDER BY id", (label,)
+            )
+        return [
+            None if properties is None else json.loads(properties).get(key)
+            for properties, in cursor
+        ]
+
+    def label_count(self, label: str) -> int:
+        """Return the number of stored edges with a label.
+
+        The edges are counted in the index of the labels.
+        """
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM edges WHERE label = ?", (label,)
+        ).fetchone()[0]
+
+    def label_counts(self) -> Dict[str, int]:
+        """Return the number of stored edges of each used label."""
+        return dict(
+            self.connection.execute(
+                "SELECT label, COUNT(*) FROM edges GROUP BY label"
+            )
+        )
+
+    def find_records(
+        self, key: str, predicate: Callable[[Any], bool]
+    ) -> Iterator[EdgeRecord]:
+        """Iterate over the records whose property passes a function.
+
+        The properties are decoded and checked in Python, for the lookups
+        that SQLite can't do.
+        """
+        return (
+            record
+            for record in self.records("properties IS NOT NULL")
+            if predicate(json.loads(record[6]).get(key, _MISSING))
+        )
+
+    def create_index(self, key: str, kind: str = "hash") -> None:
+        """Index a property, replacing its current index.
+
+        Both kinds are B-tree indexes on the property, the kind is only
+        kept in the name of the index.
+
+        Raises
+        ------
+        ValueError
+            If ``kind`` is neither 'hash' nor 'sorted', or if SQLite can't
+            find the key in a path.
+        """
+        if kind not in INDEX_CLASSES:
+            raise ValueError("kind is either 'hash' or 'sorted'")
+        if property_path(key) is None:
+            raise ValueError(f"The key {key!r} can't be indexed in SQLite")
+        if key in self.index_kinds():
+            self.drop_index(key)
+        execute_write(self.connection, property_index_sql(key, kind))
+
+    def drop_index(self, key: str) -> None:
+        """Drop the index of a property, or raise a KeyError."""
+        kind = self.index_kinds()[key]
+        name = PROPERTY_INDEX_PREFIX + kind + "_" + key.encode().hex()
+        execute_write(self.connection, f"DROP INDEX {name}")
+
+    def index_kinds(self) -> Dict[str, str]:
+        """Return the kind of the index of each indexed property."""
+        kinds = {}
+        for (name,) in self.connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' "
+            "AND substr(name, 1, ?) = ?",
+            (len(PROPERTY_INDEX_PREFIX), PROPERTY_INDEX_PREFIX),
+        ):
+            kind, __, hex_key = name[len(PROPERTY_INDEX_PREFIX) :].partition(
+                "_"
+            )
+            kinds[bytes.fromhex(hex_key).decode()] = kind
+        return kinds
+
+    def pack(self, row: int) -> Tuple:
+        """Return the pack of the edge of a row."""
+        edge = self._objects.get(row)
+        if edge is not None:
+            return edge.pack()
+        (
+            __,
+            start,
+            end,
+            label,
+            has_direction,
+            pack,
+            properties,
+        ) = self.connection.execute(
+            f"SELECT {EDGE_COLUMNS} FROM edges WHERE id = ?", (row,)
+        ).fetchone()
+        if pack is not None:
+            return tuple(json.loads(pack))
+        plain_pack: Tuple = (start, end, label, bool(has_direction))
+        if properties is not None:
+            plain_pack += (json.loads(properties),)
+        return plain_pack
+
+    def packs(self) -> Iterator[Tuple]:
+        """Iterate over the packs of the edges, in order.
+
+        The records are read by batches, without creating Edge objects.
+        """
+        objects = self._objects
+        for (
+            row,
+            start,
+            end,
+            label,
+            has_direction,
+            pack,
+            properties,
+        ) in self.records():
+            edge = objects.get(row)
+            if edge is not None:
+                yield edge.pack()
+            elif pack is not None:
+                yield tuple(json.loads(pack))
+            else:
+                plain_pack: Tuple = (start, end, label, bool(has_direction))
+                if properties is not None:
+                    plain_pack += (json.loads(properties),)
+                yield plain_pack
+
+    def materialize(self, row: int, vertices: VertexTable) -> Edge:
+        """Return an inserted Edge for a row."""
+        record = self.connection.execute(
+            f"SELECT {EDGE_COLUMNS} FROM edges WHERE id = ?", (row,)
+        ).fetchone()
+        return self.materialize_record(record, vertices)
+
+    def has_incident(self, place: int) -> bool:
+        """Return whether a vertex is an end of an edge."""
+        return (
+            self.connection.execute(
+                "SELECT 1 FROM edges WHERE start_place = ? "
+                "UNION ALL SELECT 1 FROM edges WHERE end_place = ? LIMIT 1",
+                (place, place),
+            ).fetchone()
+            is not None
+        )
+
+    def degree(self, place: int, label: str = None) -> int:
+        """Return the number of edges of a place, or of a label.
+
+        The edges are counted in the indexes of the places. A loop is
+        counted once.
+        """
+        if label is None:
+            condition, parameters = "", (place, place)
+        else:
+            condition = " AND label = ?"
+            parameters = (place, label, place, label)
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM ("
+            f"SELECT id FROM edges WHERE start_place = ?{condition} "
+            f"UNION SELECT id FROM edges WHERE end_place = ?{condition})",
+            parameters,
+        ).fetchone()[0]
+
+    def degrees(self) -> Iterator[Tuple[int, int]]:
+        """Iterate over the places that have edges, and their degree."""
+        return iter(
+            self.connection.execute(
+                "SELECT place, COUNT(*) FROM ("
+                "SELECT start_place AS place FROM edges UNION ALL "
+                "SELECT end_place FROM edges WHERE end_place != start_place"
+                ") GROUP BY place ORDER BY place"
+            )
+        )
+
+    def set_hub_threshold(self, threshold: Optional[int]) -> None:
+        """Set the degree from which a place is a hub, or None for no hubs.
+
+        The edges of a place are already found in the indexes of the
+        table, so the edges of the hubs are not partitioned.
+        """
+        self.hub_threshold = threshold
+
+    def hubs(self) -> List[int]:
+        """Return the places whose degree reached the hub threshold."""
+        threshold = self.hub_threshold
+        if threshold is None:
+            return []
+        return [
+            place for place, degree in self.degrees() if degree >= threshold
+        ]
+
+    def rows_touching(self, places: Set[int]) -> List[int]:
+        """Return the rows that have a vertex at one of some places.
+
+        The rows of each place are found with the indexes, in order.
+        """
+        rows: Set[int] = set()
+        for place in places:
+            rows.update(
+                row
+                for (row,) in self.connection.execute(
+                    "SELECT id FROM edges WHERE start_place = ? "
+                    "UNION SELECT id FROM edges WHERE end_place = ?",
+                    (place, place),
+                )
+            )
+        return sorted(rows)
+
+    def find(
+        self, start: int, end: int, label: str, has_direction: bool
+    ) -> Optional[int]:
+        """Return the first row of an edge with these values, or None."""
+        record = self.connection.execute(
+            "SELECT id FROM edges WHERE start_place = ? AND end_place = ? "
+            "AND label = ? AND has_direction = ? ORDER BY id LIMIT 1",
+            (start, end, label, has_direction),
+        ).fetchone()
+        return None if record is None else record[0]
+
+    def add(self, edge: Edge) -> int:
+        """Store an Edge in a new row and return the row.
+
+        The object is kept too if it is an instance of an Edge subclass.
+        """
+        plain = type(edge) is Edge
+        cursor = execute_write(
+            self.connection,
+            "INSERT INTO edges (start_place, end_place, label, "
+            "has_direction, pack, properties) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                edge.start.place,
+                edge.end.place,
+                edge.label,
+                edge.has_direction,
+                None if plain else self._encode(edge.pack()),
+                encode_properties(self._encode_properties, edge._properties),
+            ),
+        )
+        row = cursor.lastrowid
+        if not plain:
+            self._objects[row] = edge
+        self.version += 1
+        return row
+
+    def remove_row(self, row: int) -> Tuple[int, int, Optional[Edge], Tuple]:
+        """Delete a row.
+
+        Returns
+        -------
+        Tuple[int, int, Optional[Edge], Tuple]
+            What is needed to restore the row with ``restore_row`` : the
+            start and end places, the kept Edge object and the record.
+        """
+        record = self.connection.execute(
+            f"SELECT {EDGE_COLUMNS} FROM edges WHERE id = ?", (row,)
+        ).fetchone()
+        execute_write(
+            self.connection, "DELETE FROM edges WHERE id = ?", (row,)
+        )
+        self.version += 1
+        return (record[1], record[2], self._objects.pop(row, None), record)
+
+    def restore_row(
+        self, row: int, token: Tuple[int, int, Optional[Edge], Tuple]
+    ) -> None:
+        """Restore a deleted row, with the same id."""
+        __, __, edge, record = token
+        execute_write(
+            self.connection,
+            f"INSERT INTO edges ({EDGE_COLUMNS}) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            record,
+        )
+        if edge is not None:
+            self._objects[row] = edge
+        self.version += 1
+
+    def compact(self) -> None:
+        """Do nothing, as the deleted rows take no room in the table."""
+
+    def flush(self) -> None:
+        """Write the packs of the kept Edge objects.
+
+        Like in a JSON file, the pack of an Edge subclass is the one it has
+        when the database is saved.
+        """
+        if self._objects:
+            encode = self._encode
+            begin(self.connection)
+            self.connection.executemany(
+                "UPDATE edges SET pack = ? WHERE id = ?",
+                (
+                    (encode(edge.pack()), row)
+                    for row, edge in self._objects.items()
+                ),
+            )
+
+
+class SQLiteDocNetDB(DocNetDB):
+    """A DocNetDB that is stored in a SQLite file.
+
+    It has the same API as the DocNetDB, but it only loads the vertices and
+    edges that are read. The modifications are written to the file in a
+    SQLite transaction, and committed on ``save`` : until then, the file is
+    locked for the other writers.
+
+    The changes of the attributes of a kept instance of an Edge subclass
+    are written on save, like in a JSON file.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, pathlib.Path],
+        vertex_creation_callable: Callable[..., Vertex] = None,
+        edge_creation_callable: Callable[..., Edge] = None,
+        metrics: bool = False,
+    ) -> None:
+        """Init a SQLiteDocNetDB.
+
+        Parameters
+        ----------
+        path : Union[str, pathlib.Path]
+            The path to the SQLite file. If it doesn't exist, it will be
+            created on the next save.
+
+        The other parameters are the parameters of the DocNetDB. The
+        partial load options are not needed, as the vertices and edges are
+        loaded when they are read.
+        """
+        self._connection: Optional[sqlite3.Connection] = None
+        # The path of the open file, None while the tables are in memory.
+        self._file_path: Optional[pathlib.Path] = None
+        super().__init__(
+            path,
+            vertex_creation_callable,
+            edge_creation_callable,
+            metrics,
+            compression=None,
+        )
+
+    def _use_defaults(self) -> None:
+        """Reset the database attributes."""
+        self._next_place = 1
+        # The changes of the fields are always watched, to write the
+        # modified vertices.
+        self._watching_fields = True
+
+    # LOAD AND SAVE METHODS
+
+    def load(self) -> None:
+        """Open the file, and forget the unsaved modifications.
+
+        This method is called on instantiation. Until the first save of a
+        new database, the tables are in memory.
+        """
+        self.close()
+        self._use_defaults()
+
+        if self.path.exists():
+            self._file_path = self.path
+            connection = connect(str(self.path))
+        else:
+            connection = connect(":memory:")
+        connection.executescript(SCHEMA.format(schema=""))
+        self._connection = connection
+
+        adoptable_class = self._adoptable_vertex_class()
+        make_vertex = (
+            self.make_vertex
+            if adoptable_class is None
+            else adoptable_class._adopt
+        )
+        self._vertices = VertexTable(connection, make_vertex, self)
+        self._edges = EdgeTable(
+            connection,
+            None
+            if self._edges_are_plain()
+            else lambda pack: self.make_edge(pack, self),
+        )
+        self._edges.set_hub_threshold(self._hub_threshold)
+
+        row = connection.execute(
+            "SELECT value FROM meta WHERE key = '_next_place'"
+        ).fetchone()
+        if row is not None:
+            self._next_place = row[0]
+
+        self._loaded()
+
+    def close(self) -> None:
+        """Close the file, and forget the unsaved modifications.
+
+        The loaded vertices are detached from the database.
+        """
+        if self._connection is None:
+            return
+        self._vertices.detach()
+        self._connection.close()
+        self._connection = None
+        self._file_path = None
+
+    def save(self) -> None:
+        """Commit the modifications to the file.
+
+        During a transaction, the save is deferred until the transaction is
+        committed.
+        """
+        self._check_writable()
+
+        if self._undo_log is not None:
+            self._save_deferred = True
+            return
+
+        connection = self._connection
+        self._vertices.flush()
+        self._edges.flush()
+        execute_write(
+            connection,
+            "INSERT OR REPLACE INTO meta VALUES ('_next_place', ?)",
+            (self._next_place,),
+        )
+        connection.execute("COMMIT")
+
+        # A new database, or a database whose path was changed, is copied
+        # to its file.
+        if self._file_path != self.path:
+            self._create_file()
+
+    def _create_file(self) -> None:
+        """Copy the tables to a new file, then use the file.
+
+        The tables are copied to a temporary file that then replaces the
+        file at the path.
+        """
+        if not self.path.parent.exists():
+            self.path.parent.mkdir(parents=True)
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+        if temp_path.exists():
+            temp_path.unlink()
+
+        connection = self._connection
+        connection.execute("ATTACH DATABASE ? AS file", (str(temp_path),))
+        connection.executescript(SCHEMA.format(schema="file."))
+        for key, kind in self._edges.index_kinds().items():
+            connection.execute(property_index_sql(key, kind, "file."))
+        connection.execute("BEGIN")
+        for table in ("meta", "vertices", "edges"):
+            connection.execute(
+                f"INSERT INTO file.{table} SELECT * FROM {table}"
+            )
+        connection.execute("COMMIT")
+        connection.close()
+        os.replace(temp_path, self.path)
+
+        # The tables keep their objects, but use the file.
+        connection = connect(str(self.path))
+        self._connection = connection
+        self._file_path = self.path
+        self._vertices.connection = connection
+        self._edges.connection = connection
+
+    # MODIFICATION METHODS
+
+    def _field_changed(
+        self, vertex: Vertex, key: Any, old: Any, new: Any
+    ) -> None:
+        """Override the _field_changed method to keep the Vertex."""
+        self._vertices.mark_dirty(vertex)
+        super()._field_changed(vertex, key, old, new)
+
+    def _end_transaction(self) -> None:
+        """Override the _end_transaction method to keep watching fields."""
+        super()._end_transaction()
+        self._watching_fields = True
+
+    # EDGES ITERATION METHODS
+
+    def edges(self, label: str = None) -> Iterator[Edge]:
+        """Override the edges method to read the records by batches."""
+        edges, vertices = self._edges, self._vertices
+        if label is None:
+            records = edges.records()
+        else:
+            records = edges.records("label = :label", {"label": label})
+        return (
+            edges.materialize_record(record, vertices) for record in records
+        )
+
+    def search_edge(
+        self,
+        v1: Vertex,
+        v2: Vertex = None,
+        label: str = None,
+        direction: str = "all",
+        where: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ) -> Iterator[Edge]:
+        """Override the search_edge method to filter the edges in SQL.
+
+        The parameters are the same, and the edges are found with the
+        indexes on the start and end places. The properties are checked by
+        ``where`` in Python.
+        """
+        if v1 not in self or (v2 is not None and v2 not in self):
+            return iter(())
+        records = self._edge_candidates(v1, v2, label, direction)
+        if where is not None:
+            records = (
+                record
+                for record in records
+                if properties_pass(
+                    where, {} if record[6] is None else json.loads(record[6])
+                )
+            )
+        return (self._anchored_record(record, v1) for record in records)
+
+    def _edge_candidates(
+        self,
+        v1: Vertex,
+        v2: Vertex = None,
+        label: str = None,
+        direction: str = "all",
+    ) -> Iterator[EdgeRecord]:
+        """Return the records of the edges that ``search_edge`` returns."""
+        # The loops are outgoing edges.
+        outgoing = "start_place = :place"
+        incoming = "end_place = :place AND start_place != :place"
+        if v2 is not None:
+            outgoing += " AND end_place = :other"
+            incoming += " AND start_place = :other"
+
+        if direction == "all":
+            where = f"({outgoing}) OR ({incoming})"
+        elif direction == "none":
+            where = f"NOT has_direction AND (({outgoing}) OR ({incoming}))"
+        elif direction == "out":
+            where = f"has_direction AND {outgoing}"
+        elif direction == "in":
+            where = f"has_direction AND {incoming}"
+        else:
+            return iter(())
+
+        if label is not None:
+            where = f"({where}) AND label = :label"
+
+        return self._edges.records(
+            where,
+            {
+                "place": v1.place,
+                "other": None if v2 is None else v2.place,
+                "label": label,
+            },
+        )
+
+    def _anchored_record(self, record: EdgeRecord, anchor: Vertex) -> Edge:
+        """Create the Edge of a record, with an anchor."""
+        edge = self._edges.materialize_record(record, self._vertices)
+        edge.change_anchor(anchor)
+        return edge
+
+    # EDGE PROPERTY METHODS
+
+    def create_edge_index(self, key: str, kind: str = "hash") -> None:
+        """Override the create_edge_index method to index in the file.
+
+        The index is created in the open SQLite transaction, so it is
+        written to the file by ``save``, and used by the next loads. The
+        keys with a double quote, a backslash or a control character can't
+        be indexed, and raise a ValueError.
+        """
+        self._edges.create_index(key, kind)
+
+    def drop_edge_index(self, key: str) -> None:
+        """Override the drop_edge_index method to drop the SQLite index."""
+        self._edges.drop_index(key)
+
+    def edge_indexes(self) -> Dict[str, str]:
+        """Override the edge_indexes method to read the SQLite indexes."""
+        return self._edges.index_kinds()
+
+    def find_edges(self, key: str, value: Any) -> Iterator[Edge]:
+        """Override the find_edges method to find the edges in SQL.
+
+        The numbers, strings and booleans are compared in SQL, with the
+        index of the property if it has one.
+        """
+        path = property_path(key)
+        if path is None or (
+            sort_key(value) is None and not isinstance(value, bool)
+        ):
+            records = self._edges.find_records(key, lambda v: v == value)
+        else:
+            records = self._edges.records(
+                f"json_extract(properties, {path}) = :value", {"value": value}
+            )
+        return self._materialize_records(records)
+
+    def find_edges_in_range(
+        self,
+        key: str,
+        low: Any = None,
+        high: Any = None,
+        include_low: bool = True,
+        include_high: bool = True,
+    ) -> Iterator[Edge]:
+        """Override the find_edges_in_range method to find them in SQL.
+
+        The range is checked in SQL, with the index of the property if it
+        has one.
+        """
+        value_range = ValueRange(low, high, include_low, include_high)
+        path = property_path(key)
+        if path is None:
+            records = self._edges.find_records(key, lambda v: v in value_range)
+            return self._materialize_records(records)
+
+        value = f"json_extract(properties, {path})"
+        types = (
+            "'integer', 'real'"
+            if value_range.rank == NUMBER_RANK
+            else "'text'"
+        )
+        where = f"json_type(properties, {path}) IN ({types})"
+        if low is not None:
+            where += f" AND {value} {'>=' if include_low else '>'} :low"
+        if high is not None:
+            where += f" AND {value} {'<=' if include_high else '<'} :high"
+        records = self._edges.records(where, {"low": low, "high": high})
+        return self._materialize_records(records)
+
+    def _materialize_records(
+        self, records: Iterator[EdgeRecord]
+    ) -> Iterator[Edge]:
+        """Create the edges of some records."""
+        edges, vertices = self._edges, self._vertices
+        return (
+            edges.materialize_record(record, vertices) for record in records
+        )
+
+
+# CONVERSION FUNCTIONS
+
+
+def convert_to_sqlite(
+    source: Union[str, pathlib.Path],
+    target: Union[str, pathlib.Path],
+    compression: Optional[str] = "infer",
+) -> None:
+    """Convert a JSON database file to a SQLite file.
+
+    The packs are copied as they are, so the vertices and edges keep their
+    places and their order. The target file is written through a temporary
+    file that then replaces it.
+
+    Parameters
+    ----------
+    source : Union[str, pathlib.Path]
+        The path to the JSON file.
+    target : Union[str, pathlib.Path]
+        The path to the SQLite file.
+    compression : str {'gzip', 'bz2', 'lzma'}, optional
+        The compression of the JSON file, like in the DocNetDB ("infer" by
+        default).
+    """
+    source, target = pathlib.Path(source), pathlib.Path(target)
+    packed_data = read_packed_data(
+        source, resolve_compression(compression, source)
+    )
+    next_place = packed_data.pop("_next_place")
+    packed_edges = packed_data.pop("edges")
+    encode = json.JSONEncoder().encode
+
+    if not target.parent.exists():
+        target.parent.mkdir(parents=True)
+    temp_path = target.with_name(target.name + ".tmp")
+    if temp_path.exists():
+        temp_path.unlink()
+
+    connection = sqlite3.connect(str(temp_path), isolation_level=None)
+    try:
+        connection.executescript(SCHEMA.format(schema=""))
+        connection.execute("BEGIN")
+        connection.execute(
+            "INSERT INTO meta VALUES ('_next_place', ?)", (next_place,)
+        )
+        connection.executemany(
+            "INSERT INTO vertices VALUES (?, ?)",
+            (
+                (int(place), encode(pack))
+                for place, pack in packed_data.items()
+            ),
+        )
+        # The packs of the plain edges are rebuilt from the columns.
+        encode_extra = json.JSONEncoder(ensure_ascii=False).encode
+        connection.executemany(
+            "INSERT INTO edges (start_place, end_place, label, "
+            "has_direction, pack, properties) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                _edge_columns(pack, encode, encode_extra)
+                for pack in packed_edges
+            ),
+        )
+        connection.execute("COMMIT")
+    finally:
+        connection.close()
+    os.replace(temp_path, target)
+
+
+def _edge_columns(
+    pack: Sequence,
+    encode: Callable[[Any], str],
+    encode_extra: Callable[[Any], str],
+) -> Tuple:
+    """Return the columns of an edge from its pack.
+
+    The properties are the dict that follows the 4 first values of the
+    pack. A pack that has more than them is an Edge subclass pack, which is
+    kept as it is.
+    """
+    properties = pack[4] if len(pack) > 4 else None
+    if not isinstance(properties, dict):
+        properties = None
+    plain = len(pack) == 4 or (len(pack) == 5 and properties is not None)
+    return (
+        *pack[:4],
+        None if plain else encode(pack),
+        encode_properties(encode_extra, properties),
+    )
+
+
+def convert_to_json(
+    source: Union[str, pathlib.Path],
+    target: Union[str, pathlib.Path],
+    compression: Optional[str] = "infer",
+) -> None:
+    """Convert a SQLite database file to a JSON file.
+
+    The file is written like the DocNetDB saves it, one pack at a time.
+
+    Parameters
+    ----------
+    source : Union[str, pathlib.Path]
+        The path to the SQLite file.
+    target : Union[str, pathlib.Path]
+        The path to the JSON file.
+    compression : str {'gzip', 'bz2', 'lzma'}, optional
+        The compression of the JSON file, like in the DocNetDB ("infer" by
+        default).
+
+    Raises
+    ------
+    FileNotFoundError
+        If the SQLite file doesn't exist.
+    """
+    source, target = pathlib.Path(source), pathlib.Path(target)
+    if not source.exists():
+        raise FileNotFoundError(f"No such file: '{source}'")
+
+    connection = sqlite3.connect(str(source))
+    try:
+        write_atomically(
+            target,
+            lambda file_: _write_tables(file_, connection),
+            resolve_compression(compression, target),
+        )
+    finally:
+        connection.close()
+
+
+def _write_tables(file_: TextIO, connection: sqlite3.Connection) -> None:
+    """Write the tables of a SQLite file in the layout of a JSON file.
+
+    The bodies of the vertices are already JSON, so they are written as
+    they are.
+    """
+    encode = json.JSONEncoder().encode
+    write = file_.write
+
+    write("{")
+    separator = ""
+    for place, body in connection.execute(
+        "SELECT place, body FROM vertices ORDER BY place"
+    ):
+        write(f'{separator}"{place}": {body}')
+        separator = ", "
+
+    row = connection.execute(
+        "SELECT value FROM meta WHERE key = '_next_place'"
+    ).fetchone()
+    write(f'{separator}"_next_place": {encode(1 if row is None else row[0])}')
+
+    write(', "edges": [')
+    separator = ""
+    for (
+        start,
+        end,
+        label,
+        has_direction,
+        pack,
+        properties,
+    ) in connection.execute(
+        "SELECT start_place, end_place, label, has_direction, pack, "
+        "properties FROM edges ORDER BY id"
+    ):
+        if pack is None:
+            pack = encode([start, end, label, bool(has_direction)])
+            if properties is not None:
+                pack = f"{pack[:-1]}, {encode(json.loads(properties))}]"
+        write(separator + pack)
+        separator = ", "
+    write("]}")
@@ -0,0 +1,21 @@
+"""This module defines some tests on the compression benchmark."""
+
+import json
+
+from docnetdb.benchmarks.compression import (
+    COMPRESSIONS,
+    run_compression_benchmark,
+)
+
+
+def test_run_compression_benchmark():
+    """Test if each compression gives a JSON-serializable result."""
+    results = run_compression_benchmark([50])
+    assert [r["compression"] for r in results["results"]] == [
+        "none",
+        *COMPRESSIONS[1:],
+    ]
+    plain = results["results"][0]
+    for result in results["results"][1:]:
+        assert 0 < result["file_size"] < plain["file_size"]
+    json.dumps(results)
@@ -0,0 +1,18 @@
+"""This module defines some tests on the fork benchmark."""
+
+import json
+
+import pytest
+
+from docnetdb.benchmarks.fork import MODES, is_supported, run_fork_benchmark
+
+
+@pytest.mark.skipif(not is_supported(), reason="needs fork and /proc")
+def test_run_fork_benchmark():
+    """Test if each mode gives a JSON-serializable result."""
+    results = run_fork_benchmark(50, workers=1, searches=5)
+    assert [r["mode"] for r in results["results"]] == list(MODES)
+    for result in results["results"]:
+        assert result["worker_shared"] > 0
+        assert result["worker_private"] > 0
+    json.dumps(results)
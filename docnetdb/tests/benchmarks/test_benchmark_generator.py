@@ -0,0 +1,34 @@
+"""This module defines some tests on the synthetic graph generator."""
+
+import random
+
+from docnetdb import DocNetDB
+from docnetdb.benchmarks.generator import generate_graph, power_law_weights
+
+
+def test_generate_graph_is_seeded(tmp_path):
+    """Test if the same seed always gives the same graph."""
+    db1 = generate_graph(DocNetDB(tmp_path / "db1.db"), 200, seed=3)
+    db2 = generate_graph(DocNetDB(tmp_path / "db2.db"), 200, seed=3)
+    db3 = generate_graph(DocNetDB(tmp_path / "db3.db"), 200, seed=4)
+
+    assert list(db1.vertices()) == list(db2.vertices())
+    assert [e.pack() for e in db1.edges()] == [e.pack() for e in db2.edges()]
+    assert [e.pack() for e in db1.edges()] != [e.pack() for e in db3.edges()]
+
+
+def test_generate_graph_sizes(tmp_path):
+    """Test if the generated graph has the requested sizes and no loops."""
+    db = generate_graph(DocNetDB(tmp_path / "db.db"), 100, edge_factor=3)
+    assert len(db) == 100
+    edges = list(db.edges())
+    assert len(edges) == 300
+    assert all(edge.start is not edge.end for edge in edges)
+    assert all(isinstance(v["score"], float) for v in db)
+
+
+def test_power_law_weights():
+    """Test if a few weights are much bigger than the others."""
+    weights = sorted(power_law_weights(1000, random.Random(0)), reverse=True)
+    assert weights[0] == 1
+    assert weights[0] > 50 * weights[500]
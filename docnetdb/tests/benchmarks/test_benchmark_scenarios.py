@@ -0,0 +1,67 @@
+"""This module defines some tests on the benchmark scenarios."""
+
+import json
+
+from docnetdb.benchmarks.__main__ import main
+from docnetdb.benchmarks.compare import compare_results
+from docnetdb.benchmarks.scenarios import SCENARIOS, run_benchmarks
+
+
+def test_run_benchmarks():
+    """Test if every scenario gives a JSON-serializable result."""
+    results = run_benchmarks([50], ops=5)
+    assert [r["scenario"] for r in results["results"]] == list(SCENARIOS)
+    for result in results["results"]:
+        assert result["size"] == 50
+        assert result["time"] >= 0
+        assert result["peak_memory"] > 0
+    json.dumps(results)
+
+
+def test_benchmarks_main(tmp_path):
+    """Test if the command line writes the results to a file."""
+    output = tmp_path / "results.json"
+    main(
+        [
+            "--sizes",
+            "20",
+            "--scenarios",
+            "load",
+            "save",
+            "--no-memory",
+            "--output",
+            str(output),
+        ]
+    )
+    with open(output) as file_:
+        results = json.load(file_)
+    assert [r["scenario"] for r in results["results"]] == ["load", "save"]
+    assert results["results"][0]["peak_memory"] is None
+
+
+def test_compare_results():
+    """Test if the comparison flags the regressions."""
+
+    def run(load_time, save_time):
+        return {
+            "results": [
+                {
+                    "scenario": "load",
+                    "size": 10,
+                    "time": load_time,
+                    "peak_memory": 100,
+                },
+                {
+                    "scenario": "save",
+                    "size": 10,
+                    "time": save_time,
+                    "peak_memory": None,
+                },
+            ]
+        }
+
+    rows = compare_results(run(1.0, 1.0), run(1.05, 2.0), threshold=0.1)
+    assert [row["regression"] for row in rows] == [False, True]
+    assert rows[1]["time_change"] == 1.0
+    assert rows[0]["memory_change"] == 0
+    assert rows[1]["memory_change"] is None
@@ -0,0 +1,192 @@
+"""This module defines some tests on the bulk import and export."""
+
+import gzip
+import json
+import pathlib
+
+import pytest
+
+from docnetdb import DocNetDB, Edge, Vertex
+from docnetdb.bulk import (
+    BulkLoader,
+    export_edges,
+    export_vertices,
+    parse_batch,
+    record_texts,
+    resolve_format,
+)
+from docnetdb.sharded import ShardedDocNetDB
+from docnetdb.sqlite import SQLiteDocNetDB
+
+VERTICES = [
+    {"id": "a", "name": "Ada"},
+    {"id": "b", "name": "Bob", "age": 41},
+    {"id": "c", "name": "Cy\nLine", "tags": ["x"]},
+]
+
+EDGES = [
+    {"start": "a", "end": "b", "label": "knows", "since": 2001},
+    {"start": "c", "end": "b", "has_direction": False},
+    {"start": "b", "end": "b", "label": "self"},
+]
+
+
+def write_ndjson(path, records):
+    """Write some records to a NDJSON file."""
+    path.write_text("".join(json.dumps(record) + "\n" for record in records))
+    return path
+
+
+def test_resolve_format():
+    """Test if the format is inferred before the compression extension."""
+    assert resolve_format("infer", pathlib.Path("v.ndjson")) == "ndjson"
+    assert resolve_format("infer", pathlib.Path("v.jsonl.gz")) == "ndjson"
+    assert resolve_format("infer", pathlib.Path("v.CSV")) == "csv"
+    assert resolve_format("csv", pathlib.Path("v.txt")) == "csv"
+    with pytest.raises(ValueError):
+        resolve_format("infer", pathlib.Path("v.gz"))
+    with pytest.raises(ValueError):
+        resolve_format("xml", pathlib.Path("v.csv"))
+
+
+def test_record_texts_and_parse_batch():
+    """Test if the CSV records with line breaks are parsed whole."""
+    lines = ["id,name\n", '1,"two\n', 'lines"\n', "\n", "2,\n", "3,a,b\n"]
+    texts = list(record_texts(lines, "csv"))
+    assert [line for line, __ in texts] == [1, 2, 5, 6]
+    parsed = parse_batch("csv", ["id", "name"], {"id": int}, texts[1:])
+    assert parsed[0] == (2, {"id": 1, "name": "two\nlines"}, None)
+    assert parsed[1] == (5, {"id": 2}, None)
+    assert parsed[2][1] is None and "3 cells" in parsed[2][2]
+
+    parsed = parse_batch(
+        "ndjson", None, {"n": int}, [(1, "[1]"), (2, "{"), (3, '{"n": "x"}')]
+    )
+    assert [record for __, record, __ in parsed] == [None] * 3
+    assert all(error for __, __, error in parsed)
+
+
+@pytest.mark.parametrize(
+    "db_class", [DocNetDB, ShardedDocNetDB, SQLiteDocNetDB]
+)
+def test_bulkloader_ndjson(tmp_path, db_class):
+    """Test if the vertices and edges are inserted with their ids."""
+    db = db_class(tmp_path / "db")
+    loader = BulkLoader(db, batch_size=2)
+    counts = loader.import_vertices(
+        write_ndjson(tmp_path / "v.ndjson", VERTICES)
+    )
+    assert counts == {"inserted": 3, "skipped": 0}
+    assert loader.mapping == {"a": 1, "b": 2, "c": 3}
+    assert db[2] == {"id": "b", "name": "Bob", "age": 41}
+
+    counts = loader.import_edges(write_ndjson(tmp_path / "e.ndjson", EDGES))
+    assert counts == {"inserted": 3, "skipped": 0}
+    assert [edge.pack() for edge in db.edges()] == [
+        (1, 2, "knows", True, {"since": 2001}),
+        (2, 3, "", False),
+        (2, 2, "self", True),
+    ]
+    assert db.degree(db[2]) == 3
+
+    # A new loader finds the ids of the inserted vertices.
+    loader = BulkLoader(db)
+    assert loader.map_vertices() == 3
+    loader.import_edges(write_ndjson(tmp_path / "e2.ndjson", EDGES[:1]))
+    assert db.count_edges() == 4
+
+
+def test_bulkloader_csv(tmp_path):
+    """Test if the CSV cells are converted, and the empty ones left out."""
+    (tmp_path / "v.csv").write_text('id,name,age\n1,Ada,36\n2,"Bob, Jr",\n')
+    (tmp_path / "e.csv").write_text(
+        "start,end,has_direction,weight\n1,2,false,0.5\n2,1,TRUE,\n"
+    )
+    db = DocNetDB(tmp_path / "db.db")
+    loader = BulkLoader(db)
+    loader.import_vertices(
+        tmp_path / "v.csv", converters={"id": int, "age": int}
+    )
+    assert list(db) == [
+        {"id": 1, "name": "Ada", "age": 36},
+        {"id": 2, "name": "Bob, Jr"},
+    ]
+    loader.import_edges(
+        tmp_path / "e.csv",
+        converters={"start": int, "end": int, "weight": float},
+        label="link",
+    )
+    assert [edge.pack() for edge in db.edges()] == [
+        (1, 2, "link", False, {"weight": 0.5}),
+        (2, 1, "link", True),
+    ]
+
+
+def test_bulkloader_errors(tmp_path):
+    """Test if an invalid record stops its batch, or is skipped."""
+    records = VERTICES + [{"id": "a"}, {"name": "no id"}, {"id": "d"}]
+    path = write_ndjson(tmp_path / "v.ndjson", records)
+    db = DocNetDB(tmp_path / "db.db")
+    with pytest.raises(ValueError, match="line 4"):
+        BulkLoader(db, batch_size=3).import_vertices(path)
+    # The first batch was inserted, and none of the second one.
+    assert len(db) == 3
+
+    db = DocNetDB(tmp_path / "db.db")
+    loader = BulkLoader(db, errors="skip")
+    assert loader.import_vertices(path) == {"inserted": 4, "skipped": 2}
+    edges = EDGES + [
+        {"start": "a", "end": "z"},
+        {"start": "a", "end": "b", "has_direction": "maybe"},
+    ]
+    counts = loader.import_edges(write_ndjson(tmp_path / "e.ndjson", edges))
+    assert counts == {"inserted": 3, "skipped": 2}
+
+    with pytest.raises(ValueError):
+        BulkLoader(db, errors="ignore")
+    with pytest.raises(ValueError):
+        BulkLoader(db, batch_size=0)
+
+
+def test_bulkloader_processes(tmp_path):
+    """Test if a process pool parses the batches in order."""
+    records = [{"id": str(index), "n": index} for index in range(50)]
+    path = tmp_path / "v.ndjson.gz"
+    with gzip.open(path, "wt") as file_:
+        file_.writelines(json.dumps(record) + "\n" for record in records)
+    db = DocNetDB(tmp_path / "db.db")
+    loader = BulkLoader(db, batch_size=4, processes=2)
+    assert loader.import_vertices(path)["inserted"] == 50
+    assert [vertex["n"] for vertex in db] == list(range(50))
+
+
+@pytest.mark.parametrize("extension", ["ndjson", "csv.gz"])
+def test_export_round_trip(tmp_path, extension):
+    """Test if the exported files are imported back."""
+    db = DocNetDB(tmp_path / "db.db")
+    v1, v2, v3 = Vertex({"id": "a", "n": 1}), Vertex({"n": 2}), Vertex()
+    for vertex in (v1, v2, v3):
+        db.insert(vertex)
+    db.insert_edge(Edge(v1, v2, "knows", properties={"w": 2}))
+    db.insert_edge(Edge(v3, v2, has_direction=False))
+
+    vertex_path = tmp_path / f"v.{extension}"
+    edge_path = tmp_path / f"e.{extension}"
+    assert export_vertices(db, vertex_path) == 3
+    assert export_edges(db, edge_path) == 2
+
+    copy = DocNetDB(tmp_path / "copy.db")
+    loader = BulkLoader(copy)
+    if extension == "csv.gz":
+        loader.import_vertices(vertex_path, converters={"n": int})
+        loader.import_edges(edge_path, converters={"w": int})
+        assert loader.mapping == {"a": 1, "2": 2, "3": 3}
+        assert copy[2] == {"id": "2", "n": 2}
+    else:
+        loader.import_vertices(vertex_path)
+        loader.import_edges(edge_path)
+        assert loader.mapping == {"a": 1, 2: 2, 3: 3}
+        assert copy[2] == {"id": 2, "n": 2}
+    assert [edge.pack() for edge in copy.edges()] == [
+        edge.pack() for edge in db.edges()
+    ]
@@ -0,0 +1,99 @@
+"""This module defines some tests on the change feed of a DocNetDB."""
+
+import pytest
+
+from docnetdb import DocNetDB, Edge, Vertex
+from docnetdb.changes import MISSING, ChangeFeed
+from docnetdb.exceptions import ChangesLostException
+from docnetdb.sharded import ShardedDocNetDB
+from docnetdb.sqlite import SQLiteDocNetDB
+
+
+def test_changefeed_buffer():
+    """Test if the changes are numbered, kept and replayed from a sequence."""
+    received = []
+    feed = ChangeFeed([received.append], capacity=3)
+    for place in range(1, 6):
+        feed.publish("vertex_inserted", place)
+
+    assert feed.last_sequence == 5
+    assert [change.sequence for change in received] == [1, 2, 3, 4, 5]
+    assert [change.place for change in feed.changes()] == [3, 4, 5]
+    assert [change.sequence for change in feed.changes(since=3)] == [4, 5]
+    assert list(feed.changes(since=5)) == []
+    assert [change.sequence for change in feed.changes(since=2)] == [3, 4, 5]
+    with pytest.raises(ChangesLostException):
+        feed.changes(since=1)
+
+    feed.unsubscribe(received.append)
+    feed.clear()
+    assert list(feed.changes(since=5)) == []
+    with pytest.raises(ChangesLostException):
+        feed.changes(since=4)
+    with pytest.raises(ValueError):
+        ChangeFeed(capacity=0)
+
+
+@pytest.mark.parametrize(
+    "db_class", [DocNetDB, ShardedDocNetDB, SQLiteDocNetDB]
+)
+def test_docnetdb_change_feed(tmp_path, db_class):
+    """Test if the modifications are published as changes."""
+    db = db_class(tmp_path / "db")
+    received = []
+    feed = db.enable_change_feed(received.append)
+    assert db.enable_change_feed() is feed
+
+    v1, v2 = Vertex({"name": "a"}), Vertex()
+    db.insert(v1)
+    db.insert(v2)
+    v1["name"] = "b"
+    del v1["name"]
+    db.insert_edge(Edge(v1, v2, "x", properties={"w": 1}))
+    db.remove_edge(Edge(v1, v2, "x"))
+    db.insert_edge(Edge(v2, v1, "y"))
+    db.remove_many([v2])
+    db.save()
+    db.load()
+
+    assert [tuple(change)[1:] for change in received] == [
+        ("vertex_inserted", 1, None, None, None, None),
+        ("vertex_inserted", 2, None, None, None, None),
+        ("field_changed", 1, "name", "a", "b", None),
+        ("field_changed", 1, "name", "b", MISSING, None),
+        ("edge_inserted", 1, None, None, None, (1, 2, "x", True, {"w": 1})),
+        ("edge_removed", 1, None, None, None, (1, 2, "x", True, {"w": 1})),
+        ("edge_inserted", 2, None, None, None, (2, 1, "y", True)),
+        ("edge_removed", 2, None, None, None, (2, 1, "y", True)),
+        ("vertex_removed", 2, None, None, None, None),
+        ("load", 0, None, None, None, None),
+    ]
+    assert list(feed) == received
+
+    db.disable_change_feed()
+    db[1]["name"] = "c"
+    assert len(received) == 10
+
+
+def test_docnetdb_change_feed_transaction(tmp_path):
+    """Test if the changes of a transaction wait until it is committed."""
+    db = DocNetDB(tmp_path / "db.db")
+    received = []
+    db.enable_change_feed(received.append)
+
+    with db.transaction(save=False):
+        db.insert(Vertex())
+        with pytest.raises(RuntimeError):
+            with db.transaction():
+                db.insert(Vertex())
+                db[1]["name"] = "rolled back"
+                raise RuntimeError()
+        db[1]["name"] = "kept"
+        assert received == []
+
+    assert [(change.kind, change.new) for change in received] == [
+        ("vertex_inserted", None),
+        ("field_changed", "kept"),
+    ]
+    db[1]["name"] = "outside"
+    assert received[-1].new == "outside"
@@ -0,0 +1,107 @@
+"""This module defines some tests on the CompactVertex class."""
+
+import gc
+import json
+import pickle
+
+import pytest
+
+from docnetdb import CompactVertex, DocNetDB, Edge, Vertex
+from docnetdb.compact import _SHAPES
+
+
+def test_compactvertex_dict_api():
+    """Test if a compact vertex behaves like a dict."""
+    v = CompactVertex({"name": "Reflexion", "chapter": 6})
+    assert v.is_compact is True
+    assert v["name"] == "Reflexion"
+    assert v.get("chapter") == 6
+    assert v.get("missing", 1) == 1
+    assert "name" in v and "missing" not in v
+    assert len(v) == 2
+    assert list(v) == ["name", "chapter"]
+    assert list(v.items()) == [("name", "Reflexion"), ("chapter", 6)]
+    assert dict(v) == {"name": "Reflexion", "chapter": 6}
+    assert v == {"name": "Reflexion", "chapter": 6}
+    assert v == Vertex({"name": "Reflexion", "chapter": 6})
+    assert json.loads(json.dumps(v.pack())) == v
+    with pytest.raises(KeyError):
+        v["missing"]
+
+
+def test_compactvertex_shared_shape():
+    """Test if vertices with the same fields share their shape."""
+    v1 = CompactVertex({"name": "a", "age": 1})
+    v2 = CompactVertex.from_pack({"name": "b", "age": 2})
+    v3 = CompactVertex({"age": 3, "name": "c"})
+    assert v1._shape is v2._shape
+    assert v1._shape is not v3._shape
+
+    # The shapes that no vertex uses are forgotten.
+    keys = tuple(CompactVertex({"unique": 1})._shape.keys)
+    gc.collect()
+    assert keys not in _SHAPES
+
+
+def test_compactvertex_slots():
+    """Test if the compact vertex attributes don't need a __dict__."""
+    v = CompactVertex({"name": "a"})
+    v.place = 2
+    assert v.__dict__ == {}
+    # Other attributes can still be set.
+    v.custom = 1
+    assert v.custom == 1
+
+
+def test_compactvertex_modification():
+    """Test if a compact vertex expands on modification."""
+    v = CompactVertex({"name": "a", "age": 1})
+    keys = v.keys()
+    v["age"] = 2
+    v["new"] = True
+    assert v.is_compact is False
+    assert v == {"name": "a", "age": 2, "new": True}
+    assert list(keys) == ["name", "age", "new"]
+
+    v.compact()
+    assert v.is_compact is True
+    assert v == {"name": "a", "age": 2, "new": True}
+    del v["new"]
+    assert v == {"name": "a", "age": 2}
+
+
+def test_compactvertex_pickle():
+    """Test if a compact vertex keeps its row and place when pickled."""
+    v = CompactVertex({"name": "a"})
+    v.place = 3
+    copy = pickle.loads(pickle.dumps(v))
+    assert copy.is_compact is True
+    assert copy._shape is v._shape
+    assert copy == v and copy.place == 3
+
+
+def test_compactvertex_database(tmp_path):
+    """Test if a DocNetDB can load, save and roll back compact vertices."""
+    db = DocNetDB(tmp_path / "db.db")
+    db.insert(Vertex({"name": "a"}))
+    db.insert(Vertex({"name": "b"}))
+    db.insert_edge(Edge(db[1], db[2]))
+    db.save()
+
+    db2 = DocNetDB(
+        tmp_path / "db.db", vertex_creation_callable=CompactVertex.from_pack
+    )
+    assert isinstance(db2[1], CompactVertex)
+    assert db2[1]._shape is db2[2]._shape
+    assert list(db2.search(lambda v: v["name"] == "b")) == [db2[2]]
+    assert len(list(db2.search_edge(db2[1]))) == 1
+
+    with pytest.raises(RuntimeError):
+        with db2.transaction():
+            db2[1]["name"] = "changed"
+            db2[1].compact()
+            raise RuntimeError()
+    assert db2[1] == {"name": "a"}
+
+    db2.save()
+    assert DocNetDB(tmp_path / "db.db")[1] == {"name": "a"}
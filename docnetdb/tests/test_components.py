@@ -0,0 +1,105 @@
+"""This module defines some tests on the component tracker of a DocNetDB."""
+
+import pytest
+
+from docnetdb import DocNetDB, Edge, Vertex
+from docnetdb.exceptions import VertexInsertionException
+from docnetdb.sharded import ShardedDocNetDB
+from docnetdb.sqlite import SQLiteDocNetDB
+
+
+def component_places(tracker):
+    """Return the places of the components of a tracker."""
+    return [
+        [vertex.place for vertex in component]
+        for component in tracker.components()
+    ]
+
+
+@pytest.mark.parametrize(
+    "db_class", [DocNetDB, ShardedDocNetDB, SQLiteDocNetDB]
+)
+def test_docnetdb_components(tmp_path, db_class):
+    """Test if the components follow the insertions and removals."""
+    db = db_class(tmp_path / "db")
+    v1, v2, v3, v4 = (Vertex() for __ in range(4))
+    for vertex in (v1, v2, v3):
+        db.insert(vertex)
+    db.insert_edge(Edge(v1, v2))
+
+    tracker = db.enable_components()
+    assert component_places(tracker) == [[1, 2], [3]]
+    assert tracker.component_of(v1) == tracker.component_of(v2)
+    assert tracker.component_of(v1) != tracker.component_of(v3)
+
+    # The insertions merge the components.
+    db.insert(v4)
+    db.insert_edge(Edge(v4, v3, has_direction=False))
+    assert tracker.component_size(v3) == 2
+    db.insert_edge(Edge(v2, v3))
+    assert tracker.component_size(v1) == 4
+    assert tracker.component_count() == 1
+
+    # The removals split them.
+    db.remove_edge(Edge(v2, v3))
+    assert component_places(tracker) == [[1, 2], [3, 4]]
+    db.remove_many([v1])
+    assert component_places(tracker) == [[2], [3, 4]]
+    db.remove(v2)
+    assert tracker.component_count() == 1
+    with pytest.raises(VertexInsertionException):
+        tracker.component_of(v2)
+
+    db.save()
+    db.load()
+    assert component_places(tracker) == [[3, 4]]
+
+    db.disable_components()
+    db.insert_edge(Edge(db[3], db[3]))
+
+
+def test_docnetdb_components_labels(tmp_path):
+    """Test if only the edges of the tracked labels connect the vertices."""
+    db = DocNetDB(tmp_path / "db.db")
+    v1, v2, v3 = Vertex(), Vertex(), Vertex()
+    for vertex in (v1, v2, v3):
+        db.insert(vertex)
+    tracker = db.enable_components(labels=["same"])
+    db.insert_edge(Edge(v1, v2, "same"))
+    db.insert_edge(Edge(v2, v3, "other"))
+    assert component_places(tracker) == [[1, 2], [3]]
+
+    # A removal of an untracked edge keeps the structure.
+    db.remove_edge(Edge(v2, v3, "other"))
+    assert not tracker._stale
+    db.remove_edge(Edge(v1, v2, "same"))
+    assert tracker.component_size(v1) == 1
+
+
+def test_docnetdb_components_transaction(tmp_path):
+    """Test if the components are right after a rollback."""
+    db = DocNetDB(tmp_path / "db.db")
+    v1, v2 = Vertex(), Vertex()
+    db.insert(v1)
+    db.insert(v2)
+    tracker = db.enable_components()
+    assert tracker.component_count() == 2
+
+    with pytest.raises(RuntimeError):
+        with db.transaction(save=False):
+            db.insert_edge(Edge(v1, v2))
+            assert tracker.component_count() == 1
+            raise RuntimeError
+    assert tracker.component_count() == 2
+
+
+def test_frozen_components(tmp_path):
+    """Test if the components of a frozen database are found."""
+    db = DocNetDB(tmp_path / "db.db")
+    v1, v2, v3 = Vertex(), Vertex(), Vertex()
+    for vertex in (v1, v2, v3):
+        db.insert(vertex)
+    db.insert_edge(Edge(v3, v1))
+    frozen = db.freeze()
+    tracker = frozen.enable_components()
+    assert component_places(tracker) == [[1, 3], [2]]
@@ -0,0 +1,81 @@
+"""This module defines some tests on the compression of the files."""
+
+import io
+import json
+
+import pytest
+
+from docnetdb import DocNetDB, Edge, Vertex
+from docnetdb.compression import load_stream, resolve_compression
+
+
+def make_db(path, **kwargs):
+    """Return a saved DocNetDB with 3 vertices and 2 edges."""
+    db = DocNetDB(path, **kwargs)
+    for index in range(3):
+        db.insert(Vertex({"index": index, "name": f"vertex {index}"}))
+    db.insert_edge(Edge(db[1], db[2], "a"))
+    db.insert_edge(Edge(db[3], db[2], "b", has_direction=False))
+    db.save()
+    return db
+
+
+@pytest.mark.parametrize(
+    "filename, compression, magic",
+    [
+        ("db.json.gz", "infer", b"\x1f\x8b"),
+        ("db.json.bz2", "infer", b"BZh"),
+        ("db.json.xz", "infer", b"\xfd7zXZ"),
+        ("db.db", "gzip", b"\x1f\x8b"),
+        ("db.gz", None, b"{"),
+    ],
+)
+def test_compression_round_trip(tmp_path, filename, compression, magic):
+    """Test if the files are compressed, and loaded back."""
+    path = tmp_path / filename
+    make_db(path, compression=compression)
+    assert path.read_bytes().startswith(magic)
+
+    db = DocNetDB(path, compression=compression)
+    assert [vertex["index"] for vertex in db] == [0, 1, 2]
+    assert [edge.pack() for edge in db.edges()] == [
+        (1, 2, "a", True),
+        (2, 3, "b", False),
+    ]
+    assert db.insert(Vertex()) == 4
+
+
+def test_compression_unknown():
+    """Test if an unknown compression raises a ValueError."""
+    with pytest.raises(ValueError):
+        DocNetDB("db.db", compression="zip")
+
+
+def test_resolve_compression(tmp_path):
+    """Test if the compression is inferred from the extension."""
+    assert resolve_compression("infer", tmp_path / "db.XZ") == "lzma"
+    assert resolve_compression("infer", tmp_path / "db.db") is None
+    assert resolve_compression("bz2", tmp_path / "db.gz") == "bz2"
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 100])
+def test_load_stream(chunk_size):
+    """Test if the streaming decoder gives the result of json.load."""
+    text = (
+        ' {"1": {"a": [1, 2.5e3, "x,]"], "b": {"c": null}}, "e": [],\n'
+        '  "edges": [[1, 2, "a", true], [2, 3, "b\\"", false]] ,'
+        ' "_next_place": 12345 } \n'
+    )
+    data = load_stream(io.StringIO(text), chunk_size)
+    assert data == json.loads(text)
+    assert list(data) == list(json.loads(text))
+
+
+@pytest.mark.parametrize(
+    "text",
+    ['{"a": 1', '{"a": [1, 2}', '{"a": 1}}', '{"a" 1}', "[1]", "{'a': 1}"],
+)
+def test_load_stream_invalid(text):
+    """Test if the invalid files raise a JSONDecodeError."""
+    with pytest.raises(json.JSONDecodeError):
+        load_stream(io.StringIO(text), 2)
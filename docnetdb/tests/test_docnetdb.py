@@ -1,52 +1,66 @@
 """This module defines some tests on the DocNetDB class."""
 
-from collections import Generator
+import json
+from collections.abc import Generator
 from typing import Iterator
 
 import pytest
 
 from docnetdb import DocNetDB, Edge, Vertex, VertexInsertionException
+from docnetdb.examples.edges import ColoredEdge
+from docnetdb.exceptions import ReadOnlyDatabaseException
+from docnetdb.sqlite import SQLiteDocNetDB
+
+
+@pytest.fixture(params=[DocNetDB, SQLiteDocNetDB])
+def db_class(request):
+    """Return the class of each storage backend.
+
+    The tests of the DocNetDB API take it to run on both backends.
+    """
+    return request.param
+
 
 # TEST INIT
 
 
-def test_docnetdb_init_parameters(tmp_path):
+def test_docnetdb_init_parameters(tmp_path, db_class):
     """Test if the DocNetDB init works with a path or a string."""
     # DocNetDB init should work with a path.
-    DocNetDB(tmp_path / "db1.db")
+    db_class(tmp_path / "db1.db")
     # DocNetDB init should work with a str.
-    DocNetDB(str(tmp_path.absolute()) + "/db2.db")
+    db_class(str(tmp_path.absolute()) + "/db2.db")
     # DocNetDB init shouldn't work with another type.
     with pytest.raises(TypeError):
-        DocNetDB(123)
+        db_class(123)
 
 
-def test_docnetdb_init_file_creation(tmp_path):
+def test_docnetdb_init_file_creation(tmp_path, db_class):
     """Test if the DocNetDB init doesn't create a file straight away."""
     path = tmp_path / "dont_create_me.db"
-    DocNetDB(path)
+    db_class(path)
     assert path.exists() is False
 
 
-def test_docnetdb_init_with_subfolder(tmp_path):
+def test_docnetdb_init_with_subfolder(tmp_path, db_class):
     """Test if the DocNetDB init works with non existing subfolders."""
-    DocNetDB(tmp_path / "subfolder" / "db.db")
+    db_class(tmp_path / "subfolder" / "db.db")
 
 
-def test_docnetdb_init_with_used_file(tmp_path):
+def test_docnetdb_init_with_used_file(tmp_path, db_class):
     """Test if the DocNetDB init works even if file is already used."""
     path = tmp_path / "db.db"
-    DocNetDB(path)
-    DocNetDB(path)
+    db_class(path)
+    db_class(path)
 
 
-def test_docnetdb_init_with_nothing(tmp_path):
+def test_docnetdb_init_with_nothing(tmp_path, db_class):
     """Test if the DocNetDB init doesn't create vertices or edges.
 
     If there's no file.
     """
     path = tmp_path / "not_existing_file.db"
-    db = DocNetDB(path)
+    db = db_class(path)
     assert len(db) == 0
     assert len(list(db.edges())) == 0
 
@@ -54,9 +68,9 @@ def test_docnetdb_init_with_nothing(tmp_path):
 # TEST SPECIAL METHODS
 
 
-def test_docnetdb_contains(tmp_path):
+def test_docnetdb_contains(tmp_path, db_class):
     """Test if the DocNetDB __contains__ method works."""
-    db = DocNetDB(tmp_path / "db.db")
+    db = db_class(tmp_path / "db.db")
     v1, v2, v3 = Vertex(), Vertex(), Vertex()
     for vertex in v1, v2:  # Let's not insert v3.
         db.insert(vertex)
@@ -66,18 +80,18 @@ def test_docnetdb_contains(tmp_path):
     assert v3 not in db
 
 
-def test_docnetdb_len(tmp_path):
+def test_docnetdb_len(tmp_path, db_class):
     """Test if the DocNetDB __len___returns the number of inserted vertices."""
-    db = DocNetDB(tmp_path / "db.db")
+    db = db_class(tmp_path / "db.db")
     for __ in range(5):
         db.insert(Vertex())
 
     assert len(db) == 5
 
 
-def test_docnetdb_getitem(tmp_path):
+def test_docnetdb_getitem(tmp_path, db_class):
     """Test if the DocNetDB item-style access returns correct vertices."""
-    db = DocNetDB(tmp_path / "db.db")
+    db = db_class(tmp_path / "db.db")
     v1, v2, v3 = Vertex(), Vertex(), Vertex()
     for vertex in v1, v2, v3:
         db.insert(vertex)
@@ -87,9 +101,9 @@ def test_docnetdb_getitem(tmp_path):
     assert db[3] is v3
 
 
-def test_docnetdb_getitem_non_integer(tmp_path):
+def test_docnetdb_getitem_non_integer(tmp_path, db_class):
     """Test if the DocNetDB item access fails for an non-integer value."""
-    db = DocNetDB(tmp_path / "db.db")
+    db = db_class(tmp_path / "db.db")
     db.insert(Vertex())
 
     with pytest.raises(TypeError):
@@ -97,9 +111,9 @@ def test_docnetdb_getitem_non_integer(tmp_path):
         del v1
 
 
-def test_docnetdb_getitem_not_existing_vertex(tmp_path):
+def test_docnetdb_getitem_not_existing_vertex(tmp_path, db_class):
     """Test if the DocNetDB item access fails if the vertex doesn't exist."""
-    db = DocNetDB(tmp_path / "db.db")
+    db = db_class(tmp_path / "db.db")
     db.insert(Vertex())
 
     with pytest.raises(KeyError):
@@ -110,41 +124,92 @@ def test_docnetdb_getitem_not_existing_vertex(tmp_path):
 # TEST LOAD AND SAVE METHODS
 
 
-def test_docnetdb_save_file_creation(tmp_path):
+def test_docnetdb_save_file_creation(tmp_path, db_class):
     """Test if the DocNetDB save creates a file."""
     path = tmp_path / "file.db"
-    db = DocNetDB(path)
+    db = db_class(path)
     db.save()
     assert path.exists() is True
 
 
-def test_docnetdb_save_with_subfolder(tmp_path):
+def test_docnetdb_save_with_subfolder(tmp_path, db_class):
     """Test if the DocNetDB save creates non-existing subfolders."""
     path = tmp_path / "subfolder" / "db.db"
-    db = DocNetDB(path)
+    db = db_class(path)
     db.save()
     assert path.exists() is True
 
 
-def test_docnetdb_load_vertices(tmp_path):
+def test_docnetdb_save_format(tmp_path):
+    """Test if the DocNetDB save writes the packs of the vertices and edges.
+
+    The vertices that override the pack method are saved with their pack.
+    """
+
+    class UpperVertex(Vertex):
+        def pack(self):
+            return {key.upper(): value for key, value in self.items()}
+
+    path = tmp_path / "db.db"
+    db = DocNetDB(path)
+    db.insert(Vertex({"name": "Prologue", "tags": ["a"]}))
+    db.insert(UpperVertex({"name": "Resurrections"}))
+    db.insert(Vertex())
+    db.insert_edge(Edge(db[1], db[2], "next"))
+    db.save()
+
+    with open(path) as file_:
+        assert json.load(file_) == {
+            "1": {"name": "Prologue", "tags": ["a"]},
+            "2": {"NAME": "Resurrections"},
+            "3": {},
+            "_next_place": 4,
+            "edges": [[1, 2, "next", True]],
+        }
+
+
+def test_docnetdb_load_vertices(tmp_path, db_class):
     """Test if the DocNetDB load restores all the vertices in the object."""
     path = tmp_path / "db.db"
-    db1 = DocNetDB(path)
+    db1 = db_class(path)
     music_names = ["Prologue", "First Steps", "Resurrections"]
     for name in music_names:
         db1.insert(Vertex({"name": name}))
     db1.save()
 
-    db2 = DocNetDB(path)
+    db2 = db_class(path)
     assert len(db1) == len(db2)
     for vertex, target_name in zip(db2.vertices(), music_names):
         assert vertex["name"] == target_name
 
 
-def test_docnetdb_load_edges(tmp_path):
+def test_docnetdb_save_nested_changes(tmp_path, db_class):
+    """Test if the in-place changes of the nested fields are saved."""
+    path = tmp_path / "db.db"
+    db1 = db_class(path)
+    vertex = Vertex({"tags": [], "info": {"n": 1}})
+    db1.insert(vertex)
+    db1.insert(Vertex({"tags": []}))
+    db1.save()
+
+    vertex["tags"].append("x")
+    db1[2]["tags"].append("y")
+    db1.save()
+    vertex["info"]["n"] = 2
+    db1.save()
+
+    db2 = db_class(path)
+    assert db2[1] == {"tags": ["x"], "info": {"n": 2}}
+    assert db2[2] == {"tags": ["y"]}
+    db2[2]["tags"].append("z")
+    db2.save()
+    assert db_class(path)[2] == {"tags": ["y", "z"]}
+
+
+def test_docnetdb_load_edges(tmp_path, db_class):
     """Test if the DocNetDB load restores all the edges in the object."""
     path = tmp_path / "db.db"
-    db1 = DocNetDB(path)
+    db1 = db_class(path)
     v1, v2, v3 = Vertex(), Vertex(), Vertex()
     db1.insert(v1)
     db1.insert(v2)
@@ -153,29 +218,58 @@ def test_docnetdb_load_edges(tmp_path):
     db1.insert_edge(Edge(v3, v2, "edge2", True))
     db1.save()
 
-    db2 = DocNetDB(path)
+    db2 = db_class(path)
     assert list(db2.search_edge(db2[2])) == [
         Edge(db2[1], db2[2], "edge1", False),
         Edge(db2[3], db2[2], "edge2", True),
     ]
 
 
-def test_docnetdb_load_place(tmp_path):
+def test_docnetdb_load_vertex_classes(tmp_path, db_class):
+    """Test if the DocNetDB load uses the overriden vertex factories.
+
+    The plain vertices bypass their __init__, but a class that overrides
+    __init__ or from_pack must still go through it.
+    """
+
+    class PlainVertex(Vertex):
+        pass
+
+    class InitVertex(Vertex):
+        def __init__(self, init_dict=None):
+            super().__init__(init_dict)
+            self.setdefault("created", True)
+
+    path = tmp_path / "db.db"
+    db1 = db_class(path)
+    db1.insert(Vertex({"name": "Prologue"}))
+    db1.save()
+
+    db2 = db_class(path, vertex_creation_callable=PlainVertex.from_pack)
+    assert type(db2[1]) is PlainVertex
+    assert db2[1] == {"name": "Prologue"}
+    assert db2[1].place == 1 and db2[1] in db2
+
+    db3 = db_class(path, vertex_creation_callable=InitVertex.from_pack)
+    assert db3[1] == {"name": "Prologue", "created": True}
+
+
+def test_docnetdb_load_place(tmp_path, db_class):
     """Test if the DocNetDB load restores the state of used places."""
     path = tmp_path / "db.db"
-    db1 = DocNetDB(path)
+    db1 = db_class(path)
     vertex1 = Vertex()
     db1.insert(vertex1)
     db1.remove(vertex1)
     db1.save()
 
-    db2 = DocNetDB(path)
+    db2 = db_class(path)
     assert db2.insert(Vertex()) == 2
 
 
-def test_docnetdb_load_place_reset(tmp_path):
+def test_docnetdb_load_place_reset(tmp_path, db_class):
     """Test if the DocNetDB load with a blank file reset _next_place."""
-    db = DocNetDB(tmp_path / "db1.db")
+    db = db_class(tmp_path / "db1.db")
     for __ in range(3):
         db.insert(Vertex())
     db.save()
@@ -185,13 +279,41 @@ def test_docnetdb_load_place_reset(tmp_path):
     assert db.insert(Vertex()) == 1
 
 
-def test_docnetdb_load_no_duplication(tmp_path):
+def test_docnetdb_load_packed_edges(tmp_path):
+    """Test if the DocNetDB load keeps the plain edges packed until read.
+
+    The undirected edges are still sorted by place.
+    """
+    path = tmp_path / "db.db"
+    with open(path, "w") as file_:
+        json.dump(
+            {
+                "1": {},
+                "2": {},
+                "_next_place": 3,
+                "edges": [[2, 1, "a", False], [2, 1, "b", True]],
+            },
+            file_,
+        )
+
+    db = DocNetDB(path)
+    assert db._edges._objects == {}
+    assert list(db.edges()) == [
+        Edge(db[1], db[2], "a", False),
+        Edge(db[2], db[1], "b", True),
+    ]
+    assert all(edge.is_inserted for edge in db.edges())
+    db.remove_edge(Edge(db[1], db[2], "a", False))
+    assert [edge.label for edge in db.search_edge(db[1])] == ["b"]
+
+
+def test_docnetdb_load_no_duplication(tmp_path, db_class):
     """Test if calling DocNetDB load two times doesn't duplicate anything.
 
     Like the vertices or the edges.
     """
     path = tmp_path / "db.db"
-    db1 = DocNetDB(path)
+    db1 = db_class(path)
     v1, v2 = Vertex(), Vertex()
     db1.insert(v1)
     db1.insert(v2)
@@ -205,21 +327,82 @@ def test_docnetdb_load_no_duplication(tmp_path):
     assert len(list(db1.search_edge(db1[1]))) == 1
 
 
+def make_partial_file(path):
+    """Save a DocNetDB with a few vertices and edges for the partial loads."""
+    db = DocNetDB(path)
+    for index in range(4):
+        db.insert(Vertex({"kind": index % 2, "name": f"v{index}", "x": 1}))
+    db.insert_edge(Edge(db[1], db[2]))
+    db.insert_edge(Edge(db[1], db[3], "same kind"))
+    db.insert(Vertex({"name": "no kind"}))
+    db.save()
+
+
+def test_docnetdb_partial_load(tmp_path):
+    """Test if the DocNetDB load options project and filter the vertices.
+
+    The edges of the skipped vertices are dropped.
+    """
+    path = tmp_path / "db.db"
+    make_partial_file(path)
+
+    db = DocNetDB(
+        path, fields=["name", "kind"], where=lambda v: v["kind"] == 1
+    )
+    assert [vertex.place for vertex in db] == [2, 4]
+    assert db[2] == {"kind": 1, "name": "v1"}
+    assert list(db.edges()) == []
+
+    db = DocNetDB(path, where=lambda v: v["kind"] == 0)
+    assert [vertex.place for vertex in db] == [1, 3]
+    assert [edge.label for edge in db.edges()] == ["same kind"]
+
+    db = DocNetDB(path, edges=False)
+    assert len(db) == 5
+    assert list(db.edges()) == []
+
+
+def test_docnetdb_partial_load_read_only(tmp_path):
+    """Test if a partially loaded DocNetDB can't be modified or saved."""
+    path = tmp_path / "db.db"
+    make_partial_file(path)
+    content = path.read_text()
+
+    assert DocNetDB(path).is_read_only is False
+    db = DocNetDB(path, fields=["name"])
+    assert db.is_read_only is True
+
+    with pytest.raises(ReadOnlyDatabaseException):
+        db.save()
+    with pytest.raises(ReadOnlyDatabaseException):
+        db.insert(Vertex())
+    with pytest.raises(ReadOnlyDatabaseException):
+        db.remove(db[5])
+    with pytest.raises(ReadOnlyDatabaseException):
+        db.insert_edge(Edge(db[4], db[5]))
+    with pytest.raises(ReadOnlyDatabaseException):
+        db.remove_edge(next(db.edges()))
+    with pytest.raises(ReadOnlyDatabaseException):
+        with db.transaction():
+            pass
+    assert path.read_text() == content
+
+
 # TESTS VERTEX INSERTION AND REMOVAL METHODS
 
 
-def test_docnetdb_insert_incrementation(tmp_path):
+def test_docnetdb_insert_incrementation(tmp_path, db_class):
     """Test if the DocNetDB insert returns incrementing places."""
-    db = DocNetDB(tmp_path / "db.db")
+    db = db_class(tmp_path / "db.db")
     v1, v2, v3 = Vertex(), Vertex(), Vertex()
     assert db.insert(v1) == 1
     assert db.insert(v2) == 2
     assert db.insert(v3) == 3
 
 
-def test_docnetdb_insert_place_affectation(tmp_path):
+def test_docnetdb_insert_place_affectation(tmp_path, db_class):
     """Test_if the DocNetDB insert assigns the correct place to vertices."""
-    db = DocNetDB(tmp_path / "db.db")
+    db = db_class(tmp_path / "db.db")
     v1, v2, v3 = Vertex(), Vertex(), Vertex()
     for vertex in v1, v2, v3:
         db.insert(vertex)
@@ -228,9 +411,9 @@ def test_docnetdb_insert_place_affectation(tmp_path):
     assert v3.place == 3
 
 
-def test_docnetdb_insert_double_insertion_error(tmp_path):
+def test_docnetdb_insert_double_insertion_error(tmp_path, db_class):
     """Test if the DocNetDB insert refuses inserted vertices."""
-    db = DocNetDB(tmp_path / "db.db")
+    db = db_class(tmp_path / "db.db")
     v1 = Vertex()
     db.insert(v1)
 
@@ -238,19 +421,19 @@ def test_docnetdb_insert_double_insertion_error(tmp_path):
         db.insert(v1)
 
 
-def test_docnetdb_insert_parameter(tmp_path):
+def test_docnetdb_insert_parameter(tmp_path, db_class):
     """Test if the DocNetDB insert fails if the parameter is not a Vertex."""
-    db = DocNetDB(tmp_path / "db.db")
+    db = db_class(tmp_path / "db.db")
     with pytest.raises(TypeError):
         db.insert("this is not valid")
 
 
-def test_docnetdb_insert_always_increments(tmp_path):
+def test_docnetdb_insert_always_increments(tmp_path, db_class):
     """Test if the DocNetDB insert always uses a new place.
 
     Even if vertices have been removed, a new place should always be used.
     """
-    db = DocNetDB(tmp_path / "db.db")
+    db = db_class(tmp_path / "db.db")
     vertices = [Vertex() for __ in range(5)]
     for vertex in vertices:
         db.insert(vertex)
@@ -258,46 +441,46 @@ def test_docnetdb_insert_always_increments(tmp_path):
     assert db.insert(vertices[4]) == 6
 
 
-def test_docnetdb_remove(tmp_path):
+def test_docnetdb_remove(tmp_path, db_class):
     """Test if the DocNetD remove works properly.
 
     It should remove the vertex from the DocNetDB and return
     the correct place.
     """
-    db = DocNetDB(tmp_path / "db.db")
+    db = db_class(tmp_path / "db.db")
     vertex = Vertex()
     old_place = db.insert(vertex)
     assert db.remove(vertex) == old_place
     assert vertex not in db
 
 
-def test_docnetdb_remove_place_affectation(tmp_path):
+def test_docnetdb_remove_place_affectation(tmp_path, db_class):
     """Test if the DocNetDB remove resets the place of a Vertex."""
-    db = DocNetDB(tmp_path / "db.db")
+    db = db_class(tmp_path / "db.db")
     vertex = Vertex()
     db.insert(vertex)
     db.remove(vertex)
     assert vertex.is_inserted is False
 
 
-def test_docnetdb_remove_not_inserted_vertex(tmp_path):
+def test_docnetdb_remove_not_inserted_vertex(tmp_path, db_class):
     """Test if the DocNetDB remove refuses not inserted vertices."""
-    db = DocNetDB(tmp_path / "db.db")
+    db = db_class(tmp_path / "db.db")
     vertex = Vertex()
     with pytest.raises(VertexInsertionException):
         db.remove(vertex)
 
 
-def test_docnetdb_remove_parameter(tmp_path):
+def test_docnetdb_remove_parameter(tmp_path, db_class):
     """Test if the DocNetDB remove fails if the parameter is not a Vertex."""
-    db = DocNetDB(tmp_path / "db.db")
+    db = db_class(tmp_path / "db.db")
     with pytest.raises(TypeError):
         db.remove("this is not valid")
 
 
-def test_docnetdb_remove_with_edges(tmp_path):
+def test_docnetdb_remove_with_edges(tmp_path, db_class):
     """Test if the DocNetDB remove fails with vertices connected to edges."""
-    db = DocNetDB(tmp_path / "db.db")
+    db = db_class(tmp_path / "db.db")
     v1, v2 = Vertex(), Vertex()
     db.insert(v1)
     db.insert(v2)
@@ -306,12 +489,53 @@ def test_docnetdb_remove_with_edges(tmp_path):
         db.remove(v1)
 
 
+def test_docnetdb_remove_many(tmp_path, db_class):
+    """Test if remove_many removes the vertices and their edges."""
+    db = db_class(tmp_path / "db.db")
+    for __ in range(4):
+        db.insert(Vertex())
+    db.insert_edge(Edge(db[1], db[2], "a"))
+    db.insert_edge(ColoredEdge(db[3], db[2], "b"))
+    db.insert_edge(Edge(db[3], db[4], "c"))
+    db.insert_edge(Edge(db[1], db[1], "d"))
+    v1, v2 = db[1], db[2]
+
+    with pytest.raises(ValueError):
+        db.remove_many([v1, v2], cascade=False)
+    with pytest.raises(VertexInsertionException):
+        db.remove_many([v1, Vertex()])
+    assert len(db) == 4 and db.count_edges() == 4
+
+    with pytest.raises(RuntimeError):
+        with db.transaction(save=False):
+            assert db.remove_many([v1, v2, v1]) == {
+                "vertices": 2,
+                "edges": 3,
+            }
+            assert v1.is_inserted is False
+            assert [edge.label for edge in db.edges()] == ["c"]
+            raise RuntimeError()
+    assert v1.place == 1
+    assert [edge.label for edge in db.edges()] == ["a", "b", "c", "d"]
+
+    db.remove_many([v1, v2])
+    db.save()
+    db = db_class(tmp_path / "db.db")
+    assert [vertex.place for vertex in db] == [3, 4]
+    assert [edge.label for edge in db.edges()] == ["c"]
+    assert db.remove_many([db[4]]) == {"vertices": 1, "edges": 1}
+    assert db.remove_many([db[3]], cascade=False) == {
+        "vertices": 1,
+        "edges": 0,
+    }
+
+
 # TEST VERTICES ITERATION METHODS
 
 
-def test_docnetdb_vertices(tmp_path):
+def test_docnetdb_vertices(tmp_path, db_class):
     """Test if the DocNetDB vertices() returns all inserted vertices."""
-    db = DocNetDB(tmp_path / "db.db")
+    db = db_class(tmp_path / "db.db")
     v1, v2, v3 = Vertex(), Vertex(), Vertex()
     for vertex in v1, v2, v3:
         db.insert(vertex)
@@ -319,9 +543,9 @@ def test_docnetdb_vertices(tmp_path):
     assert list(db.vertices()) == [v1, v2, v3]
 
 
-def test_docnetdb_search(tmp_path):
+def test_docnetdb_search(tmp_path, db_class):
     """Test if the DocNetDB search returns the right vertices."""
-    db = DocNetDB(tmp_path / "db.db")
+    db = db_class(tmp_path / "db.db")
     v1, v2, v3 = Vertex(), Vertex(), Vertex()
     for vertex in v1, v2, v3:
         db.insert(vertex)
@@ -333,9 +557,9 @@ def test_docnetdb_search(tmp_path):
     assert list(result) == [v2]
 
 
-def test_docnetdb_search_return_type(tmp_path):
+def test_docnetdb_search_return_type(tmp_path, db_class):
     """Test if the DocNetDB search returns a generator."""
-    db = DocNetDB(tmp_path / "db.db")
+    db = db_class(tmp_path / "db.db")
 
     def false_func(x):
         return False
@@ -344,9 +568,9 @@ def test_docnetdb_search_return_type(tmp_path):
     assert isinstance(result, Generator) is True
 
 
-def test_docnetdb_search_keyerror_autocatch(tmp_path):
+def test_docnetdb_search_keyerror_autocatch(tmp_path, db_class):
     """Test if the DocNetDB search catches KeyError automatically."""
-    db = DocNetDB(tmp_path / "db.db")
+    db = db_class(tmp_path / "db.db")
     v1 = Vertex({"special_element": "WOW !"})
     v2 = Vertex()
     db.insert(v1)
@@ -361,13 +585,13 @@ def test_docnetdb_search_keyerror_autocatch(tmp_path):
 # TEST EDGE INSERTION AND REMOVAL METHODS
 
 
-def test_docnetdb_insert_edge_exception(tmp_path):
+def test_docnetdb_insert_edge_exception(tmp_path, db_class):
     """Test if the DocNetDB insert_edge raises exceptions.
 
     When vertices are not inserted in the database.
     """
-    db = DocNetDB(tmp_path / "db.db")
-    wrong_db = DocNetDB(tmp_path / "Wrong.db")
+    db = db_class(tmp_path / "db.db")
+    wrong_db = db_class(tmp_path / "Wrong.db")
     v1, v2 = Vertex(), Vertex()
     wrong_db.insert(v1)
     wrong_db.insert(v2)
@@ -385,12 +609,12 @@ def test_docnetdb_insert_edge_exception(tmp_path):
     db.insert_edge(new_edge)
 
 
-def test_docnetdb_remove_edge(tmp_path):
+def test_docnetdb_remove_edge(tmp_path, db_class):
     """Test if the DocNetDB remove_edge removes one corresponding edge.
 
     And only one.
     """
-    db = DocNetDB(tmp_path / "db.db")
+    db = db_class(tmp_path / "db.db")
     v1, v2, v3 = Vertex(), Vertex(), Vertex()
     for vertex in v1, v2, v3:
         db.insert(vertex)
@@ -408,15 +632,88 @@ def test_docnetdb_remove_edge(tmp_path):
     assert list(db.search_edge(v3)) == []
 
 
+# TEST TRANSACTION METHODS
+
+
+def test_docnetdb_transaction_commit(tmp_path, db_class):
+    """Test if a committed DocNetDB transaction is saved once."""
+    path = tmp_path / "db.db"
+    db = db_class(path)
+    with db.transaction():
+        v1, v2 = Vertex({"name": "v1"}), Vertex({"name": "v2"})
+        db.insert(v1)
+        db.insert(v2)
+        db.save()
+        # The save is deferred until the commit.
+        assert path.exists() is False
+        db.insert_edge(Edge(v1, v2))
+
+    db2 = db_class(path)
+    assert len(db2) == 2
+    assert len(list(db2.edges())) == 1
+
+
+def test_docnetdb_transaction_rollback(tmp_path, db_class):
+    """Test if a failed DocNetDB transaction undoes all its operations."""
+    path = tmp_path / "db.db"
+    db = db_class(path)
+    v1, v2, v3 = Vertex({"name": "v1"}), Vertex({"name": "v2"}), Vertex()
+    for vertex in v1, v2, v3:
+        db.insert(vertex)
+    edge = Edge(v1, v2, "link")
+    db.insert_edge(edge)
+    db.insert_edge(Edge(v2, v3))
+
+    with pytest.raises(ValueError):
+        with db.transaction():
+            v4 = Vertex()
+            db.insert(v4)
+            db.insert_edge(Edge(v4, v1))
+            db.remove_edge(Edge(v1, v2, "link"))
+            db.remove(v3)
+            v1["name"] = "changed"
+            v1["new"] = True
+            del v2["name"]
+            v2.update(other=1)
+            v2 |= {"name": "or", "other": 2}
+            # v3 is still connected to v2.
+            db.remove(v3)
+
+    assert list(db.vertices()) == [v1, v2, v3]
+    assert v4.is_inserted is False
+    assert v3.place == 3
+    assert v1 == {"name": "v1"}
+    assert v2 == {"name": "v2"}
+    assert list(db.edges()) == [Edge(v1, v2, "link"), Edge(v2, v3)]
+    assert edge.is_inserted is True
+    assert db.insert(Vertex()) == 4
+    assert path.exists() is False
+
+
+def test_docnetdb_transaction_nested(tmp_path, db_class):
+    """Test if a failed nested DocNetDB transaction keeps the outer one."""
+    db = db_class(tmp_path / "db.db")
+    with db.transaction(save=False):
+        v1 = Vertex()
+        db.insert(v1)
+        with pytest.raises(VertexInsertionException):
+            with db.transaction():
+                v1["name"] = "v1"
+                db.insert(v1)
+        assert v1 == {}
+    assert list(db.vertices()) == [v1]
+    assert db.path.exists() is False
+
+
 # TEST EDGES ITERATION METHODS
 
 
-def test_docnetdb_edges(tmp_path):
+def test_docnetdb_edges(tmp_path, db_class):
     """Test if the DocNetDB edges method returns all the contained edges.
 
     In an Iterable.
     """
-    db = DocNetDB(tmp_path / "db.db")
+    db = db_class(tmp_path / "db.db")
     db.insert(Vertex())
     db.insert(Vertex())
     db.insert(Vertex())
@@ -432,9 +729,40 @@ def test_docnetdb_edges(tmp_path):
     assert list(edges) == [Edge(db[1], db[2]), Edge(db[2], db[3])]
 
 
-def test_docnetdb_search_edge(tmp_path):
+def test_docnetdb_edges_by_label(tmp_path, db_class):
+    """Test if the edges of a label are listed and counted."""
+    db = db_class(tmp_path / "db.db")
+    for __ in range(3):
+        db.insert(Vertex())
+    db.insert_edge(ColoredEdge(db[1], db[2], "ost", color="red"))
+    db.insert_edge(Edge(db[2], db[3], "bridge"))
+    db.insert_edge(Edge(db[3], db[1], "ost"))
+
+    assert [edge.pack() for edge in db.edges(label="ost")] == [
+        (1, 2, "ost", True, "red"),
+        (3, 1, "ost", True),
+    ]
+    assert list(db.edges(label="unknown")) == []
+    assert db.count_edges() == 3
+    assert db.count_edges("ost") == 2
+    assert db.edge_labels() == {"ost": 2, "bridge": 1}
+
+    with pytest.raises(ValueError):
+        with db.transaction(save=False):
+            db.remove_edge(Edge(db[3], db[1], "ost"))
+            db.insert_edge(Edge(db[1], db[3], "new"))
+            assert db.edge_labels() == {"ost": 1, "bridge": 1, "new": 1}
+            raise ValueError()
+    assert db.edge_labels() == {"ost": 2, "bridge": 1}
+
+    db.remove_edge(Edge(db[2], db[3], "bridge"))
+    assert db.count_edges("bridge") == 0
+    assert db.edge_labels() == {"ost": 2}
+
+
+def test_docnetdb_search_edge(tmp_path, db_class):
     """Test if the DocNetDB search_edge returns the right edges."""
-    db = DocNetDB(tmp_path / "db.db")
+    db = db_class(tmp_path / "db.db")
     v1, v2, v3 = Vertex(), Vertex(), Vertex()
     for vertex in v1, v2, v3:
         db.insert(vertex)
@@ -454,9 +782,9 @@ def test_docnetdb_search_edge(tmp_path):
     ]
 
 
-def test_docnetdb_search_edge_parameters(tmp_path):
+def test_docnetdb_search_edge_parameters(tmp_path, db_class):
     """Test if the DocNetDB search_edge parameters are working."""
-    db = DocNetDB(tmp_path / "db.db")
+    db = db_class(tmp_path / "db.db")
     v1, v2, v3 = Vertex(), Vertex(), Vertex()
     for vertex in v1, v2, v3:
         db.insert(vertex)
@@ -489,3 +817,65 @@ def test_docnetdb_search_edge_parameters(tmp_path):
         Edge.from_anchor(anchor=v3, other=v2, label="", direction="in")
     ]
     assert list(db.search_edge(v3, direction="out")) == []
+
+
+def test_docnetdb_edge_properties(tmp_path, db_class):
+    """Test if the edge properties are saved and filtered in searches."""
+    db = db_class(tmp_path / "db.db")
+    for __ in range(3):
+        db.insert(Vertex())
+    db.insert_edge(Edge(db[1], db[2], "road", properties={"weight": 0.9}))
+    db.insert_edge(Edge(db[1], db[3], "road", properties={"weight": 0.2}))
+    db.insert_edge(Edge(db[3], db[1], "road"))
+    db.save()
+
+    db = db_class(tmp_path / "db.db")
+    assert [edge.properties for edge in db.edges()] == [
+        {"weight": 0.9},
+        {"weight": 0.2},
+        {},
+    ]
+    heavy = db.search_edge(db[1], where=lambda p: p["weight"] > 0.5)
+    assert [edge.other.place for edge in heavy] == [2]
+    light = db.search_edge(db[1], direction="out", where=lambda p: True)
+    assert [edge.other.place for edge in light] == [2, 3]
+
+
+@pytest.mark.parametrize("kind", [None, "hash", "sorted"])
+def test_docnetdb_find_edges(tmp_path, db_class, kind):
+    """Test if the edges are found by property, with or without index."""
+    db = db_class(tmp_path / "db.db")
+    for __ in range(4):
+        db.insert(Vertex())
+    if kind is not None:
+        db.create_edge_index("weight", kind)
+        assert db.edge_indexes() == {"weight": kind}
+    for place, weight in (2, 0.9), (3, "heavy"), (4, 0.2):
+        db.insert_edge(Edge(db[1], db[place], properties={"weight": weight}))
+    db.insert_edge(Edge(db[2], db[3], properties={"weight": 1}))
+
+    def ends(edges):
+        return [edge.end.place for edge in edges]
+
+    assert ends(db.find_edges("weight", 0.2)) == [4]
+    assert ends(db.find_edges("weight", "heavy")) == [3]
+    assert ends(db.find_edges("size", 1)) == []
+    assert ends(db.find_edges_in_range("weight", low=0.8)) == [2, 3]
+    assert ends(db.find_edges_in_range("weight", 0.2, 1, False, False)) == [2]
+    assert ends(db.find_edges_in_range("weight", "a", "z")) == [3]
+
+    with pytest.raises(ValueError):
+        with db.transaction(save=False):
+            db.remove_edge(Edge(db[1], db[2]))
+            assert ends(db.find_edges_in_range("weight", low=0.8)) == [3]
+            raise ValueError()
+    assert ends(db.find_edges_in_range("weight", low=0.8)) == [2, 3]
+
+    db.save()
+    db.load()
+    assert ends(db.find_edges_in_range("weight", high=0.5)) == [4]
+    if kind is not None:
+        db.drop_edge_index("weight")
+        assert db.edge_indexes() == {}
+    with pytest.raises(TypeError):
+        db.find_edges_in_range("weight", 0, "z")
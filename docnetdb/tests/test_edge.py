@@ -87,6 +87,9 @@ def test_edge_from_pack(db_3_vertices):
     pack2 = (1, 3, "edge", False)
     assert Edge.from_pack(pack2, db) == Edge(v3, v1, "edge", False)
 
+    pack3 = (1, 2, "edge", True, {"weight": 0.5})
+    assert Edge.from_pack(pack3, db).properties == {"weight": 0.5}
+
 
 # TEST CHECK METHODS
 
@@ -152,6 +155,8 @@ def test_edge_pack(db_3_vertices):
     assert e1.pack() == (2, 3, "edge", True)
     e2 = Edge(v2, v1, has_direction=False)
     assert e2.pack() == (1, 2, "", False)
+    e3 = Edge(v1, v2, properties={"weight": 0.5})
+    assert e3.pack() == (1, 2, "", True, {"weight": 0.5})
 
 
 # TEST PROPERTIES
@@ -174,3 +179,20 @@ def test_edge_properties_read_only(db_3_vertices):
     wrapper("anchor")
     wrapper("other")
     wrapper("direction")
+    wrapper("properties")
+
+
+def test_edge_properties(db_3_vertices):
+    """Test if the properties are copied, read-only and not compared."""
+    db, v1, v2, v3 = db_3_vertices
+    properties = {"weight": 0.5}
+    edge = Edge(v1, v2, properties=properties)
+    properties["weight"] = 1
+    assert edge.properties == {"weight": 0.5}
+    with pytest.raises(TypeError):
+        edge.properties["weight"] = 1
+    assert Edge(v1, v2).properties == {}
+    assert edge == Edge(v1, v2)
+
+    anchored = Edge.from_anchor(v2, v1, direction="in", properties=properties)
+    assert anchored.properties == {"weight": 1}
@@ -0,0 +1,58 @@
+"""This module defines some tests on the indexes of the edge properties."""
+
+import pytest
+
+from docnetdb.edgeindex import HashIndex, SortedIndex, ValueRange, make_index
+
+
+def test_valuerange():
+    """Test if the values of a range are found by type and bounds."""
+    value_range = ValueRange(1, 3, include_high=False)
+    assert [value in value_range for value in (0, 1, 2.5, 3, "2")] == [
+        False,
+        True,
+        True,
+        False,
+        False,
+    ]
+    assert True not in ValueRange(high=5)
+    assert "b" in ValueRange("a", "c")
+
+    with pytest.raises(ValueError):
+        ValueRange()
+    with pytest.raises(TypeError):
+        ValueRange(1, "c")
+    with pytest.raises(TypeError):
+        ValueRange([1])
+
+
+def test_hashindex():
+    """Test if a HashIndex finds the rows of a value, in order."""
+    index = make_index("tag", "hash")
+    assert isinstance(index, HashIndex)
+    for row, value in enumerate(["a", "b", "a", ["unhashable"]]):
+        index.add(row, value)
+    index.remove(0, "a")
+    index.add(0, "a")
+    assert index.find("a") == [0, 2]
+    assert index.find("c") == []
+    assert index.find(["unhashable"]) is None
+    assert index.find_range(ValueRange("a")) is None
+
+
+def test_sortedindex():
+    """Test if a SortedIndex finds the rows of a value and of a range."""
+    index = make_index("weight", "sorted")
+    assert isinstance(index, SortedIndex)
+    for row, value in enumerate([3, 1.5, "x", None, 1.5, 2]):
+        index.add(row, value)
+    index.remove(5, 2)
+    assert index.find(1.5) == [1, 4]
+    assert index.find(None) is None
+    assert index.find_range(ValueRange(1.5, include_low=False)) == [0]
+    assert index.find_range(ValueRange(high=3, include_high=False)) == [1, 4]
+    assert index.find_range(ValueRange("a")) == [2]
+    assert index.find_range(ValueRange(5, 1)) == []
+
+    with pytest.raises(ValueError):
+        make_index("weight", "btree")
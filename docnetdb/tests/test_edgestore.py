@@ -0,0 +1,167 @@
+"""This module defines some tests on the EdgeStore class."""
+
+from docnetdb import DocNetDB, Edge, Vertex
+from docnetdb.edgeindex import ValueRange
+from docnetdb.edgestore import EdgeStore
+
+
+def make_db(tmp_path, count=4):
+    """Return a DocNetDB with some inserted vertices."""
+    db = DocNetDB(tmp_path / "db.db")
+    for __ in range(count):
+        db.insert(Vertex())
+    return db
+
+
+def test_edgestore_rows(tmp_path):
+    """Test if the EdgeStore stores the values of the edges in rows."""
+    db = make_db(tmp_path)
+    store = EdgeStore()
+    assert store.add(Edge(db[1], db[2], "a")) == 0
+    assert store.add(Edge(db[3], db[1], "b", has_direction=False)) == 1
+    assert store.add(Edge(db[2], db[3], "a")) == 2
+
+    assert len(store) == 3
+    assert store.pack(0) == (1, 2, "a", True)
+    # The undirected edges are sorted by place.
+    assert store.pack(1) == (1, 3, "b", False)
+    assert store.direction(0, 1) == "out"
+    assert store.direction(0, 2) == "in"
+    assert store.direction(1, 3) == "none"
+    assert store.other(0, 2) == 1
+    # The labels are interned.
+    assert store.label_id("a") == 0
+    assert store.label_id("c") is None
+    assert list(store.incident_rows(1)) == [0, 1]
+
+
+def test_edgestore_direction_bits(tmp_path):
+    """Test if the direction of many edges is kept in the bit array."""
+    db = make_db(tmp_path)
+    store = EdgeStore()
+    directions = [index % 3 == 0 for index in range(20)]
+    for has_direction in directions:
+        store.add(Edge(db[1], db[2], has_direction=has_direction))
+
+    assert [store.has_direction(row) for row in range(20)] == directions
+
+
+def test_edgestore_remove_restore_compact(tmp_path):
+    """Test if the removed rows are skipped, restored and compacted."""
+    db = make_db(tmp_path)
+    store = EdgeStore()
+    for place in 2, 3, 4:
+        store.add(Edge(db[1], db[place], has_direction=place != 3))
+
+    token = store.remove_row(1)
+    assert len(store) == 2
+    assert list(store.rows()) == [0, 2]
+    assert list(store.incident_rows(3)) == []
+    assert store.has_incident(3) is False
+
+    store.restore_row(1, token)
+    assert list(store.rows()) == [0, 1, 2]
+
+    store.remove_row(0)
+    store.compact()
+    assert store.garbage == 0
+    assert [store.pack(row) for row in store.rows()] == [
+        (1, 3, "", False),
+        (1, 4, "", True),
+    ]
+
+
+def test_edgestore_label_index(tmp_path):
+    """Test if the rows and counts of the labels follow the modifications."""
+    db = make_db(tmp_path)
+    store = EdgeStore()
+    for label in "a", "b", "a":
+        store.add(Edge(db[1], db[2], label))
+    store.extend_packs([(3, 4, "b", True), (4, 3, "c", False)])
+    assert list(store.label_rows("a")) == [0, 2]
+    assert list(store.label_rows("b")) == [1, 3]
+    assert list(store.label_rows("d")) == []
+    assert store.label_counts() == {"a": 2, "b": 2, "c": 1}
+
+    token = store.remove_row(2)
+    store.remove_row(4)
+    assert list(store.label_rows("a")) == [0]
+    assert store.label_count("a") == 1
+    assert store.label_counts() == {"a": 1, "b": 2}
+
+    store.restore_row(2, token)
+    store.remove_row(0)
+    store.compact()
+    assert list(store.label_rows("a")) == [1]
+    assert list(store.label_rows("b")) == [0, 2]
+    assert store.label_count("c") == 0
+
+
+def test_edgestore_property_indexes(tmp_path):
+    """Test if the indexes of the properties follow the modifications."""
+    db = make_db(tmp_path)
+    store = EdgeStore()
+    store.create_index("weight", "sorted")
+    store.add(Edge(db[1], db[2], properties={"weight": 0.5}))
+    store.add(Edge(db[1], db[3]))
+    store.extend_packs(
+        [(2, 3, "", True, {"weight": 0.9}), (3, 4, "", True, {"weight": 2})]
+    )
+    store.create_index("weight_hash", "hash")
+    heavy = ValueRange(0.8)
+    assert store.pack(2) == (2, 3, "", True, {"weight": 0.9})
+    assert store.properties(1) == {}
+    assert store.find_rows("weight", 0.5) == [0]
+    assert store.find_rows_in_range("weight", heavy) == [2, 3]
+
+    token = store.remove_row(2)
+    assert store.find_rows_in_range("weight", heavy) == [3]
+    store.restore_row(2, token)
+    assert store.find_rows_in_range("weight", heavy) == [2, 3]
+
+    store.remove_row(0)
+    store.compact()
+    assert store.find_rows_in_range("weight", heavy) == [1, 2]
+    assert store.find_rows("weight", 0.5) == []
+
+    # Without an index, the properties are scanned.
+    store.drop_index("weight")
+    assert store.find_rows_in_range("weight", heavy) == [1, 2]
+    assert store.find_rows("weight", 2) == [2]
+
+
+def test_edgestore_subclass_objects(tmp_path):
+    """Test if the instances of Edge subclasses are kept.
+
+    The plain edges are created again on each read.
+    """
+
+    class NamedEdge(Edge):
+        pass
+
+    db = make_db(tmp_path)
+    plain = Edge(db[1], db[2])
+    named = NamedEdge(db[2], db[3])
+    named.name = "kept"
+    db.insert_edge(plain)
+    db.insert_edge(named)
+
+    first, second = db.edges()
+    assert first == plain and first is not plain
+    assert first.is_inserted is True
+    assert second is named
+    assert next(db.search_edge(db[3])).name == "kept"
+
+
+def test_docnetdb_remove_edge_while_iterating(tmp_path):
+    """Test if the edges can be removed while the edges are iterated."""
+    db = make_db(tmp_path)
+    for place in 2, 3, 4:
+        db.insert_edge(Edge(db[1], db[place]))
+
+    for edge in db.edges():
+        db.remove_edge(edge)
+
+    assert list(db.edges()) == []
+    db.save()
+    assert list(DocNetDB(db.path).edges()) == []
@@ -0,0 +1,95 @@
+"""This module defines some tests on the FrozenDocNetDB class."""
+
+import pytest
+
+from docnetdb import DocNetDB, Edge, FrozenDocNetDB, SQLiteDocNetDB, Vertex
+from docnetdb.examples.edges import ColoredEdge
+from docnetdb.exceptions import ReadOnlyDatabaseException
+from docnetdb.frozen import freeze_gc
+
+
+def make_db(db):
+    """Fill a database with 3 vertices and 2 edges, then return it."""
+    for index in range(4):
+        db.insert(Vertex({"index": index}))
+    db.remove(db[3])
+    db.insert_edge(Edge(db[4], db[1], "a"))
+    db.insert_edge(Edge(db[2], db[1], "b", has_direction=False))
+    return db
+
+
+@pytest.mark.parametrize("db_class", [DocNetDB, SQLiteDocNetDB])
+def test_frozen_copy(tmp_path, db_class):
+    """Test if a frozen copy reads like the database it was made from."""
+    db = make_db(db_class(tmp_path / "db.db"))
+    frozen = db.freeze()
+    assert isinstance(frozen, FrozenDocNetDB)
+
+    assert len(frozen) == 3
+    assert [vertex.place for vertex in frozen] == [1, 2, 4]
+    assert frozen[4] == {"index": 3}
+    assert frozen[4] is frozen[4]
+    with pytest.raises(KeyError):
+        frozen[3]
+    assert list(frozen.edges()) == [
+        Edge(frozen[4], frozen[1], "a"),
+        Edge(frozen[1], frozen[2], "b", False),
+    ]
+    assert [edge.other.place for edge in frozen.search_edge(frozen[1])] == [
+        4,
+        2,
+    ]
+    assert list(frozen.search(lambda v: v["index"] > 0)) == [
+        frozen[2],
+        frozen[4],
+    ]
+
+
+def test_frozen_read_only(tmp_path):
+    """Test if a frozen copy and its vertices can't be modified."""
+    frozen = make_db(DocNetDB(tmp_path / "db.db")).freeze()
+    assert frozen.is_read_only is True
+
+    with pytest.raises(ReadOnlyDatabaseException):
+        frozen.insert(Vertex())
+    with pytest.raises(ReadOnlyDatabaseException):
+        frozen.remove_edge(next(frozen.edges()))
+    with pytest.raises(ReadOnlyDatabaseException):
+        frozen.save()
+    with pytest.raises(ReadOnlyDatabaseException):
+        frozen[1]["index"] = "changed"
+    with pytest.raises(ReadOnlyDatabaseException):
+        frozen[1].pop("index")
+    assert frozen[1] == {"index": 0}
+
+
+def test_frozen_edge_subclass(tmp_path):
+    """Test if the Edge subclasses are rebuilt from their pack."""
+    db = DocNetDB(
+        tmp_path / "db.db", edge_creation_callable=ColoredEdge.from_pack
+    )
+    db.insert(Vertex())
+    db.insert(Vertex())
+    db.insert_edge(ColoredEdge(db[1], db[2], color="red"))
+
+    frozen = db.freeze()
+    del db
+    freeze_gc()
+    edge = next(frozen.edges())
+    assert type(edge) is ColoredEdge
+    assert edge.color == "red"
+    assert edge.start is frozen[1]
+
+
+def test_frozen_edge_properties(tmp_path):
+    """Test if the edge properties and indexes are copied."""
+    db = make_db(DocNetDB(tmp_path / "db.db"))
+    db.insert_edge(Edge(db[1], db[2], "c", properties={"weight": 0.9}))
+    db.create_edge_index("weight", "sorted")
+    frozen = db.freeze()
+
+    assert frozen.edge_indexes() == {"weight": "sorted"}
+    heavy = frozen.find_edges_in_range("weight", 0.5)
+    assert [edge.label for edge in heavy] == ["c"]
+    heavy = frozen.search_edge(frozen[1], where=lambda p: p["weight"] > 0.5)
+    assert [edge.properties for edge in heavy] == [{"weight": 0.9}]
@@ -0,0 +1,161 @@
+"""This module defines some tests on the hubs and the degrees."""
+
+import random
+
+import pytest
+
+from docnetdb import DocNetDB, Edge, Vertex
+from docnetdb.edgestore import EdgeStore
+from docnetdb.exceptions import VertexInsertionException
+from docnetdb.frozen import FrozenDocNetDB
+from docnetdb.hubs import HubPartition
+from docnetdb.sharded import ShardedDocNetDB
+from docnetdb.sqlite import SQLiteDocNetDB
+
+
+def test_hubpartition():
+    """Test if the rows are kept sorted by label and by other end."""
+    hub = HubPartition(1)
+    for row, label_id, other in [(4, 0, 2), (1, 1, 2), (7, 0, 3), (2, 0, 2)]:
+        hub.add(row, label_id, other)
+    assert len(hub) == 4
+    assert hub.count(0) == 3
+    assert list(hub.rows()) == [1, 2, 4, 7]
+    assert list(hub.rows(0)) == [2, 4, 7]
+    assert list(hub.rows(other=2)) == [1, 2, 4]
+    assert list(hub.rows(0, 2)) == [2, 4]
+    assert list(hub.rows(1, 3)) == []
+
+    hub.remove(4, 0, 2)
+    hub.remove(7, 0, 3)
+    assert list(hub.rows(0)) == [2]
+    assert list(hub.rows(other=3)) == []
+    assert 3 not in hub._by_other
+
+
+def test_edgestore_hubs():
+    """Test if a hub is partitioned once its degree reaches the threshold."""
+    store = EdgeStore()
+    store.set_hub_threshold(3)
+    store.extend_packs([(1, 2, "a", True), (3, 1, "b", True)])
+    assert store.hubs() == []
+    assert store.degree(1) == 2
+    store.extend_packs([(1, 1, "a", False)])
+    assert store.hubs() == [1]
+    assert store.degree(1) == 3
+    assert store.degree(1, "a") == 2
+    assert list(store.search_rows(1, 2)) == [0]
+    assert list(store.search_rows(3, 1, "b")) == [1]
+    assert list(store.search_rows(1, 1, "a")) == [2]
+    assert list(store.search_rows(1, label="c")) == []
+    assert store.find(3, 1, "b", True) == 1
+    assert store.find(1, 3, "b", True) is None
+
+    token = store.remove_row(0)
+    assert store.degree(1) == 2 and store.degree(2) == 0
+    assert not store.has_incident(2)
+    assert list(store.search_rows(1, 2)) == []
+    store.restore_row(0, token)
+    assert list(store.search_rows(1, 2)) == [0]
+
+    # A hub stays a hub until the store is compacted.
+    store.remove_row(1)
+    store.remove_row(2)
+    assert store.hubs() == [1]
+    store.compact()
+    assert store.hubs() == []
+    assert list(store.degrees()) == [(1, 1), (2, 1)]
+
+    with pytest.raises(ValueError):
+        store.set_hub_threshold(0)
+
+
+@pytest.mark.parametrize("threshold", [None, 1, 4])
+def test_docnetdb_search_hub(tmp_path, threshold):
+    """Test if the searches find the same edges with and without hubs."""
+    generator = random.Random(49)
+    db = DocNetDB(tmp_path / "db.db")
+    vertices = [Vertex({"n": n}) for n in range(12)]
+    for vertex in vertices:
+        db.insert(vertex)
+    for __ in range(80):
+        db.insert_edge(
+            Edge(
+                generator.choice(vertices[:3]),
+                generator.choice(vertices),
+                generator.choice(["a", "b"]),
+                has_direction=generator.random() < 0.7,
+            )
+        )
+    expected = {
+        (v1.place, v2.place, label, direction): [
+            edge.pack() for edge in db.search_edge(v1, v2, label, direction)
+        ]
+        for v1 in vertices
+        for v2 in vertices
+        for label in ("a", "b", "c")
+        for direction in ("in", "all")
+    }
+    expected_degrees = [db.degree(vertex) for vertex in vertices]
+
+    db.set_hub_threshold(threshold)
+    for (p1, p2, label, direction), packs in expected.items():
+        assert [
+            edge.pack()
+            for edge in db.search_edge(db[p1], db[p2], label, direction)
+        ] == packs
+    assert [db.degree(vertex) for vertex in vertices] == expected_degrees
+    for vertex in vertices:
+        assert db.degree(vertex, "a") == len(
+            list(db.search_edge(vertex, label="a"))
+        )
+
+
+@pytest.mark.parametrize(
+    "db_class", [DocNetDB, ShardedDocNetDB, SQLiteDocNetDB]
+)
+def test_docnetdb_degree_stats(tmp_path, db_class):
+    """Test if the statistics count the edges of the vertices."""
+    db = db_class(tmp_path / "db")
+    db.set_hub_threshold(3)
+    center, *others = (Vertex() for __ in range(5))
+    db.insert(center)
+    for vertex in others:
+        db.insert(vertex)
+        db.insert_edge(Edge(center, vertex, "link"))
+    db.insert_edge(Edge(center, center, "loop"))
+
+    assert db.degree(center) == 5
+    assert db.degree(center, "link") == 4
+    assert db.degree(others[0]) == 1
+    stats = db.degree_stats(top=2)
+    assert stats["vertices"] == 5
+    assert stats["edges"] == 5
+    assert stats["max"] == 5
+    assert stats["mean"] == pytest.approx(9 / 5)
+    assert stats["histogram"] == {1: 4, 4: 1}
+    assert stats["top"][0] == (center, 5)
+    assert len(stats["top"]) == 2
+    assert stats["hub_threshold"] == 3
+    assert stats["hubs"] == 1
+
+    db.insert(Vertex())
+    assert db.degree_stats()["histogram"][0] == 1
+    with pytest.raises(VertexInsertionException):
+        db.degree(Vertex())
+    with pytest.raises(ValueError):
+        db.set_hub_threshold(-1)
+
+
+def test_frozendocnetdb_hubs(tmp_path):
+    """Test if a frozen copy keeps the hub threshold."""
+    db = DocNetDB(tmp_path / "db.db")
+    db.set_hub_threshold(2)
+    v1, v2, v3 = Vertex(), Vertex(), Vertex()
+    for vertex in (v1, v2, v3):
+        db.insert(vertex)
+    db.insert_edge(Edge(v1, v2))
+    db.insert_edge(Edge(v1, v3))
+    frozen = FrozenDocNetDB(db)
+    assert frozen._edges.hubs() == [1]
+    assert len(list(frozen.search_edge(frozen[1], frozen[3]))) == 1
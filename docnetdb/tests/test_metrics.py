@@ -0,0 +1,116 @@
+"""This module defines some tests on the DocNetDB instrumentation."""
+
+from docnetdb import DocNetDB, Edge, Vertex
+from docnetdb.metrics import MetricsHook
+from docnetdb.sharded import ShardedDocNetDB
+
+
+class RecordingHook(MetricsHook):
+    """A hook that keeps all the records."""
+
+    def __init__(self):
+        """Init the list of records."""
+        self.records = []
+
+    def on_operation(self, record):
+        """Keep the record."""
+        self.records.append(record)
+
+
+def test_metrics_disabled(tmp_path):
+    """Test if a DocNetDB has no stats and no wrappers by default."""
+    db = DocNetDB(tmp_path / "db.db")
+    db.insert(Vertex())
+    assert db.stats() == {}
+    assert "insert" not in vars(db)
+
+
+def test_metrics_counts(tmp_path):
+    """Test if the instrumented operations are counted and timed."""
+    db = DocNetDB(tmp_path / "db.db")
+    db.enable_metrics()
+    v1, v2, v3 = Vertex({"age": 10}), Vertex({"age": 20}), Vertex()
+    for vertex in v1, v2, v3:
+        db.insert(vertex)
+    db.insert_edge(Edge(v1, v2))
+    db.remove(v3)
+
+    stats = db.stats()
+    assert stats["insert"]["count"] == 3
+    assert stats["insert_edge"]["count"] == 1
+    assert stats["remove"]["count"] == 1
+    assert stats["insert"]["total_time"] >= stats["insert"]["max_time"] > 0
+    assert sum(stats["insert"]["histogram"].values()) == 3
+
+
+def test_metrics_search_rows(tmp_path):
+    """Test if the searches count the scanned and returned rows."""
+    db = DocNetDB(tmp_path / "db.db")
+    db.enable_metrics()
+    vertices = [Vertex({"age": age}) for age in range(10)]
+    for vertex in vertices:
+        db.insert(vertex)
+    db.insert_edge(Edge(vertices[0], vertices[1]))
+    db.insert_edge(Edge(vertices[2], vertices[3]))
+
+    assert len(list(db.search(lambda v: v["age"] > 6))) == 3
+    assert len(list(db.search_edge(vertices[0]))) == 1
+
+    stats = db.stats()
+    assert stats["search"]["rows_scanned"] == 10
+    assert stats["search"]["rows_returned"] == 3
+    # Only the rows of the edges of the vertex are read.
+    assert stats["search_edge"]["rows_scanned"] == 1
+    assert stats["search_edge"]["rows_returned"] == 1
+
+
+def test_metrics_file_bytes(tmp_path):
+    """Test if the loads and saves measure the file size."""
+    db = DocNetDB(tmp_path / "db.db")
+    db.insert(Vertex({"name": "Rush Hour"}))
+    db.save()
+    size = (tmp_path / "db.db").stat().st_size
+
+    db2 = DocNetDB(tmp_path / "db.db", metrics=True)
+    db2.save()
+    stats = db2.stats()
+    assert stats["load"]["bytes"] == size
+    assert stats["save"]["bytes"] == size
+
+
+def test_metrics_sharded_bytes(tmp_path):
+    """Test if the loads and saves measure the files of the shards."""
+    path = tmp_path / "db"
+    db = ShardedDocNetDB(path, shard_size=2)
+    for index in range(5):
+        db.insert(Vertex({"index": index}))
+    db.save()
+    size = sum(file_.stat().st_size for file_ in path.iterdir())
+
+    db2 = ShardedDocNetDB(path, metrics=True)
+    db2[3]["index"] = "changed"
+    db2.save()
+    stats = db2.stats()
+    assert stats["load"]["bytes"] == size
+    assert stats["save"]["bytes"] == sum(
+        (path / name).stat().st_size
+        for name in ("meta.json", "vertices-1.json", "edges-1.json")
+    )
+
+
+def test_metrics_hooks(tmp_path):
+    """Test if the hooks receive the records, until it is disabled."""
+    db = DocNetDB(tmp_path / "db.db")
+    hook = RecordingHook()
+    db.enable_metrics(hook)
+    db.insert(Vertex())
+    list(db.search(lambda v: True))
+
+    assert [record.name for record in hook.records] == ["insert", "search"]
+    assert hook.records[1].returned == 1
+    assert hook.records[1].details["predicate"].endswith("<lambda>")
+
+    db.disable_metrics()
+    db.insert(Vertex())
+    assert len(hook.records) == 2
+    assert db.stats() == {}
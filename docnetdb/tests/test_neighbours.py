@@ -0,0 +1,206 @@
+"""This module defines some tests on the neighbour indexes and similarity."""
+
+import math
+import random
+
+import pytest
+
+from docnetdb import DocNetDB, Edge, Vertex
+from docnetdb.exceptions import VertexInsertionException
+from docnetdb.neighbours import NeighbourIndex, SimilarityQuery
+from docnetdb.sharded import ShardedDocNetDB
+from docnetdb.sqlite import SQLiteDocNetDB
+
+# The (start, end, has_direction) ends of a small graph.
+ENDS = [(1, 2, True), (1, 3, True), (2, 3, False), (4, 3, True), (1, 2, True)]
+
+
+def test_neighbourindex():
+    """Test if the neighbours follow the direction of the edges."""
+    out_index = NeighbourIndex(ENDS, "out", 5)
+    assert list(out_index.neighbours(1)) == [2, 3]
+    assert list(out_index.neighbours(3)) == []
+    assert out_index.degree(4) == 1
+    assert out_index.degree(9) == 0
+
+    in_index = NeighbourIndex(ENDS, "in", 5)
+    assert list(in_index.neighbours(3)) == [1, 4]
+
+    none_index = NeighbourIndex(ENDS, "none", 5)
+    assert list(none_index.neighbours(3)) == [2]
+
+    all_index = NeighbourIndex(ENDS, "all", 5)
+    assert list(all_index.neighbours(3)) == [1, 2, 4]
+    assert all_index.common(1, 4) == [3]
+    assert all_index.common(2, 3) == [1]
+
+    transposed = NeighbourIndex(ENDS, "out", 5, transposed=True)
+    assert list(transposed.neighbours(3)) == list(in_index.neighbours(3))
+
+    # Like in search_edge, a directed loop is only an outgoing edge.
+    loops = [(1, 1, True), (2, 2, False), (3, 1, True)]
+    assert list(NeighbourIndex(loops, "out", 4).neighbours(1)) == [1]
+    assert list(NeighbourIndex(loops, "in", 4).neighbours(1)) == [3]
+    assert list(NeighbourIndex(loops, "none", 4).neighbours(2)) == [2]
+    transposed = NeighbourIndex(loops, "in", 4, transposed=True)
+    assert list(transposed.neighbours(1)) == []
+    assert list(transposed.neighbours(3)) == [1]
+
+    with pytest.raises(ValueError):
+        NeighbourIndex(ENDS, "sideways", 5)
+
+
+def test_similarityquery():
+    """Test if the measures and the top k are computed."""
+    index = NeighbourIndex(ENDS, "all", 5)
+    with pytest.raises(ValueError):
+        SimilarityQuery(index, index, "cosine")
+
+    common = SimilarityQuery(index, index, "common")
+    assert common.score(1, 4) == 1
+    jaccard = SimilarityQuery(index, index, "jaccard")
+    assert jaccard.score(1, 4) == 1 / 2
+    assert jaccard.score(1, 1) == 1
+    adamic_adar = SimilarityQuery(index, index, "adamic_adar")
+    assert adamic_adar.score(1, 4) == pytest.approx(1 / math.log(3))
+
+    # The neighbour 2 is only a neighbour of 1, so it weighs nothing.
+    out_index = NeighbourIndex(ENDS, "out", 5)
+    transposed = NeighbourIndex(ENDS, "out", 5, transposed=True)
+    adamic_adar = SimilarityQuery(out_index, transposed, "adamic_adar")
+    assert adamic_adar.score(1, 1) == pytest.approx(1 / math.log(2))
+    assert adamic_adar.top(1, 10) == [(4, pytest.approx(1 / math.log(2)))]
+
+    assert jaccard.top(1, 10) == [(4, 0.5), (2, 1 / 3), (3, 0.25)]
+    assert jaccard.top(1, 1) == [(4, 0.5)]
+    assert jaccard.top(1, 0) == []
+    assert jaccard.top(1, 2, candidates=[3, 2, 1]) == [
+        (2, 1 / 3),
+        (3, 0.25),
+    ]
+
+
+@pytest.mark.parametrize("measure", ["common", "jaccard", "adamic_adar"])
+@pytest.mark.parametrize("direction", ["out", "in", "all"])
+def test_similarityquery_random(measure, direction):
+    """Test if the top k matches the scores of all the pairs."""
+    generator = random.Random(46)
+    ends = [
+        (generator.randrange(1, 40), generator.randrange(1, 40), True)
+        for __ in range(200)
+    ]
+    forward = NeighbourIndex(ends, direction, 40)
+    reverse = NeighbourIndex(ends, direction, 40, transposed=True)
+    query = SimilarityQuery(forward, reverse, measure)
+
+    for place in range(1, 40, 7):
+        scores = [
+            (other, query.score(place, other))
+            for other in range(1, 40)
+            if other != place
+        ]
+        expected = sorted(
+            (item for item in scores if item[1] != 0),
+            key=lambda item: (-item[1], item[0]),
+        )[:5]
+        top = query.top(place, 5)
+        assert [item[0] for item in top] == [item[0] for item in expected]
+        assert [item[1] for item in top] == pytest.approx(
+            [item[1] for item in expected]
+        )
+        bounded = query.top(place, 5, candidates=range(1, 40))
+        assert [item[0] for item in bounded] == [item[0] for item in expected]
+
+
+@pytest.mark.parametrize(
+    "db_class", [DocNetDB, ShardedDocNetDB, SQLiteDocNetDB]
+)
+def test_docnetdb_similarity(tmp_path, db_class):
+    """Test if the similarity queries follow the edges."""
+    db = db_class(tmp_path / "db")
+    users = [Vertex({"user": name}) for name in "abc"]
+    songs = [Vertex({"song": number}) for number in range(4)]
+    for vertex in users + songs:
+        db.insert(vertex)
+    a, b, c = users
+    for user, song in [(a, 0), (a, 1), (b, 0), (b, 1), (b, 2), (c, 3)]:
+        db.insert_edge(Edge(user, songs[song], "liked"))
+    db.insert_edge(Edge(a, c, "follows"))
+
+    assert db.common_neighbours(a, b, label="liked") == songs[:2]
+    assert db.common_neighbours(a, b, direction="in") == []
+    assert db.similarity(a, b, label="liked") == 2 / 3
+    assert db.similarity(a, b, measure="common") == 2
+    assert db.similar_vertices(a, label="liked") == [(b, 2 / 3)]
+    assert db.similar_vertices(
+        songs[0], label="liked", direction="in", measure="common"
+    ) == [(songs[1], 2), (songs[2], 1)]
+    assert db.similar_vertices(a, candidates=[b, c], label="liked") == [
+        (b, 2 / 3)
+    ]
+
+    # The indexes are rebuilt when the edges change.
+    db.insert_edge(Edge(c, songs[0], "liked"))
+    assert db.similar_vertices(a, label="liked", measure="common") == [
+        (b, 2),
+        (c, 1),
+    ]
+    db.remove_edge(Edge(b, songs[1], "liked"))
+    assert db.similarity(a, b, label="liked", measure="common") == 1
+
+    # The song 3 is only liked by c.
+    assert db.similarity(c, c, label="liked", measure="adamic_adar") == (
+        pytest.approx(1 / math.log(3))
+    )
+
+    with pytest.raises(VertexInsertionException):
+        db.similarity(a, Vertex())
+    with pytest.raises(ValueError):
+        db.similarity(a, b, direction="sideways")
+
+
+@pytest.mark.parametrize("direction", ["out", "in", "none", "all"])
+def test_docnetdb_similarity_search_edge(tmp_path, direction):
+    """Test if the neighbours are the ends of the edges of search_edge."""
+    generator = random.Random(46)
+    db = DocNetDB(tmp_path / "db.db")
+    vertices = [Vertex({"n": n}) for n in range(12)]
+    for vertex in vertices:
+        db.insert(vertex)
+    for __ in range(50):
+        db.insert_edge(
+            Edge(
+                generator.choice(vertices),
+                generator.choice(vertices),
+                has_direction=generator.random() < 0.7,
+            )
+        )
+    for vertex in vertices[:3]:
+        db.insert_edge(Edge(vertex, vertex))
+
+    def neighbours(vertex):
+        return {
+            edge.other.place
+            for edge in db.search_edge(vertex, direction=direction)
+        }
+
+    for v1 in vertices:
+        for v2 in vertices:
+            common = neighbours(v1) & neighbours(v2)
+            assert db.similarity(
+                v1, v2, measure="common", direction=direction
+            ) == len(common)
+            union = neighbours(v1) | neighbours(v2)
+            assert db.similarity(v1, v2, direction=direction) == pytest.approx(
+                len(common) / len(union) if union else 0
+            )
+        expected = sorted(
+            (
+                (other, db.similarity(v1, other, direction=direction))
+                for other in vertices
+                if other is not v1
+            ),
+            key=lambda item: (-item[1], item[0].place),
+        )
+        expected = [item for item in expected if item[1] != 0][:4]
+        assert db.similar_vertices(v1, 4, direction=direction) == expected
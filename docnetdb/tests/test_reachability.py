@@ -0,0 +1,120 @@
+"""This module defines some tests on the reachability index."""
+
+import random
+
+import pytest
+
+from docnetdb import DocNetDB, Edge, Vertex
+from docnetdb.exceptions import VertexInsertionException
+from docnetdb.neighbours import NeighbourIndex
+from docnetdb.reachability import ReachabilityIndex
+from docnetdb.sharded import ShardedDocNetDB
+from docnetdb.sqlite import SQLiteDocNetDB
+
+
+def walk(neighbours, start):
+    """Return the places reached from a place, with a breadth-first walk."""
+    reached, frontier = set(), [start]
+    while frontier:
+        frontier = [
+            neighbour
+            for place in frontier
+            for neighbour in neighbours.neighbours(place)
+            if neighbour not in reached
+        ]
+        reached.update(frontier)
+    return reached
+
+
+def test_reachabilityindex_tree():
+    """Test if a tree has a single interval by vertex."""
+    ends = [(place, place // 2, True) for place in range(2, 64)]
+    index = ReachabilityIndex(NeighbourIndex(ends, "in", 64))
+    assert len(index._lows) == 63
+    assert index.is_reachable(1, 63)
+    assert index.is_reachable(2, 9)
+    assert not index.is_reachable(3, 9)
+    assert not index.is_reachable(9, 2)
+    assert not index.is_reachable(1, 1)
+    assert not index.is_reachable(1, 64)
+    assert sorted(index.reachable(2)) == [4, 5] + list(range(8, 12)) + list(
+        range(16, 24)
+    ) + list(range(32, 48))
+    assert list(index.reachable(63)) == []
+
+
+@pytest.mark.parametrize("direction", ["out", "in", "all"])
+def test_reachabilityindex_random(direction):
+    """Test if the index matches a walk, with cycles and shortcuts."""
+    generator = random.Random(47)
+    ends = [
+        (generator.randrange(1, 80), generator.randrange(1, 80), True)
+        for __ in range(120)
+    ]
+    neighbours = NeighbourIndex(ends, direction, 80)
+    index = ReachabilityIndex(neighbours)
+    for start in range(1, 80):
+        reached = walk(neighbours, start)
+        assert sorted(index.reachable(start)) == sorted(reached)
+        for end in range(1, 80):
+            assert index.is_reachable(start, end) == (end in reached)
+
+
+@pytest.mark.parametrize(
+    "db_class", [DocNetDB, ShardedDocNetDB, SQLiteDocNetDB]
+)
+def test_docnetdb_reachability(tmp_path, db_class):
+    """Test if the ancestors and descendants follow the edges."""
+    db = db_class(tmp_path / "db")
+    root, child, grandchild, other = (Vertex({"n": n}) for n in range(4))
+    for vertex in (root, child, grandchild, other):
+        db.insert(vertex)
+    db.insert_edge(Edge(child, root, "parent"))
+    db.insert_edge(Edge(grandchild, child, "parent"))
+    db.insert_edge(Edge(other, root, "friend"))
+
+    assert db.is_reachable(grandchild, root, label="parent")
+    assert not db.is_reachable(root, grandchild, label="parent")
+    assert not db.is_reachable(other, root, label="parent")
+    assert db.is_reachable(other, root)
+    assert list(db.descendants(grandchild, label="parent")) == [root, child]
+    assert sorted(
+        vertex["n"] for vertex in db.ancestors(root, label="parent")
+    ) == [1, 2]
+    assert list(db.descendants(root, label="parent", direction="in")) == list(
+        db.ancestors(root, label="parent")
+    )
+
+    # The index follows the changes of the edges.
+    db.insert_edge(Edge(root, other, "parent"))
+    assert db.is_reachable(child, other, label="parent")
+    db.remove_edge(Edge(child, root, "parent"))
+    assert not db.is_reachable(grandchild, root, label="parent")
+
+    with pytest.raises(VertexInsertionException):
+        db.is_reachable(root, Vertex())
+    with pytest.raises(ValueError):
+        list(db.ancestors(root, direction="up"))
+
+
+def test_docnetdb_reachability_kept(tmp_path):
+    """Test if the index is kept after the changes that don't change it."""
+    db = DocNetDB(tmp_path / "db.db")
+    v1, v2, v3 = Vertex(), Vertex(), Vertex()
+    for vertex in (v1, v2, v3):
+        db.insert(vertex)
+    db.insert_edge(Edge(v1, v2, "parent"))
+    db.insert_edge(Edge(v2, v3, "parent"))
+    assert db.is_reachable(v1, v3, label="parent")
+    index = db._reachability_indexes[("parent", "out")]
+
+    # A shortcut, and the edges of other labels.
+    db.insert_edge(Edge(v1, v3, "parent"))
+    db.insert_edge(Edge(v3, v1, "friend"))
+    db.remove_edge(Edge(v3, v1, "friend"))
+    assert db._reachability_index("parent", "out") is index
+
+    # A new path.
+    db.insert_edge(Edge(v3, v1, "parent"))
+    assert db.is_reachable(v1, v1, label="parent")
+    assert db._reachability_index("parent", "out") is not index
@@ -0,0 +1,127 @@
+"""This module defines some tests on the graph sampler."""
+
+import collections
+import random
+
+import pytest
+
+from docnetdb import DocNetDB, Edge, Vertex
+from docnetdb.sampling import GraphSampler, alias_table
+from docnetdb.sqlite import SQLiteDocNetDB
+
+# A ring of 20 places, with the shortcuts from each place to the next but
+# one.
+RING = [(place, place % 20 + 1, True) for place in range(1, 21)] + [
+    (place, (place + 1) % 20 + 1, True) for place in range(1, 21)
+]
+
+
+def test_alias_table():
+    """Test if an alias table draws the indexes in proportion."""
+    probabilities, aliases = alias_table([1.0, 2.0, 5.0])
+    shares = [0.0] * 3
+    for index in range(3):
+        shares[index] += probabilities[index] / 3
+        shares[aliases[index]] += (1 - probabilities[index]) / 3
+    assert shares == pytest.approx([1 / 8, 2 / 8, 5 / 8])
+
+
+def test_graphsampler_walks():
+    """Test if the walks follow the edges and are reproducible."""
+    sampler = GraphSampler(RING, "out", 21)
+    assert len(sampler) == 40
+    assert list(sampler.neighbours(20)) == [1, 2]
+    assert sampler.degree(21) == 0
+
+    walks = sampler.walks(range(1, 21), 10, seed=1, batch_size=3)
+    assert len(walks) == 20
+    for start, walk in zip(range(1, 21), walks):
+        assert walk[0] == start and len(walk) == 10
+        for place, following in zip(walk, walk[1:]):
+            assert following in sampler.neighbours(place)
+
+    assert sampler.walks(range(1, 21), 10, seed=1, batch_size=3) == walks
+    assert sampler.walks(range(1, 21), 10, seed=2, batch_size=3) != walks
+    assert sampler.walks([21], 10, seed=1) == [[21]]
+
+    with pytest.raises(ValueError):
+        sampler.walks([1], 10, p=0)
+
+
+def test_graphsampler_processes():
+    """Test if a process pool makes the same walks."""
+    sampler = GraphSampler(RING, "all", 21)
+    starts = list(range(1, 21)) * 5
+    walks = sampler.walks(starts, 8, p=0.5, q=2, seed=3, batch_size=7)
+    assert (
+        sampler.walks(starts, 8, p=0.5, q=2, seed=3, batch_size=7, processes=2)
+        == walks
+    )
+
+
+def test_graphsampler_weighted():
+    """Test if the weighted steps are drawn in proportion to the weights."""
+    ends = [(1, 2, True, 1), (1, 3, True, 3), (1, 4, True, 0)]
+    sampler = GraphSampler(ends, "out", 5, weighted=True)
+    assert list(sampler.neighbours(1)) == [2, 3]
+    generator = random.Random(4)
+    counts = collections.Counter(
+        sampler.walk(generator, 1, 2)[1] for __ in range(4000)
+    )
+    assert counts[3] / 4000 == pytest.approx(0.75, abs=0.03)
+
+    with pytest.raises(ValueError):
+        GraphSampler([(1, 2, True, -1)], "out", 3, weighted=True)
+
+
+def test_graphsampler_node2vec():
+    """Test if a low p makes the walks go back."""
+    sampler = GraphSampler(RING, "all", 21)
+    generator = random.Random(5)
+    back = sum(
+        walk[2] == walk[0]
+        for walk in (
+            sampler.walk(generator, 1, 3, p=0.01, q=1) for __ in range(200)
+        )
+    )
+    assert back > 180
+
+
+def test_graphsampler_neighbourhood():
+    """Test if the neighbourhoods are drawn hop by hop."""
+    sampler = GraphSampler(RING, "all", 21)
+    hops = sampler.sample_neighbourhood([1], [2, 3], seed=6)
+    assert len(hops) == 2
+    assert list(hops[0]) == [1]
+    assert len(hops[0][1]) == 2
+    assert set(hops[0][1]) <= {19, 20, 2, 3}
+    assert list(hops[1]) == hops[0][1]
+    for place, drawn in hops[1].items():
+        assert len(drawn) == 3
+        assert set(drawn) <= set(sampler.neighbours(place))
+    assert sampler.sample_neighbourhood([1], [2, 3], seed=6) == hops
+
+    weighted = GraphSampler(
+        [(1, 2, True, 1), (1, 3, True, 1000)], "out", 4, weighted=True
+    )
+    assert weighted.sample_neighbourhood([1], [1], seed=7) == [{1: [3]}]
+    assert weighted.sample_neighbourhood([1], [5]) == [{1: [2, 3]}]
+
+
+@pytest.mark.parametrize("db_class", [DocNetDB, SQLiteDocNetDB])
+def test_docnetdb_sampler(tmp_path, db_class):
+    """Test if a sampler follows the label and the weights of the edges."""
+    db = db_class(tmp_path / "db")
+    v1, v2, v3 = Vertex(), Vertex(), Vertex()
+    for vertex in (v1, v2, v3):
+        db.insert(vertex)
+    db.insert_edge(Edge(v1, v2, "likes", properties={"w": 0}))
+    db.insert_edge(Edge(v1, v3, "likes"))
+    db.insert_edge(Edge(v2, v3, "knows"))
+
+    sampler = db.sampler(label="likes", weight="w")
+    assert list(sampler.neighbours(1)) == [3]
+    assert db.sampler(label="likes").walks([1, 2], 3, seed=1)[1] == [2]
+    assert db.sampler(direction="in").walks([3], 3, seed=1)[0][1] in (1, 2)
+    with pytest.raises(ValueError):
+        db.sampler(direction="up")
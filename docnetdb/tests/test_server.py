@@ -0,0 +1,131 @@
+"""This module defines some tests on the DocNetDB server and client."""
+
+import socket
+
+import pytest
+
+from docnetdb import DocNetDB, Edge, Vertex, VertexInsertionException
+from docnetdb.server import DocNetDBClient, DocNetDBServer
+from docnetdb.sqlite import SQLiteDocNetDB
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(socket, "AF_UNIX"), reason="Unix domain sockets required"
+)
+
+
+@pytest.fixture(params=[DocNetDB, SQLiteDocNetDB])
+def served_db(tmp_path, request):
+    """Serve a DocNetDB with 3 vertices and return it with a client.
+
+    The requests are executed in the threads of the server, so the tests
+    run on each storage backend.
+    """
+    db = request.param(tmp_path / "db.db")
+    for name in "abc":
+        db.insert(Vertex({"name": name}))
+    db.insert_edge(Edge(db[1], db[2], "link"))
+    server = DocNetDBServer(db, tmp_path / "db.sock")
+    server.start()
+    client = DocNetDBClient(tmp_path / "db.sock", pool_size=2)
+    yield db, client
+    client.close()
+    server.shutdown()
+
+
+def test_server_getitem(served_db):
+    """Test if the client returns copies of the served vertices."""
+    db, client = served_db
+    vertex = client[2]
+    assert vertex == {"name": "b"}
+    assert vertex.place == 2
+    assert vertex is not db[2]
+    assert len(client) == 3
+
+    with pytest.raises(KeyError):
+        client[42]
+    with pytest.raises(TypeError):
+        client["1"]
+
+
+def test_server_insert_and_remove(served_db):
+    """Test if the insertions and removals reach the served database."""
+    db, client = served_db
+    vertex = Vertex({"name": "d"})
+    assert client.insert(vertex) == 4
+    assert vertex.place == 4
+    assert db[4] == {"name": "d"}
+    assert vertex in client
+
+    assert client.remove(vertex) == 4
+    assert vertex.is_inserted is False
+    assert len(db) == 3
+
+    # The exceptions of the served database are raised by the client.
+    with pytest.raises(ValueError):
+        client.remove(client[1])
+    with pytest.raises(VertexInsertionException):
+        client.remove(Vertex())
+
+
+def test_server_update(served_db):
+    """Test if the client can update the fields of a served vertex."""
+    db, client = served_db
+    vertex = client[3]
+    vertex["name"] = "C"
+    vertex["age"] = 12
+    client.update(vertex)
+    assert db[3] == {"name": "C", "age": 12}
+
+
+def test_server_edges(served_db):
+    """Test if the client can insert, search and remove edges."""
+    db, client = served_db
+    client.insert_edge(Edge(client[2], client[3], "other", False))
+    assert len(list(db.edges())) == 2
+
+    v2 = client[2]
+    edges = list(client.search_edge(v2))
+    assert [(e.other.place, e.direction, e.label) for e in edges] == [
+        (1, "in", "link"),
+        (3, "none", "other"),
+    ]
+    assert edges[0].anchor is v2
+    assert list(client.search_edge(v2, label="nothing")) == []
+
+    client.remove_edge(edges[0])
+    assert list(db.search_edge(db[1])) == []
+
+
+def test_server_pipeline(served_db):
+    """Test if pipelined requests are answered in order."""
+    db, client = served_db
+    with client.pipeline() as pipe:
+        for name in "def":
+            pipe.insert(Vertex({"name": name}))
+        pipe.getitem(1)
+    assert pipe.results[:3] == [4, 5, 6]
+    assert pipe.results[3] == {"name": "a"}
+    assert len(db) == 6
+
+
+def test_server_pipeline_error(served_db):
+    """Test if the results of a pipeline are processed before an error."""
+    db, client = served_db
+    vertex = Vertex({"name": "d"})
+    pipe = client.pipeline()
+    pipe.getitem(42)
+    pipe.insert(vertex)
+    pipe.remove(client[1])
+    with pytest.raises(KeyError):
+        pipe.execute()
+    assert vertex.place == 4
+    assert db[4] == {"name": "d"}
+    assert isinstance(pipe.results[0], KeyError)
+    assert isinstance(pipe.results[2], ValueError)
+
+
+def test_server_save(served_db):
+    """Test if the client can make the server save its database."""
+    db, client = served_db
+    client.save()
+    assert len(type(db)(db.path)) == 3
@@ -0,0 +1,190 @@
+"""This module defines some tests on the ShardedDocNetDB class."""
+
+import json
+
+import pytest
+
+from docnetdb import DocNetDB, Edge, Vertex
+from docnetdb.exceptions import ReadOnlyDatabaseException
+from docnetdb.sharded import ShardedDocNetDB
+
+
+def make_sharded_db(path, **kwargs):
+    """Return a saved ShardedDocNetDB with 3 shards of 2 places."""
+    db = ShardedDocNetDB(path, shard_size=2, **kwargs)
+    for index in range(5):
+        db.insert(Vertex({"index": index}))
+    db.insert_edge(Edge(db[1], db[4], "a"))
+    db.insert_edge(Edge(db[5], db[2], "b"))
+    db.insert_edge(Edge(db[4], db[3], "c", has_direction=False))
+    db.save()
+    return db
+
+
+def test_sharded_files(tmp_path):
+    """Test if the vertices and edges are partitioned in the files."""
+    make_sharded_db(tmp_path / "db")
+
+    with open(tmp_path / "db" / "meta.json") as file_:
+        assert json.load(file_) == {
+            "_next_place": 6,
+            "shard_size": 2,
+            "shards": [0, 1, 2],
+            "compression": None,
+        }
+    with open(tmp_path / "db" / "vertices-1.json") as file_:
+        assert json.load(file_) == {"3": {"index": 2}, "4": {"index": 3}}
+    with open(tmp_path / "db" / "edges-1.json") as file_:
+        assert json.load(file_) == [[3, 4, "c", False]]
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_sharded_load(tmp_path, workers):
+    """Test if the shards are loaded and merged, with or without a pool."""
+    make_sharded_db(tmp_path / "db")
+
+    db = ShardedDocNetDB(tmp_path / "db", workers=workers)
+    assert db.shard_size == 2
+    assert [vertex["index"] for vertex in db] == [0, 1, 2, 3, 4]
+    assert db[3] == {"index": 2}
+    assert [edge.label for edge in db.search_edge(db[4])] == ["a", "c"]
+    assert db.insert(Vertex()) == 6
+    assert list(db.search(lambda v: v["index"] > 3)) == [db[5]]
+
+
+def test_sharded_dirty_shards(tmp_path):
+    """Test if only the modified shards are written on save."""
+    path = tmp_path / "db"
+    make_sharded_db(path)
+
+    db = ShardedDocNetDB(path)
+    assert db.dirty_shards == set()
+    inodes = {
+        shard: (path / f"vertices-{shard}.json").stat().st_ino
+        for shard in range(3)
+    }
+
+    db[3]["index"] = "changed"
+    db.remove_edge(Edge(db[5], db[2], "b"))
+    assert db.dirty_shards == {1, 2}
+    db.save()
+    assert db.dirty_shards == set()
+    assert (path / "vertices-0.json").stat().st_ino == inodes[0]
+    assert (path / "vertices-1.json").stat().st_ino != inodes[1]
+
+    db = ShardedDocNetDB(path)
+    assert db[3]["index"] == "changed"
+    assert [edge.label for edge in db.edges()] == ["a", "c"]
+
+    db.insert(Vertex())
+    assert db.dirty_shards == {2}
+
+
+def test_sharded_nested_changes(tmp_path):
+    """Test if the shards of the vertices changed in place are saved."""
+    path = tmp_path / "db"
+    db = make_sharded_db(path)
+    db[3]["tags"] = []
+    db.save()
+
+    db = ShardedDocNetDB(path)
+    db[3]["tags"].append("x")
+    assert db.dirty_shards == {1}
+    db.save()
+    assert db.dirty_shards == set()
+    db[3]["tags"].append("y")
+    db.save()
+
+    db = ShardedDocNetDB(path)
+    assert db[3] == {"index": 2, "tags": ["x", "y"]}
+    assert db.dirty_shards == set()
+
+
+def test_sharded_transaction(tmp_path):
+    """Test if the shards are still tracked after a transaction."""
+    path = tmp_path / "db"
+    db = make_sharded_db(path)
+
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            db[1]["index"] = "rolled back"
+            raise RuntimeError()
+    db[5]["index"] = "changed"
+    assert db.dirty_shards == {0, 2}
+    db.save()
+
+    db = ShardedDocNetDB(path)
+    assert db[1]["index"] == 0
+    assert db[5]["index"] == "changed"
+
+
+def test_sharded_compression(tmp_path):
+    """Test if the shard files are compressed, and recompressed."""
+    path = tmp_path / "db"
+    make_sharded_db(path, compression="gzip")
+    assert (path / "vertices-0.json.gz").exists()
+
+    db = ShardedDocNetDB(path, compression="lzma")
+    assert db[2] == {"index": 1}
+    db.save()
+    assert sorted(file_.name for file_ in path.iterdir()) == [
+        "edges-0.json.xz",
+        "edges-1.json.xz",
+        "edges-2.json.xz",
+        "meta.json",
+        "vertices-0.json.xz",
+        "vertices-1.json.xz",
+        "vertices-2.json.xz",
+    ]
+    assert [edge.label for edge in ShardedDocNetDB(path).edges()] == [
+        "a",
+        "c",
+        "b",
+    ]
+
+
+def test_sharded_partial_load(tmp_path):
+    """Test if the partial load options work on the shards."""
+    make_sharded_db(tmp_path / "db")
+
+    db = ShardedDocNetDB(tmp_path / "db", where=lambda v: v["index"] < 4)
+    assert len(db) == 4
+    assert [edge.label for edge in db.edges()] == ["a", "c"]
+    with pytest.raises(ReadOnlyDatabaseException):
+        db.save()
+
+
+def test_sharded_same_api(tmp_path):
+    """Test if the ShardedDocNetDB returns the same data as the DocNetDB."""
+    sharded = make_sharded_db(tmp_path / "db")
+    db = DocNetDB(tmp_path / "single.db")
+    for vertex in sharded:
+        db.insert(Vertex(vertex))
+    for edge in sharded.edges():
+        db.insert_edge(
+            Edge(
+                *(db[v.place] for v in (edge.start, edge.end)),
+                edge.label,
+                edge.has_direction,
+            )
+        )
+
+    for place in range(1, 6):
+        assert [e.pack() for e in sharded.search_edge(sharded[place])] == [
+            e.pack() for e in db.search_edge(db[place])
+        ]
+
+
+def test_sharded_remove_many(tmp_path):
+    """Test if remove_many marks the shards of the vertices and edges."""
+    path = tmp_path / "db"
+    make_sharded_db(path)
+
+    db = ShardedDocNetDB(path)
+    assert db.remove_many([db[2]]) == {"vertices": 1, "edges": 1}
+    assert db.dirty_shards == {0, 2}
+    db.save()
+
+    db = ShardedDocNetDB(path)
+    assert [vertex["index"] for vertex in db] == [0, 2, 3, 4]
+    assert [edge.label for edge in db.edges()] == ["a", "c"]
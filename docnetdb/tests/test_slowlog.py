@@ -0,0 +1,83 @@
+"""This module defines some tests on the slow operation log."""
+
+import logging
+import time
+
+from docnetdb import DocNetDB, Edge, Vertex
+
+
+def slow_gate(vertex):
+    """Accept every vertex, slowly."""
+    time.sleep(0.002)
+    return True
+
+
+def test_slowlog_threshold(tmp_path):
+    """Test if only the operations above the threshold are kept."""
+    db = DocNetDB(tmp_path / "db.db")
+    slow_log = db.enable_slow_log(threshold=0.005)
+    for __ in range(5):
+        db.insert(Vertex())
+    assert len(slow_log) == 0
+
+    assert len(list(db.search(slow_gate))) == 5
+    (entry,) = slow_log
+    assert entry.name == "search"
+    assert entry.duration >= 0.005
+    assert entry.details["predicate"].endswith("slow_gate")
+    assert (entry.scanned, entry.returned) == (5, 5)
+
+
+def test_slowlog_search_edge_details(tmp_path):
+    """Test if the arguments of a slow search_edge are kept."""
+    db = DocNetDB(tmp_path / "db.db")
+    v1, v2 = Vertex(), Vertex()
+    db.insert(v1)
+    db.insert(v2)
+    db.insert_edge(Edge(v1, v2, "link"))
+    slow_log = db.enable_slow_log(threshold=0)
+
+    list(db.search_edge(v2, label="link", direction="in"))
+    assert slow_log.entries[-1].details == {
+        "vertex": 2,
+        "other": None,
+        "label": "link",
+        "direction": "in",
+    }
+    db.insert(Vertex())
+    assert slow_log.entries[-1].details == {"vertex": 3}
+
+
+def test_slowlog_capacity(tmp_path):
+    """Test if the buffer only keeps the last slow operations."""
+    db = DocNetDB(tmp_path / "db.db")
+    slow_log = db.enable_slow_log(threshold=0, capacity=3)
+    for __ in range(5):
+        db.insert(Vertex())
+    assert [entry.details["vertex"] for entry in slow_log] == [3, 4, 5]
+
+    db.disable_slow_log()
+    db.insert(Vertex())
+    assert len(slow_log) == 3
+
+
+def test_slowlog_logger(tmp_path, caplog):
+    """Test if the slow operations go through the package logger."""
+    db = DocNetDB(tmp_path / "db.db")
+    db.enable_slow_log(threshold=0)
+    with caplog.at_level(logging.WARNING, logger="docnetdb"):
+        db.insert(Vertex())
+    (record,) = caplog.records
+    assert record.name == "docnetdb"
+    assert "insert(vertex=1)" in record.getMessage()
+
+
+def test_logger_import_creates_no_file(tmp_path, monkeypatch):
+    """Test if importing the logger doesn't create a log file."""
+    import importlib
+
+    import docnetdb.logger
+
+    monkeypatch.chdir(tmp_path)
+    importlib.reload(docnetdb.logger)
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,169 @@
+"""This module defines some tests on the SQLiteDocNetDB class.
+
+The tests of the DocNetDB API run on it too, in test_docnetdb.py.
+"""
+
+import gc
+import sqlite3
+
+import pytest
+
+from docnetdb import DocNetDB, Edge, Vertex
+from docnetdb.examples.edges import ColoredEdge
+from docnetdb.sqlite import SQLiteDocNetDB, convert_to_json, convert_to_sqlite
+
+
+def make_sqlite_db(path):
+    """Return a saved SQLiteDocNetDB with 3 vertices and 2 edges."""
+    db = SQLiteDocNetDB(path)
+    for index in range(3):
+        db.insert(Vertex({"index": index}))
+    db.insert_edge(Edge(db[1], db[2], "a"))
+    db.insert_edge(Edge(db[3], db[2], "b", has_direction=False))
+    db.save()
+    return db
+
+
+def test_sqlite_tables(tmp_path):
+    """Test if the vertices, edges and _next_place are in the tables."""
+    path = tmp_path / "db.sqlite"
+    make_sqlite_db(path)
+
+    connection = sqlite3.connect(str(path))
+    assert connection.execute("SELECT * FROM vertices").fetchall() == [
+        (1, '{"index": 0}'),
+        (2, '{"index": 1}'),
+        (3, '{"index": 2}'),
+    ]
+    assert connection.execute(
+        "SELECT start_place, end_place, label, has_direction FROM edges"
+    ).fetchall() == [(1, 2, "a", 1), (2, 3, "b", 0)]
+    assert connection.execute("SELECT * FROM meta").fetchall() == [
+        ("_next_place", 4)
+    ]
+
+
+def test_sqlite_lazy_vertices(tmp_path):
+    """Test if the vertices are read when needed, and kept while used."""
+    path = tmp_path / "db.sqlite"
+    make_sqlite_db(path)
+
+    db = SQLiteDocNetDB(path)
+    assert len(db._vertices._loaded) == 0
+    vertex = db[2]
+    assert db[2] is vertex
+    assert list(db._vertices._loaded) == [2]
+
+    del vertex
+    gc.collect()
+    assert len(db._vertices._loaded) == 0
+    assert db[2] == {"index": 1}
+
+
+def test_sqlite_save(tmp_path):
+    """Test if the modifications are only written by save."""
+    path = tmp_path / "db.sqlite"
+    make_sqlite_db(path)
+
+    db = SQLiteDocNetDB(path)
+    db[1]["index"] = "changed"
+    db.insert(Vertex({"index": 3}))
+    db.remove_edge(Edge(db[1], db[2], "a"))
+    assert SQLiteDocNetDB(path)[1] == {"index": 0}
+
+    # The modified vertex is written even if it isn't referenced anymore.
+    gc.collect()
+    db.save()
+    db = SQLiteDocNetDB(path)
+    assert db[1] == {"index": "changed"}
+    assert len(db) == 4
+    assert [edge.label for edge in db.edges()] == ["b"]
+
+    db[1]["index"] = "discarded"
+    db.load()
+    assert db[1] == {"index": "changed"}
+
+
+def test_sqlite_edge_subclass(tmp_path):
+    """Test if the packs of the Edge subclasses are kept."""
+    path = tmp_path / "db.sqlite"
+    db = SQLiteDocNetDB(path, edge_creation_callable=ColoredEdge.from_pack)
+    db.insert(Vertex())
+    db.insert(Vertex())
+    edge = ColoredEdge(db[1], db[2], "a", color="red")
+    db.insert_edge(edge)
+    edge.color = "blue"
+    assert next(db.edges()) is edge
+    db.save()
+
+    db = SQLiteDocNetDB(path, edge_creation_callable=ColoredEdge.from_pack)
+    edge = next(db.search_edge(db[2], label="a", direction="in"))
+    assert type(edge) is ColoredEdge
+    assert edge.color == "blue"
+
+
+def test_sqlite_metrics(tmp_path):
+    """Test if the searched edges only scan the matching records."""
+    db = make_sqlite_db(tmp_path / "db.sqlite")
+    db.enable_metrics()
+    assert len(list(db.search_edge(db[2], label="a"))) == 1
+    assert db.stats()["search_edge"]["rows_scanned"] == 1
+
+
+def test_sqlite_convert(tmp_path):
+    """Test if the conversions keep the files the same."""
+    json_path = tmp_path / "db.json"
+    db = DocNetDB(json_path)
+    for index in range(3):
+        db.insert(Vertex({"index": index}))
+    db.remove(db[2])
+    db.insert_edge(ColoredEdge(db[3], db[1], "a"))
+    db.insert_edge(ColoredEdge(db[1], db[3], "b", color="red"))
+    db.insert_edge(
+        ColoredEdge(db[1], db[1], "c", properties={"w": 1}, color="red")
+    )
+    db.save()
+
+    convert_to_sqlite(json_path, tmp_path / "db.sqlite")
+    sqlite_db = SQLiteDocNetDB(
+        tmp_path / "db.sqlite", edge_creation_callable=ColoredEdge.from_pack
+    )
+    assert [vertex.place for vertex in sqlite_db] == [1, 3]
+    assert [edge.label for edge in sqlite_db.search_edge(sqlite_db[1])] == [
+        "a",
+        "b",
+        "c",
+    ]
+    assert [edge.color for edge in sqlite_db.find_edges("w", 1)] == ["red"]
+    assert sqlite_db.insert(Vertex()) == 4
+
+    convert_to_json(tmp_path / "db.sqlite", tmp_path / "back.json.gz")
+    convert_to_sqlite(tmp_path / "back.json.gz", tmp_path / "back.sqlite")
+    convert_to_json(tmp_path / "back.sqlite", tmp_path / "back.json")
+    assert (tmp_path / "back.json").read_text() == json_path.read_text()
+
+
+def test_sqlite_edge_indexes(tmp_path):
+    """Test if the indexes of the edge properties are stored in the file."""
+    path = tmp_path / "db.sqlite"
+    db = SQLiteDocNetDB(path)
+    for __ in range(3):
+        db.insert(Vertex())
+    db.insert_edge(Edge(db[1], db[2], properties={"wéight": 0.9}))
+    db.insert_edge(Edge(db[2], db[3], properties={"wéight": 0.1, 'a"b': 1}))
+    db.create_edge_index("wéight", "sorted")
+    db.save()
+
+    db = SQLiteDocNetDB(path)
+    assert db.edge_indexes() == {"wéight": "sorted"}
+    plan = db._connection.execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM edges "
+        "WHERE json_extract(properties, '$.\"wéight\"') > 0.5"
+    ).fetchall()
+    assert "edges_property_sorted_" in str(plan)
+    assert [e.end.place for e in db.find_edges_in_range("wéight", 0.5)] == [2]
+
+    # The keys that SQLite can't find in a path are scanned.
+    assert [e.end.place for e in db.find_edges('a"b', 1)] == [3]
+    with pytest.raises(ValueError):
+        db.create_edge_index('a"b')
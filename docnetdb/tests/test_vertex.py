@@ -1,5 +1,7 @@
 """This module defines some tests on the Vertex class."""
 
+import pickle
+
 import pytest
 
 from docnetdb import Vertex
@@ -44,3 +46,17 @@ def test_vertex_items():
     with pytest.raises(KeyError):
         v["name"]
     assert v["version"] == 3
+
+
+def test_vertex_pickle():
+    """Test if a pickled Vertex keeps its fields and its place."""
+    v = Vertex({"name": "v"})
+    v.place = 2
+    v.custom = [1]
+    # The database is not pickled.
+    v._db = lambda: None
+    copy = pickle.loads(pickle.dumps(v))
+    assert copy == v
+    assert copy.place == 2
+    assert copy.custom == [1]
+    assert copy._db is None
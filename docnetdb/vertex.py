@@ -1,7 +1,10 @@
 """This module define the Vertex class."""
 
 
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
+
+# A sentinel used to notify the creation or the deletion of a field.
+_MISSING = object()
 
 
 class Vertex(dict):
@@ -23,10 +26,15 @@ class Vertex(dict):
         # a DocNetDB.
         self.place = 0
 
+        # The DocNetDB the Vertex is inserted in. It is notified of the
+        # changes of the fields when it watches them (during a transaction
+        # for instance).
+        self._db = None
+
         # All the elements (the fields of the Vertex) are strings. The value
         # can be anything.
         if init_dict is not None:
-            self.update(**init_dict)
+            self.update(init_dict)
 
     # FACTORIES
 
@@ -48,6 +56,18 @@ class Vertex(dict):
         """
         return cls(pack)
 
+    @classmethod
+    def _adopt(cls, pack: Dict) -> "Vertex":
+        """Create a Vertex from a decoded pack, bypassing __init__.
+
+        This is the fast path of the DocNetDB load, only used when the class
+        overrides neither __init__ nor from_pack. The fields are merged at
+        the C level, and the place and database are set by the caller.
+        """
+        vertex = cls.__new__(cls)
+        dict.update(vertex, pack)
+        return vertex
+
     # EXPORT METHODS
 
     def pack(self) -> Dict:
@@ -64,6 +84,106 @@ class Vertex(dict):
         # mistake.
         return self.copy()
 
+    # FIELD MODIFICATION METHODS
+
+    # The dict methods that modify the fields are overriden to notify the
+    # database. When the Vertex is not inserted, or when its database
+    # doesn't watch the fields, the dict method is called first thing.
+
+    def _is_watched(self) -> bool:
+        """Return whether the changes of the fields must be notified."""
+        db = self._db
+        return db is not None and db._watching_fields
+
+    def _notify(self, key: Any, old: Any, new: Any) -> None:
+        """Notify the database of the change of a field.
+
+        ``old`` is _MISSING for a new field, ``new`` is _MISSING for a
+        deleted field.
+        """
+        self._db._field_changed(self, key, old, new)
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        """Override the __setitem__ method to notify the change."""
+        db = self._db
+        if db is None or not db._watching_fields:
+            dict.__setitem__(self, key, value)
+            return
+        old = self.get(key, _MISSING)
+        super().__setitem__(key, value)
+        self._notify(key, old, value)
+
+    def __delitem__(self, key: Any) -> None:
+        """Override the __delitem__ method to notify the change."""
+        db = self._db
+        if db is None or not db._watching_fields:
+            dict.__delitem__(self, key)
+            return
+        old = self[key]
+        super().__delitem__(key)
+        self._notify(key, old, _MISSING)
+
+    def update(self, *args, **kwargs) -> None:
+        """Override the update method to notify the changes."""
+        db = self._db
+        if db is None or not db._watching_fields:
+            dict.update(self, *args, **kwargs)
+            return
+        # Like dict.update, this doesn't use an overriden __setitem__.
+        for key, value in dict(*args, **kwargs).items():
+            Vertex.__setitem__(self, key, value)
+
+    def __ior__(self, other: Any) -> "Vertex":
+        """Override the |= operator to notify the changes, like update."""
+        self.update(other)
+        return self
+
+    def setdefault(self, key: Any, default: Any = None) -> Any:
+        """Override the setdefault method to notify the change."""
+        db = self._db
+        if db is None or not db._watching_fields or key in self:
+            return dict.setdefault(self, key, default)
+        Vertex.__setitem__(self, key, default)
+        return default
+
+    def pop(self, key: Any, *default) -> Any:
+        """Override the pop method to notify the change."""
+        db = self._db
+        if db is None or not db._watching_fields or key not in self:
+            return dict.pop(self, key, *default)
+        value = dict.pop(self, key)
+        self._notify(key, value, _MISSING)
+        return value
+
+    def popitem(self) -> Any:
+        """Override the popitem method to notify the change."""
+        db = self._db
+        if db is None or not db._watching_fields:
+            return dict.popitem(self)
+        key, value = dict.popitem(self)
+        self._notify(key, value, _MISSING)
+        return key, value
+
+    def clear(self) -> None:
+        """Override the clear method to notify the changes."""
+        db = self._db
+        if db is None or not db._watching_fields:
+            dict.clear(self)
+            return
+        while self:
+            self.popitem()
+
+    def _restore_field(self, key: Any, value: Any) -> None:
+        """Restore a field without notifying the database.
+
+        This is used to undo a change. The field is deleted if ``value`` is
+        _MISSING.
+        """
+        if value is _MISSING:
+            dict.pop(self, key, None)
+        else:
+            dict.__setitem__(self, key, value)
+
     # CUSTOM METHODS
 
     def __repr__(self) -> str:
@@ -71,6 +191,16 @@ class Vertex(dict):
         place_str = f"{self.place}" if self.is_inserted else ""
         return f"<Vertex ({place_str}) {super().__repr__()}>"
 
+    def __reduce__(self):
+        """Pickle the Vertex without its database."""
+        state = (self.place, dict(self.items()))
+        attributes = {
+            name: value
+            for name, value in self.__dict__.items()
+            if name not in ("place", "_db")
+        }
+        return (_rebuild, (type(self), state), attributes or None)
+
     # PROPERTIES
 
     @property
@@ -95,3 +225,13 @@ class Vertex(dict):
         will be raised.
         """
         return True
+
+
+def _rebuild(cls, state) -> Vertex:
+    """Rebuild an unpickled Vertex."""
+    place, fields = state
+    vertex = cls.__new__(cls)
+    vertex.place = place
+    vertex._db = None
+    dict.update(vertex, fields)
+    return vertex